@@ -14,6 +14,7 @@
 """
 
 import logging
+import time
 from pathlib import Path
 
 from flask import Flask
@@ -25,6 +26,13 @@ from arb.portal.globals import Globals
 from arb.portal.routes import main
 from arb.portal.startup.db import db_initialize_and_create, reflect_database
 from arb.portal.startup.flask import configure_flask_app
+from arb.portal.startup.lifecycle import record_startup, start_worker_services
+from arb.portal.utils.db_pool import apply_pool_settings, init_pool_metrics
+from arb.portal.utils.db_routing import init_read_replicas
+from arb.portal.utils.diagnostics_policy import init_diagnostics_policy
+from arb.portal.utils.form_page_cache import init_form_page_cache
+from arb.portal.utils.incidence_cache import init_incidence_cache
+from arb.portal.utils.incidence_summary import init_incidence_summary
 from arb.utils.database import get_reflected_base
 
 logger = logging.getLogger(__name__)
@@ -49,7 +57,12 @@ def create_app() -> Flask:
   Examples:
     from arb.portal.app import create_app
     app = create_app()
+
+  Notes:
+    - With PRELOAD_APP set (gunicorn master), per-process services are not started here; each
+      worker starts them after fork (see `arb.portal.startup.lifecycle`).
   """
+  started = time.perf_counter()
   app: Flask = Flask(__name__)
 
   # Load configuration from config/settings.py
@@ -60,7 +73,14 @@ def create_app() -> Flask:
   configure_flask_app(app)
 
   # Initialize Flask extensions
+  apply_pool_settings(app)
   db.init_app(app)
+  init_read_replicas(app)
+  init_pool_metrics(app)
+  init_incidence_cache(app)
+  init_form_page_cache(app)
+  init_incidence_summary(app)
+  init_diagnostics_policy(app)
   # GPT recommends this, but I'm commenting it out for now
   # csrf.init_app(app)
 
@@ -81,4 +101,11 @@ def create_app() -> Flask:
   # Register route blueprints
   app.register_blueprint(main)
 
+  record_startup(app, started)
+
+  # Per-process services (e.g., optional cleanup of the upload folders); threads do not
+  # survive fork, so a preloaded app starts them in each worker instead
+  if not app.config.get("PRELOAD_APP", False):
+    start_worker_services(app)
+
   return app
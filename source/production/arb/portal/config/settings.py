@@ -44,6 +44,40 @@ class BaseConfig:
     LOG_LEVEL (str): Default logging level.
     TIMEZONE (str): Target timezone for timestamp formatting.
     FAST_LOAD (bool): Enables performance optimizations at startup.
+    STAGING_RETENTION_DAYS (int): Age in days after which staged upload files are deleted by the janitor.
+    PROCESSED_RETENTION_DAYS (int): Age in days after which processed upload files are archived by the janitor.
+    UPLOAD_JANITOR_MIN_AGE_SECONDS (int): The janitor never touches files modified more recently than this.
+    UPLOAD_JANITOR_INTERVAL_SECONDS (int): Seconds between background janitor passes (0 disables the thread).
+    PORTAL_UPDATES_RETENTION_MONTHS (int): Months of portal_updates history kept in the database before archival.
+    PORTAL_UPDATES_ARCHIVE_DIR (str | None): Folder for archived portal_updates files (default: <project root>/portal_updates_archive).
+    INCIDENCE_CACHE_ENABLED (bool): Enables the incidence read-through cache (default: only when INCIDENCE_CACHE_REDIS_URL is set).
+    INCIDENCE_CACHE_MAX_ENTRIES (int): Incidences kept by the in-process cache.
+    INCIDENCE_CACHE_TTL_SECONDS (int): Seconds a cached incidence stays valid (bounds staleness across processes).
+    INCIDENCE_CACHE_REDIS_URL (str | None): Optional Redis URL for a cache shared by all worker processes.
+    FORM_PAGE_CACHE_ENABLED (bool): Caches rendered feedback form update pages and answers revalidations with 304s.
+    FORM_PAGE_CACHE_MAX_ENTRIES (int): Rendered pages kept by each worker process.
+    FORM_PAGE_CACHE_ROLES_HEADER (str | None): Request header with the user's comma-separated roles (pages are cached per role set).
+    SQLALCHEMY_REPLICA_URIS (list[str]): Read replica URIs (comma-separated DATABASE_REPLICA_URIS); empty disables routing.
+    SQLALCHEMY_REPLICA_AUTO_ROUTE (bool): Route every GET/HEAD request to a replica, not only `@read_only` views.
+    SQLALCHEMY_REPLICA_RETRY_SECONDS (int): Seconds a replica is skipped after a connection error.
+    SQLALCHEMY_REPLICA_STICKY_SECONDS (int): Seconds a browser reads from the primary after it committed a write.
+    DATABASE_POOL_SIZE (int): Connections kept open in each engine's pool.
+    DATABASE_MAX_OVERFLOW (int): Extra connections opened under bursts beyond DATABASE_POOL_SIZE.
+    DATABASE_POOL_TIMEOUT (float): Seconds a checkout waits for a free connection before failing.
+    DATABASE_POOL_RECYCLE (int): Seconds after which a pooled connection is replaced.
+    DATABASE_POOL_PRE_PING (bool): Test each connection on checkout (disable with DATABASE_POOL_PRE_PING=false).
+    DATABASE_POOL_LEAK_SECONDS (float): Log connections checked out longer than this and their thread (0 disables).
+    DATABASE_POOL_LEAK_STACKS (bool): Also record the stack of every checkout for those reports (debugging; costly).
+    PRELOAD_APP (bool): The app is created in a prefork master (gunicorn preload); workers start per-process services after fork.
+    SUMMARY_ENABLED (bool): Maintains the incidence summary from the write paths (disable with SUMMARY_ENABLED=false).
+    SUMMARY_MAX_STALENESS_SECONDS (float): Seconds a stale summary is served before the dashboard refreshes it.
+    SUMMARY_REFRESH_INTERVAL_SECONDS (float): Seconds between scheduled refreshes of a stale summary (0 disables).
+    DIAGNOSTICS_MODE (str): Default form save diagnostics mode: "off", "sampled" or "always".
+    DIAGNOSTICS_SAMPLE_RATE (float): Fraction of saves diagnosed in "sampled" mode.
+    DIAGNOSTICS_USERS (str): Comma-separated users whose saves are always diagnosed.
+    DIAGNOSTICS_INCIDENCES (str): Comma-separated incidence IDs whose saves are always diagnosed.
+    DIAGNOSTICS_POLICY_FILE (str | None): File sharing runtime policy changes between workers (default: instance folder).
+    PORTAL_ADMIN_USERS (str): Comma-separated proxy-authenticated users allowed to run admin actions ("*" for anyone).
     logger (logging.Logger): Logger instance for this module.
 
   Examples:
@@ -101,6 +135,83 @@ class BaseConfig:
     FAST_LOAD = True
   logger.info(f"{FAST_LOAD = }")
 
+  # ---------------------------------------------------------------------
+  # Upload folder retention (see arb/portal/utils/staging_janitor.py)
+  # ---------------------------------------------------------------------
+  STAGING_RETENTION_DAYS = int(os.getenv("STAGING_RETENTION_DAYS", "30"))
+  PROCESSED_RETENTION_DAYS = int(os.getenv("PROCESSED_RETENTION_DAYS", "90"))
+  UPLOAD_JANITOR_MIN_AGE_SECONDS = int(os.getenv("UPLOAD_JANITOR_MIN_AGE_SECONDS", "3600"))
+  UPLOAD_JANITOR_INTERVAL_SECONDS = int(os.getenv("UPLOAD_JANITOR_INTERVAL_SECONDS", "0"))
+
+  # ---------------------------------------------------------------------
+  # portal_updates archival (see arb/portal/utils/portal_update_archive.py)
+  # ---------------------------------------------------------------------
+  PORTAL_UPDATES_RETENTION_MONTHS = int(os.getenv("PORTAL_UPDATES_RETENTION_MONTHS", "24"))
+  PORTAL_UPDATES_ARCHIVE_DIR = os.getenv("PORTAL_UPDATES_ARCHIVE_DIR") or None
+
+  # ---------------------------------------------------------------------
+  # Incidence read-through cache (see arb/portal/utils/incidence_cache.py)
+  # ---------------------------------------------------------------------
+  INCIDENCE_CACHE_REDIS_URL = os.getenv("INCIDENCE_CACHE_REDIS_URL") or None
+  # Only a shared (Redis) cache sees the commits of every worker process, so it is on by default only then
+  INCIDENCE_CACHE_ENABLED = os.getenv("INCIDENCE_CACHE_ENABLED",
+                                      "true" if INCIDENCE_CACHE_REDIS_URL else "false").lower() != "false"
+  INCIDENCE_CACHE_MAX_ENTRIES = int(os.getenv("INCIDENCE_CACHE_MAX_ENTRIES", "1024"))
+  INCIDENCE_CACHE_TTL_SECONDS = int(os.getenv("INCIDENCE_CACHE_TTL_SECONDS", "300"))
+
+  # ---------------------------------------------------------------------
+  # Feedback form page render cache (see arb/portal/utils/form_page_cache.py)
+  # ---------------------------------------------------------------------
+  FORM_PAGE_CACHE_ENABLED = os.getenv("FORM_PAGE_CACHE_ENABLED", "true").lower() != "false"
+  FORM_PAGE_CACHE_MAX_ENTRIES = int(os.getenv("FORM_PAGE_CACHE_MAX_ENTRIES", "256"))
+  FORM_PAGE_CACHE_ROLES_HEADER = os.getenv("FORM_PAGE_CACHE_ROLES_HEADER") or None
+
+  # ---------------------------------------------------------------------
+  # Read replicas (see arb/portal/utils/db_routing.py)
+  # for example: set DATABASE_REPLICA_URIS=postgresql+psycopg2://...cluster-ro-...
+  # ---------------------------------------------------------------------
+  SQLALCHEMY_REPLICA_URIS = [uri.strip() for uri in os.getenv("DATABASE_REPLICA_URIS", "").split(",") if uri.strip()]
+  SQLALCHEMY_REPLICA_AUTO_ROUTE = os.getenv("DATABASE_REPLICA_AUTO_ROUTE", "false").lower() == "true"
+  SQLALCHEMY_REPLICA_RETRY_SECONDS = int(os.getenv("DATABASE_REPLICA_RETRY_SECONDS", "30"))
+  SQLALCHEMY_REPLICA_STICKY_SECONDS = int(os.getenv("DATABASE_REPLICA_STICKY_SECONDS", "5"))
+
+  # ---------------------------------------------------------------------
+  # Connection pool sizing and metrics (see arb/portal/utils/db_pool.py)
+  # ---------------------------------------------------------------------
+  DATABASE_POOL_SIZE = int(os.getenv("DATABASE_POOL_SIZE", "5"))
+  DATABASE_MAX_OVERFLOW = int(os.getenv("DATABASE_MAX_OVERFLOW", "10"))
+  DATABASE_POOL_TIMEOUT = float(os.getenv("DATABASE_POOL_TIMEOUT", "30"))
+  DATABASE_POOL_RECYCLE = int(os.getenv("DATABASE_POOL_RECYCLE", "1800"))
+  DATABASE_POOL_PRE_PING = os.getenv("DATABASE_POOL_PRE_PING", "true").lower() != "false"
+  DATABASE_POOL_LEAK_SECONDS = float(os.getenv("DATABASE_POOL_LEAK_SECONDS", "60"))
+  DATABASE_POOL_LEAK_STACKS = os.getenv("DATABASE_POOL_LEAK_STACKS", "false").lower() == "true"
+
+  # ---------------------------------------------------------------------
+  # Prefork servers (see arb/portal/startup/lifecycle.py and gunicorn.conf.py)
+  # ---------------------------------------------------------------------
+  PRELOAD_APP = os.getenv("PRELOAD_APP", "false").lower() == "true"
+
+  # ---------------------------------------------------------------------
+  # Incidence summary dashboard (see arb/portal/utils/incidence_summary.py)
+  # ---------------------------------------------------------------------
+  SUMMARY_ENABLED = os.getenv("SUMMARY_ENABLED", "true").lower() != "false"
+  SUMMARY_MAX_STALENESS_SECONDS = float(os.getenv("SUMMARY_MAX_STALENESS_SECONDS", "300"))
+  SUMMARY_REFRESH_INTERVAL_SECONDS = float(os.getenv("SUMMARY_REFRESH_INTERVAL_SECONDS", "0"))
+
+  # ---------------------------------------------------------------------
+  # Form save diagnostics (see arb/portal/utils/diagnostics_policy.py)
+  # ---------------------------------------------------------------------
+  DIAGNOSTICS_MODE = os.getenv("DIAGNOSTICS_MODE", "off")
+  DIAGNOSTICS_SAMPLE_RATE = float(os.getenv("DIAGNOSTICS_SAMPLE_RATE", "0.01"))
+  DIAGNOSTICS_USERS = os.getenv("DIAGNOSTICS_USERS", "")
+  DIAGNOSTICS_INCIDENCES = os.getenv("DIAGNOSTICS_INCIDENCES", "")
+  DIAGNOSTICS_POLICY_FILE = os.getenv("DIAGNOSTICS_POLICY_FILE") or None
+
+  # ---------------------------------------------------------------------
+  # Administrative actions (see arb/portal/utils/admin_auth.py)
+  # ---------------------------------------------------------------------
+  PORTAL_ADMIN_USERS = os.getenv("PORTAL_ADMIN_USERS", "")
+
 
 class DevelopmentConfig(BaseConfig):
   """
@@ -110,6 +221,11 @@ class DevelopmentConfig(BaseConfig):
     DEBUG (bool): Enables debug mode.
     FLASK_ENV (str): Flask environment indicator.
     LOG_LEVEL (str): Logging level (default: "DEBUG").
+    DATABASE_POOL_SIZE (int): Small pool for a single local process (default: 2).
+    DATABASE_POOL_LEAK_SECONDS (float): Report held connections sooner while developing (default: 10).
+    DATABASE_POOL_LEAK_STACKS (bool): Log where leaked connections were checked out (default: True).
+    DIAGNOSTICS_MODE (str): Diagnose every form save while developing (default: "always").
+    PORTAL_ADMIN_USERS (str): Anyone may run admin actions on a local server without a proxy (default: "*").
 
   Examples:
     app.config.from_object(DevelopmentConfig)
@@ -122,6 +238,11 @@ class DevelopmentConfig(BaseConfig):
   FLASK_ENV = "development"
   # EXPLAIN_TEMPLATE_LOADING = True
   LOG_LEVEL = "DEBUG"
+  DATABASE_POOL_SIZE = int(os.getenv("DATABASE_POOL_SIZE", "2"))
+  DATABASE_POOL_LEAK_SECONDS = float(os.getenv("DATABASE_POOL_LEAK_SECONDS", "10"))
+  DATABASE_POOL_LEAK_STACKS = os.getenv("DATABASE_POOL_LEAK_STACKS", "true").lower() != "false"
+  DIAGNOSTICS_MODE = os.getenv("DIAGNOSTICS_MODE", "always")
+  PORTAL_ADMIN_USERS = os.getenv("PORTAL_ADMIN_USERS", "*")
 
 
 class ProductionConfig(BaseConfig):
@@ -133,6 +254,8 @@ class ProductionConfig(BaseConfig):
     FLASK_ENV (str): Environment label for Flask runtime.
     WTF_CSRF_ENABLED (bool): Enables CSRF protection.
     LOG_LEVEL (str): Logging level (default: "INFO").
+    DATABASE_POOL_SIZE (int): Pool sized for bursts of uploads (default: 10).
+    DATABASE_MAX_OVERFLOW (int): Extra burst connections (default: 20).
 
   Examples:
     app.config.from_object(ProductionConfig)
@@ -145,6 +268,8 @@ class ProductionConfig(BaseConfig):
   FLASK_ENV = "production"
   WTF_CSRF_ENABLED = True
   LOG_LEVEL = "INFO"
+  DATABASE_POOL_SIZE = int(os.getenv("DATABASE_POOL_SIZE", "10"))
+  DATABASE_MAX_OVERFLOW = int(os.getenv("DATABASE_MAX_OVERFLOW", "20"))
 
 
 class TestingConfig(BaseConfig):
@@ -157,6 +282,8 @@ class TestingConfig(BaseConfig):
     FLASK_ENV (str): Flask environment label.
     WTF_CSRF_ENABLED (bool): Disables CSRF for test convenience.
     LOG_LEVEL (str): Logging level (default: "WARNING").
+    INCIDENCE_CACHE_ENABLED (bool): Disables the incidence cache so tests always read the database.
+    FORM_PAGE_CACHE_ENABLED (bool): Disables the form page cache so tests always render.
 
   Examples:
     app.config.from_object(TestingConfig)
@@ -170,3 +297,5 @@ class TestingConfig(BaseConfig):
   FLASK_ENV = "testing"
   WTF_CSRF_ENABLED = False
   LOG_LEVEL = "WARNING"
+  INCIDENCE_CACHE_ENABLED = False
+  FORM_PAGE_CACHE_ENABLED = False
@@ -29,10 +29,12 @@ from flask_wtf import CSRFProtect
 # noinspection PyUnresolvedReferences
 from geoalchemy2 import Geometry  # <= not used but must be imported for introspection
 
+from arb.portal.utils.db_routing import RoutingSession
+
 logger = logging.getLogger(__name__)
 logger.debug(f'Loading File: "{Path(__file__).name}". Full Path: "{Path(__file__)}"')
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 """SQLAlchemy: Flask SQLAlchemy instance for managing ORM and schema.
 
   Examples:
@@ -42,6 +44,8 @@ db = SQLAlchemy()
   Notes:
     - Do not initialize until app.init_app() is called.
     - Use within Flask app context.
+    - `db.session` is a `RoutingSession`: read-only routes may read from a replica
+      (see `arb.portal.utils.db_routing`).
 """
 # print(f"{type(db)=}")
 
@@ -26,18 +26,42 @@ from pathlib import Path
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 
+from arb.utils.wtf_forms_util import ChoiceSet, freeze_choices
+
 logger = logging.getLogger(__name__)
 logger.debug(f'Loading File: "{Path(__file__).name}". Full Path: "{Path(__file__)}"')
 
 
+def compile_drop_downs(drop_downs: dict, drop_downs_contingent: dict) -> tuple[dict[str, ChoiceSet], dict]:
+  """
+  Compile dropdown data into the immutable form used by the feedback forms.
+
+  Args:
+    drop_downs (dict): Field name → dropdown data (as returned by `get_excel_dropdown_data`).
+    drop_downs_contingent (dict): Contingency name → parent value → list of child options.
+
+  Returns:
+    tuple[dict[str, ChoiceSet], dict]: Field name → ChoiceSet, and the contingent options with
+      each child list frozen to a tuple.
+
+  Examples:
+    Input : {"ogi_performed": ["Yes", "No"]}, {"cause_by_location": {"Cover": ["Crack"]}}
+    Output: ({"ogi_performed": ChoiceSet((("Yes", "Yes"), ("No", "No")))}, {"cause_by_location": {"Cover": ("Crack",)}})
+  """
+  choices = {name: freeze_choices(value) for name, value in drop_downs.items()}
+  contingent = {name: {parent: tuple(children) for parent, children in mapping.items()}
+                for name, mapping in drop_downs_contingent.items()}
+  return choices, contingent
+
+
 class Globals:
   """
   Central class for holding runtime-global mappings used in the Flask app.
 
   Attributes:
     db_column_types (dict): Mapping of table.column to SQLAlchemy type metadata (includes `db_type`, `sa_type`, `py_type`).
-    drop_downs (dict): Field name to independent dropdown options.
-    drop_downs_contingent (dict): Parent-dependent options for contingent dropdowns (e.g., county → list of subcounties).
+    drop_downs (dict): Field name to independent dropdown options (ChoiceSet once loaded).
+    drop_downs_contingent (dict): Parent-dependent options for contingent dropdowns (e.g., county → tuple of subcounties).
 
   Examples:
     Globals.load_drop_downs(app, db)
@@ -68,6 +92,8 @@ class Globals:
       - Uses `get_excel_dropdown_data()` from `db_hardcoded` to populate form options.
       - Populates both `Globals.drop_downs` and `Globals.drop_downs_contingent`.
       - Should be called once after app startup or reflection.
+      - Choices are compiled once into immutable ChoiceSets (see `compile_drop_downs`) that forms
+        attach by reference.
       - NOT COVERED BY UNIT TESTS: This function is not covered by unit tests because the dependency (get_excel_dropdown_data) is imported inside the method body, making it impossible to robustly patch/mock for testing. Change with caution. See documentation/docstring_update_for_testing.md for details.
     """
 
@@ -75,7 +101,7 @@ class Globals:
 
     logger.debug(f"In load_drop_downs()")
 
-    Globals.drop_downs, Globals.drop_downs_contingent = get_excel_dropdown_data()
+    Globals.drop_downs, Globals.drop_downs_contingent = compile_drop_downs(*get_excel_dropdown_data())
 
     logger.debug(f"Globals.drop_downs={Globals.drop_downs}")
     logger.debug(f"Globals.drop_downs_contingent={Globals.drop_downs_contingent}")
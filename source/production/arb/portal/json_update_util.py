@@ -6,8 +6,12 @@
     - Compares current vs. new values in a model's JSON field
     - Logs only meaningful changes to a structured audit table
     - Excludes no-op or default placeholders (e.g., None, "")
+    - Merges changed keys inside the database (PostgreSQL jsonb `||`, SQLite `json_set`)
+      instead of rewriting the whole JSON document
+    - Stores periodic misc_json snapshots for history reconstruction (see `incidence_history`)
 
   Module_Attributes:
+    DB_JSON_MERGE_DIALECTS (tuple[str, ...]): Dialects supported by `merge_json_column_in_db()`.
     logger (logging.Logger): Logger instance for this module.
 
   Examples:
@@ -21,23 +25,182 @@
 """
 
 import datetime
+import json
 import logging
+from typing import Any
 
+from sqlalchemy import inspect as sa_inspect, text
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import object_session
 from sqlalchemy.orm.attributes import flag_modified
 
 from arb.portal.extensions import db
 from arb.portal.sqla_models import PortalUpdate
+from arb.portal.utils.incidence_cache import INCIDENCE_TABLE, mark_incidence_changed
+from arb.portal.utils.incidence_history import snapshot_if_due
 from arb.utils.constants import PLEASE_SELECT
 
 logger = logging.getLogger(__name__)
 
+DB_JSON_MERGE_DIALECTS = ("postgresql", "sqlite")
+
+# Maximum path/value pairs per SQLite json_set() call (SQLite caps function arguments)
+_SQLITE_JSON_SET_PAIRS = 50
+
+
+def is_audited_change(old_value: Any, new_value: Any) -> bool:
+  """
+  Return True if changing a JSON key from `old_value` to `new_value` should be logged to portal_updates.
+
+  Args:
+    old_value (Any): Prior value of the key (None when the key was absent).
+    new_value (Any): New value of the key.
+
+  Returns:
+    bool: False for unchanged values and for non-useful updates from None
+    (None → None, None → "", None → PLEASE_SELECT); True otherwise.
+
+  Examples:
+    Input : is_audited_change(None, "")
+    Output: False
+    Input : is_audited_change("A", "B")
+    Output: True
+  """
+  if old_value is None and new_value is None:
+    return False
+  if old_value is None and new_value == "":
+    return False
+  # Note, on the rare situation that "Please Select" is a valid entry in a string field - it will be filtered out
+  if old_value is None and new_value == PLEASE_SELECT:
+    return False
+  return old_value != new_value
+
+
+def merge_json_column_in_db(model,
+                            updates: dict,
+                            json_field: str = "misc_json") -> dict[str, Any] | None:
+  """
+  Merge top-level keys into a row's JSON column inside the database and return their prior values.
+
+  Only the changed keys are sent; the database merges them into the stored document, so the
+  full document is never read into Python or written back (no lost updates between concurrent
+  editors of different keys).
+
+  Args:
+    model (SQLAlchemy model): A persistent ORM instance (already in the database and in a session).
+    updates (dict): Top-level key/value pairs to set. Values must be JSON-serializable.
+    json_field (str): Name of the JSON column (default: 'misc_json').
+
+  Returns:
+    dict[str, Any] | None: Prior value of each key in `updates` (None when the key was absent),
+    or None if the merge could not be done in the database (transient/pending instance,
+    composite primary key, or unsupported dialect). Callers should then fall back to
+    merging in Python.
+
+  Raises:
+    TypeError: If a value in `updates` is not JSON-serializable.
+    sqlalchemy.exc.SQLAlchemyError: If the UPDATE fails.
+
+  Examples:
+    prior = merge_json_column_in_db(model, {"facility_name": "New name"})
+    # prior == {"facility_name": "Old name"}
+
+  Notes:
+    - PostgreSQL: a single `UPDATE ... SET col = col || :patch FROM (SELECT ... FOR UPDATE)
+      RETURNING ...` both merges and returns the prior values in the same statement.
+    - SQLite: one `json_set` path/value pair per key replaces each top-level value, as `||`
+      does on PostgreSQL (`json_patch` would deep-merge nested objects and delete nested nulls).
+      SQLite's RETURNING cannot see pre-update values, so the prior values are read in the same
+      transaction immediately before the UPDATE; SQLite's single-writer lock prevents another
+      write in between. Keys containing a double quote cannot be written as a JSON path and fall
+      back to the in-memory merge (None is returned).
+    - Pending ORM changes are flushed first, and the in-memory JSON attribute (and any generated
+      columns) are expired afterwards so the next access reloads the merged document.
+  """
+  session = object_session(model)
+  state = sa_inspect(model)
+  if session is None or not state.persistent:
+    return None
+
+  dialect = session.get_bind().dialect
+  if dialect.name not in DB_JSON_MERGE_DIALECTS:
+    return None
+
+  mapper = state.mapper
+  if len(mapper.primary_key) != 1:
+    return None
+  pk_column = mapper.primary_key[0]
+  table = mapper.local_table
+  json_column = table.c[json_field]
+
+  patch = dict(updates)
+  if not patch:
+    return {}
+  patch_json = json.dumps(patch)
+
+  session.flush()
+  pk_value = state.identity[0]
+
+  preparer = dialect.identifier_preparer
+  table_sql = preparer.format_table(table)
+  pk_sql = preparer.quote(pk_column.name)
+  col_sql = preparer.quote(json_column.name)
+
+  if dialect.name == "postgresql":
+    merged_sql = f"COALESCE(CAST(t.{col_sql} AS jsonb), '{{}}'::jsonb) || CAST(:patch AS jsonb)"
+    if not isinstance(json_column.type, postgresql.JSONB):
+      merged_sql = f"CAST({merged_sql} AS json)"
+    statement = text(
+      f"UPDATE {table_sql} AS t SET {col_sql} = {merged_sql} "
+      f"FROM (SELECT {pk_sql}, {col_sql} AS prior_json FROM {table_sql} WHERE {pk_sql} = :pk FOR UPDATE) AS prior "
+      f"WHERE t.{pk_sql} = prior.{pk_sql} "
+      f"RETURNING (SELECT jsonb_object_agg(k, CAST(prior.prior_json AS jsonb) -> k) "
+      f"FROM unnest(CAST(:keys AS text[])) AS k)"
+    )
+    row = session.execute(statement, {"patch": patch_json, "pk": pk_value, "keys": list(patch)}).first()
+    if row is None:
+      return None
+    prior_values = row[0] or {}
+    if isinstance(prior_values, str):
+      prior_values = json.loads(prior_values)
+  else:
+    if any('"' in key for key in patch):
+      return None
+    prior_json = session.execute(
+      text(f"SELECT {col_sql} FROM {table_sql} WHERE {pk_sql} = :pk"), {"pk": pk_value}
+    ).scalar()
+    if isinstance(prior_json, str):
+      prior_json = json.loads(prior_json)
+    prior_json = prior_json or {}
+    prior_values = {key: prior_json.get(key) for key in patch}
+
+    merged_sql = f"COALESCE({col_sql}, '{{}}')"
+    params = {"pk": pk_value}
+    keys = list(patch)
+    for start in range(0, len(keys), _SQLITE_JSON_SET_PAIRS):
+      pairs = []
+      for index, key in enumerate(keys[start:start + _SQLITE_JSON_SET_PAIRS], start=start):
+        params[f"path_{index}"] = f'$."{key}"'
+        params[f"v_{index}"] = json.dumps(patch[key])
+        pairs.append(f":path_{index}, json(:v_{index})")
+      merged_sql = f"json_set({merged_sql}, {', '.join(pairs)})"
+    session.execute(text(f"UPDATE {table_sql} SET {col_sql} = {merged_sql} WHERE {pk_sql} = :pk"), params)
+
+  if table.name == INCIDENCE_TABLE:
+    mark_incidence_changed(session, pk_value)
+
+  # Generated columns derived from the JSON document (see promoted_columns) changed with it
+  stale = [json_field] + [attr.key for attr in mapper.column_attrs
+                          if any(column.computed is not None for column in attr.columns)]
+  session.expire(model, stale)
+  return {key: prior_values.get(key) for key in patch}
+
 
 def apply_json_patch_and_log(model,
                              updates: dict,
                              json_field: str = "misc_json",
                              user: str = "anonymous",
-                             comments: str = "") -> None:
+                             comments: str = "") -> list[PortalUpdate]:
   """
   Apply updates to a model's JSON field and log each change in portal_updates.
 
@@ -56,7 +219,8 @@ def apply_json_patch_and_log(model,
     comments (str): Optional comment for the log entry.
 
   Returns:
-    None
+    list[PortalUpdate]: The committed audit rows, one per changed key (expired by the commit;
+      `sqlalchemy.inspect(row).identity` gives a row's ID without a query).
 
   Raises:
     AttributeError: If the specified JSON field does not exist on the model.
@@ -69,6 +233,11 @@ def apply_json_patch_and_log(model,
     - Logs all changes to the portal_updates table for auditing.
     - Commits the session after applying changes and logging.
     - Raises and logs exceptions on commit failure.
+    - Persistent rows are updated with `merge_json_column_in_db()`, which sends only the keys in
+      `updates` and returns their prior values for the audit rows. Transient rows (and unsupported
+      dialects) fall back to merging into the in-memory JSON document.
+    - Every `HISTORY_SNAPSHOT_INTERVAL` audited changes a full misc_json snapshot is stored
+      (`snapshot_if_due()`) to bound history reconstruction.
   """
 
   # 🆕 DIAGNOSTIC: Log function entry and model state
@@ -81,21 +250,6 @@ def apply_json_patch_and_log(model,
   logger.info(f"[apply_json_patch_and_log] Model session: {session is not None}, "
               f"Model in session: {model in session if session else False}")
 
-  # In the future, may want to handle new rows differently
-  json_data = getattr(model, json_field)
-  if json_data is None:
-    json_data = {}
-    is_new_row = True
-  else:
-    is_new_row = False
-
-  logger.info(f"[apply_json_patch_and_log] Initial json_data: {json_data}, is_new_row: {is_new_row}")
-
-  # Consistency check
-  if "id_incidence" in json_data and json_data["id_incidence"] != model.id_incidence:
-    logger.warning(f"[apply_json_patch_and_log] MISMATCH: model.id_incidence={model.id_incidence} "
-                   f"!= misc_json['id_incidence']={json_data['id_incidence']}")
-
   # Remove id_incidence from updates to avoid contaminating misc_json
   if "id_incidence" in updates:
     if updates["id_incidence"] != model.id_incidence:
@@ -103,25 +257,43 @@ def apply_json_patch_and_log(model,
                      f"{updates['id_incidence']}")
       del updates["id_incidence"]
 
+  # Merge only the changed keys inside the database when the row already exists
+  prior_values = merge_json_column_in_db(model, updates, json_field)
+  merged_in_db = prior_values is not None
+
+  if merged_in_db:
+    logger.info(f"[apply_json_patch_and_log] Merged {len(updates)} keys into {json_field} in the database")
+  else:
+    # In the future, may want to handle new rows differently
+    json_data = getattr(model, json_field)
+    if json_data is None:
+      json_data = {}
+      is_new_row = True
+    else:
+      is_new_row = False
+
+    logger.info(f"[apply_json_patch_and_log] Initial json_data: {json_data}, is_new_row: {is_new_row}")
+
+    # Consistency check
+    if "id_incidence" in json_data and json_data["id_incidence"] != model.id_incidence:
+      logger.warning(f"[apply_json_patch_and_log] MISMATCH: model.id_incidence={model.id_incidence} "
+                     f"!= misc_json['id_incidence']={json_data['id_incidence']}")
+
+    prior_values = {key: json_data.get(key) for key in updates}
+    json_data.update(updates)
+
   changes_made = 0
+  log_entries = []
+  # One timestamp per save so the change feed can group a commit's rows together
+  timestamp = datetime.datetime.now(datetime.UTC)
   for key, new_value in updates.items():
 
-    old_value = json_data.get(key)
-    json_data[key] = new_value
+    old_value = prior_values.get(key)
 
-    # Filter out non-useful updates
-    if old_value is None and new_value is None:
-      continue
-    if old_value is None and new_value == "":
-      continue
-    # Note, on the rare situation that "Please Select" is a valid entry in a string field - it will be filtered out
-    if old_value is None and new_value == PLEASE_SELECT:
-      continue
-
-    if old_value != new_value:
+    if is_audited_change(old_value, new_value):
       changes_made += 1
       log_entry = PortalUpdate(
-        timestamp=datetime.datetime.now(datetime.UTC),
+        timestamp=timestamp,
         key=key,
         old_value=str(old_value),
         new_value=str(new_value),
@@ -130,23 +302,28 @@ def apply_json_patch_and_log(model,
         id_incidence=model.id_incidence,
       )
       db.session.add(log_entry)
+      log_entries.append(log_entry)
       logger.debug(f"[apply_json_patch_and_log] Added log entry for {key}: {old_value} -> {new_value}")
 
   logger.info(f"[apply_json_patch_and_log] Applied {changes_made} changes to json_data")
 
-  setattr(model, json_field, json_data)
-  flag_modified(model, json_field)
+  if not merged_in_db:
+    setattr(model, json_field, json_data)
+    flag_modified(model, json_field)
 
-  # 🆕 DIAGNOSTIC: Log before commit
-  logger.info(f"[apply_json_patch_and_log] Before commit: model.{json_field}={getattr(model, json_field)}")
+    # 🆕 DIAGNOSTIC: Log before commit
+    logger.info(f"[apply_json_patch_and_log] Before commit: model.{json_field}={getattr(model, json_field)}")
   logger.info(f"[apply_json_patch_and_log] About to commit {changes_made} changes to database")
 
   try:
+    if changes_made:
+      snapshot_if_due(db.session, model, json_field)
     db.session.commit()
     logger.info(f"[apply_json_patch_and_log] ✅ COMMIT SUCCESSFUL: {changes_made} changes committed")
 
-    # 🆕 DIAGNOSTIC: Verify model state after commit
-    logger.info(f"[apply_json_patch_and_log] After commit: model.{json_field}={getattr(model, json_field)}")
+    # 🆕 DIAGNOSTIC: Verify model state after commit (skipped after a DB-side merge to avoid reloading the document)
+    if not merged_in_db:
+      logger.info(f"[apply_json_patch_and_log] After commit: model.{json_field}={getattr(model, json_field)}")
 
     # Check if model is still in session after commit
     session_after = object_session(model)
@@ -156,3 +333,5 @@ def apply_json_patch_and_log(model,
     logger.error(f"[apply_json_patch_and_log] ❌ COMMIT FAILED: {e}")
     logger.exception(f"[apply_json_patch_and_log] Full exception details:")
     raise
+
+  return log_entries
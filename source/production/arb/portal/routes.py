@@ -21,6 +21,7 @@ import csv
 import datetime
 import logging
 import os
+import re
 from io import StringIO
 from pathlib import Path
 from typing import Any, Union
@@ -30,8 +31,10 @@ from flask import Blueprint, Response, abort, current_app, flash, jsonify, redir
   send_from_directory, \
   url_for  # to access app context
 from flask.typing import ResponseReturnValue
+from flask_wtf.csrf import validate_csrf
 from sqlalchemy.ext.automap import AutomapBase
 from werkzeug.exceptions import abort
+from wtforms import ValidationError
 
 import arb.portal.db_hardcoded
 import arb.utils.sql_alchemy
@@ -42,7 +45,9 @@ from arb.portal.extensions import csrf, db
 from arb.portal.globals import Globals
 from arb.portal.json_update_util import apply_json_patch_and_log
 from arb.portal.sqla_models import PortalUpdate
+from arb.portal.startup.lifecycle import memory_usage
 from arb.portal.startup.runtime_info import LOG_FILE
+from arb.portal.utils.admin_auth import admin_required, require_admin
 from arb.portal.utils.db_ingest_util import dict_to_database, extract_tab_and_sector, stage_uploaded_file_for_review, \
   upload_and_process_file, upload_and_stage_only, upload_and_update_db, xl_dict_to_database, \
   upload_and_process_file_enhanced, stage_uploaded_file_for_review_enhanced
@@ -50,10 +55,24 @@ from arb.portal.utils.route_upload_helpers import validate_upload_request, get_e
   get_success_message_for_upload, render_upload_form, render_upload_error, handle_upload_error, handle_upload_exception, \
   handle_upload_success, render_upload_page, render_upload_success_page, render_upload_error_page
 from arb.portal.utils.db_introspection_util import get_ensured_row
+from arb.portal.utils.feedback_forms import FEEDBACK_FORMS, FEEDBACK_FORMS_BY_SLUG
+from arb.portal.utils.db_pool import format_prometheus, get_pool_metrics
+from arb.portal.utils.db_routing import read_only
+from arb.portal.utils.diagnostics_policy import DIAGNOSTICS_MODES, DiagnosticsPolicy, get_diagnostics_store
+from arb.portal.utils.autosave import AutosaveConflict, autosave_fields
+from arb.portal.utils.bulk_validation import validation_badges
+from arb.portal.utils.change_feed import CHANGE_FEED_PAGE_SIZE, read_change_feed
 from arb.portal.utils.form_mapper import apply_portal_update_filters
+from arb.portal.utils.form_page_cache import get_form_page_cache
+from arb.portal.utils.form_rules import rules_contract
+from arb.portal.utils.incidence_history import diff_history_points, parse_history_point, reconstruct_misc_json
 from arb.portal.utils.route_util import format_diagnostic_message, generate_staging_diagnostics, \
   generate_upload_diagnostics, generate_upload_diagnostics_unified, incidence_prep
-from arb.portal.utils.sector_util import get_sector_info
+from arb.portal.utils.promoted_columns import PROMOTED_JSON_KEYS, query_incidences
+from arb.portal.utils.incidence_cache import get_incidence_cache
+from arb.portal.utils.incidence_summary import SUMMARY_DIMENSIONS, claim_refresh, refresh_if_stale, \
+  refresh_incidence_summary, summarize, summary_state
+from arb.portal.utils.sector_util import get_sector_info, read_incidence
 from arb.portal.utils.test_cleanup_util import delete_testing_rows, list_testing_rows
 from arb.portal.wtf_landfill import LandfillFeedback
 from arb.portal.wtf_oil_and_gas import OGFeedback
@@ -61,7 +80,7 @@ from arb.portal.wtf_upload import UploadForm
 from arb.utils.diagnostics import obj_to_html
 from arb.utils.file_io import read_file_reverse
 from arb.utils.json import compute_field_differences, json_load_with_meta
-from arb.utils.sql_alchemy import find_auto_increment_value, get_class_from_table_name, get_rows_by_table_name
+from arb.utils.sql_alchemy import find_auto_increment_value, get_class_from_table_name
 from arb.utils.wtf_forms_util import get_wtforms_fields, prep_payload_for_json
 
 import time
@@ -75,6 +94,7 @@ main = Blueprint("main", __name__)
 
 
 @main.route('/')
+@read_only
 def index() -> str:
   """
   Display the homepage with a list of all existing incidence records.
@@ -85,15 +105,35 @@ def index() -> str:
   Examples:
     # In browser: GET /
     # Returns: HTML page with table of incidences
+    # In browser: GET /?sector=Landfill&sort_by=facility_name&direction=asc&page=2&per_page=50
+    # In browser: GET /?sector=Landfill&month=2025-01
+
+  Notes:
+    - Optional query parameters filter on promoted misc_json keys (e.g., `sector`), sort
+      (`sort_by`, `direction`) and page (`page`, `per_page`). Promoted generated columns are
+      used when they exist (see `arb.portal.utils.promoted_columns`).
+    - `month` (YYYY-MM) restricts to incidences observed in that UTC month (the summary
+      dashboard's drill-down links use it).
+    - Validity badges come from the stored bulk revalidation results
+      (`arb.portal.utils.bulk_validation`); nothing is validated here.
   """
   logger.info(f"route called: index.")
 
   base: AutomapBase = current_app.base  # type: ignore[attr-defined]
-  table_name = 'incidences'
-  colum_name_pk = 'id_incidence'
-  rows = get_rows_by_table_name(db, base, table_name, colum_name_pk, ascending=False)
-
-  return render_template('index.html', model_rows=rows)
+  filters = {key: request.args[key] for key in PROMOTED_JSON_KEYS if request.args.get(key)}
+  month = request.args.get("month", "")
+  if month and not re.fullmatch(r"\d{4}-\d{2}", month):
+    abort(400, description=f"Invalid month {month!r}; expected YYYY-MM")
+  rows = query_incidences(db,
+                          base,
+                          filters=filters,
+                          prefix_filters={"observation_timestamp": month} if month else None,
+                          sort_by=request.args.get("sort_by") or None,
+                          descending=request.args.get("direction", "desc") != "asc",
+                          page=request.args.get("page", 1, type=int),
+                          per_page=request.args.get("per_page", None, type=int))
+
+  return render_template('index.html', model_rows=rows, validity=validation_badges(db.session, rows))
 
 
 @main.route('/incidence_update/<int:id_>/', methods=('GET', 'POST'))
@@ -142,7 +182,8 @@ def incidence_update(id_: int) -> Union[str, Response]:
     abort(500, description=f"Multiple rows found for id={id_}")
   model_row = rows[0]
 
-  sector, sector_type = get_sector_info(db, base, id_)
+  # A POST saves the form, so it must not pick the form class from a cached read
+  sector, sector_type = get_sector_info(db, base, id_, use_cache=request.method == "GET")
 
   logger.debug(f"calling incidence_prep()")
   return incidence_prep(model_row,
@@ -151,6 +192,71 @@ def incidence_update(id_: int) -> Union[str, Response]:
                         default_dropdown=PLEASE_SELECT)
 
 
+@main.route('/incidence_update/<int:id_>/fields', methods=['PATCH'])
+def incidence_autosave(id_: int) -> ResponseReturnValue:
+  """
+  Autosave the changed fields of a feedback form (JSON PATCH used by static/js/autosave.js).
+
+  Args:
+    id_ (int): Primary key of the incidence being edited.
+
+  Returns:
+    ResponseReturnValue: JSON {"revision", "revisions", "saved", "validated", "errors"}; 409 with
+      {"conflicts", "revision"} if a changed field was modified after its base revision.
+
+  Examples:
+    # PATCH /incidence_update/123/fields
+    # {"revision": 41, "revisions": {"facility_name": 57}, "fields": {"facility_name": "Site A", "ogi_performed": "Yes"}}
+
+  Notes:
+    - Only the changed fields and the fields that depend on them are validated, and only the
+      changed keys are merged into misc_json (see `arb.portal.utils.autosave`).
+    - `revision` is the revision the page was rendered with; `revisions` (optional) holds the
+      per-key revisions returned by earlier autosaves of the page.
+    - The CSRF token is read from the X-CSRFToken header when CSRF protection is enabled.
+  """
+  logger.info(f"route called: incidence_autosave with id= {id_}.")
+
+  if current_app.config.get("WTF_CSRF_ENABLED", True):
+    try:
+      validate_csrf(request.headers.get("X-CSRFToken"))
+    except ValidationError as e:
+      abort(400, description=f"CSRF validation failed: {e}")
+
+  payload = request.get_json(silent=True) or {}
+  changes = payload.get("fields")
+  revision = payload.get("revision")
+  revisions = payload.get("revisions") or {}
+  if (not isinstance(changes, dict) or not changes or not isinstance(revision, int)
+          or not isinstance(revisions, dict) or not all(isinstance(value, int) for value in revisions.values())):
+    abort(400, description='Expected JSON {"revision": <int>, "revisions": {<name>: <int>, ...}, '
+                           '"fields": {<name>: <value>, ...}}')
+
+  base: AutomapBase = current_app.base  # type: ignore[attr-defined]
+  table_class: Any = get_class_from_table_name(base, "incidences")
+  if table_class is None:
+    abort(503, description="Could not get table class for incidences")
+  model_row = db.session.get(table_class, id_)
+  if model_row is None:
+    abort(404, description=f"No incidence with id_incidence={id_}")
+
+  _, sector_type = get_sector_info(db, base, id_, use_cache=False)
+  form_class = FEEDBACK_FORMS.get(sector_type)
+  if form_class is None:
+    abort(400, description=f"Sector type {sector_type!r} is not editable")
+
+  try:
+    result = autosave_fields(model_row, form_class, changes, revision, db.session,
+                             user=request.remote_user or "anonymous", revisions=revisions)
+  except AutosaveConflict as e:
+    return jsonify({"conflicts": e.keys, "revision": e.revision}), 409
+  except ValueError as e:
+    abort(400, description=str(e))
+
+  return jsonify({"revision": result.revision, "revisions": result.revisions, "saved": result.saved,
+                  "validated": list(result.validated), "errors": result.errors})
+
+
 @main.route('/og_incidence_create/', methods=('GET', 'POST'))
 def og_incidence_create() -> Response:
   """
@@ -281,6 +387,7 @@ def list_uploads() -> str:
 
 
 @main.route('/list_staged')
+@read_only
 def list_staged() -> ResponseReturnValue:
   """
   List all staged files available for review or processing.
@@ -300,6 +407,11 @@ def list_staged() -> ResponseReturnValue:
   if staging_dir.exists():
     for file_path in staging_dir.glob("*.json"):
       filename = file_path.name
+      # The janitor may remove a file between the glob and here; it is simply no longer listed
+      try:
+        file_stat = file_path.stat()
+      except FileNotFoundError:
+        continue
       id_incidence = None
       sector = "Unknown"
       try:
@@ -326,25 +438,29 @@ def list_staged() -> ResponseReturnValue:
             'filename': filename,
             'id_incidence': id_incidence,
             'sector': sector,
-            'file_size': file_path.stat().st_size,
-            'modified_time': datetime.datetime.fromtimestamp(file_path.stat().st_mtime),
+            'file_size': file_stat.st_size,
+            'modified_time': datetime.datetime.fromtimestamp(file_stat.st_mtime),
             'malformed': False
           })
+        except FileNotFoundError:
+          continue
         except Exception as meta_exc:
           # If JSON loads but required fields are missing, treat as malformed
           logger.warning(f"Malformed staged file (missing fields) {file_path}: {meta_exc}")
           malformed_files.append({
             'filename': filename,
-            'file_size': file_path.stat().st_size,
-            'modified_time': datetime.datetime.fromtimestamp(file_path.stat().st_mtime),
+            'file_size': file_stat.st_size,
+            'modified_time': datetime.datetime.fromtimestamp(file_stat.st_mtime),
             'error': f"Missing required fields: {meta_exc}"
           })
+      except FileNotFoundError:
+        continue
       except Exception as e:
         logger.warning(f"Could not process staged file {file_path}: {e}")
         malformed_files.append({
           'filename': filename,
-          'file_size': file_path.stat().st_size,
-          'modified_time': datetime.datetime.fromtimestamp(file_path.stat().st_mtime),
+          'file_size': file_stat.st_size,
+          'modified_time': datetime.datetime.fromtimestamp(file_stat.st_mtime),
           'error': str(e)
         })
 
@@ -705,15 +821,20 @@ def review_staged(id_: int, filename: str) -> str | Response:
                            metadata={},
                            filename=filename)
 
-  model, _, is_new_row = get_ensured_row(
-    db=db,
-    base=base,
-    table_name="incidences",
-    primary_key_name="id_incidence",
-    id_=id_
-  )
+  # Display only: read through the incidence cache, creating the row only when it does not exist
+  cached = read_incidence(db, base, id_)
+  if cached is not None:
+    db_json, is_new_row = cached.misc_json, False
+  else:
+    model, _, is_new_row = get_ensured_row(
+      db=db,
+      base=base,
+      table_name="incidences",
+      primary_key_name="id_incidence",
+      id_=id_
+    )
+    db_json = getattr(model, "misc_json", {}) or {}
 
-  db_json = getattr(model, "misc_json", {}) or {}
   staged_fields = compute_field_differences(new_data=staged_payload, existing_data=db_json)
 
   if is_new_row:
@@ -979,6 +1100,7 @@ def serve_file(filename) -> Response:
 
 
 @main.route("/portal_updates")
+@read_only
 def view_portal_updates() -> str:
   """
   Display a table of all portal update log entries.
@@ -1018,6 +1140,7 @@ def view_portal_updates() -> str:
 
 
 @main.route("/portal_updates/export")
+@read_only
 def export_portal_updates() -> Response:
   """
   Export all portal update log entries as a CSV file.
@@ -1058,6 +1181,197 @@ def export_portal_updates() -> Response:
   )
 
 
+@main.route("/incidence_history/<int:id_>")
+@read_only
+def incidence_history(id_: int) -> ResponseReturnValue:
+  """
+  Show an incidence's misc_json as of a point in its audit trail, optionally diffed against another point.
+
+  Args:
+    id_ (int): Incidence ID.
+
+  Returns:
+    ResponseReturnValue: Rendered history page, or JSON when `format=json`.
+
+  Examples:
+    # In browser: GET /incidence_history/123?at=2025-01-15T14:30
+    # In browser: GET /incidence_history/123?start=118&end=240
+    # API:        GET /incidence_history/123?at=118&format=json
+
+  Notes:
+    - Points (`at`, `start`, `end`) are portal update IDs or ISO-8601 timestamps (naive values are
+      California local); an empty point means the current document.
+    - When `start` is given, the page shows `compute_field_differences()` between `start` and `end`.
+    - Invalid points return 400.
+  """
+  logger.info(f"route called: incidence_history with id_: {id_}")
+
+  base: AutomapBase = current_app.base  # type: ignore[attr-defined]
+  table_class = get_class_from_table_name(base, "incidences")
+  if table_class is None:
+    abort(500, description="Could not get table class for incidences")
+  model_row = db.session.get(table_class, id_)
+  if model_row is None:
+    abort(404, description=f"Incidence {id_} not found")
+  current_document = model_row.misc_json or {}
+
+  try:
+    at = parse_history_point(request.args.get("at"))
+    start = parse_history_point(request.args.get("start"))
+    end = parse_history_point(request.args.get("end"))
+  except ValueError as e:
+    abort(400, description=f"Invalid history point: {e}")
+
+  history = reconstruct_misc_json(db.session, id_, current_document, at)
+  start_point = end_point = None
+  differences = []
+  if request.args.get("start", "").strip():
+    start_point, end_point, differences = diff_history_points(db.session, id_, current_document, start, end)
+
+  if request.args.get("format") == "json":
+    def point_to_dict(point):
+      return None if point is None else {"update_id": point.update_id, "timestamp": point.timestamp,
+                                         "source": point.source, "replayed": point.replayed,
+                                         "misc_json": point.misc_json}
+
+    return jsonify({"id_incidence": id_, "at": point_to_dict(history), "start": point_to_dict(start_point),
+                    "end": point_to_dict(end_point), "differences": differences})
+
+  updates = db.session.query(PortalUpdate).filter(PortalUpdate.id_incidence == id_) \
+    .order_by(PortalUpdate.id.desc()).limit(200).all()
+
+  return render_template(
+    "incidence_history.html",
+    id_incidence=id_,
+    history=history,
+    start_point=start_point,
+    end_point=end_point,
+    differences=differences,
+    updates=updates,
+    at=request.args.get("at", "").strip(),
+    start=request.args.get("start", "").strip(),
+    end=request.args.get("end", "").strip(),
+  )
+
+
+@main.route("/incidence_changes")
+@read_only
+def incidence_changes() -> ResponseReturnValue:
+  """
+  Return one page of the incidence change feed (change-data-capture) as JSON.
+
+  Returns:
+    ResponseReturnValue: JSON page from `read_change_feed()`, 400 for an invalid cursor/timestamp, or
+      503 when `include_misc_json` is requested and the incidences table is not reflected.
+
+  Examples:
+    # GET /incidence_changes?since=2025-01-15T00:00&limit=200
+    # GET /incidence_changes?cursor=cHU6MTIzNA&include_misc_json=1
+
+  Notes:
+    - Query parameters: `cursor` (from the previous page), `since` (ISO-8601 commit time, used
+      only without a cursor), `limit` (rows per page), `include_misc_json` (any non-empty value).
+    - Consumers store the returned `cursor` and call again while `has_more` is true.
+  """
+  logger.info(f"route called: incidence_changes")
+
+  try:
+    since = parse_history_point(request.args.get("since"))
+    if since is not None and not isinstance(since, datetime.datetime):
+      raise ValueError(f"since must be a date/time, not {since!r}")
+    limit = int(request.args.get("limit", CHANGE_FEED_PAGE_SIZE))
+    incidences = None
+    if request.args.get("include_misc_json"):
+      base: AutomapBase = current_app.base  # type: ignore[attr-defined]
+      table_class = get_class_from_table_name(base, "incidences")
+      if table_class is None:
+        abort(503, description="Could not get table class for incidences")
+      incidences = table_class.__table__
+    page = read_change_feed(db.session, cursor=request.args.get("cursor"), since=since, limit=limit,
+                            incidences=incidences)
+  except ValueError as e:
+    abort(400, description=str(e))
+
+  return jsonify(page)
+
+
+@main.route("/incidence_summary")
+@read_only
+def incidence_summary() -> ResponseReturnValue:
+  """
+  Dashboard of incidence counts by sector, facility and month, with drill-down links.
+
+  Returns:
+    ResponseReturnValue: Rendered summary page, or JSON when `format=json`.
+
+  Examples:
+    # In browser: GET /incidence_summary
+    # In browser: GET /incidence_summary?group_by=month&sector=Landfill
+    # API:        GET /incidence_summary?group_by=facility_name&format=json
+
+  Notes:
+    - Reads the pre-aggregated summary (see `arb.portal.utils.incidence_summary`), so the cost
+      depends on the number of groups, not the number of incidences.
+    - `group_by` is one of sector, facility_name, month; the other dimensions may be given as filters.
+    - A summary that has been stale for longer than SUMMARY_MAX_STALENESS_SECONDS is refreshed
+      first (by one worker at a time, on a primary connection); admins force a full refresh with
+      `POST /incidence_summary/refresh`. Only the summary reads use the replica (`@read_only`).
+    - Each row links to the next dimension's breakdown and to the matching incidence list.
+  """
+  logger.info(f"route called: incidence_summary")
+
+  group_by = request.args.get("group_by", SUMMARY_DIMENSIONS[0])
+  filters = {key: request.args[key] for key in SUMMARY_DIMENSIONS if key in request.args and key != group_by}
+  if group_by not in SUMMARY_DIMENSIONS:
+    abort(400, description=f"Invalid group_by {group_by!r}; expected one of {SUMMARY_DIMENSIONS}")
+
+  # The staleness check and the refresh lock must run on the primary, not on a lagging replica
+  with db.engine.begin() as connection:
+    refresh_if_stale(connection, current_app.config.get("SUMMARY_MAX_STALENESS_SECONDS", 300))
+
+  groups = summarize(db.session, group_by, filters)
+  remaining = [key for key in SUMMARY_DIMENSIONS if key != group_by and key not in filters]
+  next_dimension = remaining[0] if remaining else None
+  for group in groups:
+    selection = {**filters, group_by: group["value"]}
+    group["breakdown_url"] = (url_for("main.incidence_summary", group_by=next_dimension, **selection)
+                              if next_dimension else None)
+    group["list_url"] = (url_for("main.index", **{key: value for key, value in selection.items() if value})
+                         if all(selection.values()) else None)
+
+  state = summary_state(db.session)
+  if request.args.get("format") == "json":
+    return jsonify({"group_by": group_by, "filters": filters, "groups": groups,
+                    "total": sum(group["incidences"] for group in groups), **state})
+
+  return render_template("incidence_summary.html", group_by=group_by, filters=filters, groups=groups,
+                         dimensions=SUMMARY_DIMENSIONS, state=state,
+                         total=sum(group["incidences"] for group in groups))
+
+
+@main.route("/incidence_summary/refresh", methods=["POST"])
+@admin_required
+def incidence_summary_refresh() -> ResponseReturnValue:
+  """
+  Fully recompute the incidence summary (admin users only), then show the dashboard again.
+
+  Returns:
+    ResponseReturnValue: Redirect to `/incidence_summary` with the same query parameters.
+
+  Notes:
+    - If another worker is refreshing the summary, this request does not start a second refresh.
+  """
+  logger.info(f"route called: incidence_summary_refresh")
+
+  if claim_refresh(db.session, if_stale=False):
+    refresh_incidence_summary(db.session)
+    db.session.commit()
+  else:
+    db.session.rollback()
+    flash("The incidence summary is already being refreshed.", "info")
+  return redirect(url_for("main.incidence_summary", **request.args))
+
+
 @main.route('/search/', methods=('GET', 'POST'))
 def search() -> str:
   """
@@ -1083,10 +1397,10 @@ def search() -> str:
 # Diagnostic and developer endpoints
 #####################################################################
 
-@main.route('/diagnostics')
+@main.route('/diagnostics', methods=['GET', 'POST'])
 def diagnostics() -> str:
   """
-  Display developer diagnostics and runtime information.
+  Display developer diagnostics and runtime information, and set the form save diagnostics policy.
 
   NOTE: This is a developer-only route, not covered by E2E tests by design.
 
@@ -1096,9 +1410,25 @@ def diagnostics() -> str:
   Examples:
     # In browser: GET /diagnostics
     # Returns: HTML diagnostics info
+    # POST /diagnostics with mode=sampled&sample_rate=0.05&users=&incidences=1234
+
+  Notes:
+    - A POST (admin users only, see `arb.portal.utils.admin_auth`) replaces the diagnostics
+      policy for every worker (see `arb.portal.utils.diagnostics_policy`); invalid values leave
+      it unchanged.
   """
   logger.info(f"route called: diagnostics")
 
+  store = get_diagnostics_store()
+  policy_error = None
+  if request.method == 'POST':
+    require_admin()
+  if request.method == 'POST' and store is not None:
+    try:
+      store.set(DiagnosticsPolicy.from_dict(request.form.to_dict()))
+    except ValueError as e:
+      policy_error = str(e)
+
   result = find_auto_increment_value(db, "incidences", "id_incidence")
 
   html_content = f"<p><strong>Diagnostic Results=</strong></p> <p>{result}</p>"
@@ -1108,6 +1438,10 @@ def diagnostics() -> str:
                          html_content=html_content,
                          modal_title="Success",
                          modal_message="Diagnostics completed successfully.",
+                         diagnostics_policy=store.get().to_dict() if store else None,
+                         diagnostics_counters=store.counters if store else None,
+                         diagnostics_modes=DIAGNOSTICS_MODES,
+                         policy_error=policy_error,
                          )
 
 
@@ -1137,6 +1471,116 @@ def show_dropdown_dict() -> str:
                          )
 
 
+@main.route('/show_incidence_cache', methods=['GET', 'POST'])
+def show_incidence_cache() -> ResponseReturnValue:
+  """
+  Show incidence cache and form page cache metrics (hit rate, size, invalidations).
+
+  Returns:
+    ResponseReturnValue: Rendered HTML of the cache statistics, or a redirect back to it after a POST.
+
+  Notes:
+    - A POST (admin users only, see `arb.portal.utils.admin_auth`) drops every cached entry of
+      both caches in this worker process and resets its counters.
+  """
+  logger.info(f"route called: show_incidence_cache")
+
+  cache = get_incidence_cache()
+  page_cache = get_form_page_cache()
+  if request.method == 'POST':
+    require_admin()
+    for cleared in (cache, page_cache):
+      if cleared is not None:
+        cleared.clear()
+    return redirect(url_for('main.show_incidence_cache'))
+  stats = cache.stats() if cache is not None else {"enabled": False, "backend": None}
+  page_stats = page_cache.stats() if page_cache is not None else {"enabled": False}
+  return render_template('diagnostics.html',
+                         header="Incidence Cache",
+                         subheader="Read-through cache of incidence misc_json and sector, and the form page render cache.",
+                         html_content=f"<p><strong>Incidence cache statistics=</strong></p> <p>{obj_to_html(stats)}</p>"
+                                      f"<p><strong>Form page cache statistics=</strong></p> <p>{obj_to_html(page_stats)}</p>",
+                         post_action="Clear caches",
+                         )
+
+
+@main.route('/form_rules/<sector>')
+def form_rules(sector: str) -> ResponseReturnValue:
+  """
+  Return the versioned JSON rules contract of a feedback form for client-side validation.
+
+  Args:
+    sector (str): Form slug, "oil_and_gas" or "landfill".
+
+  Returns:
+    ResponseReturnValue: JSON contract (see `arb.portal.utils.form_rules.rules_contract`), or 304
+      when the browser's cached copy (If-None-Match) is current.
+
+  Examples:
+    # GET /form_rules/landfill
+
+  Notes:
+    - The contract version is the ETag; browsers revalidate on each page load and get a 304 until
+      the rules change (i.e., until a deployment changes the form declarations).
+  """
+  form_class = FEEDBACK_FORMS_BY_SLUG.get(sector)
+  if form_class is None:
+    abort(404, description=f"No form rules for sector {sector!r}")
+
+  contract = rules_contract(form_class)
+  response = jsonify(contract)
+  response.set_etag(contract["version"])
+  response.cache_control.public = True
+  response.cache_control.no_cache = True
+  return response.make_conditional(request)
+
+
+@main.route('/db_pool_metrics')
+def db_pool_metrics() -> ResponseReturnValue:
+  """
+  Return live connection pool metrics (event counters, checkout latency, overflow, leaks).
+
+  Returns:
+    ResponseReturnValue: JSON list of pool snapshots, or Prometheus text with `?format=prometheus`.
+
+  Examples:
+    # GET /db_pool_metrics
+    # GET /db_pool_metrics?format=prometheus
+
+  Notes:
+    - Reading the metrics also runs the leak detector, which logs the checkout stack of any
+      connection held longer than DATABASE_POOL_LEAK_SECONDS.
+  """
+  snapshots = [metrics.snapshot() for metrics in get_pool_metrics().values()]
+  if request.args.get("format") == "prometheus":
+    return Response(format_prometheus(snapshots), mimetype="text/plain; version=0.0.4")
+  return jsonify(snapshots)
+
+
+@main.route('/show_process_info')
+def show_process_info() -> str:
+  """
+  Show this worker's startup time, fork origin and memory use (RSS/PSS/USS).
+
+  Returns:
+    str: Rendered HTML of the process lifecycle information.
+
+  Notes:
+    - Compare PSS across workers to see the memory shared through a preloaded master.
+  """
+  logger.info(f"route called: show_process_info")
+
+  info = dict(current_app.extensions.get("lifecycle", {}))
+  info.pop("services", None)
+  info["pid"] = os.getpid()
+  info["memory_now"] = memory_usage()
+  return render_template('diagnostics.html',
+                         header="Process Info",
+                         subheader="Startup time and memory of the worker serving this request.",
+                         html_content=f"<p><strong>Process lifecycle=</strong></p> <p>{obj_to_html(info)}</p>",
+                         )
+
+
 @main.route('/show_database_structure')
 def show_database_structure() -> str:
   """
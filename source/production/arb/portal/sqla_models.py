@@ -7,6 +7,7 @@ including uploaded file metadata and portal JSON update logs.
 Module_Attributes:
   UploadedFile (type): SQLAlchemy model for uploaded file metadata.
   PortalUpdate (type): SQLAlchemy model for portal update logs.
+  PortalUpdateSnapshot (type): SQLAlchemy model for periodic misc_json snapshots of an incidence.
   logger (logging.Logger): Logger instance for this module.
 
 Examples:
@@ -26,7 +27,7 @@ Notes:
 import logging
 from pathlib import Path
 
-from sqlalchemy import Column, DateTime, Integer, String, Text
+from sqlalchemy import JSON, BigInteger, Column, DateTime, Index, Integer, String, Text
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.sql import func
 
@@ -111,6 +112,8 @@ class PortalUpdate(db.Model):
     user (str): Username or identifier of the user making the change.
     comments (str): Optional explanatory comment.
     id_incidence (int | None): Foreign key to the modified incidence (nullable).
+    commit_xid (int | None): PostgreSQL: 64-bit ID of the inserting transaction, filled in by the
+      column default `pg_current_xact_id()`; NULL on SQLite. Orders the change feed by commit.
 
   Examples:
     update = PortalUpdate(key="field1", old_value="A", new_value="B", user="alice", id_incidence=1)
@@ -121,9 +124,23 @@ class PortalUpdate(db.Model):
   Notes:
     - Automatically populated by `apply_json_patch_and_log()`.
     - Used for rendering the `portal_updates.html` table.
+    - Indexes match the `/portal_updates` filters (`apply_portal_update_filters`), which always
+      sort by timestamp: incidence ID ranges, date ranges, and key/user lookups. Existing
+      databases get them from `ensure_portal_update_indexes()` at startup.
+    - On PostgreSQL the table can be converted to monthly range partitions on `timestamp`
+      (see `arb.portal.utils.portal_update_archive`); the ORM mapping is unchanged.
+    - `commit_xid` has its PostgreSQL default set by `ensure_portal_update_indexes()`, because
+      the default is PostgreSQL specific; `(commit_xid, id)` is the change feed's paging index.
   """
 
   __tablename__ = "portal_updates"
+  __table_args__ = (
+    Index("ix_portal_updates_timestamp", "timestamp"),
+    Index("ix_portal_updates_id_incidence_timestamp", "id_incidence", "timestamp"),
+    Index("ix_portal_updates_user_timestamp", "user", "timestamp"),
+    Index("ix_portal_updates_key_timestamp", "key", "timestamp"),
+    Index("ix_portal_updates_commit_xid_id", "commit_xid", "id"),
+  )
 
   id = Column(Integer, primary_key=True)
   timestamp = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -134,6 +151,7 @@ class PortalUpdate(db.Model):
   user = Column(String(255), nullable=False, default="anonymous")
   comments = Column(Text, nullable=False, default="")
   id_incidence = Column(Integer, nullable=True)
+  commit_xid = Column(BigInteger, nullable=True)
 
   def __repr__(self) -> str:
     """
@@ -153,6 +171,60 @@ class PortalUpdate(db.Model):
     )
 
 
+class PortalUpdateSnapshot(db.Model):
+  """
+  SQLAlchemy model holding a full copy of an incidence's misc_json as of a portal update.
+
+  Table Name:
+    portal_update_snapshots
+
+  Attributes:
+    id (int): Primary key.
+    id_incidence (int): Incidence the snapshot belongs to.
+    id_portal_update (int): ID of the last `PortalUpdate` row reflected in the snapshot.
+    timestamp (datetime): UTC time when the snapshot was taken.
+    misc_json (dict): The incidence's misc_json after `id_portal_update` was applied.
+
+  Examples:
+    snapshot = PortalUpdateSnapshot(id_incidence=1, id_portal_update=42, misc_json={"sector": "Landfill"})
+    db.session.add(snapshot)
+    db.session.commit()
+
+  Notes:
+    - Written every `HISTORY_SNAPSHOT_INTERVAL` audited changes by `apply_json_patch_and_log()`
+      (see `arb.portal.utils.incidence_history`), so history reconstruction only replays a
+      bounded number of `PortalUpdate` rows.
+  """
+
+  __tablename__ = "portal_update_snapshots"
+  __table_args__ = (
+    Index("ix_portal_update_snapshots_id_incidence_update", "id_incidence", "id_portal_update"),
+  )
+
+  id = Column(Integer, primary_key=True)
+  id_incidence = Column(Integer, nullable=False)
+  id_portal_update = Column(Integer, nullable=False)
+  timestamp = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+  misc_json = Column(JSON, nullable=False)
+
+  def __repr__(self) -> str:
+    """
+    Return a human-readable string representation of the snapshot record.
+
+    Returns:
+      str: Summary string showing the snapshot ID, incidence, portal update ID, and key count.
+
+    Examples:
+      snapshot = PortalUpdateSnapshot(id=1, id_incidence=7, id_portal_update=42, misc_json={"a": 1})
+      print(repr(snapshot))
+      # Output: '<PortalUpdateSnapshot id=1 id_incidence=7 id_portal_update=42 keys=1>'
+    """
+    return (
+      f"<PortalUpdateSnapshot id={self.id} id_incidence={self.id_incidence} "
+      f"id_portal_update={self.id_portal_update} keys={len(self.misc_json or {})}>"
+    )
+
+
 def run_diagnostics() -> None:
   """
   Run a test transaction to validate UploadedFile model functionality.
@@ -80,6 +80,7 @@ def db_create() -> None:
 
   Notes:
     - Skips creation if FAST_LOAD=True is set in the app config.
+    - Also creates portal_updates indexes missing from existing databases.
     - Logs warnings and info for tracing.
   """
   if current_app.config.get("FAST_LOAD", False) is True:
@@ -88,6 +89,14 @@ def db_create() -> None:
 
   logger.info(f"Creating all missing tables.")
   db.create_all()
+
+  # create_all() skips indexes added to models whose tables already exist
+  from arb.portal.utils.portal_update_archive import ensure_portal_update_indexes
+  ensure_portal_update_indexes(db.engine)
+  from arb.portal.utils.incidence_summary import ensure_incidence_summary
+  ensure_incidence_summary(db.engine)
+  from arb.portal.utils.bulk_validation import ensure_validation_table
+  ensure_validation_table(db.engine)
   logger.debug(f"Database schema created.")
 
 
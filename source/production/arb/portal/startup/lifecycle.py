@@ -0,0 +1,295 @@
+"""
+  Preload-safe process lifecycle for prefork servers (gunicorn with `preload_app`).
+
+  `create_app()` opens database connections while it creates tables, reflects the schema and
+  loads the dropdown globals. With a preloaded app that work runs once in the gunicorn master and
+  the workers share its memory, but pooled connections, locks and threads must not cross the
+  fork. The lifecycle is:
+
+    1. Master: `create_app()` does all import-time and reflection work; with PRELOAD_APP set it
+       does not start per-process services (threads do not survive fork).
+    2. Master, before each fork (`prepare_for_fork`): dispose every engine so no pooled socket
+       is open when the worker is forked.
+    3. Worker, after fork (`after_fork_in_child`): `engine.dispose(close=False)` on every engine,
+       so the worker starts a fresh pool without closing sockets that belong to the master, then
+       re-seed per-worker state (pool metrics, replica health, incidence cache) and start the
+       per-process services (upload janitor, summary refresher threads).
+
+  `source/production/gunicorn.conf.py` wires steps 2 and 3 into gunicorn's `pre_fork` and
+  `post_fork` hooks.
+
+  Attributes:
+    logger (logging.Logger): Logger instance for this module.
+
+  Examples:
+    # gunicorn.conf.py
+    def post_fork(server, worker):
+      after_fork_in_child(server.app.wsgi())
+
+    # Measure startup time and memory per worker, preloaded vs not (from the production directory):
+    python -m arb.portal.startup.lifecycle --workers 4
+
+  Notes:
+    - `after_fork_in_child()` does nothing in the process that created the app, so the hooks are
+      harmless without preloading.
+    - Per-worker memory is reported as RSS, PSS (shared pages divided between the processes
+      sharing them) and USS (pages private to the process); preloading lowers PSS and USS.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+from flask import Flask
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+logger.debug(f'Loading File: "{Path(__file__).name}". Full Path: "{Path(__file__)}"')
+
+_EXTENSION_KEY = "lifecycle"
+
+
+def memory_usage(pid: int | str = "self") -> dict:
+  """
+  Return the memory use of a process in KiB.
+
+  Args:
+    pid (int | str): Process ID, or "self" for the current process.
+
+  Returns:
+    dict: {"rss_kb": int, "pss_kb": int | None, "uss_kb": int | None}; PSS/USS need Linux
+      `/proc/<pid>/smaps_rollup`, RSS falls back to `resource.getrusage` (peak RSS).
+
+  Examples:
+    Input : "self"
+    Output: {"rss_kb": 182340, "pss_kb": 61020, "uss_kb": 48890}
+  """
+  fields: dict[str, int] = {}
+  try:
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+      for line in f:
+        parts = line.split()
+        if len(parts) == 3 and parts[2] == "kB":
+          fields[parts[0].rstrip(":")] = int(parts[1])
+  except OSError:
+    pass
+  if fields:
+    return {"rss_kb": fields.get("Rss"), "pss_kb": fields.get("Pss"),
+            "uss_kb": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)}
+
+  import resource
+  return {"rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, "pss_kb": None, "uss_kb": None}
+
+
+def app_engines(app: Flask) -> dict[str, Engine]:
+  """
+  Return every engine the app uses: Flask-SQLAlchemy binds ("primary" for the default) and read replicas.
+
+  Args:
+    app (Flask): Flask application.
+
+  Returns:
+    dict[str, Engine]: Engines by name.
+  """
+  with app.app_context():
+    engines = {("primary" if key is None else key): engine
+               for key, engine in app.extensions["sqlalchemy"].engines.items()}
+  router = app.extensions.get("read_replicas")
+  if router is not None:
+    engines.update(router.engines)
+  return engines
+
+
+def record_startup(app: Flask, started: float) -> dict:
+  """
+  Record how long `create_app()` took and the process memory afterwards.
+
+  Args:
+    app (Flask): Flask application.
+    started (float): `time.perf_counter()` value taken when app creation began.
+
+  Returns:
+    dict: Lifecycle state stored in `app.extensions["lifecycle"]`.
+  """
+  state = {
+    "pid": os.getpid(),
+    "preloaded": bool(app.config.get("PRELOAD_APP", False)),
+    "startup_seconds": round(time.perf_counter() - started, 3),
+    "memory_after_startup": memory_usage(),
+    "forked_from": None,
+    "worker_ready_seconds": None,
+    "services": {},
+  }
+  app.extensions[_EXTENSION_KEY] = state
+  logger.info(f"App created in {state['startup_seconds']}s (pid {state['pid']}, "
+              f"preloaded={state['preloaded']}, memory={state['memory_after_startup']})")
+  return state
+
+
+def start_worker_services(app: Flask) -> None:
+  """
+  Start the per-process background services (upload janitor, incidence summary refresher).
+
+  Args:
+    app (Flask): Flask application.
+
+  Notes:
+    - Called by `create_app()` unless PRELOAD_APP is set, and by `after_fork_in_child()` in each worker.
+  """
+  from arb.portal.utils.incidence_summary import start_summary_refresher
+  from arb.portal.utils.staging_janitor import start_janitor_thread
+  state = app.extensions.setdefault(_EXTENSION_KEY, {"services": {}})
+  state["services"]["janitor"] = start_janitor_thread(app)
+  state["services"]["summary_refresher"] = start_summary_refresher(app)
+
+
+def prepare_for_fork(app: Flask) -> None:
+  """
+  Close the master's pooled connections so none are inherited by the next worker.
+
+  Args:
+    app (Flask): The preloaded Flask application.
+
+  Notes:
+    - Safe to call before every fork; the master does not use the database after startup.
+  """
+  for engine in app_engines(app).values():
+    engine.dispose()
+  logger.debug(f"prepare_for_fork: disposed engines in pid {os.getpid()}")
+
+
+def after_fork_in_child(app: Flask) -> bool:
+  """
+  Make a forked worker's copy of the app safe to use and re-seed its per-worker state.
+
+  Args:
+    app (Flask): The app created in the parent process.
+
+  Returns:
+    bool: True if the worker was prepared, False if the app was created in this process
+      (no fork happened since, so there is nothing to do).
+
+  Examples:
+    def post_fork(server, worker):
+      after_fork_in_child(server.app.wsgi())
+  """
+  state = app.extensions.get(_EXTENSION_KEY)
+  if state is None or state.get("pid") == os.getpid():
+    return False
+  started = time.perf_counter()
+
+  # Replace the pools without closing connections that belong to the parent
+  for engine in app_engines(app).values():
+    engine.dispose(close=False)
+
+  # Per-worker state: counters, replica health, and the in-process caches (with their locks)
+  for metrics in app.extensions.get("db_pool_metrics", {}).values():
+    metrics.reset()
+  router = app.extensions.get("read_replicas")
+  if router is not None:
+    router.reset()
+  if "incidence_cache" in app.extensions:
+    from arb.portal.utils.incidence_cache import init_incidence_cache
+    init_incidence_cache(app)
+  if "form_page_cache" in app.extensions:
+    from arb.portal.utils.form_page_cache import init_form_page_cache
+    init_form_page_cache(app)
+
+  start_worker_services(app)
+
+  state.update(forked_from=state["pid"], pid=os.getpid(),
+               worker_ready_seconds=round(time.perf_counter() - started, 4))
+  logger.info(f"Worker {state['pid']} ready {state['worker_ready_seconds']}s after fork "
+              f"from {state['forked_from']} (memory={memory_usage()})")
+  return True
+
+
+def _measure_worker(conn_write: int, app: Flask | None) -> None:
+  """Child side of `measure_workers`: prepare or create the app, report timing and memory, exit."""
+  started = time.perf_counter()
+  if app is None:
+    from arb.portal.app import create_app
+    app = create_app()
+  else:
+    after_fork_in_child(app)
+  ready = time.perf_counter() - started
+  time.sleep(0.5)  # let the sibling workers finish so PSS reflects the steady state
+  report = {"pid": os.getpid(), "ready_seconds": round(ready, 3), **memory_usage()}
+  os.write(conn_write, (json.dumps(report) + "\n").encode())
+  os._exit(0)
+
+
+def measure_workers(workers: int = 4, preload: bool = True) -> dict:
+  """
+  Fork `workers` processes the way gunicorn would and report startup time and memory per worker.
+
+  Args:
+    workers (int): Number of worker processes.
+    preload (bool): Create the app once in this process before forking (True), or in every worker.
+
+  Returns:
+    dict: {"preload": bool, "master_startup_seconds": float | None, "workers": [{"pid", "ready_seconds",
+           "rss_kb", "pss_kb", "uss_kb"}], "total_pss_kb": int | None}
+
+  Notes:
+    - Needs `os.fork` (Linux/macOS) and the configured database.
+  """
+  app = None
+  master_seconds = None
+  if preload:
+    os.environ["PRELOAD_APP"] = "true"
+    from arb.portal.app import create_app
+    started = time.perf_counter()
+    app = create_app()
+    master_seconds = round(time.perf_counter() - started, 3)
+    prepare_for_fork(app)
+
+  read_fd, write_fd = os.pipe()
+  pids = []
+  for _ in range(workers):
+    pid = os.fork()
+    if pid == 0:
+      os.close(read_fd)
+      _measure_worker(write_fd, app)
+    pids.append(pid)
+  os.close(write_fd)
+  for pid in pids:
+    os.waitpid(pid, 0)
+  with os.fdopen(read_fd) as f:
+    reports = [json.loads(line) for line in f if line.strip()]
+
+  pss = [report["pss_kb"] for report in reports if report.get("pss_kb") is not None]
+  return {"preload": preload, "master_startup_seconds": master_seconds, "workers": reports,
+          "total_pss_kb": sum(pss) if pss else None}
+
+
+def main(argv: list[str] | None = None) -> int:
+  """
+  Command-line entry point printing per-worker startup time and memory as JSON.
+
+  Args:
+    argv (list[str] | None): Arguments to parse; defaults to `sys.argv[1:]`.
+
+  Returns:
+    int: Process exit code.
+
+  Examples:
+    python -m arb.portal.startup.lifecycle --workers 4
+    python -m arb.portal.startup.lifecycle --workers 4 --no-preload
+  """
+  parser = argparse.ArgumentParser(description="Measure worker startup time and memory with and without preloading.")
+  parser.add_argument("--workers", type=int, default=4, help="Worker processes to fork.")
+  parser.add_argument("--no-preload", action="store_true", help="Create the app in every worker instead.")
+  args = parser.parse_args(argv)
+  if not hasattr(os, "fork"):
+    print("os.fork is not available on this platform", file=sys.stderr)
+    return 2
+  print(json.dumps(measure_workers(args.workers, preload=not args.no_preload), indent=2))
+  return 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
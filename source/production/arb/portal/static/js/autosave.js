@@ -0,0 +1,153 @@
+/**
+ * @fileoverview Debounced field-level autosave for the feedback forms
+ *
+ * Instead of posting the whole form, this script collects the names of the fields the user
+ * changed and, once the user pauses, sends only those fields in a JSON PATCH (see
+ * arb.portal.utils.autosave). Each field is sent with the revision its value is based on: the
+ * revision the page was rendered with, or the revision the server returned when it last saved
+ * that field. The server validates the changed fields and the fields that depend on them, merges
+ * the changed keys, and returns the revisions of the saved keys and the errors.
+ *
+ * Features:
+ * - Debounces saves (AUTOSAVE_DELAY_MS after the last edit; select/change events save sooner)
+ * - Sends one request at a time; edits made during a save are sent by the next one
+ * - Marks fields with server errors (Bootstrap "is-invalid", messages in the title)
+ * - Stops autosaving fields that someone else changed (409) and asks for a reload; the other
+ *   fields of the rejected request are sent again
+ * - Only advances a field's revision when the server saved that field, so a later save still
+ *   detects edits that other users made to the fields this page has not saved
+ * - Dispatches "autosave:saved" on the form so form_change_tracker.js can clear its indicator
+ *
+ * Requirements:
+ * - Script tag has data-autosave-url and data-revision attributes
+ * - Form has an ID matching the data-form-id attribute on the body
+ * - Page has an element with ID "unsaved-indicator" (the status is shown next to it)
+ */
+
+/** Delay after the last keystroke before saving (ms) */
+const AUTOSAVE_DELAY_MS = 1500;
+
+/** Delay after a change event (select, date picker, leaving a text box) before saving (ms) */
+const AUTOSAVE_CHANGE_DELAY_MS = 300;
+
+(function () {
+    const autosaveScript = document.currentScript;
+
+    document.addEventListener("DOMContentLoaded", function () {
+        const formId = document.body.getAttribute("data-form-id");
+        const form = document.querySelector(`#${formId}`);
+        const url = autosaveScript && autosaveScript.getAttribute("data-autosave-url");
+        let revision = autosaveScript ? parseInt(autosaveScript.getAttribute("data-revision"), 10) : NaN;
+
+        if (!form || !url || Number.isNaN(revision)) {
+            console.warn("Autosave script: missing form, URL or revision");
+            return;
+        }
+
+        const csrfInput = form.querySelector('input[name="csrf_token"]');
+        const keyRevisions = {};
+        const pending = new Set();
+        const conflicted = new Set();
+        let timer = null;
+        let inFlight = false;
+
+        const status = document.createElement("span");
+        status.className = "small text-white-50 ms-2";
+        const indicator = document.getElementById("unsaved-indicator");
+        if (indicator) {
+            indicator.after(status);
+        }
+
+        const showErrors = (validated, errors) => {
+            validated.forEach(name => {
+                const element = form.elements[name];
+                if (!element || !element.classList) {
+                    return;
+                }
+                const messages = errors[name] || [];
+                element.classList.toggle("is-invalid", messages.length > 0);
+                element.title = messages.join("\n");
+            });
+        };
+
+        const save = () => {
+            timer = null;
+            if (inFlight || pending.size === 0) {
+                return;
+            }
+            const fields = {};
+            const revisions = {};
+            pending.forEach(name => {
+                const element = form.elements[name];
+                if (element) {
+                    fields[name] = element.value;
+                    if (name in keyRevisions) {
+                        revisions[name] = keyRevisions[name];
+                    }
+                }
+            });
+            pending.clear();
+            inFlight = true;
+            status.textContent = "Saving…";
+
+            fetch(url, {
+                method: "PATCH",
+                credentials: "same-origin",
+                headers: {
+                    "Content-Type": "application/json",
+                    "X-CSRFToken": csrfInput ? csrfInput.value : "",
+                },
+                body: JSON.stringify({revision: revision, revisions: revisions, fields: fields}),
+            })
+                .then(response => response.json().then(body => ({status: response.status, body: body})))
+                .then(({status: code, body}) => {
+                    if (code === 409) {
+                        body.conflicts.forEach(name => conflicted.add(name));
+                        Object.keys(fields)
+                            .filter(name => !conflicted.has(name))
+                            .forEach(name => pending.add(name));
+                        status.textContent = `Changed by someone else: ${body.conflicts.join(", ")} — reload to see the latest values`;
+                        return;
+                    }
+                    if (code !== 200) {
+                        Object.keys(fields).forEach(name => pending.add(name));
+                        status.textContent = "Autosave failed; use Save to keep your changes";
+                        return;
+                    }
+                    Object.assign(keyRevisions, body.revisions);
+                    showErrors(body.validated, body.errors);
+                    const errorCount = Object.values(body.errors).reduce((count, messages) => count + messages.length, 0);
+                    status.textContent = errorCount ? `Saved (${errorCount} validation issue(s))` : "Saved";
+                    form.dispatchEvent(new CustomEvent("autosave:saved", {detail: {pending: pending.size}}));
+                })
+                .catch(error => {
+                    Object.keys(fields).forEach(name => pending.add(name));
+                    status.textContent = "Autosave failed; use Save to keep your changes";
+                    console.warn("Autosave request failed", error);
+                })
+                .finally(() => {
+                    inFlight = false;
+                    if (pending.size) {
+                        schedule(AUTOSAVE_CHANGE_DELAY_MS);
+                    }
+                });
+        };
+
+        const schedule = delay => {
+            clearTimeout(timer);
+            timer = setTimeout(save, delay);
+        };
+
+        const track = delay => event => {
+            const name = event.target && event.target.name;
+            if (!name || name === "csrf_token" || event.target.readOnly || conflicted.has(name)) {
+                return;
+            }
+            pending.add(name);
+            schedule(delay);
+        };
+
+        form.addEventListener("input", track(AUTOSAVE_DELAY_MS));
+        form.addEventListener("change", track(AUTOSAVE_CHANGE_DELAY_MS));
+    });
+})();
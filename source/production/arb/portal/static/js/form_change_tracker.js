@@ -10,12 +10,14 @@
  * - Shows visual indicator when form has unsaved changes
  * - Warns users before leaving page with unsaved data
  * - Automatically clears dirty state when form is submitted
+ * - Clears dirty state when autosave (autosave.js) has saved every change
  *
  * Functions:
  * - markDirty() - Marks form as having unsaved changes and shows indicator
  * - (beforeunload event handler) - Warns user before leaving page
  * - (submit event handler) - Clears dirty state on form submission
  * - (change/input event handlers) - Monitor form field changes
+ * - (autosave:saved event handler) - Clears dirty state once no autosave is pending
  *
  * Requirements:
  * - Form must have an ID matching the data-form-id attribute on the body
@@ -70,6 +72,17 @@ document.addEventListener("DOMContentLoaded", function () {
         }
     });
 
+    /**
+     * Clears the dirty state once autosave has stored every pending change
+     * @param {CustomEvent} e - autosave:saved event with detail.pending (number of unsaved fields)
+     */
+    form.addEventListener("autosave:saved", function (e) {
+        if (e.detail && e.detail.pending === 0) {
+            isDirty = false;
+            indicator.classList.add("d-none");
+        }
+    });
+
     /**
      * Clears the dirty state when form is successfully submitted
      * Hides the unsaved indicator and removes the beforeunload warning
@@ -0,0 +1,199 @@
+/**
+ * @fileoverview Live evaluation of the server's declarative form rules
+ *
+ * The feedback forms declare their contingent requirements and cross-field checks once on the
+ * server (arb.portal.utils.form_rules). The same declaration is served as a versioned JSON
+ * contract at /form_rules/<sector>; this script evaluates it as the user edits the form, so
+ * requirement changes and inconsistent answers show up without a POST and re-render.
+ *
+ * Features:
+ * - Marks labels of currently required fields (class "rule-required")
+ * - Shows cross-field check messages under the affected field (class "form-rule-errors")
+ * - Re-evaluates on every change/input event
+ *
+ * Functions:
+ * - evaluate(condition, values, fields) - Evaluate one rule condition
+ * - requiredFields(contract, values) - Fields required after the requirement rules
+ * - checkErrors(contract, values) - Field name → check messages
+ *
+ * Requirements:
+ * - Script tag has a data-rules-url attribute pointing at the contract
+ * - Form has an ID matching the data-form-id attribute on the body
+ *
+ * Notes:
+ * - The evaluator must stay in step with evaluate() in form_rules.py; the parity tests run
+ *   this file under Node against the server implementation.
+ */
+
+/**
+ * Whether an input string counts as a value for the given field type
+ * @param {string} value - Input value
+ * @param {string} type - Field type from the contract ("number", "datetime", "select", "text")
+ * @returns {boolean}
+ */
+function isPresent(value, type) {
+    if (value === undefined || value === null || value === "") {
+        return false;
+    }
+    if (type === "number") {
+        const number = Number(value);
+        return Number.isFinite(number) && number !== 0;
+    }
+    if (type === "datetime") {
+        return /^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}(:\d{2})?$/.test(value);
+    }
+    return true;
+}
+
+/**
+ * Evaluate a rule condition
+ * @param {Object} condition - Condition from the contract
+ * @param {Object<string, string>} values - Field name → input value
+ * @param {Object<string, Object>} fields - Field specs from the contract
+ * @returns {boolean}
+ */
+function evaluate(condition, values, fields) {
+    if (condition.all) {
+        return condition.all.every(sub => evaluate(sub, values, fields));
+    }
+    if (condition.any) {
+        return condition.any.some(sub => evaluate(sub, values, fields));
+    }
+    if (condition.not) {
+        return !evaluate(condition.not, values, fields);
+    }
+
+    const value = values[condition.field];
+    const type = (fields[condition.field] || {}).type;
+    switch (condition.op) {
+        case "eq":
+            return value === condition.value;
+        case "ne":
+            return value !== condition.value;
+        case "in":
+            return condition.values.includes(value);
+        case "not_in":
+            return !condition.values.includes(value);
+        case "present":
+            return isPresent(value, type);
+        case "earlier_than": {
+            const other = values[condition.other];
+            const otherType = (fields[condition.other] || {}).type;
+            return isPresent(value, type) && isPresent(other, otherType) && value < other;
+        }
+        case "in_fields":
+            return condition.fields.some(name => values[name] === value);
+        default:
+            throw new Error(`Unknown form rule op ${condition.op}`);
+    }
+}
+
+/**
+ * Fields required after the requirement rules are applied
+ * @param {Object} contract - Rules contract
+ * @param {Object<string, string>} values - Field name → input value
+ * @returns {Set<string>}
+ */
+function requiredFields(contract, values) {
+    const required = new Set(Object.keys(contract.fields).filter(name => contract.fields[name].required));
+    contract.requirements.forEach(rule => {
+        const holds = evaluate(rule.when, values, contract.fields);
+        [[rule.require, holds], [rule.optional, !holds]].forEach(([names, becomesRequired]) => {
+            names.forEach(name => {
+                if ((contract.fields[name] || {}).switchable) {
+                    if (becomesRequired) {
+                        required.add(name);
+                    } else {
+                        required.delete(name);
+                    }
+                }
+            });
+        });
+    });
+    return required;
+}
+
+/**
+ * Cross-field check messages for the current values
+ * @param {Object} contract - Rules contract
+ * @param {Object<string, string>} values - Field name → input value
+ * @returns {Object<string, string[]>}
+ */
+function checkErrors(contract, values) {
+    const errors = {};
+    contract.checks.forEach(rule => {
+        if (evaluate(rule.when, values, contract.fields)) {
+            (errors[rule.field] = errors[rule.field] || []).push(rule.message);
+        }
+    });
+    return errors;
+}
+
+if (typeof module !== "undefined" && module.exports) {
+    module.exports = {isPresent, evaluate, requiredFields, checkErrors};
+}
+
+if (typeof document !== "undefined") {
+    const rulesScript = document.currentScript;
+
+    document.addEventListener("DOMContentLoaded", function () {
+        const formId = document.body.getAttribute("data-form-id");
+        const form = document.querySelector(`#${formId}`);
+        const rulesUrl = rulesScript && rulesScript.getAttribute("data-rules-url");
+
+        if (!form || !rulesUrl) {
+            console.warn("Form rules script: missing form or rules URL");
+            return;
+        }
+
+        fetch(rulesUrl, {credentials: "same-origin"})
+            .then(response => response.json())
+            .then(contract => {
+                const readValues = () => {
+                    const values = {};
+                    Object.keys(contract.fields).forEach(name => {
+                        const element = form.elements[name];
+                        values[name] = element ? element.value : "";
+                    });
+                    return values;
+                };
+
+                const render = () => {
+                    const values = readValues();
+                    const required = requiredFields(contract, values);
+                    const errors = checkErrors(contract, values);
+
+                    Object.keys(contract.fields).forEach(name => {
+                        const element = form.elements[name];
+                        if (!element || !element.id) {
+                            return;
+                        }
+                        const label = form.querySelector(`label[for="${element.id}"]`);
+                        if (label) {
+                            label.classList.toggle("rule-required", required.has(name));
+                        }
+
+                        const row = element.closest(".row") || element.parentElement;
+                        let box = row.nextElementSibling;
+                        if (!box || !box.classList.contains("form-rule-errors")) {
+                            box = document.createElement("div");
+                            box.className = "form-rule-errors";
+                            row.after(box);
+                        }
+                        box.replaceChildren(...(errors[name] || []).map(message => {
+                            const alert = document.createElement("div");
+                            alert.className = "alert alert-warning py-1 mb-2";
+                            alert.textContent = message;
+                            return alert;
+                        }));
+                        element.classList.toggle("is-invalid", Boolean(errors[name]));
+                    });
+                };
+
+                form.addEventListener("change", render);
+                form.addEventListener("input", render);
+                render();
+            })
+            .catch(error => console.warn("Form rules script: could not load rules", error));
+    });
+}
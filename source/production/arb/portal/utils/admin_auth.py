@@ -0,0 +1,100 @@
+"""
+  Guard for the portal's administrative actions (cache clears, forced refreshes, runtime policy).
+
+  The portal has no login of its own; users are authenticated by the fronting proxy, which
+  passes the user name as `REMOTE_USER` (`request.remote_user`). Administrative actions are
+  limited to the users listed in the PORTAL_ADMIN_USERS setting (comma-separated); other
+  requests get a 403.
+
+  Attributes:
+    ADMIN_ANY_USER (str): PORTAL_ADMIN_USERS value that lets every request act as an admin.
+    logger (logging.Logger): Logger instance for this module.
+
+  Examples:
+    @main.route("/incidence_summary/refresh", methods=["POST"])
+    @admin_required
+    def refresh_incidence_summary(): ...
+
+    # In a view that also answers GETs:
+    if request.method == "POST":
+      require_admin()
+
+  Notes:
+    - Only the proxy-authenticated user counts; the client address (the fallback user of
+      `diagnostics_policy.request_user()`) is not an identity.
+    - DevelopmentConfig defaults PORTAL_ADMIN_USERS to ADMIN_ANY_USER, because a local server
+      has no proxy. Other configs default to no admins, so the actions are refused until set.
+"""
+import functools
+import logging
+from pathlib import Path
+from typing import Any, Callable
+
+from flask import abort, current_app, request
+
+logger = logging.getLogger(__name__)
+logger.debug(f'Loading File: "{Path(__file__).name}". Full Path: "{Path(__file__)}"')
+
+ADMIN_ANY_USER = "*"
+
+
+def admin_users() -> set[str]:
+  """
+  Return the users allowed to run administrative actions.
+
+  Returns:
+    set[str]: Names from the PORTAL_ADMIN_USERS setting (may contain ADMIN_ANY_USER).
+
+  Examples:
+    Input : PORTAL_ADMIN_USERS = "alice, bob"
+    Output: {"alice", "bob"}
+  """
+  configured = current_app.config.get("PORTAL_ADMIN_USERS") or ""
+  return {user.strip() for user in configured.split(",") if user.strip()}
+
+
+def is_admin() -> bool:
+  """
+  Return whether the current request may run administrative actions.
+
+  Returns:
+    bool: True if PORTAL_ADMIN_USERS lists the proxy-authenticated user (or ADMIN_ANY_USER).
+  """
+  allowed = admin_users()
+  return ADMIN_ANY_USER in allowed or (request.remote_user is not None and request.remote_user in allowed)
+
+
+def require_admin() -> None:
+  """
+  Abort the current request with 403 unless it comes from an admin user.
+
+  Raises:
+    werkzeug.exceptions.Forbidden: If `is_admin()` is False.
+  """
+  if not is_admin():
+    logger.warning(f"Refused {request.method} {request.path} for user {request.remote_user!r}: not an admin")
+    abort(403, description="This action is limited to portal administrators (PORTAL_ADMIN_USERS).")
+
+
+def admin_required(view: Callable) -> Callable:
+  """
+  Decorate a view that only admin users may call (any HTTP method).
+
+  Args:
+    view (Callable): Flask view function.
+
+  Returns:
+    Callable: Wrapped view that answers 403 for other users.
+
+  Examples:
+    @main.route("/incidence_summary/refresh", methods=["POST"])
+    @admin_required
+    def refresh_incidence_summary(): ...
+  """
+
+  @functools.wraps(view)
+  def wrapper(*args: Any, **kwargs: Any) -> Any:
+    require_admin()
+    return view(*args, **kwargs)
+
+  return wrapper
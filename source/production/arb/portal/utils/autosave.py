@@ -0,0 +1,306 @@
+"""
+  Field-level autosave of the feedback forms.
+
+  A full form save posts every field, runs the whole form through validation and `wtform_to_model`,
+  and re-renders the page. Autosave instead sends only the fields the user changed
+  (`PATCH /incidence_update/<id>/fields`), and the server:
+
+    1. locks the incidence row and checks each changed key's base revision against the audit log
+       (key-level optimistic concurrency),
+    2. loads the stored record into the form and overlays the changed fields,
+    3. validates only the changed fields and the fields whose requirements or cross-field checks
+       depend on them (see `arb.portal.utils.form_rules`),
+    4. merges the changed keys into misc_json in the database with audit rows
+       (`apply_json_patch_and_log`), and returns each key's new revision and the field errors.
+
+  The row revision is the ID of the latest `portal_updates` row for the incidence; the page is
+  rendered with it. A key's revision is the ID of the latest audit row the client's value of that
+  key is based on: the page revision until the key is autosaved, then the ID of the audit row of
+  that save. A patch is rejected only if one of *its* keys was changed after its base revision,
+  so two people editing different fields of the same record do not conflict, and a client never
+  skips someone else's change to a key by adopting the row's latest revision.
+
+  Attributes:
+    logger (logging.Logger): Logger instance for this module.
+
+  Examples:
+    from arb.portal.utils.autosave import autosave_fields
+    result = autosave_fields(model_row, OGFeedback, {"facility_name": "Site A"}, revision=41)
+    result.revision, result.errors
+
+  Notes:
+    - The check and the write run in one transaction on the locked row (`lock_incidence`), so
+      concurrent patches of the same incidence are checked one after another.
+    - Autosave saves drafts: changed values are stored even when they have validation errors,
+      exactly like the form's Save button; the errors are returned for display.
+    - Writes that bypass `apply_json_patch_and_log` leave no audit row and so do not move the
+      revision; all portal editing paths go through it.
+"""
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from flask_wtf import FlaskForm
+from sqlalchemy import func, inspect as sa_inspect, select
+from sqlalchemy.ext.automap import AutomapBase
+from sqlalchemy.orm import Session
+from werkzeug.datastructures import MultiDict
+from wtforms import SelectField
+from wtforms.validators import InputRequired
+
+from arb.portal.constants import PLEASE_SELECT
+from arb.portal.json_update_util import apply_json_patch_and_log
+from arb.portal.sqla_models import PortalUpdate
+from arb.portal.utils.form_rules import FormRules, apply_requirement_rules, evaluate, form_values
+from arb.utils.diagnostics import get_changed_fields
+from arb.utils.json import make_dict_serializeable
+from arb.utils.misc import replace_list_occurrences
+from arb.utils.sql_alchemy import load_model_json_column
+from arb.utils.wtf_forms_util import ensure_field_choice, get_wtforms_fields, model_to_wtform
+
+logger = logging.getLogger(__name__)
+logger.debug(f'Loading File: "{Path(__file__).name}". Full Path: "{Path(__file__)}"')
+
+# Fields that are never written by autosave
+_READ_ONLY_FIELDS = frozenset({"id_incidence", "csrf_token"})
+
+# Same replacements the forms' validate() applies
+_ERROR_MESSAGE_REPLACEMENTS = {"Not a valid float value.": "Not a valid numeric value."}
+
+
+class AutosaveConflict(Exception):
+  """
+  Raised when keys in a patch were changed by someone else after the client's revision.
+
+  Attributes:
+    keys (list[str]): Conflicting keys.
+    revision (int): Current revision of the incidence.
+  """
+
+  def __init__(self, keys: list[str], revision: int) -> None:
+    super().__init__(f"Fields changed since revision: {', '.join(keys)}")
+    self.keys = keys
+    self.revision = revision
+
+
+@dataclass(frozen=True)
+class AutosaveResult:
+  """
+  Outcome of an autosave.
+
+  Attributes:
+    revision (int): Revision of the incidence after the save.
+    revisions (dict[str, int]): Each patched key's new base revision (see the module docstring).
+    saved (dict): Keys written to misc_json with their stored (JSON) values.
+    validated (tuple[str, ...]): Fields that were validated (changed fields and their dependents).
+    errors (dict[str, list[str]]): Errors of the validated fields.
+  """
+  revision: int
+  revisions: dict[str, int] = field(default_factory=dict)
+  saved: dict = field(default_factory=dict)
+  validated: tuple[str, ...] = ()
+  errors: dict[str, list[str]] = field(default_factory=dict)
+
+
+def incidence_revision(session: Session, id_incidence: int) -> int:
+  """Return the incidence's revision: the ID of its latest audit row (0 if it has none)."""
+  statement = select(func.max(PortalUpdate.id)).where(PortalUpdate.id_incidence == id_incidence)
+  return session.execute(statement).scalar() or 0
+
+
+def conflicting_keys(session: Session, id_incidence: int, bases: dict[str, int]) -> list[str]:
+  """
+  Return the keys that were changed after the revision the client's value is based on.
+
+  Args:
+    session (Session): Database session.
+    id_incidence (int): Incidence ID.
+    bases (dict[str, int]): Key the client wants to write → revision its value is based on.
+
+  Returns:
+    list[str]: Sorted conflicting keys (empty if the patch can be applied).
+  """
+  statement = (select(PortalUpdate.key, func.max(PortalUpdate.id))
+               .where(PortalUpdate.id_incidence == id_incidence, PortalUpdate.id > min(bases.values()),
+                      PortalUpdate.key.in_(list(bases)))
+               .group_by(PortalUpdate.key))
+  return sorted(key for key, latest in session.execute(statement) if latest > bases[key])
+
+
+def lock_incidence(session: Session, model: AutomapBase) -> None:
+  """
+  Lock the incidence row until the transaction ends and reload it.
+
+  Args:
+    session (Session): Database session of `model`.
+    model (AutomapBase): Incidence row.
+
+  Notes:
+    - PostgreSQL: `SELECT ... FOR UPDATE`. SQLite has no row locks, so a no-op update of the row
+      takes the database write lock instead.
+  """
+  if session.get_bind().dialect.name == "sqlite":
+    mapper = sa_inspect(model).mapper
+    table = mapper.local_table
+    session.execute(table.update().where(*(column == value for column, value
+                                           in zip(mapper.primary_key, mapper.primary_key_from_instance(model))))
+                    .values({column.name: column for column in mapper.primary_key}))
+  session.refresh(model, with_for_update=True)
+
+
+def condition_fields(condition: dict) -> set[str]:
+  """Return every field referenced by a rule condition."""
+  for combinator in ("all", "any"):
+    if combinator in condition:
+      return set().union(*(condition_fields(sub) for sub in condition[combinator]))
+  if "not" in condition:
+    return condition_fields(condition["not"])
+  return {condition["field"], *([condition["other"]] if "other" in condition else []),
+          *condition.get("fields", ())}
+
+
+def dependent_fields(rules: FormRules, changed: set[str]) -> set[str]:
+  """
+  Return the fields whose validation depends on the changed fields.
+
+  Args:
+    rules (FormRules): The form's rules.
+    changed (set[str]): Changed field names.
+
+  Returns:
+    set[str]: Fields whose requirement may switch, or that receive a cross-field check message,
+      because of a change to `changed` (the changed fields themselves are not included).
+  """
+  dependents = set()
+  for rule in rules.requirements:
+    if condition_fields(rule.when) & changed:
+      dependents.update(rule.require, rule.optional)
+  for check in rules.checks:
+    if condition_fields(check.when) & changed:
+      dependents.add(check.field)
+  return dependents - changed
+
+
+def validate_fields(form: FlaskForm, names: set[str], rules: FormRules) -> dict[str, list[str]]:
+  """
+  Validate a subset of a form's fields, including the cross-field checks that involve them.
+
+  Args:
+    form (FlaskForm): Form with its data loaded.
+    names (set[str]): Fields to validate.
+    rules (FormRules): The form's rules.
+
+  Returns:
+    dict[str, list[str]]: Field name → errors, for fields in `names` that have errors.
+
+  Notes:
+    - Mirrors the feedback forms' validate(): contingent requirements first, invalid selector
+      values reset to "Please Select", field validators, required selectors, then the checks.
+  """
+  apply_requirement_rules(form, rules)
+  for name in names:
+    form_field = form[name]
+    if isinstance(form_field, SelectField):
+      ensure_field_choice(name, form_field)
+    form_field.validate(form)
+    if (isinstance(form_field, SelectField) and form_field.data in (None, PLEASE_SELECT)
+            and any(isinstance(validator, InputRequired) for validator in form_field.validators)
+            and "This field is required." not in form_field.errors):
+      form_field.errors.append("This field is required.")
+
+  values = form_values(form)
+  for check in rules.checks:
+    if check.field in names and evaluate(check.when, values):
+      form[check.field].errors.append(check.message)
+
+  errors = {}
+  for name in names:
+    field_errors = list(form[name].errors)
+    replace_list_occurrences(field_errors, _ERROR_MESSAGE_REPLACEMENTS)
+    if field_errors:
+      errors[name] = field_errors
+  return errors
+
+
+def autosave_fields(model: AutomapBase,
+                    form_class: type[FlaskForm],
+                    changes: dict,
+                    revision: int,
+                    session: Session,
+                    user: str = "anonymous",
+                    revisions: dict[str, int] | None = None) -> AutosaveResult:
+  """
+  Validate and save the changed fields of a feedback form.
+
+  Args:
+    model (AutomapBase): Incidence row.
+    form_class (type[FlaskForm]): Feedback form class of the incidence's sector.
+    changes (dict): Field name → submitted value (as the browser posts it).
+    revision (int): Revision of the page the client's values are based on.
+    session (Session): Database session of `model`.
+    user (str): User recorded in the audit rows.
+    revisions (dict[str, int] | None): Base revisions of keys the client autosaved before
+      (`AutosaveResult.revisions`); other keys are based on `revision`.
+
+  Returns:
+    AutosaveResult: The new revisions, the saved keys and the field errors.
+
+  Raises:
+    ValueError: If `changes` names a field the form does not have or that autosave does not write.
+    AutosaveConflict: If a changed key was modified after its base revision.
+
+  Examples:
+    Input : autosave_fields(row, LandfillFeedback, {"emission_identified_flag_fk": "No leak was detected"}, 17, db.session)
+    Output: AutosaveResult(revision=18, revisions={"emission_identified_flag_fk": 18}, saved={...}, ...)
+
+  Notes:
+    - The transaction is ended before returning (committed by the save, else rolled back), which
+      releases the row lock.
+  """
+  form = form_class(formdata=None)
+  field_names = set(get_wtforms_fields(form))
+  unknown = sorted((set(changes) - field_names) | (set(changes) & _READ_ONLY_FIELDS))
+  if unknown:
+    raise ValueError(f"Fields cannot be autosaved: {', '.join(unknown)}")
+
+  id_incidence = model.id_incidence
+  lock_incidence(session, model)
+  current_revision = incidence_revision(session, id_incidence)
+  conflicts = conflicting_keys(session, id_incidence, {name: (revisions or {}).get(name, revision)
+                                                       for name in changes})
+  if conflicts:
+    session.rollback()
+    raise AutosaveConflict(conflicts, current_revision)
+
+  model_to_wtform(model, form)
+  submitted = MultiDict({name: "" if value is None else str(value) for name, value in changes.items()})
+  for name in changes:
+    form[name].process(submitted)
+  if hasattr(form, "update_contingent_selectors"):
+    form.update_contingent_selectors()
+
+  rules = getattr(form_class, "form_rules", FormRules())
+  changed = set(changes)
+  validated = changed | (dependent_fields(rules, changed) & field_names)
+  errors = validate_fields(form, validated, rules)
+
+  payload = make_dict_serializeable({name: form[name].data for name in changes}, convert_time_to_ca=True)
+  existing = load_model_json_column(model, "misc_json") or {}
+  existing = make_dict_serializeable({name: existing.get(name) for name in changes}, convert_time_to_ca=True)
+  payload_changes = get_changed_fields(payload, existing)
+  # Unchanged keys are current as of the locked read; saved keys as of this save's audit rows
+  key_revisions = dict.fromkeys(changes, current_revision)
+  audit_rows = []
+  if payload_changes:
+    audit_rows = apply_json_patch_and_log(model, payload_changes, "misc_json", user=user, comments="autosave")
+  if audit_rows:
+    saved_revision = max(sa_inspect(row).identity[0] for row in audit_rows)
+    key_revisions.update(dict.fromkeys(payload_changes, saved_revision))
+  else:
+    session.rollback()
+
+  return AutosaveResult(revision=max(key_revisions.values(), default=current_revision),
+                        revisions=key_revisions,
+                        saved=payload_changes,
+                        validated=tuple(sorted(validated)),
+                        errors=errors)
@@ -0,0 +1,509 @@
+"""
+  Headless bulk revalidation of the stored incidences.
+
+  When drop-down lists (`db_hardcoded.get_excel_dropdown_data`) or form validators change, stored
+  incidences may no longer pass the feedback forms. This module runs the same `OGFeedback` /
+  `LandfillFeedback` validation that the update page runs on GET (`model_to_wtform` then
+  `validate_form(skip_csrf=True)`) against every stored `misc_json`, without a request context or a
+  browser, and materializes the outcome in a per-incidence table:
+
+    incidence_validation(id_incidence, sector, valid, error_count, errors, document_hash,
+                         rules_version, validated_at)
+
+  The homepage reads that table to show a validity badge per incidence (`validation_badges`), so
+  nothing is validated at render time. A badge is shown as "not checked" when the incidence changed
+  (`document_hash`) or the rules changed (`rules_version`) since it was validated.
+
+  The table is read in `id_incidence` order in chunks; chunks are validated by a process pool
+  (validation is CPU-bound Python, ~2-3 ms per incidence) and each chunk's results are written in
+  one transaction, so a run can be interrupted and resumed with `--only-stale`.
+
+  Attributes:
+    VALIDATION_TABLE (str): Name of the per-incidence validation table.
+    VALIDATION_CHUNK_SIZE (int): Default number of incidences per chunk.
+    FORM_ERRORS_KEY (str): Key in `errors` for form-level errors and unreadable documents.
+    logger (logging.Logger): Logger instance for this module.
+
+  Examples:
+    from arb.portal.utils.bulk_validation import revalidate_incidences, error_summary
+    report = revalidate_incidences(db.engine, workers=4)
+    error_summary(db.session)  # [{"sector": "Landfill", "field": "emission_cause", "message": ..., "incidences": 37}, ...]
+
+    # Command line (from the production directory):
+    python -m arb.portal.utils.bulk_validation --workers 8 --only-stale
+
+  Notes:
+    - The sector comes from misc_json["sector"]; sectors without a feedback form are skipped (the
+      update page shows them read-only).
+    - Workers are spawned, not forked: they never touch the database, and a spawned worker does not
+      inherit the parent's connections or threads. The parent's drop-downs are passed to them.
+    - `rules_version` hashes the drop-downs, the forms' rules contracts and the source of the form
+      modules. Changes to shared validators in other modules need a full run (without `--only-stale`).
+"""
+import argparse
+import datetime
+import hashlib
+import inspect
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Iterable, Iterator
+
+from flask import Flask
+from sqlalchemy import JSON, Boolean, Column, DateTime, Index, Integer, MetaData, Table, Text, \
+  inspect as sa_inspect, select
+from sqlalchemy.engine import Engine
+
+from arb.portal.globals import Globals, compile_drop_downs
+from arb.portal.utils.cli_util import add_database_uri_argument, cli_engine
+from arb.portal.utils.feedback_forms import FEEDBACK_FORMS
+from arb.portal.utils.form_rules import rules_contract
+from arb.portal.utils.form_validation import validate_form
+from arb.utils.wtf_forms_util import model_to_wtform
+
+logger = logging.getLogger(__name__)
+logger.debug(f'Loading File: "{Path(__file__).name}". Full Path: "{Path(__file__)}"')
+
+VALIDATION_TABLE = "incidence_validation"
+VALIDATION_CHUNK_SIZE = 250
+FORM_ERRORS_KEY = "_form"
+
+_metadata = MetaData()
+validation_table = Table(VALIDATION_TABLE, _metadata,
+                         Column("id_incidence", Integer, primary_key=True),
+                         Column("sector", Text, nullable=False),
+                         Column("valid", Boolean, nullable=False),
+                         Column("error_count", Integer, nullable=False),
+                         Column("errors", JSON, nullable=False),
+                         Column("document_hash", Text, nullable=False),
+                         Column("rules_version", Text, nullable=False),
+                         Column("validated_at", DateTime(timezone=True), nullable=False),
+                         Index(f"ix_{VALIDATION_TABLE}_valid", "valid"))
+incidences_table = Table("incidences", _metadata,
+                         Column("id_incidence", Integer, primary_key=True),
+                         Column("misc_json", Text))
+
+_headless_app: Flask | None = None
+_rules_version_memo: dict = {}
+_ready_engines: set[str] = set()
+
+
+@dataclass(frozen=True)
+class RevalidationReport:
+  """
+  Outcome of a bulk revalidation run.
+
+  Attributes:
+    checked (int): Incidences read from the table.
+    validated (int): Incidences validated (and written to the validation table).
+    invalid (int): Validated incidences with at least one error.
+    unsupported (int): Incidences whose sector has no feedback form (never validated or stored).
+    skipped (int): Incidences skipped because their stored result was current (`only_stale`).
+    rules_version (str): Rules version the results were computed with.
+    seconds (float): Wall-clock duration of the run.
+  """
+  checked: int = 0
+  validated: int = 0
+  invalid: int = 0
+  unsupported: int = 0
+  skipped: int = 0
+  rules_version: str = ""
+  seconds: float = 0.0
+
+
+def _as_document(misc_json: Any) -> dict:
+  """Return misc_json as a dict (JSON strings are parsed; anything unreadable is an empty dict)."""
+  if isinstance(misc_json, str):
+    try:
+      misc_json = json.loads(misc_json)
+    except ValueError:
+      misc_json = None
+  return misc_json if isinstance(misc_json, dict) else {}
+
+
+def document_hash(misc_json: Any) -> str:
+  """
+  Return a stable hash of an incidence's misc_json.
+
+  Args:
+    misc_json (Any): The incidence's misc_json (dict, JSON string, or None).
+
+  Returns:
+    str: Hex digest that changes whenever any key or value changes (key order is ignored).
+
+  Examples:
+    Input : {"b": 1, "a": "x"}
+    Output: same value as for {"a": "x", "b": 1}
+  """
+  canonical = json.dumps(_as_document(misc_json), sort_keys=True, separators=(",", ":"), default=str)
+  return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+
+def rules_version() -> str:
+  """
+  Return a hash of everything that decides whether a stored incidence is valid.
+
+  Returns:
+    str: Hex digest of the drop-downs, the feedback forms' rules contracts and their module source.
+
+  Notes:
+    - Memoized per drop-down object, so it is computed once after `Globals.load_drop_downs()`.
+  """
+  key = (Globals.drop_downs, Globals.drop_downs_contingent)
+  memo_key = _rules_version_memo.get("key", ())
+  if len(memo_key) != 2 or memo_key[0] is not key[0] or memo_key[1] is not key[1]:
+    forms = {}
+    for sector, form_class in sorted(FEEDBACK_FORMS.items()):
+      source = inspect.getsource(sys.modules[form_class.__module__])
+      forms[sector] = [rules_contract(form_class)["version"], hashlib.sha256(source.encode("utf-8")).hexdigest()]
+    payload = json.dumps({"drop_downs": Globals.drop_downs,
+                          "drop_downs_contingent": Globals.drop_downs_contingent,
+                          "forms": forms}, sort_keys=True, default=str)
+    _rules_version_memo.update(key=key, version=hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16])
+  return _rules_version_memo["version"]
+
+
+def ensure_validation_table(engine: Engine) -> bool:
+  """
+  Create the validation table if missing (idempotent).
+
+  Args:
+    engine (Engine): Engine connected to the portal database.
+
+  Returns:
+    bool: True if the table was created by this call.
+  """
+  if sa_inspect(engine).has_table(VALIDATION_TABLE):
+    return False
+  _metadata.create_all(engine, tables=[validation_table])
+  logger.info(f"Created the {VALIDATION_TABLE} table")
+  return True
+
+
+def _ensure_drop_downs() -> None:
+  """Load the drop-downs if this process has not loaded them (command line, workers)."""
+  if not Globals.drop_downs:
+    from arb.portal.db_hardcoded import get_excel_dropdown_data
+    Globals.drop_downs, Globals.drop_downs_contingent = compile_drop_downs(*get_excel_dropdown_data())
+
+
+def _app() -> Flask:
+  """Return the minimal app whose context the forms need (FlaskForm reads its config)."""
+  global _headless_app
+  if _headless_app is None:
+    _headless_app = Flask(__name__)
+    _headless_app.config["WTF_CSRF_ENABLED"] = False
+  return _headless_app
+
+
+def validate_document(id_incidence: int, misc_json: Any) -> dict | None:
+  """
+  Validate one stored incidence with its sector's feedback form.
+
+  Args:
+    id_incidence (int): Incidence ID.
+    misc_json (Any): The incidence's misc_json (dict or JSON string).
+
+  Returns:
+    dict | None: {"id_incidence", "sector", "valid", "error_count", "errors"}, where `errors` maps
+      field names to messages; None if the sector has no feedback form.
+
+  Examples:
+    Input : 7, {"sector": "Landfill", "facility_name": "Site A", ...}
+    Output: {"id_incidence": 7, "sector": "Landfill", "valid": False, "error_count": 2,
+             "errors": {"emission_cause": ["This field is required."], ...}}
+
+  Notes:
+    - Requires an app context (see `validate_chunk`); never a request context.
+  """
+  document = _as_document(misc_json)
+  sector = document.get("sector")
+  form_class = FEEDBACK_FORMS.get(sector)
+  if form_class is None:
+    return None
+
+  form = form_class(formdata=None, meta={"csrf": False})
+  try:
+    model_to_wtform(SimpleNamespace(id_incidence=id_incidence, misc_json=document), form)
+  except (TypeError, ValueError) as e:
+    return {"id_incidence": id_incidence, "sector": sector, "valid": False, "error_count": 1,
+            "errors": {FORM_ERRORS_KEY: [f"Stored data could not be loaded: {e}"]}}
+
+  result = validate_form(form, skip_csrf=True)
+  errors = {name or FORM_ERRORS_KEY: messages for name, messages in result.field_errors.items() if messages}
+  return {"id_incidence": id_incidence, "sector": sector, "valid": result.valid,
+          "error_count": result.total_errors, "errors": errors}
+
+
+def validate_chunk(rows: list[tuple[int, Any]]) -> list[dict | None]:
+  """
+  Validate a chunk of incidences (the unit of work of the process pool).
+
+  Args:
+    rows (list[tuple[int, Any]]): (id_incidence, misc_json) pairs.
+
+  Returns:
+    list[dict | None]: `validate_document()` results, in `rows` order.
+  """
+  _ensure_drop_downs()
+  with _app().app_context():
+    return [validate_document(id_incidence, misc_json) for id_incidence, misc_json in rows]
+
+
+def _init_worker(drop_downs: dict, drop_downs_contingent: dict) -> None:
+  """Give a pool worker the parent's drop-downs."""
+  Globals.drop_downs, Globals.drop_downs_contingent = drop_downs, drop_downs_contingent
+
+
+def _read_chunks(engine: Engine, chunk_size: int) -> Iterator[list[tuple[int, Any]]]:
+  """Yield the incidences in `id_incidence` order, `chunk_size` at a time (keyset pagination)."""
+  last_id = None
+  while True:
+    statement = select(incidences_table.c.id_incidence, incidences_table.c.misc_json)
+    if last_id is not None:
+      statement = statement.where(incidences_table.c.id_incidence > last_id)
+    with engine.connect() as connection:
+      rows = [tuple(row) for row in connection.execute(statement.order_by(incidences_table.c.id_incidence)
+                                                        .limit(chunk_size))]
+    if not rows:
+      return
+    yield rows
+    last_id = rows[-1][0]
+
+
+def _current_ids(engine: Engine, ids: list[int], version: str) -> dict[int, str]:
+  """Return id → document_hash for stored results computed with `version`."""
+  with engine.connect() as connection:
+    rows = connection.execute(select(validation_table.c.id_incidence, validation_table.c.document_hash)
+                              .where(validation_table.c.id_incidence.in_(ids),
+                                     validation_table.c.rules_version == version))
+    return dict(rows.all())
+
+
+def _store_results(engine: Engine,
+                   ids: list[int],
+                   results: list[dict | None],
+                   hashes: dict[int, str],
+                   version: str) -> None:
+  """Replace the stored results of one chunk in a single transaction."""
+  now = datetime.datetime.now(datetime.UTC)
+  records = [{**result, "document_hash": hashes[result["id_incidence"]], "rules_version": version,
+              "validated_at": now} for result in results if result is not None]
+  with engine.begin() as connection:
+    connection.execute(validation_table.delete().where(validation_table.c.id_incidence.in_(ids)))
+    if records:
+      connection.execute(validation_table.insert(), records)
+
+
+def revalidate_incidences(engine: Engine,
+                          workers: int | None = None,
+                          chunk_size: int = VALIDATION_CHUNK_SIZE,
+                          only_stale: bool = False) -> RevalidationReport:
+  """
+  Validate every stored incidence and write the results to the validation table.
+
+  Args:
+    engine (Engine): Engine connected to the portal database.
+    workers (int | None): Worker processes (default: CPU count). 0 or 1 validates in this process.
+    chunk_size (int): Incidences per chunk (one pool task and one write transaction each).
+    only_stale (bool): Skip incidences whose stored result has the current document hash and rules version.
+
+  Returns:
+    RevalidationReport: Counts and duration of the run.
+
+  Examples:
+    Input : db.engine, workers=4
+    Output: RevalidationReport(checked=1200, validated=1187, invalid=93, unsupported=13, skipped=0, ...)
+
+  Notes:
+    - At most two chunks per worker are in flight, so memory stays bounded on large tables.
+    - Results of incidences that no longer exist are removed at the end of a full run.
+  """
+  started = time.perf_counter()
+  ensure_validation_table(engine)
+  _ensure_drop_downs()
+  version = rules_version()
+  workers = (os.cpu_count() or 1) if workers is None else workers
+  counts = dict.fromkeys(("checked", "validated", "invalid", "unsupported", "skipped"), 0)
+  all_ids: list[int] = []
+
+  def _collect(ids: list[int], hashes: dict[int, str], results: list[dict | None]) -> None:
+    _store_results(engine, ids, results, hashes, version)
+    for result in results:
+      if result is None:
+        counts["unsupported"] += 1
+      else:
+        counts["validated"] += 1
+        counts["invalid"] += not result["valid"]
+
+  def _work() -> Iterable[tuple[list[int], dict[int, str], list[tuple[int, Any]]]]:
+    for rows in _read_chunks(engine, chunk_size):
+      counts["checked"] += len(rows)
+      rows = [(id_incidence, _as_document(misc_json)) for id_incidence, misc_json in rows]
+      hashes = {id_incidence: document_hash(document) for id_incidence, document in rows}
+      all_ids.extend(hashes)
+      supported = [row for row in rows if row[1].get("sector") in FEEDBACK_FORMS]
+      counts["unsupported"] += len(rows) - len(supported)
+      if only_stale:
+        current = _current_ids(engine, list(hashes), version)
+        rows = [row for row in supported if current.get(row[0]) != hashes[row[0]]]
+        counts["skipped"] += len(supported) - len(rows)
+      else:
+        rows = supported
+      if rows:
+        yield [row[0] for row in rows], hashes, rows
+
+  if workers <= 1:
+    for ids, hashes, rows in _work():
+      _collect(ids, hashes, validate_chunk(rows))
+  else:
+    in_flight: deque[tuple[list[int], dict[int, str], Future]] = deque()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker,
+                             initargs=(Globals.drop_downs, Globals.drop_downs_contingent)) as pool:
+      for ids, hashes, rows in _work():
+        in_flight.append((ids, hashes, pool.submit(validate_chunk, rows)))
+        if len(in_flight) >= 2 * workers:
+          ids, hashes, future = in_flight.popleft()
+          _collect(ids, hashes, future.result())
+      while in_flight:
+        ids, hashes, future = in_flight.popleft()
+        _collect(ids, hashes, future.result())
+
+  if not only_stale:
+    with engine.begin() as connection:
+      stored = connection.execute(select(validation_table.c.id_incidence)).scalars().all()
+      removed = sorted(set(stored) - set(all_ids))
+      for start in range(0, len(removed), chunk_size):
+        connection.execute(validation_table.delete()
+                           .where(validation_table.c.id_incidence.in_(removed[start:start + chunk_size])))
+
+  report = RevalidationReport(**counts, rules_version=version, seconds=time.perf_counter() - started)
+  logger.info(f"Revalidated incidences: {report}")
+  return report
+
+
+def error_summary(executor: Any, sector: str | None = None) -> list[dict]:
+  """
+  Count the invalid incidences per sector, field and message.
+
+  Args:
+    executor (Any): Session or Connection.
+    sector (str | None): Restrict to one sector.
+
+  Returns:
+    list[dict]: [{"sector", "field", "message", "incidences"}], most frequent first.
+
+  Examples:
+    Input : session, "Landfill"
+    Output: [{"sector": "Landfill", "field": "emission_cause", "message": "This field is required.", "incidences": 37}]
+  """
+  statement = select(validation_table.c.sector, validation_table.c.errors).where(validation_table.c.valid.is_(False))
+  if sector is not None:
+    statement = statement.where(validation_table.c.sector == sector)
+  counts: dict[tuple[str, str, str], int] = {}
+  for row_sector, errors in executor.execute(statement):
+    for field_name, messages in _as_document(errors).items():
+      for message in dict.fromkeys(messages):
+        key = (row_sector, field_name, message)
+        counts[key] = counts.get(key, 0) + 1
+  return [{"sector": key[0], "field": key[1], "message": key[2], "incidences": count}
+          for key, count in sorted(counts.items(), key=lambda item: (-item[1], item[0]))]
+
+
+def validation_badges(executor: Any, model_rows: Iterable[Any]) -> dict[int, dict]:
+  """
+  Return the stored validity of incidences for display (no validation happens here).
+
+  Args:
+    executor (Any): Session or Connection.
+    model_rows (Iterable[Any]): Incidence rows with `id_incidence` and `misc_json`.
+
+  Returns:
+    dict[int, dict]: id_incidence → {"status": "valid" | "invalid" | "stale", "error_count": int,
+      "validated_at": datetime}; incidences never validated are absent, and the result is empty
+      until the validation table exists.
+
+  Examples:
+    Input : db.session, [row_7, row_8]
+    Output: {7: {"status": "invalid", "error_count": 2, "validated_at": ...}, 8: {"status": "stale", ...}}
+  """
+  rows = {row.id_incidence: row for row in model_rows}
+  if not rows or not _table_ready(executor):
+    return {}
+  version = rules_version()
+  statement = (select(validation_table.c.id_incidence, validation_table.c.valid, validation_table.c.error_count,
+                      validation_table.c.document_hash, validation_table.c.rules_version,
+                      validation_table.c.validated_at)
+               .where(validation_table.c.id_incidence.in_(list(rows))))
+  badges = {}
+  for stored in executor.execute(statement):
+    current = stored.rules_version == version and stored.document_hash == document_hash(
+      rows[stored.id_incidence].misc_json)
+    status = ("valid" if stored.valid else "invalid") if current else "stale"
+    badges[stored.id_incidence] = {"status": status, "error_count": stored.error_count,
+                                   "validated_at": stored.validated_at}
+  return badges
+
+
+def _table_ready(executor: Any) -> bool:
+  """Return True once the validation table exists (remembered per database)."""
+  bind = getattr(executor, "engine", None) or executor.get_bind()
+  url = str(bind.url)
+  if url not in _ready_engines and sa_inspect(bind).has_table(VALIDATION_TABLE):
+    _ready_engines.add(url)
+  return url in _ready_engines
+
+
+def main(argv: list[str] | None = None) -> int:
+  """
+  Command-line entry point that revalidates the incidences and prints the error summary.
+
+  Args:
+    argv (list[str] | None): Arguments to parse; defaults to `sys.argv[1:]`.
+
+  Returns:
+    int: Process exit code (0 on success).
+
+  Examples:
+    python -m arb.portal.utils.bulk_validation --workers 8
+    python -m arb.portal.utils.bulk_validation --only-stale --database-uri sqlite:///portal.sqlite
+    python -m arb.portal.utils.bulk_validation --summary-only --sector Landfill
+  """
+  parser = argparse.ArgumentParser(description="Revalidate stored incidences against the feedback forms.")
+  add_database_uri_argument(parser)
+  parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+  parser.add_argument("--chunk-size", type=int, default=VALIDATION_CHUNK_SIZE, help="Incidences per chunk.")
+  parser.add_argument("--only-stale", action="store_true",
+                      help="Only revalidate incidences changed since their last validation or after a rules change.")
+  parser.add_argument("--summary-only", action="store_true", help="Print the stored error summary without validating.")
+  parser.add_argument("--sector", default=None, help="Restrict the printed error summary to one sector.")
+  args = parser.parse_args(argv)
+
+  engine = cli_engine(args.database_uri)
+  try:
+    if not args.summary_only:
+      report = revalidate_incidences(engine, workers=args.workers, chunk_size=args.chunk_size,
+                                     only_stale=args.only_stale)
+      print(f"checked={report.checked} validated={report.validated} invalid={report.invalid} "
+            f"unsupported={report.unsupported} skipped={report.skipped} "
+            f"rules_version={report.rules_version} seconds={report.seconds:.1f}")
+    ensure_validation_table(engine)
+    with engine.connect() as connection:
+      for row in error_summary(connection, args.sector):
+        print(f"{row['incidences']}\t{row['sector']}\t{row['field']}\t{row['message']}")
+  finally:
+    engine.dispose()
+  return 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
@@ -0,0 +1,317 @@
+"""
+  Change-data-capture feed of incidence changes, read from the portal_updates audit trail.
+
+  Downstream consumers keep an opaque cursor and ask for everything that changed since it,
+  instead of polling whole tables. Each page lists the changed incidences, each incidence's
+  changes grouped per commit (one save: same timestamp, user, and comment), and optionally the
+  fully merged current `misc_json`. The returned cursor is passed back to read the next page.
+
+  The cursor wraps the commit-order position of the last row delivered, so a page is a range scan
+  of the `ix_portal_updates_commit_xid_id` index in commit order (of the primary key on SQLite).
+  A consumer can also start from a commit timestamp (`since`), which is resolved through the
+  `ix_portal_updates_timestamp` index.
+
+  Attributes:
+    CHANGE_FEED_PAGE_SIZE (int): Default number of portal update rows per page.
+    CHANGE_FEED_MAX_PAGE_SIZE (int): Largest page a caller may request.
+    logger (logging.Logger): Logger instance for this module.
+
+  Examples:
+    from arb.portal.utils.change_feed import read_change_feed
+    page = read_change_feed(db.session, cursor=saved_cursor)
+    saved_cursor = page["cursor"]
+
+    # Command line (from the production directory):
+    python -m arb.portal.utils.change_feed --since 2025-01-15 --all --include-misc-json
+
+  Notes:
+    - IDs are assigned at insert time but become visible at commit, so paging on the ID alone
+      skips a lower ID committed after a higher one was read. The feed pages in commit order
+      instead:
+        - SQLite has a single writer, which holds the database lock from its first insert to
+          its commit, so IDs become visible in ID order and the position is the ID.
+        - PostgreSQL pages on (`commit_xid`, ID), where `commit_xid` is the 64-bit ID of the
+          inserting transaction stored by the column default, and delivers only rows whose
+          transaction ID is below the `pg_snapshot_xmin()` of the read, i.e., rows of finished
+          transactions. Any transaction still in flight, or starting later, has a transaction ID
+          at or above that bound, so it is delivered after the cursor. Needs PostgreSQL 13+.
+    - `commit_xid` and its default are added to existing databases at startup
+      (`ensure_portal_update_indexes()`); PostgreSQL rows without it are not delivered.
+    - A page never ends in the middle of a commit unless that one commit is larger than the page.
+    - Values are the audit strings (`str(value)`, with "None" decoded to None); use
+      `include_misc_json` for the typed current document.
+"""
+import argparse
+import base64
+import binascii
+import datetime
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import BigInteger, MetaData, Table, literal, select, text, tuple_
+from sqlalchemy.orm import Session
+
+from arb.portal.sqla_models import PortalUpdate
+from arb.portal.utils.cli_util import add_database_uri_argument, cli_engine
+from arb.portal.utils.incidence_history import decode_audit_value, parse_history_point
+
+logger = logging.getLogger(__name__)
+logger.debug(f'Loading File: "{Path(__file__).name}". Full Path: "{Path(__file__)}"')
+
+CHANGE_FEED_PAGE_SIZE = 500
+CHANGE_FEED_MAX_PAGE_SIZE = 5000
+
+_CURSOR_PREFIX = "pu:"
+
+
+def encode_cursor(update_id: int, xid: int = 0) -> str:
+  """
+  Encode a commit-order position as an opaque feed cursor.
+
+  Args:
+    update_id (int): Last `PortalUpdate.id` delivered.
+    xid (int): Transaction ID that inserted that row (PostgreSQL; 0 elsewhere).
+
+  Returns:
+    str: URL-safe cursor string.
+
+  Examples:
+    Input : 1234
+    Output: "cHU6MTIzNA"
+    Input : 1234, xid=987
+    Output: "cHU6OTg3LjEyMzQ"
+  """
+  position = f"{xid}.{update_id}" if xid else f"{update_id}"
+  return base64.urlsafe_b64encode(f"{_CURSOR_PREFIX}{position}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str | None) -> tuple[int, int]:
+  """
+  Decode a feed cursor back to the commit-order position of the last delivered row.
+
+  Args:
+    cursor (str | None): Cursor from a previous page; None or empty starts at the beginning.
+
+  Returns:
+    tuple[int, int]: (transaction ID, `PortalUpdate.id`) of the last delivered row; (0, 0) for
+      the beginning.
+
+  Raises:
+    ValueError: If the cursor was not produced by `encode_cursor()`.
+
+  Examples:
+    Input : "cHU6MTIzNA"
+    Output: (0, 1234)
+    Input : "cHU6OTg3LjEyMzQ"
+    Output: (987, 1234)
+  """
+  if not cursor:
+    return 0, 0
+  try:
+    decoded = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+  except (binascii.Error, UnicodeDecodeError) as e:
+    raise ValueError(f"Invalid change feed cursor: {cursor!r}") from e
+  xid, _, update_id = decoded[len(_CURSOR_PREFIX):].rpartition(".")
+  if not decoded.startswith(_CURSOR_PREFIX) or not update_id.isdigit() or (xid and not xid.isdigit()):
+    raise ValueError(f"Invalid change feed cursor: {cursor!r}")
+  return int(xid or 0), int(update_id)
+
+
+def _settled_below(session: Session) -> int | None:
+  """
+  Return the transaction ID below which every transaction has finished.
+
+  Args:
+    session (Session): Active SQLAlchemy session.
+
+  Returns:
+    int | None: On PostgreSQL, the `pg_snapshot_xmin()` of the session's snapshot; None on
+      single-writer backends, where the ID alone is in commit order.
+  """
+  if session.get_bind().dialect.name != "postgresql":
+    return None
+  return session.execute(text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")).scalar()
+
+
+def _as_utc(value: datetime.datetime) -> datetime.datetime:
+  """Return a UTC-aware datetime (SQLite returns the stored UTC timestamps naive)."""
+  return value.replace(tzinfo=datetime.UTC) if value.tzinfo is None else value.astimezone(datetime.UTC)
+
+
+def _commit_key(row: Any) -> tuple:
+  """Return the key identifying the save (commit) a portal update row belongs to."""
+  return row.id_incidence, row.timestamp, row.user, row.comments
+
+
+def read_change_feed(session: Session,
+                     cursor: str | None = None,
+                     since: datetime.datetime | None = None,
+                     limit: int = CHANGE_FEED_PAGE_SIZE,
+                     incidences: Table | None = None,
+                     json_field: str = "misc_json",
+                     primary_key: str = "id_incidence") -> dict:
+  """
+  Return one page of incidence changes after a cursor (or since a commit timestamp).
+
+  Args:
+    session (Session): Active SQLAlchemy session.
+    cursor (str | None): Cursor from the previous page; None starts at the beginning (or `since`).
+    since (datetime.datetime | None): Start at the first change committed at or after this time
+      (ignored when `cursor` is given).
+    limit (int): Maximum portal update rows in the page (clamped to 1..CHANGE_FEED_MAX_PAGE_SIZE).
+    incidences (Table | None): Incidence table; when given, each incidence includes its current
+      `misc_json`.
+    json_field (str): JSON column of `incidences`.
+    primary_key (str): Primary key column of `incidences`.
+
+  Returns:
+    dict: {"cursor": str, "has_more": bool, "count": int, "incidences": [
+             {"id_incidence": int, "misc_json": dict | None (only with `incidences`),
+              "commits": [{"timestamp": str, "user": str, "comments": str,
+                           "first_update_id": int, "last_update_id": int,
+                           "changes": {key: {"old": Any, "new": Any}}}]}]}
+
+  Raises:
+    ValueError: If `cursor` is invalid.
+
+  Examples:
+    page = read_change_feed(db.session, cursor="cHU6MTIzNA", limit=100)
+    # page["cursor"] → next cursor; page["has_more"] → call again immediately
+
+  Notes:
+    - When nothing new is available the returned cursor equals the one passed in.
+    - Rows of transactions that have not finished are held back (see the module Notes).
+    - Incidences are ordered by their first change in the page; commits in commit order. A key
+      changed twice in one commit reports its first old and last new value.
+  """
+  after_xid, after_id = decode_cursor(cursor)
+  settled_below = _settled_below(session)
+  if settled_below is not None:
+    position = PortalUpdate.commit_xid
+    settled = [PortalUpdate.commit_xid < settled_below]
+    order = (PortalUpdate.commit_xid, PortalUpdate.id)
+  else:
+    position, settled, order = literal(0, BigInteger), [], (PortalUpdate.id,)
+  if not cursor and since is not None:
+    first = session.execute(select(position, PortalUpdate.id).where(PortalUpdate.timestamp >= since, *settled)
+                            .order_by(*order).limit(1)).first()
+    last = session.execute(select(position, PortalUpdate.id).where(*settled)
+                           .order_by(*(column.desc() for column in order)).limit(1)).first()
+    after_xid, after_id = (first[0], first[1] - 1) if first is not None else tuple(last or (0, 0))
+
+  limit = max(1, min(int(limit), CHANGE_FEED_MAX_PAGE_SIZE))
+  if settled_below is not None:
+    after = tuple_(*order) > tuple_(literal(after_xid, BigInteger), literal(after_id))
+  else:
+    after = PortalUpdate.id > after_id
+
+  rows = session.execute(
+    select(PortalUpdate.id, PortalUpdate.timestamp, PortalUpdate.key, PortalUpdate.old_value,
+           PortalUpdate.new_value, PortalUpdate.user, PortalUpdate.comments, PortalUpdate.id_incidence,
+           position.label("xid"))
+    .where(after, *settled)
+    .order_by(*order)
+    .limit(limit + 1)
+  ).all()
+
+  has_more = len(rows) > limit
+  page = rows[:limit]
+
+  if has_more and _commit_key(page[-1]) == _commit_key(rows[limit]):
+    # Do not split a commit across pages, unless the page holds nothing else
+    trimmed = page
+    while trimmed and _commit_key(trimmed[-1]) == _commit_key(rows[limit]):
+      trimmed = trimmed[:-1]
+    page = trimmed or page
+
+  grouped: dict[Any, dict] = {}
+  for row in page:
+    entry = grouped.setdefault(row.id_incidence, {"id_incidence": row.id_incidence, "commits": []})
+    commits = entry["commits"]
+    if not commits or commits[-1]["_key"] != _commit_key(row):
+      commits.append({"_key": _commit_key(row), "timestamp": _as_utc(row.timestamp).isoformat(),
+                      "user": row.user, "comments": row.comments, "first_update_id": row.id,
+                      "last_update_id": row.id, "changes": {}})
+    commit = commits[-1]
+    commit["last_update_id"] = row.id
+    change = commit["changes"].setdefault(row.key, {"old": decode_audit_value(row.old_value)})
+    change["new"] = decode_audit_value(row.new_value)
+
+  for entry in grouped.values():
+    for commit in entry["commits"]:
+      del commit["_key"]
+
+  if incidences is not None and grouped:
+    ids = [id_ for id_ in grouped if id_ is not None]
+    documents = dict(session.execute(
+      select(incidences.c[primary_key], incidences.c[json_field]).where(incidences.c[primary_key].in_(ids))
+    ).all())
+    for id_, entry in grouped.items():
+      entry["misc_json"] = documents.get(id_)
+
+  next_cursor = encode_cursor(page[-1].id, page[-1].xid) if page else encode_cursor(after_id, after_xid)
+  logger.debug(f"read_change_feed: {len(page)} rows after {after_id}, {len(grouped)} incidences, more={has_more}")
+  return {"cursor": next_cursor, "has_more": has_more, "count": len(page), "incidences": list(grouped.values())}
+
+
+def main(argv: list[str] | None = None) -> int:
+  """
+  Command-line entry point that prints change feed pages as JSON.
+
+  Args:
+    argv (list[str] | None): Arguments to parse; defaults to `sys.argv[1:]`.
+
+  Returns:
+    int: Process exit code (0 on success, 2 for an invalid cursor or timestamp).
+
+  Examples:
+    python -m arb.portal.utils.change_feed --cursor cHU6MTIzNA --limit 100
+    python -m arb.portal.utils.change_feed --since 2025-01-15T00:00 --all > changes.jsonl
+  """
+  parser = argparse.ArgumentParser(description="Print incidence changes since a cursor or timestamp.")
+  add_database_uri_argument(parser)
+  parser.add_argument("--cursor", default=None, help="Cursor returned by a previous page.")
+  parser.add_argument("--since", default=None,
+                      help="Start at this commit time (ISO-8601; naive values are California local).")
+  parser.add_argument("--limit", type=int, default=CHANGE_FEED_PAGE_SIZE, help="Portal update rows per page.")
+  parser.add_argument("--include-misc-json", action="store_true", help="Include each incidence's current misc_json.")
+  parser.add_argument("--all", action="store_true",
+                      help="Read pages until caught up, printing one JSON page per line.")
+  args = parser.parse_args(argv)
+
+  try:
+    since = parse_history_point(args.since) if args.since else None
+    decode_cursor(args.cursor)
+  except ValueError as e:
+    print(e, file=sys.stderr)
+    return 2
+  if since is not None and not isinstance(since, datetime.datetime):
+    print(f"--since must be a date/time, not {args.since!r}", file=sys.stderr)
+    return 2
+
+  engine = cli_engine(args.database_uri)
+  try:
+    incidences = Table("incidences", MetaData(), autoload_with=engine) if args.include_misc_json else None
+    with Session(engine) as session:
+      cursor = args.cursor
+      while True:
+        page = read_change_feed(session, cursor=cursor, since=since, limit=args.limit, incidences=incidences)
+        if not args.all:
+          print(json.dumps(page, indent=2, default=str))
+          break
+        if page["count"]:
+          print(json.dumps(page, default=str))
+        cursor = page["cursor"]
+        if not page["has_more"]:
+          print(f"cursor: {cursor}", file=sys.stderr)
+          break
+  finally:
+    engine.dispose()
+  return 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
@@ -0,0 +1,69 @@
+"""
+  Shared helpers for the portal's maintenance command-line tools.
+
+  The `python -m arb.portal.utils.<module>` entry points (promoted_columns, portal_update_archive,
+  incidence_history, change_feed, incidence_summary, bulk_validation) run outside the Flask app,
+  so they build their own SQLAlchemy engine. `cli_engine()` builds it the way the app does: with
+  the portal SQLALCHEMY_DATABASE_URI and SQLALCHEMY_ENGINE_OPTIONS (e.g., the PostgreSQL
+  `search_path` and `timezone` connect options), so the tools see the same schema as the portal.
+
+  Attributes:
+    logger (logging.Logger): Logger instance for this module.
+
+  Examples:
+    parser = argparse.ArgumentParser(description="...")
+    add_database_uri_argument(parser)
+    args = parser.parse_args(argv)
+    engine = cli_engine(args.database_uri)
+
+  Notes:
+    - The configured engine options are meant for the configured database. They are applied to an
+      explicit `--database-uri` only when it uses the same backend (e.g., another PostgreSQL
+      database), so a `sqlite:///` URI does not receive PostgreSQL connect arguments.
+"""
+import argparse
+import logging
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+
+logger = logging.getLogger(__name__)
+logger.debug(f'Loading File: "{Path(__file__).name}". Full Path: "{Path(__file__)}"')
+
+
+def add_database_uri_argument(parser: argparse.ArgumentParser) -> None:
+  """
+  Add the standard `--database-uri` option to a command-line parser.
+
+  Args:
+    parser (argparse.ArgumentParser): Parser of a maintenance tool.
+  """
+  parser.add_argument("--database-uri", default=None,
+                      help="Database URI (default: the portal SQLALCHEMY_DATABASE_URI).")
+
+
+def cli_engine(database_uri: str | None = None) -> Engine:
+  """
+  Create the engine of a maintenance tool with the portal's engine options.
+
+  Args:
+    database_uri (str | None): URI from `--database-uri`; None uses the portal SQLALCHEMY_DATABASE_URI.
+
+  Returns:
+    Engine: A new engine; the caller disposes of it.
+
+  Examples:
+    Input : None
+    Output: Engine for BaseConfig.SQLALCHEMY_DATABASE_URI with BaseConfig.SQLALCHEMY_ENGINE_OPTIONS
+    Input : "sqlite:///portal.sqlite"
+    Output: Engine for the SQLite file (PostgreSQL options are not applied)
+  """
+  from arb.portal.config.settings import BaseConfig
+
+  configured_uri = BaseConfig.SQLALCHEMY_DATABASE_URI
+  database_uri = database_uri or configured_uri
+  engine_options = {}
+  if make_url(database_uri).get_backend_name() == make_url(configured_uri).get_backend_name():
+    engine_options = dict(BaseConfig.SQLALCHEMY_ENGINE_OPTIONS or {})
+  return create_engine(database_uri, **engine_options)
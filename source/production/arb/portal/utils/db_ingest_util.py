@@ -5,8 +5,10 @@
   This module provides:
     - Generic row ingestion from any dict using SQLAlchemy reflection
     - Excel-specific wrapper for sector-based data (xl_dict_to_database)
+    - Set-based ingestion of many payloads/files with batched upserts (dicts_to_database, json_files_to_db)
 
   Attributes:
+    BULK_INGEST_BATCH_SIZE (int): Default number of payloads written per upsert batch.
     logger (logging.Logger): Logger instance for this module.
 
   Examples:
@@ -23,13 +25,18 @@ from pathlib import Path
 from typing import Any
 
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import Table, cast, func, insert, literal_column, select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.automap import AutomapBase
 from werkzeug.datastructures import FileStorage
 
 from arb.portal.config.accessors import get_upload_folder
+from arb.portal.json_update_util import is_audited_change
+from arb.portal.sqla_models import PortalUpdate
 from arb.portal.startup.runtime_info import LOG_DIR
 from arb.portal.utils.db_introspection_util import get_ensured_row
 from arb.portal.utils.file_upload_util import add_file_to_upload_table
+from arb.portal.utils.incidence_cache import INCIDENCE_TABLE, mark_incidence_changed
 from arb.portal.utils.import_audit import generate_import_audit
 from arb.portal.utils.result_types import (
     StagingResult, UploadResult, FileSaveResult, FileConversionResult,
@@ -38,11 +45,14 @@ from arb.portal.utils.result_types import (
 )
 from arb.utils.excel.xl_parse import convert_upload_to_json, get_json_file_name_old, parse_xl_file, parse_xl_file_2, xl_schema_map
 from arb.utils.json import extract_id_from_json, json_load_with_meta
+from arb.utils.sql_alchemy import get_class_from_table_name
 from arb.utils.web_html import upload_single_file
 
 logger = logging.getLogger(__name__)
 logger.debug(f'Loading File: "{Path(__file__).name}". Full Path: "{Path(__file__)}"')
 
+BULK_INGEST_BATCH_SIZE = 500
+
 
 def extract_tab_and_sector(xl_dict: dict, tab_name: str = "Feedback Form") -> dict:
   """
@@ -397,6 +407,233 @@ def json_file_to_db(db: SQLAlchemy,
   return xl_dict_to_database(db, base, json_as_dict, dry_run=dry_run)
 
 
+def dicts_to_database(db: SQLAlchemy,
+                      base: AutomapBase,
+                      payloads: list[dict],
+                      table_name: str = "incidences",
+                      primary_key: str = "id_incidence",
+                      json_field: str = "misc_json",
+                      batch_size: int = BULK_INGEST_BATCH_SIZE,
+                      user: str = "anonymous",
+                      comments: str = "",
+                      dry_run: bool = False) -> list[int]:
+  """
+  Insert or update many rows from dictionary payloads using batched upserts.
+
+  This is the set-based counterpart of `dict_to_database` for backfills and re-imports. Each
+  batch costs a few statements instead of several round trips per payload:
+    1. One multi-row INSERT ... RETURNING for payloads without a primary key.
+    2. One SELECT of the existing JSON documents (FOR UPDATE on PostgreSQL).
+    3. One `INSERT ... ON CONFLICT (pk) DO UPDATE` for all rows in the batch.
+    4. One multi-row INSERT into portal_updates for the audit trail.
+
+  Args:
+    db (SQLAlchemy): SQLAlchemy DB instance.
+    base (AutomapBase): Reflected model metadata.
+    payloads (list[dict]): Dictionary payloads to insert/update, in order.
+    table_name (str): Table name to target.
+    primary_key (str): Primary key column.
+    json_field (str): Name of JSON field for form payload.
+    batch_size (int): Number of payloads written and committed per batch.
+    user (str): User recorded on the portal_updates audit rows.
+    comments (str): Comment recorded on the portal_updates audit rows.
+    dry_run (bool): If True, perform the writes but roll back each batch instead of committing.
+
+  Returns:
+    list[int]: The primary key of each payload, in the order of `payloads`.
+
+  Raises:
+    ValueError: If any payload is empty, or the table is not mapped.
+
+  Examples:
+    ids = dicts_to_database(db, base, [payload_1, payload_2])
+    # Upserts both payloads and logs their changes to portal_updates
+
+  Notes:
+    - Per-row semantics match `dict_to_database`: payloads without a primary key get a new
+      database-generated key, which is backfilled into the payload (and its JSON document);
+      payloads with a key update that row or create it; each payload is passed through
+      `prep_payload_for_json` and merged key-by-key into the existing JSON document.
+    - Audit rows follow `apply_json_patch_and_log` (`is_audited_change`). Several payloads for the
+      same key in one batch are applied in order and audited step by step.
+    - PostgreSQL merges with jsonb `||` inside the upsert. SQLite writes the document merged in
+      Python from the rows read in the same transaction.
+    - Other dialects fall back to calling `dict_to_database` once per payload.
+    - Batches are committed independently; a failing batch is rolled back and re-raised, and
+      earlier batches stay committed.
+  """
+  logger.debug(f"dicts_to_database() called with {len(payloads)} payloads, {batch_size=}")
+
+  for data_dict in payloads:
+    validate_payload_for_database(data_dict)
+
+  table_class = get_class_from_table_name(base, table_name)
+  if table_class is None:
+    raise ValueError(f"Table '{table_name}' not found or not mapped in metadata.")
+  table = table_class.__table__
+
+  dialect_name = db.session.get_bind().dialect.name
+  if dialect_name not in ("postgresql", "sqlite"):
+    logger.warning(f"Bulk upsert is not supported on {dialect_name}; ingesting one payload at a time")
+    return [dict_to_database(db, base, data_dict, table_name=table_name, primary_key=primary_key,
+                             json_field=json_field, dry_run=dry_run)
+            for data_dict in payloads]
+
+  ids = []
+  for start in range(0, len(payloads), max(batch_size, 1)):
+    batch = payloads[start:start + max(batch_size, 1)]
+    try:
+      ids.extend(_upsert_json_batch(db, table, batch, primary_key, json_field, user, comments))
+    except Exception:
+      db.session.rollback()
+      logger.exception(f"Bulk upsert failed for payloads {start}-{start + len(batch) - 1}")
+      raise
+    if dry_run:
+      db.session.rollback()
+    else:
+      db.session.commit()
+    logger.debug(f"Bulk upsert {'rolled back' if dry_run else 'committed'} "
+                 f"payloads {start}-{start + len(batch) - 1}")
+
+  return ids
+
+
+def _upsert_json_batch(db: SQLAlchemy,
+                       table: Table,
+                       batch: list[dict],
+                       primary_key: str,
+                       json_field: str,
+                       user: str,
+                       comments: str) -> list[int]:
+  """
+  Upsert one batch of payloads and add their audit rows to the session (no commit).
+
+  Args:
+    db (SQLAlchemy): SQLAlchemy DB instance.
+    table (Table): Target table.
+    batch (list[dict]): Validated payloads; new primary keys are backfilled into them.
+    primary_key (str): Primary key column.
+    json_field (str): Name of JSON field for form payload.
+    user (str): User recorded on audit rows.
+    comments (str): Comment recorded on audit rows.
+
+  Returns:
+    list[int]: The primary key of each payload in `batch`.
+  """
+  from arb.utils.wtf_forms_util import prep_payload_for_json
+
+  session = db.session
+  dialect_name = session.get_bind().dialect.name
+  pk_column = table.c[primary_key]
+  json_column = table.c[json_field]
+
+  # Payloads without a key get database-generated keys first, as get_ensured_row does one at a time.
+  # The placeholder rows are identical, so keys are handed out in ascending order as the per-row path would.
+  missing = [data_dict for data_dict in batch if data_dict.get(primary_key) is None]
+  new_ids = set()
+  if missing:
+    result = session.execute(insert(table).returning(pk_column), [{json_field: {}} for _ in missing])
+    for data_dict, id_ in zip(missing, sorted(result.scalars().all())):
+      logger.debug(f"Backfilling {primary_key} = {id_} into payload")
+      data_dict[primary_key] = id_
+      new_ids.add(id_)
+
+  # Group payloads per row, keeping their order, so each row appears once in the upsert
+  updates_by_id: dict[Any, list[dict]] = {}
+  ids = []
+  for data_dict in batch:
+    updates = prep_payload_for_json(data_dict)
+    id_ = updates[primary_key]
+    updates_by_id.setdefault(id_, []).append(updates)
+    ids.append(id_)
+
+  existing_ids = [id_ for id_ in updates_by_id if id_ not in new_ids]
+  documents = {}
+  if existing_ids:
+    rows = session.execute(
+      select(pk_column, json_column).where(pk_column.in_(existing_ids)).with_for_update()
+    ).all()
+    documents = {id_: document or {} for id_, document in rows}
+
+  timestamp = datetime.datetime.now(datetime.UTC)
+  upsert_rows = []
+  audit_rows = []
+  for id_, updates_list in updates_by_id.items():
+    document = dict(documents.get(id_) or {})
+    patch = {}
+    for updates in updates_list:
+      for key, new_value in updates.items():
+        old_value = document.get(key)
+        if is_audited_change(old_value, new_value):
+          audit_rows.append({"timestamp": timestamp, "key": key, "old_value": str(old_value),
+                             "new_value": str(new_value), "user": user, "comments": comments or "",
+                             "id_incidence": id_})
+        document[key] = new_value
+        patch[key] = new_value
+    upsert_rows.append({primary_key: id_, json_field: patch if dialect_name == "postgresql" else document})
+
+  if dialect_name == "postgresql":
+    statement = postgresql.insert(table)
+    merged = func.coalesce(cast(json_column, postgresql.JSONB), literal_column("'{}'::jsonb")).op("||")(
+      cast(statement.excluded[json_field], postgresql.JSONB))
+    if not isinstance(json_column.type, postgresql.JSONB):
+      merged = cast(merged, json_column.type)
+  else:
+    statement = sqlite.insert(table)
+    merged = statement.excluded[json_field]
+  statement = statement.on_conflict_do_update(index_elements=[pk_column], set_={json_field: merged})
+  session.execute(statement, upsert_rows)
+  if table.name == INCIDENCE_TABLE:
+    mark_incidence_changed(session, *ids)
+
+  if audit_rows:
+    session.execute(insert(PortalUpdate), audit_rows)
+
+  logger.info(f"Bulk upserted {len(upsert_rows)} rows ({len(new_ids)} new) with {len(audit_rows)} audit rows")
+  return ids
+
+
+def json_files_to_db(db: SQLAlchemy,
+                     file_names: list[str | Path],
+                     base: AutomapBase,
+                     tab_name: str = "Feedback Form",
+                     batch_size: int = BULK_INGEST_BATCH_SIZE,
+                     dry_run: bool = False) -> list[tuple[int, str]]:
+  """
+  Parse many structured JSON files and upsert them into the DB in batches.
+
+  Args:
+    db (SQLAlchemy): DB engine.
+    file_names (list[str | Path]): Paths to .json files (as written by the Excel converter).
+    base (AutomapBase): Reflected schema.
+    tab_name (str): Sheet name to extract from each file.
+    batch_size (int): Number of files written and committed per batch.
+    dry_run (bool): If True, roll back instead of committing.
+
+  Returns:
+    list[tuple[int, str]]: (id_incidence, sector) for each file, in order.
+
+  Examples:
+    results = json_files_to_db(db, sorted(Path("processed").glob("*.json")), base)
+    # Re-imports every processed file with a few statements per batch
+
+  Notes:
+    - The set-based counterpart of `json_file_to_db`; see `dicts_to_database`.
+  """
+  payloads = []
+  sectors = []
+  for file_name in file_names:
+    json_as_dict, metadata = json_load_with_meta(file_name)
+    sector = json_as_dict["metadata"]["sector"]
+    tab_data = json_as_dict["tab_contents"][tab_name]
+    tab_data["sector"] = sector
+    payloads.append(tab_data)
+    sectors.append(sector)
+
+  ids = dicts_to_database(db, base, payloads, batch_size=batch_size, dry_run=dry_run)
+  return list(zip(ids, sectors))
+
+
 def upload_and_update_db_old(db: SQLAlchemy,
                              upload_dir: str | Path,
                              request_file: FileStorage,
@@ -0,0 +1,361 @@
+"""
+  Connection pool sizing and live pool metrics (checkout latency, overflow, leaks).
+
+  Pool sizing, pre-ping and recycle come from the DATABASE_POOL_* settings and are merged into
+  SQLALCHEMY_ENGINE_OPTIONS by `apply_pool_settings(app)` before `db.init_app(app)`; read replica
+  engines reuse the same options.
+
+  `init_pool_metrics(app)` then instruments every engine's pool:
+    - counters for the pool events (connect, checkout, checkin, invalidate) and checkout timeouts;
+    - a histogram of checkout latency: the time `pool.connect()` waited for a free connection
+      (including the pre-ping), recorded by `TimedQueuePool`;
+    - gauges read from the pool (size, checked out, overflow);
+    - a leak detector that logs any connection checked out longer than
+      DATABASE_POOL_LEAK_SECONDS (once per checkout) with the holding thread and its stack.
+
+  The metrics are served by the `/db_pool_metrics` route as JSON, or in the Prometheus text
+  format with `?format=prometheus`.
+
+  Attributes:
+    CHECKOUT_LATENCY_BUCKETS (tuple[float, ...]): Histogram upper bounds in seconds.
+    logger (logging.Logger): Logger instance for this module.
+
+  Examples:
+    apply_pool_settings(app)
+    db.init_app(app)
+    init_pool_metrics(app)
+    get_pool_metrics()["primary"].snapshot()
+
+  Notes:
+    - Explicit keys in SQLALCHEMY_ENGINE_OPTIONS (e.g., from DATABASE_ENGINE_OPTIONS) override the
+      DATABASE_POOL_* settings.
+    - SQLite in-memory databases use a single static connection, so only pre-ping and recycle
+      are applied to them.
+    - Leaks are checked on every checkout (before waiting for a connection) and whenever the
+      metrics are read, so a stalled pool reports the threads holding its connections.
+    - A checkout only records its time and thread. The leak report shows where that thread is
+      when the leak is found; the stack at checkout time is captured on every checkout only with
+      DATABASE_POOL_LEAK_STACKS (on in DevelopmentConfig), as extracting it costs every request.
+"""
+import logging
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Any, Mapping
+
+from flask import Flask, current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+logger.debug(f'Loading File: "{Path(__file__).name}". Full Path: "{Path(__file__)}"')
+
+CHECKOUT_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+_EXTENSION_KEY = "db_pool_metrics"
+_STACK_LIMIT = 40
+
+
+def pool_engine_options(config: Mapping[str, Any]) -> dict:
+  """
+  Return SQLALCHEMY_ENGINE_OPTIONS with the DATABASE_POOL_* settings filled in.
+
+  Args:
+    config (Mapping[str, Any]): Flask config (or any mapping with the same keys).
+
+  Returns:
+    dict: Engine options; explicit SQLALCHEMY_ENGINE_OPTIONS keys win over the pool settings.
+
+  Examples:
+    Input : {"SQLALCHEMY_DATABASE_URI": "postgresql://...", "DATABASE_POOL_SIZE": 10}
+    Output: {"pool_size": 10, "max_overflow": 10, "pool_timeout": 30, "pool_recycle": 1800,
+             "pool_pre_ping": True, "poolclass": TimedQueuePool}
+  """
+  options: dict[str, Any] = {
+    "pool_pre_ping": bool(config.get("DATABASE_POOL_PRE_PING", True)),
+    "pool_recycle": int(config.get("DATABASE_POOL_RECYCLE", 1800)),
+  }
+  uri = config.get("SQLALCHEMY_DATABASE_URI")
+  url = make_url(uri) if uri else None
+  in_memory_sqlite = url is not None and url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+  if not in_memory_sqlite:
+    options.update({
+      "poolclass": TimedQueuePool,
+      "pool_size": int(config.get("DATABASE_POOL_SIZE", 5)),
+      "max_overflow": int(config.get("DATABASE_MAX_OVERFLOW", 10)),
+      "pool_timeout": float(config.get("DATABASE_POOL_TIMEOUT", 30)),
+    })
+  options.update(config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+  return options
+
+
+def apply_pool_settings(app: Flask) -> dict:
+  """
+  Merge the pool settings into the app's SQLALCHEMY_ENGINE_OPTIONS (call before `db.init_app`).
+
+  Args:
+    app (Flask): Flask application.
+
+  Returns:
+    dict: The engine options now in `app.config["SQLALCHEMY_ENGINE_OPTIONS"]`.
+  """
+  options = pool_engine_options(app.config)
+  app.config["SQLALCHEMY_ENGINE_OPTIONS"] = options
+  pool_options = {key: value for key, value in options.items() if key.startswith("pool")}
+  logger.info(f"Database pool options: {pool_options}, max_overflow={options.get('max_overflow')}")
+  return options
+
+
+class PoolMetrics:
+  """
+  Counters, checkout latency histogram and leak detector for one engine's pool.
+
+  Args:
+    name (str): Pool name used in reports ("primary", a bind key, or a replica name).
+    leak_seconds (float): Report connections checked out longer than this (0 disables).
+    capture_stacks (bool): Record the stack of every checkout for the leak report (debugging).
+
+  Examples:
+    metrics = instrument_engine(engine, "primary", leak_seconds=60)
+    metrics.snapshot()["checkouts"]
+  """
+
+  def __init__(self, name: str, leak_seconds: float = 60, capture_stacks: bool = False) -> None:
+    self.name = name
+    self.leak_seconds = leak_seconds
+    self.capture_stacks = capture_stacks
+    self.pool: Any = None
+    self.counters = {"connects": 0, "checkouts": 0, "checkins": 0, "invalidations": 0, "timeouts": 0, "leaks": 0}
+    self.bucket_counts = [0] * (len(CHECKOUT_LATENCY_BUCKETS) + 1)
+    self.latency_sum = 0.0
+    self.latency_max = 0.0
+    # id(connection record) -> [checkout time, thread, checkout stack or None, reported]
+    self._held: dict[int, list] = {}
+    self._lock = threading.Lock()
+
+  def reset(self) -> None:
+    """
+    Zero the counters and forget held connections (e.g., in a worker forked from a preloaded master).
+    """
+    self._lock = threading.Lock()
+    self.counters = dict.fromkeys(self.counters, 0)
+    self.bucket_counts = [0] * len(self.bucket_counts)
+    self.latency_sum = 0.0
+    self.latency_max = 0.0
+    self._held = {}
+
+  def _count(self, name: str) -> None:
+    with self._lock:
+      self.counters[name] += 1
+
+  def observe_checkout_latency(self, seconds: float) -> None:
+    """Record how long one checkout waited for a connection."""
+    index = next((i for i, bound in enumerate(CHECKOUT_LATENCY_BUCKETS) if seconds <= bound),
+                 len(CHECKOUT_LATENCY_BUCKETS))
+    with self._lock:
+      self.bucket_counts[index] += 1
+      self.latency_sum += seconds
+      self.latency_max = max(self.latency_max, seconds)
+
+  def on_connect(self, dbapi_connection: Any, connection_record: Any) -> None:
+    self._count("connects")
+
+  def on_checkout(self, dbapi_connection: Any, connection_record: Any, connection_proxy: Any) -> None:
+    self._count("checkouts")
+    if self.leak_seconds > 0:
+      stack = None
+      if self.capture_stacks:
+        stack = traceback.StackSummary.extract(traceback.walk_stack(None), limit=_STACK_LIMIT, lookup_lines=False)
+      with self._lock:
+        self._held[id(connection_record)] = [time.monotonic(), threading.current_thread(), stack, False]
+
+  def on_checkin(self, dbapi_connection: Any, connection_record: Any) -> None:
+    self._count("checkins")
+    with self._lock:
+      held = self._held.pop(id(connection_record), None)
+    if held is not None and not held[3] and time.monotonic() - held[0] > self.leak_seconds:
+      self._report_leak(held, returned=True)
+
+  def on_invalidate(self, dbapi_connection: Any, connection_record: Any, exception: BaseException | None) -> None:
+    self._count("invalidations")
+
+  def _report_leak(self, held: list, returned: bool = False) -> None:
+    held[3] = True
+    self._count("leaks")
+    state = "was held" if returned else "has been held"
+    thread = held[1]
+    if held[2] is not None:
+      where = "Checked out at:\n" + "".join(traceback.format_list(list(reversed(held[2]))))
+    elif not returned and thread.ident in (frames := sys._current_frames()):
+      where = "Thread is now at:\n" + "".join(traceback.format_stack(frames[thread.ident], limit=_STACK_LIMIT))
+    else:
+      where = "Set DATABASE_POOL_LEAK_STACKS=true to log the checkout stack."
+    logger.warning(f"Pool {self.name!r}: connection {state} for {time.monotonic() - held[0]:.1f}s "
+                   f"by thread {thread.name!r} (leak threshold {self.leak_seconds}s). {where}")
+
+  def check_leaks(self) -> int:
+    """
+    Log every connection checked out longer than `leak_seconds` that was not reported yet.
+
+    Returns:
+      int: Number of connections reported by this call.
+    """
+    if self.leak_seconds <= 0:
+      return 0
+    cutoff = time.monotonic() - self.leak_seconds
+    with self._lock:
+      leaked = [held for held in self._held.values() if not held[3] and held[0] < cutoff]
+    for held in leaked:
+      self._report_leak(held)
+    return len(leaked)
+
+  def snapshot(self) -> dict:
+    """
+    Return the current counters, gauges and latency histogram.
+
+    Returns:
+      dict: {"pool": str, "connects": int, ..., "size": int | None, "checked_out": int | None,
+             "overflow": int | None, "held_longest_seconds": float,
+             "checkout_latency": {"buckets": {le: cumulative count}, "count", "sum", "max"}}
+    """
+    self.check_leaks()
+    now = time.monotonic()
+    with self._lock:
+      data: dict[str, Any] = {"pool": self.name, **self.counters}
+      cumulative, buckets = 0, {}
+      for bound, count in zip((*CHECKOUT_LATENCY_BUCKETS, float("inf")), self.bucket_counts):
+        cumulative += count
+        buckets["+Inf" if bound == float("inf") else str(bound)] = cumulative
+      data["checkout_latency"] = {"buckets": buckets, "count": cumulative, "sum": round(self.latency_sum, 6),
+                                  "max": round(self.latency_max, 6)}
+      data["held_longest_seconds"] = round(max((now - held[0] for held in self._held.values()), default=0.0), 3)
+    pool = self.pool
+    for key, method in (("size", "size"), ("checked_out", "checkedout"), ("overflow", "overflow")):
+      data[key] = getattr(pool, method)() if hasattr(pool, method) else None
+    return data
+
+
+class TimedQueuePool(QueuePool):
+  """
+  QueuePool that records how long each checkout waits and counts checkout timeouts.
+
+  Notes:
+    - `engine.dispose()` recreates the pool; `recreate()` carries the metrics over.
+  """
+  metrics: PoolMetrics | None = None
+
+  def connect(self) -> Any:
+    metrics = self.metrics
+    if metrics is None:
+      return super().connect()
+    metrics.check_leaks()
+    start = time.perf_counter()
+    try:
+      connection = super().connect()
+    except PoolTimeoutError:
+      metrics._count("timeouts")
+      metrics.observe_checkout_latency(time.perf_counter() - start)
+      logger.warning(f"Pool {metrics.name!r}: checkout timed out ({metrics.snapshot()})")
+      raise
+    metrics.observe_checkout_latency(time.perf_counter() - start)
+    return connection
+
+  def recreate(self) -> "TimedQueuePool":
+    pool = super().recreate()
+    pool.metrics = self.metrics
+    if self.metrics is not None:
+      self.metrics.pool = pool
+    return pool
+
+
+def instrument_engine(engine: Engine, name: str, leak_seconds: float = 60,
+                      capture_stacks: bool = False) -> PoolMetrics:
+  """
+  Attach pool event listeners (and checkout timing for `TimedQueuePool`) to an engine.
+
+  Args:
+    engine (Engine): Engine whose pool is instrumented.
+    name (str): Pool name used in reports.
+    leak_seconds (float): Leak detection threshold in seconds (0 disables).
+    capture_stacks (bool): Record the stack of every checkout for the leak report.
+
+  Returns:
+    PoolMetrics: Metrics updated by the pool events.
+  """
+  metrics = PoolMetrics(name, leak_seconds, capture_stacks)
+  metrics.pool = engine.pool
+  if isinstance(engine.pool, TimedQueuePool):
+    engine.pool.metrics = metrics
+  event.listen(engine, "connect", metrics.on_connect)
+  event.listen(engine, "checkout", metrics.on_checkout)
+  event.listen(engine, "checkin", metrics.on_checkin)
+  event.listen(engine, "invalidate", metrics.on_invalidate)
+  return metrics
+
+
+def init_pool_metrics(app: Flask) -> dict[str, PoolMetrics]:
+  """
+  Instrument the pools of every engine the app uses (binds and read replicas).
+
+  Args:
+    app (Flask): Flask application (call after `db.init_app(app)` and `init_read_replicas(app)`).
+
+  Returns:
+    dict[str, PoolMetrics]: Metrics by pool name, stored in `app.extensions["db_pool_metrics"]`.
+  """
+  leak_seconds = float(app.config.get("DATABASE_POOL_LEAK_SECONDS", 60))
+  capture_stacks = bool(app.config.get("DATABASE_POOL_LEAK_STACKS", False))
+  with app.app_context():
+    engines = {("primary" if key is None else key): engine
+               for key, engine in app.extensions["sqlalchemy"].engines.items()}
+  router = app.extensions.get("read_replicas")
+  if router is not None:
+    engines.update(router.engines)
+
+  metrics = {name: instrument_engine(engine, name, leak_seconds, capture_stacks) for name, engine in engines.items()}
+  app.extensions[_EXTENSION_KEY] = metrics
+  return metrics
+
+
+def get_pool_metrics() -> dict[str, PoolMetrics]:
+  """
+  Return the current app's pool metrics by pool name (empty outside an app context).
+  """
+  if not has_app_context():
+    return {}
+  return current_app.extensions.get(_EXTENSION_KEY, {})
+
+
+def format_prometheus(snapshots: list[dict]) -> str:
+  """
+  Render pool snapshots in the Prometheus text exposition format.
+
+  Args:
+    snapshots (list[dict]): Results of `PoolMetrics.snapshot()`.
+
+  Returns:
+    str: Metrics text (`portal_db_pool_*` families labelled by pool).
+
+  Examples:
+    Input : [{"pool": "primary", "checkouts": 3, ...}]
+    Output: 'portal_db_pool_checkouts_total{pool="primary"} 3\\n...'
+  """
+  lines = []
+  for key in ("connects", "checkouts", "checkins", "invalidations", "timeouts", "leaks"):
+    lines.append(f"# TYPE portal_db_pool_{key}_total counter")
+    lines.extend(f'portal_db_pool_{key}_total{{pool="{s["pool"]}"}} {s[key]}' for s in snapshots)
+  for key in ("size", "checked_out", "overflow", "held_longest_seconds"):
+    lines.append(f"# TYPE portal_db_pool_{key} gauge")
+    lines.extend(f'portal_db_pool_{key}{{pool="{s["pool"]}"}} {s[key]}' for s in snapshots if s[key] is not None)
+  lines.append("# TYPE portal_db_pool_checkout_seconds histogram")
+  for s in snapshots:
+    latency = s["checkout_latency"]
+    lines.extend(f'portal_db_pool_checkout_seconds_bucket{{pool="{s["pool"]}",le="{le}"}} {count}'
+                 for le, count in latency["buckets"].items())
+    lines.append(f'portal_db_pool_checkout_seconds_sum{{pool="{s["pool"]}"}} {latency["sum"]}')
+    lines.append(f'portal_db_pool_checkout_seconds_count{{pool="{s["pool"]}"}} {latency["count"]}')
+  return "\n".join(lines) + "\n"
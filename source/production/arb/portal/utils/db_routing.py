@@ -0,0 +1,388 @@
+"""
+  Read-replica routing for `db.session`: read-only routes read from replica engines,
+  everything else (and every write) uses the primary.
+
+  Configure one or more replica URIs (SQLALCHEMY_REPLICA_URIS, e.g. the cluster reader
+  endpoint) and call `init_read_replicas(app)` after `db.init_app(app)`. Routes opt in with
+  `@read_only`; with SQLALCHEMY_REPLICA_AUTO_ROUTE enabled every GET/HEAD request is routed
+  unless its view is decorated with `@use_primary`.
+
+  While a request is routed, `RoutingSession.get_bind()` returns a replica engine for reads and
+  the primary engine for:
+    - flushes and Core/text writes (INSERT/UPDATE/DELETE, SELECT ... FOR UPDATE);
+    - every statement after the session has written (read-your-writes within the session);
+    - every request from the same browser for SQLALCHEMY_REPLICA_STICKY_SECONDS after one of
+      its requests committed a write (read-your-writes across the redirect after a save).
+
+  Fallback: a connection or operational error on a replica marks it unavailable for
+  SQLALCHEMY_REPLICA_RETRY_SECONDS. A `@read_only` view that failed on a replica is rolled
+  back and run again on the primary, so a replica outage only costs one retried read.
+
+  Attributes:
+    logger (logging.Logger): Logger instance for this module.
+
+  Examples:
+    # settings: SQLALCHEMY_REPLICA_URIS = ["postgresql+psycopg2://...cluster-ro-..."]
+    from arb.portal.utils.db_routing import read_only
+
+    @main.route("/portal_updates")
+    @read_only
+    def view_portal_updates(): ...
+
+  Notes:
+    - `arb.portal.extensions.db` uses `RoutingSession`; without replicas configured (or outside
+      a routed request) it behaves exactly like Flask-SQLAlchemy's session.
+    - Code that uses `db.engine` directly (e.g., `find_auto_increment_value`) always runs on
+      the primary.
+    - Auto-routing is off by default: several GET views create missing rows (`get_ensured_row`)
+      and must not decide that from a lagging replica. Mark such views with `@use_primary`
+      before enabling it.
+"""
+import functools
+import itertools
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from flask import Flask, current_app, has_app_context, has_request_context, request, session as flask_session
+from flask_sqlalchemy.session import Session as FlaskSQLAlchemySession
+from sqlalchemy import TextClause, create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.sql.dml import UpdateBase
+
+logger = logging.getLogger(__name__)
+logger.debug(f'Loading File: "{Path(__file__).name}". Full Path: "{Path(__file__)}"')
+
+_EXTENSION_KEY = "read_replicas"
+_ROUTER_KEY = "read_replica_router"  # session.info: set while the session may read from a replica
+_REPLICA_KEY = "read_replica_name"  # session.info: replica chosen for this session
+_WROTE_KEY = "read_replica_wrote"  # session.info: the session has written; read from the primary
+_PRIMARY_UNTIL_KEY = "_db_primary_until"  # flask session: epoch seconds until reads stay on the primary
+_READ_ONLY_SQL = ("select", "with", "show", "explain", "values", "table")
+_events_installed = False
+
+
+def is_write_statement(clause: Any) -> bool:
+  """
+  Return True if a statement must run on the primary.
+
+  Args:
+    clause (Any): Statement passed to `Session.get_bind()` (may be None).
+
+  Returns:
+    bool: True for INSERT/UPDATE/DELETE, SELECT ... FOR UPDATE, and text() statements that do
+      not start with a read-only keyword.
+
+  Examples:
+    Input : text("UPDATE incidences SET misc_json = NULL")
+    Output: True
+    Input : select(PortalUpdate)
+    Output: False
+  """
+  if clause is None:
+    return False
+  if isinstance(clause, UpdateBase):
+    return True
+  if isinstance(clause, TextClause):
+    words = clause.text.lstrip(" \t\r\n(").split(None, 1)
+    return not words or words[0].lower() not in _READ_ONLY_SQL
+  return getattr(clause, "_for_update_arg", None) is not None
+
+
+class RoutingSession(FlaskSQLAlchemySession):
+  """
+  Flask-SQLAlchemy session that sends reads to a replica while a request is routed.
+
+  Notes:
+    - Routing is enabled per session by `read_only` (or auto-routing) storing the app's
+      `ReplicaRouter` in `session.info`; the session is discarded at the end of the request.
+    - Models with their own bind key keep their bind.
+  """
+
+  def get_bind(self, mapper: Any | None = None, clause: Any | None = None, bind: Any | None = None,
+               **kwargs: Any) -> Any:
+    """
+    Select the engine for a statement: a replica for routed reads, otherwise the primary.
+
+    Args:
+      mapper (Any | None): Mapped class or mapper being queried.
+      clause (Any | None): Statement being executed.
+      bind (Any | None): Explicit bind, always honoured.
+      **kwargs: Passed to Flask-SQLAlchemy's `Session.get_bind()`.
+
+    Returns:
+      Engine | Connection: Engine (or connection) to execute on.
+    """
+    primary = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+    if bind is not None:
+      return primary
+    if self._flushing or is_write_statement(clause):
+      self.info[_WROTE_KEY] = True
+      return primary
+
+    router = self.info.get(_ROUTER_KEY)
+    if router is None or self.info.get(_WROTE_KEY) or primary is not self._db.engines.get(None):
+      return primary
+    name = self.info.get(_REPLICA_KEY)
+    if name is None or not router.is_available(name):
+      name = router.choose()
+      if name is None:
+        return primary
+      self.info[_REPLICA_KEY] = name
+    return router.engines[name]
+
+
+class ReplicaRouter:
+  """
+  Replica engines, their availability, and the routing settings of one app.
+
+  Args:
+    engines (dict[str, Engine]): Replica engines by name.
+    auto_route (bool): Route every GET/HEAD request not marked `@use_primary`.
+    retry_seconds (float): How long a failed replica is skipped.
+    sticky_seconds (float): How long a browser reads from the primary after committing a write.
+
+  Examples:
+    router = ReplicaRouter({"replica_0": create_engine(uri)})
+    router.choose()  # "replica_0"
+  """
+
+  def __init__(self, engines: dict[str, Engine], auto_route: bool = False, retry_seconds: float = 30,
+               sticky_seconds: float = 5) -> None:
+    self.engines = dict(engines)
+    self.auto_route = auto_route
+    self.retry_seconds = retry_seconds
+    self.sticky_seconds = sticky_seconds
+    self._unavailable_until: dict[str, float] = {}
+    self._next = itertools.count()
+    self._lock = threading.Lock()
+    self.routed_requests = 0
+    self.fallbacks = 0
+    self.failures = 0
+
+  def reset(self) -> None:
+    """
+    Forget replica failures and zero the counters (e.g., in a worker forked from a preloaded master).
+    """
+    self._lock = threading.Lock()
+    self._unavailable_until = {}
+    self.routed_requests = 0
+    self.fallbacks = 0
+    self.failures = 0
+
+  def is_available(self, name: str) -> bool:
+    """Return True if the replica has not failed within the last `retry_seconds`."""
+    return self._unavailable_until.get(name, 0.0) <= time.monotonic()
+
+  def choose(self) -> str | None:
+    """
+    Return the next available replica (round robin), or None if every replica is unavailable.
+    """
+    available = [name for name in self.engines if self.is_available(name)]
+    if not available:
+      return None
+    with self._lock:
+      return available[next(self._next) % len(available)]
+
+  def mark_unavailable(self, name: str, error: BaseException | None = None) -> None:
+    """
+    Skip a replica for `retry_seconds` after a connection or operational error.
+
+    Args:
+      name (str): Replica name.
+      error (BaseException | None): The error, for the log message.
+    """
+    with self._lock:
+      self._unavailable_until[name] = time.monotonic() + self.retry_seconds
+      self.failures += 1
+    logger.warning(f"Read replica {name!r} unavailable for {self.retry_seconds}s: {error}")
+
+  def stats(self) -> dict:
+    """
+    Return routing counters for diagnostics.
+
+    Returns:
+      dict: Replica names, which are available, routed requests, failures and primary fallbacks.
+    """
+    return {
+      "replicas": list(self.engines),
+      "available": [name for name in self.engines if self.is_available(name)],
+      "auto_route": self.auto_route,
+      "routed_requests": self.routed_requests,
+      "failures": self.failures,
+      "fallbacks": self.fallbacks,
+    }
+
+
+def get_replica_router() -> ReplicaRouter | None:
+  """
+  Return the current app's replica router, or None if no replicas are configured.
+  """
+  if not has_app_context():
+    return None
+  return current_app.extensions.get(_EXTENSION_KEY)
+
+
+def _primary_pinned() -> bool:
+  """Return True if this browser committed a write within the sticky window."""
+  return has_request_context() and flask_session.get(_PRIMARY_UNTIL_KEY, 0) > time.time()
+
+
+def _db_session() -> Any:
+  """Return the app's Flask-SQLAlchemy scoped session (avoids importing arb.portal.extensions)."""
+  return current_app.extensions["sqlalchemy"].session
+
+
+def _start_routing(router: ReplicaRouter) -> bool:
+  """Let the current request's session read from a replica; return False if it must not."""
+  if _primary_pinned():
+    return False
+  _db_session().info[_ROUTER_KEY] = router
+  router.routed_requests += 1
+  return True
+
+
+def read_only(view: Callable) -> Callable:
+  """
+  Decorate a view whose database access is read-only so its reads use a replica.
+
+  Args:
+    view (Callable): Flask view function.
+
+  Returns:
+    Callable: Wrapped view that falls back to the primary if the replica fails.
+
+  Examples:
+    @main.route("/portal_updates/export")
+    @read_only
+    def export_portal_updates(): ...
+
+  Notes:
+    - Writes made by the view still go to the primary, and later reads in the request follow.
+    - On a replica connection/operational error the session is rolled back and the view runs
+      again on the primary.
+  """
+
+  @functools.wraps(view)
+  def wrapper(*args: Any, **kwargs: Any) -> Any:
+    router = get_replica_router()
+    if router is None or not _start_routing(router):
+      return view(*args, **kwargs)
+    session = _db_session()
+    try:
+      return view(*args, **kwargs)
+    except (OperationalError, InterfaceError) as e:
+      if session.info.get(_REPLICA_KEY) is None:
+        raise
+      logger.warning(f"{view.__name__}: read replica failed ({e.__class__.__name__}); retrying on the primary")
+      router.fallbacks += 1
+      session.rollback()
+      session.info.pop(_ROUTER_KEY, None)
+      session.info.pop(_REPLICA_KEY, None)
+      return view(*args, **kwargs)
+    finally:
+      session.info.pop(_ROUTER_KEY, None)
+
+  wrapper._db_read_only = True  # type: ignore[attr-defined]
+  return wrapper
+
+
+def use_primary(view: Callable) -> Callable:
+  """
+  Mark a GET view that must read from the primary even when auto-routing is enabled.
+
+  Args:
+    view (Callable): Flask view function.
+
+  Returns:
+    Callable: The same view, marked.
+  """
+  view._db_use_primary = True  # type: ignore[attr-defined]
+  return view
+
+
+def _auto_route() -> None:
+  """`before_request` hook: route GET/HEAD requests when SQLALCHEMY_REPLICA_AUTO_ROUTE is set."""
+  router = get_replica_router()
+  if router is None or not router.auto_route or request.method not in ("GET", "HEAD"):
+    return
+  view = current_app.view_functions.get(request.endpoint or "")
+  if view is None or getattr(view, "_db_read_only", False) or getattr(view, "_db_use_primary", False):
+    return
+  _start_routing(router)
+
+
+def _after_flush(session: Any, flush_context: Any) -> None:
+  if session.new or session.dirty or session.deleted:
+    session.info[_WROTE_KEY] = True
+
+
+def _after_commit(session: Any) -> None:
+  # Keep this browser on the primary until the replicas have caught up with its write
+  if not session.info.get(_WROTE_KEY) or not has_request_context():
+    return
+  router = get_replica_router()
+  if router is not None and router.sticky_seconds > 0:
+    flask_session[_PRIMARY_UNTIL_KEY] = time.time() + router.sticky_seconds
+
+
+def install_session_events() -> None:
+  """
+  Register the read-your-writes listeners on `RoutingSession` (idempotent).
+  """
+  global _events_installed
+  if _events_installed:
+    return
+  event.listen(RoutingSession, "after_flush", _after_flush)
+  event.listen(RoutingSession, "after_commit", _after_commit)
+  _events_installed = True
+
+
+def init_read_replicas(app: Flask) -> ReplicaRouter | None:
+  """
+  Create replica engines from the app configuration and enable read routing.
+
+  Args:
+    app (Flask): Flask application (call after `db.init_app(app)`).
+
+  Returns:
+    ReplicaRouter | None: The router stored in `app.extensions["read_replicas"]`, or None when
+      SQLALCHEMY_REPLICA_URIS is empty.
+
+  Examples:
+    db.init_app(app)
+    init_read_replicas(app)
+
+  Notes:
+    - Config keys: SQLALCHEMY_REPLICA_URIS, SQLALCHEMY_REPLICA_AUTO_ROUTE,
+      SQLALCHEMY_REPLICA_RETRY_SECONDS, SQLALCHEMY_REPLICA_STICKY_SECONDS.
+    - Replica engines use the primary's SQLALCHEMY_ENGINE_OPTIONS (same schema search path).
+  """
+  uris = app.config.get("SQLALCHEMY_REPLICA_URIS") or []
+  if isinstance(uris, str):
+    uris = [uri.strip() for uri in uris.split(",") if uri.strip()]
+  if not uris:
+    return None
+
+  engine_options = dict(app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+  engines = {f"replica_{i}": create_engine(uri, **engine_options) for i, uri in enumerate(uris)}
+  router = ReplicaRouter(engines,
+                         auto_route=bool(app.config.get("SQLALCHEMY_REPLICA_AUTO_ROUTE", False)),
+                         retry_seconds=float(app.config.get("SQLALCHEMY_REPLICA_RETRY_SECONDS", 30)),
+                         sticky_seconds=float(app.config.get("SQLALCHEMY_REPLICA_STICKY_SECONDS", 5)))
+
+  for name, engine in engines.items():
+    def _handle_error(context: Any, name: str = name) -> None:
+      if context.is_disconnect or isinstance(context.sqlalchemy_exception, (OperationalError, InterfaceError)):
+        router.mark_unavailable(name, context.original_exception)
+
+    event.listen(engine, "handle_error", _handle_error)
+
+  app.extensions[_EXTENSION_KEY] = router
+  app.before_request(_auto_route)
+  install_session_events()
+  logger.info(f"Read replicas: {list(engines)} (auto_route={router.auto_route})")
+  return router
@@ -0,0 +1,255 @@
+"""
+  Opt-in diagnostics policy for the feedback form save path.
+
+  `incidence_prep()` used to log model diagnostics, before/after model snapshots and form errors
+  on every request. The policy decides once per request whether that work is done:
+
+    - mode "off": no diagnostics (production default).
+    - mode "sampled": diagnostics for a random `sample_rate` fraction of requests.
+    - mode "always": diagnostics for every request (development default).
+    - `users` / `incidences`: always diagnose requests from these users or for these incidences,
+      whatever the mode, so one person or one record can be debugged in production.
+
+  The policy can be changed at runtime from the developer diagnostics page (`/diagnostics`).
+  Changes are written to a small JSON file (DIAGNOSTICS_POLICY_FILE) that every worker process
+  re-reads when its modification time changes, so a toggle reaches all workers at the cost of
+  one `os.stat()` per save.
+
+  Attributes:
+    DIAGNOSTICS_MODES (tuple[str, ...]): Valid policy modes.
+    logger (logging.Logger): Logger instance for this module.
+
+  Examples:
+    from arb.portal.utils.diagnostics_policy import diagnostics_enabled
+    if diagnostics_enabled(model_row.id_incidence):
+      sa_model_diagnostics(model_row)
+
+  Notes:
+    - The request user is `request.remote_user` (set by an authenticating proxy), falling back to
+      the client address, since the portal has no login of its own.
+    - The decision is cached on `flask.g`, so every check in a request agrees (a sampled request
+      gets all of its diagnostics, not a random subset).
+"""
+import json
+import logging
+import os
+import random
+import threading
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable
+
+from flask import Flask, current_app, g, has_app_context, has_request_context, request
+
+logger = logging.getLogger(__name__)
+logger.debug(f'Loading File: "{Path(__file__).name}". Full Path: "{Path(__file__)}"')
+
+DIAGNOSTICS_MODES = ("off", "sampled", "always")
+
+_EXTENSION_KEY = "diagnostics_policy"
+
+
+@dataclass(frozen=True)
+class DiagnosticsPolicy:
+  """
+  When to run the form save diagnostics.
+
+  Attributes:
+    mode (str): One of DIAGNOSTICS_MODES.
+    sample_rate (float): Fraction of requests diagnosed in "sampled" mode (0.0-1.0).
+    users (frozenset[str]): Users whose requests are always diagnosed.
+    incidences (frozenset[int]): Incidence IDs whose requests are always diagnosed.
+  """
+  mode: str = "off"
+  sample_rate: float = 0.0
+  users: frozenset[str] = field(default_factory=frozenset)
+  incidences: frozenset[int] = field(default_factory=frozenset)
+
+  def __post_init__(self) -> None:
+    if self.mode not in DIAGNOSTICS_MODES:
+      raise ValueError(f"Unknown diagnostics mode {self.mode!r}; expected one of {DIAGNOSTICS_MODES}")
+    if not 0.0 <= self.sample_rate <= 1.0:
+      raise ValueError(f"sample_rate must be between 0 and 1, not {self.sample_rate}")
+
+  def should_diagnose(self,
+                      user: str | None = None,
+                      id_incidence: int | None = None,
+                      rng: Callable[[], float] | None = None) -> bool:
+    """
+    Decide whether a request is diagnosed.
+
+    Args:
+      user (str | None): Request user.
+      id_incidence (int | None): Incidence being edited.
+      rng (Callable[[], float] | None): Random source in [0, 1) for sampling (default: `random.random`).
+
+    Returns:
+      bool: True if diagnostics should run.
+
+    Examples:
+      Input : DiagnosticsPolicy("off", incidences=frozenset({42})).should_diagnose(id_incidence=42)
+      Output: True
+    """
+    if (user is not None and user in self.users) or (id_incidence is not None and id_incidence in self.incidences):
+      return True
+    if self.mode == "always":
+      return True
+    return self.mode == "sampled" and (rng or random.random)() < self.sample_rate
+
+  def to_dict(self) -> dict:
+    """Return the policy as JSON-serializable data."""
+    data = asdict(self)
+    data["users"] = sorted(self.users)
+    data["incidences"] = sorted(self.incidences)
+    return data
+
+  @classmethod
+  def from_dict(cls, data: dict) -> "DiagnosticsPolicy":
+    """
+    Build a policy from `to_dict()` output or form/config values.
+
+    Args:
+      data (dict): mode, sample_rate, and users/incidences as lists or comma-separated strings.
+
+    Returns:
+      DiagnosticsPolicy: The policy.
+
+    Raises:
+      ValueError: If a value is invalid.
+
+    Examples:
+      Input : {"mode": "sampled", "sample_rate": "0.05", "incidences": "12, 40"}
+      Output: DiagnosticsPolicy(mode='sampled', sample_rate=0.05, users=frozenset(), incidences=frozenset({12, 40}))
+    """
+
+    def _items(value) -> list[str]:
+      if isinstance(value, str):
+        value = value.split(",")
+      return [str(item).strip() for item in value or () if str(item).strip()]
+
+    return cls(mode=str(data.get("mode") or "off").strip().lower(),
+               sample_rate=float(data.get("sample_rate") or 0.0),
+               users=frozenset(_items(data.get("users"))),
+               incidences=frozenset(int(item) for item in _items(data.get("incidences"))))
+
+
+class DiagnosticsPolicyStore:
+  """
+  Process-safe holder of the current policy, shared between workers through a JSON file.
+
+  Args:
+    default (DiagnosticsPolicy): Policy used until one is saved.
+    path (Path | None): Policy file; None keeps runtime changes in this process only.
+
+  Examples:
+    store = DiagnosticsPolicyStore(DiagnosticsPolicy(), Path("instance/diagnostics_policy.json"))
+    store.set(DiagnosticsPolicy("always"))
+  """
+
+  def __init__(self, default: DiagnosticsPolicy, path: Path | None = None) -> None:
+    self.default = default
+    self.path = path
+    self._policy = default
+    self._mtime: float | None = None
+    self._lock = threading.Lock()
+    self.counters = {"requests": 0, "diagnosed": 0}
+
+  def get(self) -> DiagnosticsPolicy:
+    """Return the current policy, re-reading the policy file if another process changed it."""
+    if self.path is None:
+      return self._policy
+    try:
+      mtime = self.path.stat().st_mtime
+    except OSError:
+      return self._policy
+    if mtime != self._mtime:
+      with self._lock:
+        try:
+          self._policy = DiagnosticsPolicy.from_dict(json.loads(self.path.read_text()))
+        except (OSError, ValueError, TypeError) as e:
+          logger.warning(f"Ignoring unreadable diagnostics policy file {self.path}: {e}")
+        self._mtime = mtime
+    return self._policy
+
+  def set(self, policy: DiagnosticsPolicy) -> None:
+    """Make `policy` current in this process and, through the policy file, in every other worker."""
+    with self._lock:
+      self._policy = policy
+      if self.path is not None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(policy.to_dict()))
+        os.replace(tmp_path, self.path)
+        self._mtime = self.path.stat().st_mtime
+    logger.info(f"Diagnostics policy set to {policy.to_dict()}")
+
+  def record(self, diagnosed: bool) -> None:
+    """Count a policy decision."""
+    with self._lock:
+      self.counters["requests"] += 1
+      self.counters["diagnosed"] += int(diagnosed)
+
+
+def init_diagnostics_policy(app: Flask) -> DiagnosticsPolicyStore:
+  """
+  Create the diagnostics policy store from the app configuration.
+
+  Args:
+    app (Flask): Flask application.
+
+  Returns:
+    DiagnosticsPolicyStore: Store saved in `app.extensions["diagnostics_policy"]`.
+
+  Notes:
+    - Config keys: DIAGNOSTICS_MODE, DIAGNOSTICS_SAMPLE_RATE, DIAGNOSTICS_USERS,
+      DIAGNOSTICS_INCIDENCES, DIAGNOSTICS_POLICY_FILE (default: `<instance_path>/diagnostics_policy.json`).
+    - A saved policy file takes precedence over the configured default.
+  """
+  default = DiagnosticsPolicy.from_dict({
+    "mode": app.config.get("DIAGNOSTICS_MODE", "off"),
+    "sample_rate": app.config.get("DIAGNOSTICS_SAMPLE_RATE", 0.0),
+    "users": app.config.get("DIAGNOSTICS_USERS", ""),
+    "incidences": app.config.get("DIAGNOSTICS_INCIDENCES", ""),
+  })
+  path = app.config.get("DIAGNOSTICS_POLICY_FILE") or Path(app.instance_path) / "diagnostics_policy.json"
+  store = DiagnosticsPolicyStore(default, Path(path))
+  app.extensions[_EXTENSION_KEY] = store
+  logger.info(f"Diagnostics policy: {store.get().to_dict()} (file {store.path})")
+  return store
+
+
+def get_diagnostics_store() -> DiagnosticsPolicyStore | None:
+  """Return the current app's diagnostics policy store, or None outside an app or before init."""
+  if not has_app_context():
+    return None
+  return current_app.extensions.get(_EXTENSION_KEY)
+
+
+def request_user() -> str | None:
+  """Return the user of the current request (proxy-authenticated user, else client address)."""
+  if not has_request_context():
+    return None
+  return request.remote_user or request.remote_addr
+
+
+def diagnostics_enabled(id_incidence: int | None = None) -> bool:
+  """
+  Return whether the current request should run the optional diagnostics.
+
+  Args:
+    id_incidence (int | None): Incidence the request works on.
+
+  Returns:
+    bool: The policy decision, made once per request and cached on `flask.g`. Without a
+      configured store (e.g., scripts and unit tests), diagnostics stay on as before.
+  """
+  store = get_diagnostics_store()
+  if store is None:
+    return True
+  if has_request_context() and "diagnostics_enabled" in g:
+    return g.diagnostics_enabled
+  diagnosed = store.get().should_diagnose(request_user(), id_incidence)
+  store.record(diagnosed)
+  if has_request_context():
+    g.diagnostics_enabled = diagnosed
+  return diagnosed
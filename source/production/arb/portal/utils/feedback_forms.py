@@ -0,0 +1,51 @@
+"""
+  The feedback form class of each sector type, shared by every path that validates or serves a form.
+
+  The update page, field autosave, the client-side rules endpoint and bulk validation must agree
+  on which WTForms class checks a sector's data, so the mapping is defined once here.
+
+  Attributes:
+    FEEDBACK_FORMS (dict[str, type[FlaskForm]]): Sector type (see `sector_util.get_sector_type`) → form class.
+    FEEDBACK_FORMS_BY_SLUG (dict[str, type[FlaskForm]]): URL slug (e.g., "oil_and_gas") → form class.
+    logger (logging.Logger): Logger instance for this module.
+
+  Examples:
+    from arb.portal.utils.feedback_forms import FEEDBACK_FORMS
+    form_class = FEEDBACK_FORMS.get(sector_type)  # None for sectors without a feedback form
+
+  Notes:
+    - The slugs match the form templates (`feedback_<slug>.html`) and the `/form_rules/<slug>` URLs.
+"""
+import logging
+from pathlib import Path
+
+from flask_wtf import FlaskForm
+
+from arb.portal.wtf_landfill import LandfillFeedback
+from arb.portal.wtf_oil_and_gas import OGFeedback
+
+logger = logging.getLogger(__name__)
+logger.debug(f'Loading File: "{Path(__file__).name}". Full Path: "{Path(__file__)}"')
+
+FEEDBACK_FORMS: dict[str, type[FlaskForm]] = {"Oil & Gas": OGFeedback, "Landfill": LandfillFeedback}
+
+
+def feedback_form_slug(sector_type: str) -> str:
+  """
+  Return the URL/template slug of a sector type.
+
+  Args:
+    sector_type (str): Sector type with a feedback form.
+
+  Returns:
+    str: Lower-case slug with "&" spelled out.
+
+  Examples:
+    Input : "Oil & Gas"
+    Output: "oil_and_gas"
+  """
+  return "_".join(sector_type.replace("&", "and").lower().split())
+
+
+FEEDBACK_FORMS_BY_SLUG: dict[str, type[FlaskForm]] = {feedback_form_slug(sector_type): form_class
+                                                      for sector_type, form_class in FEEDBACK_FORMS.items()}
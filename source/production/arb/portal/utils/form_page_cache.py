@@ -0,0 +1,317 @@
+"""
+  Render cache and ETag revalidation for the feedback form update pages.
+
+  `GET /incidence_update/<id>/` builds the sector's feedback form, loads the stored record into it,
+  validates it and renders one of the (large) feedback templates, even when nothing about the page
+  has changed since the last view. This module caches the rendered page per incidence under a key
+  made of everything the page depends on:
+
+    - the template version (path, size and modification time of every template file),
+    - the rules version (drop-downs, form rules and form source; see `bulk_validation.rules_version`),
+    - the template, sector type and the request's role set,
+    - the incidence revision (latest `portal_updates` row) and a hash of its misc_json.
+
+  Every response carries a weak ETag derived from the key, so a browser revalidating an unchanged
+  incidence (`If-None-Match`) gets a 304 without the form being built or rendered.
+
+  CSRF tokens are per session and expire, so they are never cached: the current token is replaced
+  with a placeholder before a page is stored and substituted back when it is served, and the ETag
+  also covers the session's CSRF secret and a CSRF time window (half of WTF_CSRF_TIME_LIMIT), so a
+  304 never keeps a page whose token is invalid or about to expire.
+
+  Invalidation needs no bookkeeping: any write moves the revision or the document hash, so a stale
+  entry is never read again. The cache also listens to the incidence write events of
+  `arb.portal.utils.incidence_cache`, so the entries of an incidence are dropped as soon as a write
+  to it commits.
+
+  Attributes:
+    CSRF_PLACEHOLDER (str): Marker stored in cached pages in place of the CSRF token.
+    TEMPLATE_CHECK_SECONDS (float): Minimum seconds between template folder scans while templates auto-reload.
+    logger (logging.Logger): Logger instance for this module.
+
+  Examples:
+    from arb.portal.utils.form_page_cache import serve_form_page
+    return serve_form_page(model_row, 'feedback_landfill.html', 'Landfill', render)
+
+  Notes:
+    - Disable with FORM_PAGE_CACHE_ENABLED = False (the default in TestingConfig, or set the
+      FORM_PAGE_CACHE_ENABLED=false environment variable); pages are then always rendered.
+    - The portal has no roles of its own. If an authenticating proxy passes the user's roles in a
+      header (comma-separated), name it in FORM_PAGE_CACHE_ROLES_HEADER and pages are cached per role set.
+    - Requests with pending flash messages and requests selected for diagnostics are rendered
+      normally (and not stored), since their pages differ from the shared one.
+    - The cache is per process; each worker renders a page once before serving it from memory.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from flask import Flask, Response, current_app, has_app_context, make_response, request, session
+from flask_wtf.csrf import generate_csrf
+from sqlalchemy.ext.automap import AutomapBase
+
+from arb.portal.extensions import db
+from arb.portal.utils.autosave import incidence_revision
+from arb.portal.utils.incidence_cache import install_session_events, register_invalidation_target
+
+logger = logging.getLogger(__name__)
+logger.debug(f'Loading File: "{Path(__file__).name}". Full Path: "{Path(__file__)}"')
+
+CSRF_PLACEHOLDER = "__FORM_PAGE_CACHE_CSRF_TOKEN__"
+TEMPLATE_CHECK_SECONDS = 2.0
+
+_EXTENSION_KEY = "form_page_cache"
+
+
+class FormPageCache:
+  """
+  Thread-safe in-process LRU cache of rendered form pages with hit-rate metrics.
+
+  Args:
+    max_entries (int): Maximum cached pages before the least recently used is evicted.
+    enabled (bool): When False every request is rendered (nothing is stored).
+  """
+
+  def __init__(self, max_entries: int = 256, enabled: bool = True) -> None:
+    self.max_entries = max_entries
+    self.enabled = enabled
+    self._pages: OrderedDict[tuple[int, str], str] = OrderedDict()
+    self._template_versions: dict[int, tuple[float, str]] = {}
+    self._lock = threading.Lock()
+    self._counters = {"hits": 0, "misses": 0, "not_modified": 0, "bypassed": 0, "invalidations": 0}
+
+  def _count(self, name: str, amount: int = 1) -> None:
+    with self._lock:
+      self._counters[name] += amount
+
+  def get(self, id_: int, key: str) -> str | None:
+    """Return the cached page for an incidence and key, or None."""
+    with self._lock:
+      page = self._pages.get((id_, key))
+      if page is not None:
+        self._pages.move_to_end((id_, key))
+      return page
+
+  def set(self, id_: int, key: str, page: str) -> None:
+    """Store a page (with the CSRF token already replaced by CSRF_PLACEHOLDER)."""
+    with self._lock:
+      self._pages[(id_, key)] = page
+      self._pages.move_to_end((id_, key))
+      while len(self._pages) > self.max_entries:
+        self._pages.popitem(last=False)
+
+  def invalidate(self, ids: Iterable[int]) -> None:
+    """Drop every cached page of the given incidences (called when writes to them commit)."""
+    ids = {id_ for id_ in ids if id_ is not None}
+    with self._lock:
+      stale = [key for key in self._pages if key[0] in ids]
+      for key in stale:
+        del self._pages[key]
+      self._counters["invalidations"] += len(stale)
+
+  def template_version(self, app: Flask) -> str:
+    """
+    Return a hash of the app's template files (path, size, modification time).
+
+    Notes:
+      - Computed once per process or, while templates auto-reload (`configure_flask_app` turns this on),
+        at most every TEMPLATE_CHECK_SECONDS, so a template edit reaches the cache within that time.
+    """
+    now = time.monotonic()
+    with self._lock:
+      checked_at, version = self._template_versions.get(id(app), (0.0, None))
+    if version is None or (app.jinja_env.auto_reload and now - checked_at >= TEMPLATE_CHECK_SECONDS):
+      version = _template_files_version(app)
+      with self._lock:
+        self._template_versions[id(app)] = (now, version)
+    return version
+
+  def clear(self) -> None:
+    """Drop every page and reset the metrics."""
+    with self._lock:
+      self._pages.clear()
+      self._template_versions.clear()
+      self._counters = dict.fromkeys(self._counters, 0)
+
+  def stats(self) -> dict:
+    """
+    Return cache metrics.
+
+    Returns:
+      dict: enabled, size, max_entries, hits, misses, not_modified, bypassed, invalidations and
+      hit_rate ((hits + not_modified) / (hits + not_modified + misses), 0.0 before any lookup).
+    """
+    with self._lock:
+      counters = dict(self._counters)
+      size = len(self._pages)
+    served = counters["hits"] + counters["not_modified"]
+    lookups = served + counters["misses"]
+    return {"enabled": self.enabled, "size": size, "max_entries": self.max_entries, **counters,
+            "hit_rate": round(served / lookups, 4) if lookups else 0.0}
+
+  def __len__(self) -> int:
+    return len(self._pages)
+
+
+def _template_files_version(app: Flask) -> str:
+  """Hash the path, size and mtime of every file under the app's and blueprints' template folders."""
+  folders = [app.jinja_loader] + [blueprint.jinja_loader for blueprint in app.iter_blueprints()]
+  entries = []
+  for loader in folders:
+    for folder in getattr(loader, "searchpath", None) or []:
+      for directory, _, file_names in os.walk(folder):
+        for file_name in file_names:
+          stat = os.stat(os.path.join(directory, file_name))
+          entries.append(f"{directory}/{file_name}:{stat.st_size}:{stat.st_mtime_ns}")
+  entries.sort()
+  return hashlib.sha256("\n".join(entries).encode("utf-8")).hexdigest()[:16]
+
+
+def request_roles() -> tuple[str, ...]:
+  """
+  Return the sorted role set of the current request.
+
+  Returns:
+    tuple[str, ...]: Roles from the FORM_PAGE_CACHE_ROLES_HEADER request header, or () when the
+      header is not configured (the portal has no roles of its own).
+  """
+  header = current_app.config.get("FORM_PAGE_CACHE_ROLES_HEADER")
+  if not header:
+    return ()
+  return tuple(sorted({role.strip() for role in request.headers.get(header, "").split(",") if role.strip()}))
+
+
+def form_page_key(cache: FormPageCache, model_row: AutomapBase, template_file: str, sector_type: str) -> str:
+  """
+  Return the cache key of an incidence's update page.
+
+  Args:
+    cache (FormPageCache): Cache supplying the template version.
+    model_row (AutomapBase): The incidence row (for its ID and misc_json).
+    template_file (str): Feedback template the page is rendered with.
+    sector_type (str): Sector type that selected the form.
+
+  Returns:
+    str: Hex digest of the template version, rules version, template, sector type, role set,
+      incidence revision and misc_json hash.
+  """
+  # Imported here because the feedback forms require Globals to be initialized (see `incidence_prep`)
+  from arb.portal.utils.bulk_validation import document_hash, rules_version
+
+  parts = [
+    cache.template_version(current_app._get_current_object()),
+    rules_version(),
+    template_file,
+    sector_type,
+    ",".join(request_roles()),
+    str(incidence_revision(db.session, model_row.id_incidence)),
+    document_hash(model_row.misc_json),
+  ]
+  return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()[:32]
+
+
+def _csrf_scope() -> str:
+  """Return the session's CSRF secret and time window, which cached pages' ETags must also match."""
+  config = current_app.config
+  if not config.get("WTF_CSRF_ENABLED", True):
+    return ""
+  secret = session.get(config.get("WTF_CSRF_FIELD_NAME", "csrf_token"), "")
+  time_limit = config.get("WTF_CSRF_TIME_LIMIT", 3600)
+  window = int(time.time() // max(time_limit / 2, 1)) if time_limit else 0
+  return f"{secret}:{window}"
+
+
+def _page_response(page: str, etag: str) -> Response:
+  response = make_response(page)
+  response.set_etag(etag, weak=True)
+  response.headers["Cache-Control"] = "private, no-cache"
+  return response
+
+
+def serve_form_page(model_row: AutomapBase,
+                    template_file: str,
+                    sector_type: str,
+                    render: Callable[[], Any]) -> Any:
+  """
+  Serve an incidence's update page from the render cache, or as a 304 if the browser's copy is current.
+
+  Args:
+    model_row (AutomapBase): The incidence row.
+    template_file (str): Feedback template the page is rendered with.
+    sector_type (str): Sector type that selected the form.
+    render (Callable[[], Any]): Builds, validates and renders the page (called on a miss).
+
+  Returns:
+    Any: A 304 response, a response with the cached or freshly rendered page and its ETag, or
+      whatever `render()` returns when the cache is bypassed (or the result is not a page).
+
+  Examples:
+    return serve_form_page(model_row, template_file, sector_type,
+                           lambda: render_template(template_file, wtf_form=wtf_form, ...))
+  """
+  cache = get_form_page_cache()
+  if cache is None or not cache.enabled or session.get("_flashes"):
+    if cache is not None:
+      cache._count("bypassed")
+    return render()
+
+  csrf_token = generate_csrf() if current_app.config.get("WTF_CSRF_ENABLED", True) else None
+  key = form_page_key(cache, model_row, template_file, sector_type)
+  etag = hashlib.sha256(f"{key}:{_csrf_scope()}".encode("utf-8")).hexdigest()[:32]
+
+  if request.if_none_match.contains_weak(etag):
+    cache._count("not_modified")
+    response = _page_response("", etag)
+    response.status_code = 304
+    return response
+
+  page = cache.get(model_row.id_incidence, key)
+  if page is None:
+    cache._count("misses")
+    rendered = render()
+    if not isinstance(rendered, str):
+      return rendered
+    page = rendered.replace(csrf_token, CSRF_PLACEHOLDER) if csrf_token else rendered
+    cache.set(model_row.id_incidence, key, page)
+  else:
+    cache._count("hits")
+  return _page_response(page.replace(CSRF_PLACEHOLDER, csrf_token or ""), etag)
+
+
+def init_form_page_cache(app: Flask) -> FormPageCache:
+  """
+  Create the app's form page cache from its configuration and subscribe it to incidence writes.
+
+  Args:
+    app (Flask): Flask application.
+
+  Returns:
+    FormPageCache: The cache stored in `app.extensions["form_page_cache"]`.
+
+  Examples:
+    init_form_page_cache(app)
+
+  Notes:
+    - Config keys: FORM_PAGE_CACHE_ENABLED, FORM_PAGE_CACHE_MAX_ENTRIES, FORM_PAGE_CACHE_ROLES_HEADER.
+  """
+  cache = FormPageCache(int(app.config.get("FORM_PAGE_CACHE_MAX_ENTRIES", 256)),
+                        enabled=bool(app.config.get("FORM_PAGE_CACHE_ENABLED", True)))
+  app.extensions[_EXTENSION_KEY] = cache
+  register_invalidation_target(cache)
+  install_session_events()
+  logger.info(f"Form page cache: enabled={cache.enabled}, max_entries={cache.max_entries}")
+  return cache
+
+
+def get_form_page_cache() -> FormPageCache | None:
+  """
+  Return the current app's form page cache, or None outside an app context or if not initialized.
+  """
+  if not has_app_context():
+    return None
+  return current_app.extensions.get(_EXTENSION_KEY)
@@ -0,0 +1,348 @@
+"""
+  Declarative contingent-field and cross-field rules for the feedback forms.
+
+  The rules that decide which fields are required (e.g., "OGI date is required if OGI was
+  performed") and the cross-field consistency checks (e.g., "OGI date must be after the plume
+  observation") are declared once per form as data (`FormRules`). The server applies them during
+  `validate()`, and the same declaration is exported as a versioned JSON contract
+  (`rules_contract()`, served at `/form_rules/<sector>`) that `static/js/form_rules.js`
+  evaluates live in the browser, so most corrections no longer need a full POST and re-render.
+
+  Conditions are JSON-compatible dicts built with the helpers below:
+
+    {"field": "ogi_performed", "op": "eq", "value": "Yes"}
+    {"field": "ogi_result", "op": "in", "values": ["Unintentional-leak"]}
+    {"field": "ogi_date", "op": "present"}
+    {"field": "ogi_date", "op": "earlier_than", "other": "observation_timestamp"}
+    {"field": "emission_cause_secondary", "op": "in_fields", "fields": ["emission_cause"]}
+    {"all": [...]}, {"any": [...]}, {"not": {...}}
+
+  Attributes:
+    RULES_SCHEMA_VERSION (int): Version of the contract format (bumped on incompatible changes).
+    logger (logging.Logger): Logger instance for this module.
+
+  Examples:
+    form_rules = FormRules(
+      requirements=(Requirement(eq("ogi_performed", "Yes"), require=("ogi_date", "ogi_result")),),
+      checks=(Check(all_of(eq("ogi_performed", "No"), present("ogi_date")), "ogi_date",
+                    "Can't have an OGI inspection date if OGI was not performed"),),
+    )
+    apply_requirement_rules(form, form_rules)   # before super().validate()
+    apply_check_rules(form, form_rules)         # after super().validate()
+
+  Notes:
+    - Requirement rules are applied in order with `change_validators_on_test()` semantics: when the
+      condition holds, `require` fields become required and `optional` fields optional; when it
+      does not, the reverse. Only fields declared with InputRequired or Optional can switch.
+    - "present" means a non-empty value; for numeric fields zero counts as absent, matching the
+      truthiness test the forms used before the rules were declarative.
+    - The browser sees input strings while the server sees coerced field data. The ops are
+      restricted to ones that agree on both (string equality for selects, ISO order for the
+      datetime-local values), which the parity tests verify on the `db_hardcoded` dummy payloads.
+"""
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from flask_wtf import FlaskForm
+from wtforms import DateTimeLocalField, DecimalField, FloatField, IntegerField, SelectField
+from wtforms.fields.core import UnboundField
+from wtforms.validators import InputRequired, Optional
+
+from arb.utils.wtf_forms_util import change_validators_on_test
+
+logger = logging.getLogger(__name__)
+logger.debug(f'Loading File: "{Path(__file__).name}". Full Path: "{Path(__file__)}"')
+
+RULES_SCHEMA_VERSION = 1
+
+_contract_cache: dict[type, dict] = {}
+
+
+def eq(field_name: str, value: str) -> dict:
+  """Condition: the field equals `value`."""
+  return {"field": field_name, "op": "eq", "value": value}
+
+
+def ne(field_name: str, value: str) -> dict:
+  """Condition: the field does not equal `value`."""
+  return {"field": field_name, "op": "ne", "value": value}
+
+
+def is_in(field_name: str, values: list[str]) -> dict:
+  """Condition: the field is one of `values`."""
+  return {"field": field_name, "op": "in", "values": list(values)}
+
+
+def not_in(field_name: str, values: list[str]) -> dict:
+  """Condition: the field is none of `values`."""
+  return {"field": field_name, "op": "not_in", "values": list(values)}
+
+
+def present(field_name: str) -> dict:
+  """Condition: the field has a value (see module notes)."""
+  return {"field": field_name, "op": "present"}
+
+
+def earlier_than(field_name: str, other: str) -> dict:
+  """Condition: both fields have values and the field's value is earlier than `other`'s."""
+  return {"field": field_name, "op": "earlier_than", "other": other}
+
+
+def in_fields(field_name: str, fields: list[str]) -> dict:
+  """Condition: the field equals the value of one of `fields`."""
+  return {"field": field_name, "op": "in_fields", "fields": list(fields)}
+
+
+def all_of(*conditions: dict) -> dict:
+  """Condition: every sub-condition holds."""
+  return {"all": list(conditions)}
+
+
+def any_of(*conditions: dict) -> dict:
+  """Condition: at least one sub-condition holds."""
+  return {"any": list(conditions)}
+
+
+def negate(condition: dict) -> dict:
+  """Condition: the sub-condition does not hold."""
+  return {"not": condition}
+
+
+@dataclass(frozen=True)
+class Requirement:
+  """
+  Contingent requirement rule.
+
+  Attributes:
+    when (dict): Condition.
+    require (tuple[str, ...]): Fields required when the condition holds (optional otherwise).
+    optional (tuple[str, ...]): Fields optional when the condition holds (required otherwise).
+  """
+  when: dict
+  require: tuple[str, ...] = ()
+  optional: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class Check:
+  """
+  Cross-field consistency check.
+
+  Attributes:
+    when (dict): Condition that identifies an inconsistent response.
+    field (str): Field that receives the error message.
+    message (str): Error message.
+  """
+  when: dict
+  field: str
+  message: str
+
+
+@dataclass(frozen=True)
+class FormRules:
+  """
+  Declarative rules for one form.
+
+  Attributes:
+    requirements (tuple[Requirement, ...]): Contingent requirement rules, applied in order.
+    checks (tuple[Check, ...]): Cross-field checks, reported in order.
+  """
+  requirements: tuple[Requirement, ...] = ()
+  checks: tuple[Check, ...] = ()
+
+  def to_dict(self) -> dict:
+    """Return the rules as JSON-serializable data."""
+    return {
+      "requirements": [{"when": rule.when, "require": list(rule.require), "optional": list(rule.optional)}
+                       for rule in self.requirements],
+      "checks": [{"when": rule.when, "field": rule.field, "message": rule.message} for rule in self.checks],
+    }
+
+
+def _is_present(value: Any) -> bool:
+  if isinstance(value, str):
+    return value != ""
+  return bool(value)
+
+
+def evaluate(condition: dict, values: dict[str, Any]) -> bool:
+  """
+  Evaluate a condition against field values.
+
+  Args:
+    condition (dict): Condition built with the helpers in this module.
+    values (dict[str, Any]): Field name → field data.
+
+  Returns:
+    bool: True if the condition holds.
+
+  Raises:
+    ValueError: If the condition uses an unknown op.
+
+  Examples:
+    Input : evaluate(eq("ogi_performed", "Yes"), {"ogi_performed": "Yes"})
+    Output: True
+  """
+  if "all" in condition:
+    return all(evaluate(sub, values) for sub in condition["all"])
+  if "any" in condition:
+    return any(evaluate(sub, values) for sub in condition["any"])
+  if "not" in condition:
+    return not evaluate(condition["not"], values)
+
+  op = condition["op"]
+  value = values.get(condition["field"])
+  if op == "eq":
+    return value == condition["value"]
+  if op == "ne":
+    return value != condition["value"]
+  if op == "in":
+    return value in condition["values"]
+  if op == "not_in":
+    return value not in condition["values"]
+  if op == "present":
+    return _is_present(value)
+  if op == "earlier_than":
+    other = values.get(condition["other"])
+    return _is_present(value) and _is_present(other) and value < other
+  if op == "in_fields":
+    return value in [values.get(name) for name in condition["fields"]]
+  raise ValueError(f"Unknown form rule op {op!r}")
+
+
+def form_values(form: FlaskForm) -> dict[str, Any]:
+  """Return field name → current field data for evaluating rules against a form."""
+  return {name: form_field.data for name, form_field in form._fields.items()}
+
+
+def apply_requirement_rules(form: FlaskForm, rules: FormRules) -> None:
+  """
+  Switch the InputRequired/Optional validators of a form according to its requirement rules.
+
+  Args:
+    form (FlaskForm): Form whose field data is set.
+    rules (FormRules): The form's rules.
+  """
+  values = form_values(form)
+  for rule in rules.requirements:
+    change_validators_on_test(form, evaluate(rule.when, values), list(rule.require), list(rule.optional))
+
+
+def check_errors(rules: FormRules, values: dict[str, Any]) -> dict[str, list[str]]:
+  """
+  Return the cross-field check errors for a set of field values.
+
+  Args:
+    rules (FormRules): The form's rules.
+    values (dict[str, Any]): Field name → field data.
+
+  Returns:
+    dict[str, list[str]]: Field name → error messages, in rule order.
+  """
+  errors: dict[str, list[str]] = {}
+  for rule in rules.checks:
+    if evaluate(rule.when, values):
+      errors.setdefault(rule.field, []).append(rule.message)
+  return errors
+
+
+def apply_check_rules(form: FlaskForm, rules: FormRules) -> None:
+  """
+  Append the cross-field check errors to the form's field errors.
+
+  Args:
+    form (FlaskForm): Form that has been through field-level validation.
+    rules (FormRules): The form's rules.
+  """
+  for field_name, messages in check_errors(rules, form_values(form)).items():
+    form[field_name].errors.extend(messages)
+
+
+def _field_type(field_class: type) -> str:
+  if issubclass(field_class, DateTimeLocalField):
+    return "datetime"
+  if issubclass(field_class, (DecimalField, FloatField, IntegerField)):
+    return "number"
+  if issubclass(field_class, SelectField):
+    return "select"
+  return "text"
+
+
+def _declared_fields(form_class: type[FlaskForm]) -> list[tuple[str, UnboundField]]:
+  unbound = [(name, value) for name in dir(form_class)
+             if isinstance(value := getattr(form_class, name, None), UnboundField)]
+  return sorted(unbound, key=lambda item: item[1].creation_counter)
+
+
+def field_specs(form_class: type[FlaskForm]) -> dict[str, dict]:
+  """
+  Describe the fields of a form class for the rules contract.
+
+  Args:
+    form_class (type[FlaskForm]): Form class.
+
+  Returns:
+    dict[str, dict]: Field name → {"type", "required", "switchable"} in declaration order, where
+      `required` is the declared state and `switchable` tells whether requirement rules can change it.
+  """
+  specs = {}
+  for name, unbound in _declared_fields(form_class):
+    validators = unbound.kwargs.get("validators") or []
+    required = any(isinstance(validator, InputRequired) for validator in validators)
+    specs[name] = {
+      "type": _field_type(unbound.field_class),
+      "required": required,
+      "switchable": required or any(isinstance(validator, Optional) for validator in validators),
+    }
+  return specs
+
+
+def required_fields(rules: FormRules, specs: dict[str, dict], values: dict[str, Any]) -> set[str]:
+  """
+  Return the fields required after the requirement rules are applied.
+
+  Args:
+    rules (FormRules): The form's rules.
+    specs (dict[str, dict]): Output of `field_specs()`.
+    values (dict[str, Any]): Field name → field data.
+
+  Returns:
+    set[str]: Required field names (mirrors what `apply_requirement_rules()` does to validators).
+  """
+  required = {name for name, spec in specs.items() if spec["required"]}
+  for rule in rules.requirements:
+    holds = evaluate(rule.when, values)
+    for names, becomes_required in ((rule.require, holds), (rule.optional, not holds)):
+      for name in names:
+        if specs.get(name, {}).get("switchable"):
+          (required.add if becomes_required else required.discard)(name)
+  return required
+
+
+def rules_contract(form_class: type[FlaskForm]) -> dict:
+  """
+  Return the versioned JSON contract for a form class's rules.
+
+  Args:
+    form_class (type[FlaskForm]): Form class with a `form_rules` attribute.
+
+  Returns:
+    dict: {"form", "schema_version", "version", "fields", "requirements", "checks"}; `version`
+      is a digest of the content, so it changes whenever a rule or field declaration changes.
+
+  Notes:
+    - Built once per form class and cached for the life of the process.
+  """
+  contract = _contract_cache.get(form_class)
+  if contract is None:
+    body = {"form": form_class.__name__, "schema_version": RULES_SCHEMA_VERSION,
+            "fields": field_specs(form_class), **form_class.form_rules.to_dict()}
+    digest = hashlib.sha256(json.dumps(body, sort_keys=True).encode()).hexdigest()[:16]
+    contract = {**body, "version": f"{RULES_SCHEMA_VERSION}-{digest}"}
+    _contract_cache[form_class] = contract
+  return contract
+
@@ -0,0 +1,134 @@
+"""
+  Single-pass, memoized validation of the feedback forms.
+
+  `OGFeedback.validate()` and `LandfillFeedback.validate()` re-run the contingent-field and
+  cross-field logic every time they are called, and `incidence_prep()` counted the errors again
+  for each consumer. `validate_form()` validates a form once, captures everything the request
+  needs in a `FormValidationResult`, and stores it on the form instance so later calls in the
+  same request (a form lives for one request) reuse it.
+
+  Attributes:
+    logger (logging.Logger): Logger instance for this module.
+
+  Examples:
+    from arb.portal.utils.form_validation import validate_form
+    result = validate_form(wtf_form, skip_csrf=True)
+    result.error_counts["total_error_count"]
+    result.section_error_counts  # {"Section 3": 0, "Section 6": 2, ...}
+
+  Notes:
+    - Forms declare their sections with a `section_starts` class attribute mapping the first field
+      of each section (in declaration order) to the section name used by the template.
+    - Call `validate_form()` after the form's data is final; changing field data afterwards does
+      not re-validate (that is the point of the memo).
+"""
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from flask_wtf import FlaskForm
+from wtforms.validators import InputRequired
+
+from arb.utils.wtf_forms_util import validate_no_csrf, wtf_count_errors
+
+logger = logging.getLogger(__name__)
+logger.debug(f'Loading File: "{Path(__file__).name}". Full Path: "{Path(__file__)}"')
+
+_MEMO_ATTRIBUTE = "_validation_result"
+
+
+@dataclass(frozen=True)
+class FormValidationResult:
+  """
+  Outcome of validating a feedback form once.
+
+  Attributes:
+    valid (bool): True if no field or form-level errors remain.
+    field_errors (dict[str | None, list[str]]): Errors by field name (None for form-level errors).
+    error_counts (dict[str, int]): Counts in the `wtf_count_errors()` format used by the templates.
+    section_error_counts (dict[str, int]): Field errors per form section, in form order.
+    required_fields (frozenset[str]): Fields required after the contingent-field rules were applied.
+  """
+  valid: bool
+  field_errors: dict[str | None, list[str]]
+  error_counts: dict[str, int]
+  section_error_counts: dict[str, int] = field(default_factory=dict)
+  required_fields: frozenset[str] = field(default_factory=frozenset)
+
+  @property
+  def total_errors(self) -> int:
+    """Total number of field and form-level errors."""
+    return self.error_counts["total_error_count"]
+
+
+def form_sections(form: FlaskForm) -> dict[str, str]:
+  """
+  Map each field of a form to its section.
+
+  Args:
+    form (FlaskForm): Form whose class may define `section_starts`.
+
+  Returns:
+    dict[str, str]: Field name → section name; empty if the form declares no sections.
+
+  Examples:
+    Input : OGFeedback()
+    Output: {"id_incidence": "Section 3", "id_plume": "Section 3", ..., "carb_notes": "Section A"}
+  """
+  section_starts = getattr(type(form), "section_starts", None) or {}
+  sections = {}
+  current = None
+  for name in form._fields:
+    current = section_starts.get(name, current)
+    if current is not None:
+      sections[name] = current
+  return sections
+
+
+def validate_form(form: FlaskForm,
+                  skip_csrf: bool = False,
+                  extra_validators: dict | None = None,
+                  log_errors: bool = False) -> FormValidationResult:
+  """
+  Validate a form once and return the memoized result on later calls.
+
+  Args:
+    form (FlaskForm): Form to validate.
+    skip_csrf (bool): Ignore CSRF token errors (used when validating GET-rendered data).
+    extra_validators (dict | None): Additional per-field validators (first call only).
+    log_errors (bool): Log the form errors at debug level (first call only).
+
+  Returns:
+    FormValidationResult: The validation result for this form instance.
+
+  Examples:
+    result = validate_form(wtf_form)
+    if result.total_errors == 0:
+      flash("Saved")
+  """
+  memo = getattr(form, _MEMO_ATTRIBUTE, None)
+  if memo is not None:
+    return memo
+
+  if skip_csrf:
+    valid = validate_no_csrf(form, extra_validators=extra_validators)
+  else:
+    valid = form.validate(extra_validators=extra_validators)
+
+  field_errors = {name: list(errors) for name, errors in form.errors.items()}
+  sections = form_sections(form)
+  section_error_counts = dict.fromkeys(dict.fromkeys(sections.values()), 0)
+  for name, errors in field_errors.items():
+    if name in sections:
+      section_error_counts[sections[name]] += len(errors)
+
+  result = FormValidationResult(
+    valid=valid,
+    field_errors=field_errors,
+    error_counts=wtf_count_errors(form, log_errors=log_errors),
+    section_error_counts=section_error_counts,
+    required_fields=frozenset(name for name, form_field in form._fields.items()
+                              if any(isinstance(validator, InputRequired) for validator in form_field.validators)),
+  )
+  setattr(form, _MEMO_ATTRIBUTE, result)
+  return result
@@ -39,7 +39,6 @@ Notes:
     - Perfect separation of concerns enables surgical unit testing
 """
 
-import json
 import logging
 from dataclasses import dataclass
 from datetime import datetime
@@ -59,6 +58,8 @@ from arb.portal.utils.result_types import (
     FileConversionResult,
     IdValidationResult
 )
+from arb.utils.io_wrappers import save_json_safely
+from arb.utils.json_codec import get_json_codec
 
 logger = logging.getLogger(__name__)
 
@@ -265,12 +266,11 @@ class InMemoryStaging:
                 # TODO: Add base_misc_json for comparison during review
             }
             
-            # Ensure staging directory exists
-            staging_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Write staging file
-            with open(staged_file_path, 'w', encoding='utf-8') as f:
-                json.dump(staging_data, f, indent=2, ensure_ascii=False, default=str)
+            # Write staging file atomically (creates the staging directory if needed) so that
+            # list_staged/review_staged never observe a partially written file
+            save_json_safely(staging_data, staged_file_path,
+                             json_options={"indent": 2, "ensure_ascii": False, "default": str},
+                             codec=get_json_codec())
             
             logger.info(f"Successfully created staging file: {staged_filename}")
             return StagedFileResult(
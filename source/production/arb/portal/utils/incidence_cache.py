@@ -0,0 +1,461 @@
+"""
+  Read-through cache of incidence `misc_json` and sector, invalidated when writes commit.
+
+  Several routes (`incidence_update`, `review_staged`, ...) load the same incidence row and its
+  `sources` sector on every request. This module keeps those reads in a small cache keyed by
+  `id_incidence` and a per-incidence revision:
+
+    - Reads go through `get_cached_incidence(id_, loader)`; on a miss the loader runs and the
+      result is stored under the incidence's current revision.
+    - SQLAlchemy session events collect the incidences touched by each flush (ORM changes to
+      `incidences` rows and new `portal_updates` rows) plus any ids marked with
+      `mark_incidence_changed()` by Core/text write paths. On `after_commit` their revisions are
+      bumped, so older entries are never read again; on rollback the pending set is discarded.
+
+  Backends:
+    - Redis: set INCIDENCE_CACHE_REDIS_URL and install `redis`. Revisions and entries are shared,
+      so a commit in any worker invalidates every worker's reads. The cache is enabled by default
+      only when this URL is set.
+    - In-process: a thread-safe LRU dictionary with a TTL. Revisions are bumped only in the
+      process that commits, so enable it (INCIDENCE_CACHE_ENABLED=true without a Redis URL) only
+      for single-process servers.
+
+  Attributes:
+    INCIDENCE_TABLE (str): Table whose rows are cached.
+    logger (logging.Logger): Logger instance for this module.
+
+  Examples:
+    from arb.portal.utils.incidence_cache import get_cached_incidence, get_incidence_cache
+    entry = get_cached_incidence(123, lambda: load_row(123))
+    get_incidence_cache().stats()  # {'hits': 10, 'misses': 2, 'hit_rate': 0.83, ...}
+
+  Notes:
+    - When disabled (INCIDENCE_CACHE_ENABLED = False, the default without a Redis URL and in
+      TestingConfig) reads always run the loader.
+    - Only use cached data for display and review. Write paths (e.g., `confirm_staged`) must read
+      the row from the session.
+    - `sources` rows are written by other systems, so a sector change there is only picked up
+      after the entry's TTL expires.
+"""
+import copy
+import json
+import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from flask import Flask, current_app, has_app_context
+from sqlalchemy import event, inspect as sa_inspect
+from sqlalchemy.orm import Session
+
+from arb.portal.sqla_models import PortalUpdate
+
+try:
+  import redis
+except ImportError:  # pragma: no cover - depends on the environment
+  redis = None
+
+logger = logging.getLogger(__name__)
+logger.debug(f'Loading File: "{Path(__file__).name}". Full Path: "{Path(__file__)}"')
+
+INCIDENCE_TABLE = "incidences"
+
+_PENDING_KEY = "incidence_cache_pending"
+_EXTENSION_KEY = "incidence_cache"
+# Caches invalidated when incidence writes commit (IncidenceCache and other `invalidate(ids)` targets)
+_CACHES: weakref.WeakSet = weakref.WeakSet()
+_events_installed = False
+
+
+@dataclass(frozen=True)
+class CachedIncidence:
+  """
+  Cached view of one incidence row.
+
+  Attributes:
+    id_incidence (int): Incidence ID.
+    misc_json (dict): The row's misc_json (callers receive their own copy).
+    sector_by_foreign_key (str | None): Sector from the `sources` table, if linked.
+  """
+  id_incidence: int
+  misc_json: dict = field(default_factory=dict)
+  sector_by_foreign_key: str | None = None
+
+  def to_payload(self) -> dict:
+    """Return a JSON-serializable representation for cache backends."""
+    return {"id_incidence": self.id_incidence, "misc_json": self.misc_json,
+            "sector_by_foreign_key": self.sector_by_foreign_key}
+
+  @classmethod
+  def from_payload(cls, payload: dict) -> "CachedIncidence":
+    """Rebuild an entry from `to_payload()` output, copying the document."""
+    return cls(payload["id_incidence"], copy.deepcopy(payload["misc_json"] or {}), payload["sector_by_foreign_key"])
+
+
+class InMemoryIncidenceBackend:
+  """
+  Thread-safe in-process LRU store of cache payloads with per-incidence revision counters.
+
+  Args:
+    max_entries (int): Maximum cached incidences before the least recently used is evicted.
+    ttl_seconds (float): Seconds an entry stays valid (0 disables expiry).
+
+  Notes:
+    - The revision counters live in this process only. A commit bumps the counters of the
+      worker that made it; other workers would keep serving their entry until it expires, so
+      this backend is only used by single-process servers (see `init_incidence_cache`).
+    - `clear()` (the show_incidence_cache POST) likewise clears only the worker that serves it.
+  """
+  name = "memory"
+
+  def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300) -> None:
+    self.max_entries = max_entries
+    self.ttl_seconds = ttl_seconds
+    self._entries: OrderedDict[tuple[int, int], tuple[float, dict]] = OrderedDict()
+    self._revisions: dict[int, int] = {}
+    self._lock = threading.Lock()
+
+  def revision(self, id_: int) -> int:
+    with self._lock:
+      return self._revisions.get(id_, 0)
+
+  def bump(self, ids: Iterable[int]) -> None:
+    with self._lock:
+      for id_ in ids:
+        self._revisions[id_] = self._revisions.get(id_, 0) + 1
+        for key in [key for key in self._entries if key[0] == id_]:
+          del self._entries[key]
+
+  def get(self, key: tuple[int, int]) -> dict | None:
+    with self._lock:
+      item = self._entries.get(key)
+      if item is None:
+        return None
+      stored_at, payload = item
+      if self.ttl_seconds and time.monotonic() - stored_at > self.ttl_seconds:
+        del self._entries[key]
+        return None
+      self._entries.move_to_end(key)
+      return payload
+
+  def set(self, key: tuple[int, int], payload: dict) -> None:
+    with self._lock:
+      self._entries[key] = (time.monotonic(), copy.deepcopy(payload))
+      self._entries.move_to_end(key)
+      while len(self._entries) > self.max_entries:
+        self._entries.popitem(last=False)
+
+  def clear(self) -> None:
+    with self._lock:
+      self._entries.clear()
+      self._revisions.clear()
+
+  def __len__(self) -> int:
+    return len(self._entries)
+
+
+class RedisIncidenceBackend:
+  """
+  Redis store shared by all worker processes.
+
+  Args:
+    url (str): Redis URL (e.g., "redis://localhost:6379/0").
+    ttl_seconds (float): Seconds an entry stays valid.
+    prefix (str): Key prefix.
+
+  Raises:
+    RuntimeError: If the `redis` package is not installed.
+  """
+  name = "redis"
+
+  def __init__(self, url: str, ttl_seconds: float = 300, prefix: str = "feedback_portal:incidence:") -> None:
+    if redis is None:
+      raise RuntimeError("INCIDENCE_CACHE_REDIS_URL is set but the redis package is not installed")
+    self.client = redis.Redis.from_url(url)
+    self.ttl_seconds = int(ttl_seconds) or None
+    self.prefix = prefix
+
+  def revision(self, id_: int) -> int:
+    return int(self.client.get(f"{self.prefix}{id_}:rev") or 0)
+
+  def bump(self, ids: Iterable[int]) -> None:
+    pipeline = self.client.pipeline()
+    for id_ in ids:
+      pipeline.incr(f"{self.prefix}{id_}:rev")
+    pipeline.execute()
+
+  def get(self, key: tuple[int, int]) -> dict | None:
+    raw = self.client.get(f"{self.prefix}{key[0]}:{key[1]}")
+    return json.loads(raw) if raw else None
+
+  def set(self, key: tuple[int, int], payload: dict) -> None:
+    self.client.set(f"{self.prefix}{key[0]}:{key[1]}", json.dumps(payload), ex=self.ttl_seconds)
+
+  def clear(self) -> None:
+    for key in self.client.scan_iter(f"{self.prefix}*"):
+      self.client.delete(key)
+
+  def __len__(self) -> int:
+    return sum(1 for key in self.client.scan_iter(f"{self.prefix}*") if not key.endswith(b":rev"))
+
+
+class IncidenceCache:
+  """
+  Read-through incidence cache with hit-rate metrics.
+
+  Args:
+    backend (InMemoryIncidenceBackend | RedisIncidenceBackend): Payload store.
+    enabled (bool): When False every read runs the loader (nothing is stored).
+
+  Examples:
+    cache = IncidenceCache(InMemoryIncidenceBackend())
+    entry = cache.get(123, loader)
+  """
+
+  def __init__(self, backend: Any, enabled: bool = True) -> None:
+    self.backend = backend
+    self.enabled = enabled
+    self._lock = threading.Lock()
+    self._counters = {"hits": 0, "misses": 0, "bypassed": 0, "invalidations": 0, "errors": 0}
+    register_invalidation_target(self)
+
+  def _count(self, name: str, amount: int = 1) -> None:
+    with self._lock:
+      self._counters[name] += amount
+
+  def get(self, id_: int, loader: Callable[[], CachedIncidence | None]) -> CachedIncidence | None:
+    """
+    Return the cached entry for an incidence, loading and storing it on a miss.
+
+    Args:
+      id_ (int): Incidence ID.
+      loader (Callable[[], CachedIncidence | None]): Reads the incidence from the database;
+        returns None if the row does not exist (missing rows are not cached).
+
+    Returns:
+      CachedIncidence | None: The entry (with its own copy of misc_json), or None if not found.
+    """
+    if not self.enabled:
+      self._count("bypassed")
+      return loader()
+
+    try:
+      key = (id_, self.backend.revision(id_))
+      payload = self.backend.get(key)
+    except Exception as e:
+      logger.warning(f"Incidence cache read failed for {id_}: {e}")
+      self._count("errors")
+      return loader()
+
+    if payload is not None:
+      self._count("hits")
+      return CachedIncidence.from_payload(payload)
+
+    self._count("misses")
+    entry = loader()
+    if entry is not None:
+      try:
+        self.backend.set(key, entry.to_payload())
+      except Exception as e:
+        logger.warning(f"Incidence cache write failed for {id_}: {e}")
+        self._count("errors")
+      entry = CachedIncidence.from_payload(entry.to_payload())
+    return entry
+
+  def invalidate(self, ids: Iterable[int]) -> None:
+    """Bump the revision of each incidence so existing entries are no longer read."""
+    ids = sorted({id_ for id_ in ids if id_ is not None})
+    if not ids:
+      return
+    try:
+      self.backend.bump(ids)
+    except Exception as e:
+      logger.warning(f"Incidence cache invalidation failed for {ids}: {e}")
+      self._count("errors")
+      return
+    self._count("invalidations", len(ids))
+
+  def clear(self) -> None:
+    """Drop every entry and reset the metrics."""
+    self.backend.clear()
+    with self._lock:
+      self._counters = dict.fromkeys(self._counters, 0)
+
+  def stats(self) -> dict:
+    """
+    Return cache metrics.
+
+    Returns:
+      dict: enabled, backend, size, hits, misses, bypassed, invalidations, errors, and
+      hit_rate (hits / (hits + misses), 0.0 before any lookup).
+    """
+    with self._lock:
+      counters = dict(self._counters)
+    lookups = counters["hits"] + counters["misses"]
+    try:
+      size = len(self.backend)
+    except Exception:
+      size = None
+    return {"enabled": self.enabled, "backend": self.backend.name, "size": size, **counters,
+            "hit_rate": round(counters["hits"] / lookups, 4) if lookups else 0.0}
+
+
+def register_invalidation_target(target: Any) -> None:
+  """
+  Have `target.invalidate(ids)` called with the incidences written by each committed transaction.
+
+  Args:
+    target (Any): Object with an `invalidate(ids: Iterable[int])` method (held by weak reference).
+
+  Examples:
+    register_invalidation_target(form_page_cache)
+
+  Notes:
+    - Call `install_session_events()` as well if the incidence cache may not be initialized.
+  """
+  _CACHES.add(target)
+
+
+def mark_incidence_changed(session: Session, *ids: int | None) -> None:
+  """
+  Record incidences changed by Core/text statements so they are invalidated when `session` commits.
+
+  Args:
+    session (Session): Session running the write.
+    *ids (int | None): Incidence IDs written (None values are ignored).
+
+  Examples:
+    session.execute(text("UPDATE incidences SET misc_json = ... WHERE id_incidence = :pk"), {"pk": 7})
+    mark_incidence_changed(session, 7)
+  """
+  session.info.setdefault(_PENDING_KEY, set()).update(id_ for id_ in ids if id_ is not None)
+
+
+def pending_incidence_ids(session: Session) -> set[int]:
+  """
+  Return the incidences written so far in the session's current transaction.
+
+  Args:
+    session (Session): Session running the writes.
+
+  Returns:
+    set[int]: IDs collected from flushed ORM changes and `mark_incidence_changed()` calls
+      (flush first to include unflushed ORM changes).
+  """
+  return set(session.info.get(_PENDING_KEY, ()))
+
+
+def _after_flush(session: Session, flush_context: Any) -> None:
+  """Collect incidences touched by ORM changes in this flush."""
+  changed = []
+  for obj in (*session.new, *session.dirty, *session.deleted):
+    if isinstance(obj, PortalUpdate):
+      changed.append(obj.id_incidence)
+      continue
+    mapper = sa_inspect(obj, raiseerr=False)
+    mapper = getattr(mapper, "mapper", None)
+    if mapper is not None and getattr(mapper.local_table, "name", None) == INCIDENCE_TABLE:
+      changed.append(getattr(obj, "id_incidence", None))
+  if changed:
+    mark_incidence_changed(session, *changed)
+
+
+def _after_commit(session: Session) -> None:
+  """Invalidate incidences written in the committed transaction."""
+  ids = session.info.pop(_PENDING_KEY, None)
+  if ids:
+    for cache in list(_CACHES):
+      cache.invalidate(ids)
+
+
+def _after_rollback(session: Session) -> None:
+  """Forget incidences recorded by a rolled-back transaction."""
+  session.info.pop(_PENDING_KEY, None)
+
+
+def install_session_events() -> None:
+  """
+  Register the invalidation listeners on every SQLAlchemy Session (idempotent).
+
+  Notes:
+    - Listening on the Session class covers Flask-SQLAlchemy's scoped session and sessions
+      created by command-line tools.
+  """
+  global _events_installed
+  if _events_installed:
+    return
+  event.listen(Session, "after_flush", _after_flush)
+  event.listen(Session, "after_commit", _after_commit)
+  event.listen(Session, "after_rollback", _after_rollback)
+  _events_installed = True
+
+
+def init_incidence_cache(app: Flask) -> IncidenceCache:
+  """
+  Create the app's incidence cache from its configuration and install the session events.
+
+  Args:
+    app (Flask): Flask application.
+
+  Returns:
+    IncidenceCache: The cache stored in `app.extensions["incidence_cache"]`.
+
+  Examples:
+    init_incidence_cache(app)
+
+  Notes:
+    - Config keys: INCIDENCE_CACHE_ENABLED, INCIDENCE_CACHE_MAX_ENTRIES,
+      INCIDENCE_CACHE_TTL_SECONDS, INCIDENCE_CACHE_REDIS_URL.
+    - INCIDENCE_CACHE_ENABLED defaults to whether a Redis URL is set. If Redis cannot be
+      configured the cache is disabled (with a warning) instead of falling back to the
+      in-process backend, which would miss the commits of other workers.
+  """
+  ttl_seconds = float(app.config.get("INCIDENCE_CACHE_TTL_SECONDS", 300))
+  backend: Any = None
+  redis_url = app.config.get("INCIDENCE_CACHE_REDIS_URL")
+  enabled = bool(app.config.get("INCIDENCE_CACHE_ENABLED", bool(redis_url)))
+  if redis_url:
+    try:
+      backend = RedisIncidenceBackend(redis_url, ttl_seconds)
+    except Exception as e:
+      logger.warning(f"Incidence cache: could not use Redis ({e}); the cache is disabled")
+      enabled = False
+  if backend is None:
+    backend = InMemoryIncidenceBackend(int(app.config.get("INCIDENCE_CACHE_MAX_ENTRIES", 1024)), ttl_seconds)
+
+  cache = IncidenceCache(backend, enabled=enabled)
+  app.extensions[_EXTENSION_KEY] = cache
+  install_session_events()
+  logger.info(f"Incidence cache: enabled={cache.enabled}, backend={backend.name}")
+  return cache
+
+
+def get_incidence_cache() -> IncidenceCache | None:
+  """
+  Return the current app's incidence cache, or None outside an app context or if not initialized.
+  """
+  if not has_app_context():
+    return None
+  return current_app.extensions.get(_EXTENSION_KEY)
+
+
+def get_cached_incidence(id_: int, loader: Callable[[], CachedIncidence | None]) -> CachedIncidence | None:
+  """
+  Read an incidence through the current app's cache (or directly when there is none).
+
+  Args:
+    id_ (int): Incidence ID.
+    loader (Callable[[], CachedIncidence | None]): Reads the incidence from the database.
+
+  Returns:
+    CachedIncidence | None: The entry, or None if the row does not exist.
+
+  Examples:
+    entry = get_cached_incidence(123, lambda: load_incidence(db, base, 123))
+  """
+  cache = get_incidence_cache()
+  return loader() if cache is None else cache.get(id_, loader)
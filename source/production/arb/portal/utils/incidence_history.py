@@ -0,0 +1,416 @@
+"""
+  Reconstruct an incidence's misc_json as of any point in its audit trail.
+
+  Every audited change to `misc_json` is a `PortalUpdate` row (key, old_value, new_value). This
+  module replays those rows to rebuild the full document as of an update ID or a timestamp, and
+  diffs two points in time with `compute_field_differences()`.
+
+  To keep reconstruction bounded for incidences with thousands of edits, a full copy of the
+  document (`PortalUpdateSnapshot`) is written every `HISTORY_SNAPSHOT_INTERVAL` audited changes.
+  A reconstruction starts from the nearest snapshot at or before the requested point and replays
+  `new_value` forward; if there is none, it starts from the next later snapshot (or the current
+  document) and undoes changes backward using `old_value`. Either way at most one snapshot
+  interval of rows is replayed once snapshots exist.
+
+  Attributes:
+    HISTORY_SNAPSHOT_INTERVAL (int): Audited changes per incidence between snapshots.
+    logger (logging.Logger): Logger instance for this module.
+
+  Examples:
+    from arb.portal.utils.incidence_history import diff_history_points, reconstruct_misc_json
+    point = reconstruct_misc_json(db.session, 42, model.misc_json, point=datetime(2025, 1, 1, tzinfo=UTC))
+    changes = diff_history_points(db.session, 42, model.misc_json, start=120, end=None)
+
+    # Command line (from the production directory), for incidences logged before snapshots existed:
+    python -m arb.portal.utils.incidence_history --id-incidence 42
+
+  Notes:
+    - `PortalUpdate` stores values as `str(value)`, so replayed values are strings ("None" is
+      decoded back to None). Values carried over from a snapshot or the current document keep
+      their JSON types; `compute_field_differences()` normalizes both for comparison.
+    - Update IDs order the trail (timestamps can tie within one save).
+    - Changes that bypass the audit trail (e.g., `cleanse_misc_json`) are not reconstructed, and
+      points older than the retained trail (see `portal_update_archive`) cannot be reached.
+"""
+import argparse
+import copy
+import datetime
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import MetaData, Table, delete, func, select
+from sqlalchemy.orm import Session
+
+from arb.portal.sqla_models import PortalUpdate, PortalUpdateSnapshot
+from arb.portal.utils.cli_util import add_database_uri_argument, cli_engine
+from arb.utils.date_and_time import html_naive_str_to_utc_datetime
+from arb.utils.json import compute_field_differences
+
+logger = logging.getLogger(__name__)
+logger.debug(f'Loading File: "{Path(__file__).name}". Full Path: "{Path(__file__)}"')
+
+HISTORY_SNAPSHOT_INTERVAL = 50
+
+HistoryPointSpec = int | datetime.datetime | None
+
+
+@dataclass
+class HistoryPoint:
+  """
+  An incidence's misc_json as of one point in its audit trail.
+
+  Attributes:
+    id_incidence (int): Incidence the document belongs to.
+    update_id (int | None): Last `PortalUpdate` ID applied, or None if before the first audited change.
+    timestamp (datetime.datetime | None): Timestamp of that update.
+    misc_json (dict): Reconstructed document.
+    source (str): Starting point of the reconstruction: "current" or "snapshot".
+    replayed (int): Number of `PortalUpdate` rows replayed from the starting point.
+  """
+  id_incidence: int
+  update_id: int | None
+  timestamp: datetime.datetime | None
+  misc_json: dict = field(default_factory=dict)
+  source: str = "current"
+  replayed: int = 0
+
+
+def decode_audit_value(value: str | None) -> Any:
+  """
+  Decode a stored `PortalUpdate.old_value`/`new_value` string back to a misc_json value.
+
+  Args:
+    value (str | None): Value as stored in portal_updates.
+
+  Returns:
+    Any: None for NULL or "None" (how `str(None)` was logged); otherwise the string unchanged.
+
+  Examples:
+    Input : "None"
+    Output: None
+    Input : "Landfill"
+    Output: "Landfill"
+  """
+  if value is None or value == "None":
+    return None
+  return value
+
+
+def parse_history_point(value: str | None) -> HistoryPointSpec:
+  """
+  Parse a history point from a query-string value.
+
+  Args:
+    value (str | None): A `PortalUpdate` ID ("123"), an ISO-8601 timestamp, or empty for "now".
+      Naive timestamps (e.g., from an HTML datetime-local input) are California local time.
+
+  Returns:
+    int | datetime.datetime | None: Update ID, UTC-aware datetime, or None for the current document.
+
+  Raises:
+    ValueError: If the value is neither an integer nor an ISO-8601 date/time.
+
+  Examples:
+    Input : "120"
+    Output: 120
+    Input : "2025-01-15T14:30"
+    Output: datetime.datetime(2025, 1, 15, 22, 30, tzinfo=ZoneInfo("UTC"))
+  """
+  value = (value or "").strip()
+  if not value:
+    return None
+  if value.isdigit():
+    return int(value)
+  parsed = datetime.datetime.fromisoformat(value)
+  if parsed.tzinfo is None:
+    return html_naive_str_to_utc_datetime(parsed.isoformat())
+  return parsed.astimezone(datetime.UTC)
+
+
+def resolve_history_point(session: Session,
+                          id_incidence: int,
+                          point: HistoryPointSpec = None) -> tuple[int | None, datetime.datetime | None]:
+  """
+  Return the last `PortalUpdate` of an incidence at or before a history point.
+
+  Args:
+    session (Session): Active SQLAlchemy session.
+    id_incidence (int): Incidence ID.
+    point (int | datetime.datetime | None): Update ID, timestamp, or None for the latest update.
+
+  Returns:
+    tuple[int | None, datetime.datetime | None]: (update ID, timestamp) of that update, or
+    (None, None) if the point precedes the incidence's first audited change.
+
+  Examples:
+    Input : session, 42, datetime(2025, 1, 1, tzinfo=UTC)
+    Output: (118, datetime(2024, 12, 31, 17, 5, tzinfo=UTC))
+  """
+  query = select(PortalUpdate.id, PortalUpdate.timestamp).where(PortalUpdate.id_incidence == id_incidence)
+  if isinstance(point, datetime.datetime):
+    query = query.where(PortalUpdate.timestamp <= point)
+  elif point is not None:
+    query = query.where(PortalUpdate.id <= point)
+  row = session.execute(query.order_by(PortalUpdate.id.desc()).limit(1)).first()
+  return (row.id, row.timestamp) if row else (None, None)
+
+
+def _updates_between(session: Session, id_incidence: int, after_id: int | None, through_id: int | None,
+                     descending: bool = False) -> list:
+  """Return the incidence's PortalUpdate rows with after_id < id <= through_id, ordered by id."""
+  query = select(PortalUpdate.id, PortalUpdate.key, PortalUpdate.old_value, PortalUpdate.new_value) \
+    .where(PortalUpdate.id_incidence == id_incidence)
+  if after_id is not None:
+    query = query.where(PortalUpdate.id > after_id)
+  if through_id is not None:
+    query = query.where(PortalUpdate.id <= through_id)
+  return session.execute(query.order_by(PortalUpdate.id.desc() if descending else PortalUpdate.id)).all()
+
+
+def _undo(document: dict, update: Any) -> None:
+  """Revert one audited change in place (a logged "None" old value means the key was absent)."""
+  old_value = decode_audit_value(update.old_value)
+  if old_value is None:
+    document.pop(update.key, None)
+  else:
+    document[update.key] = old_value
+
+
+def reconstruct_misc_json(session: Session,
+                          id_incidence: int,
+                          current_document: dict | None,
+                          point: HistoryPointSpec = None) -> HistoryPoint:
+  """
+  Rebuild an incidence's misc_json as of an update ID or timestamp.
+
+  Args:
+    session (Session): Active SQLAlchemy session.
+    id_incidence (int): Incidence ID.
+    current_document (dict | None): The incidence's current misc_json (used when no snapshot helps).
+    point (int | datetime.datetime | None): Update ID, timestamp, or None for the current document.
+
+  Returns:
+    HistoryPoint: The reconstructed document and how it was obtained.
+
+  Examples:
+    history = reconstruct_misc_json(db.session, 42, model.misc_json, point=118)
+    history.misc_json["facility_name"]
+    # 'Old facility name'
+
+  Notes:
+    - Forward replay from the nearest snapshot at or before the point is preferred; otherwise
+      changes are undone backward from the next snapshot or from `current_document`.
+    - `current_document` is not modified.
+  """
+  update_id, timestamp = resolve_history_point(session, id_incidence, point)
+  latest_id, _ = resolve_history_point(session, id_incidence)
+  if update_id == latest_id:
+    return HistoryPoint(id_incidence, update_id, timestamp, copy.deepcopy(current_document or {}))
+
+  snapshots = select(PortalUpdateSnapshot).where(PortalUpdateSnapshot.id_incidence == id_incidence)
+  before = None
+  if update_id is not None:
+    before = session.scalars(snapshots.where(PortalUpdateSnapshot.id_portal_update <= update_id)
+                             .order_by(PortalUpdateSnapshot.id_portal_update.desc()).limit(1)).first()
+
+  if before is not None:
+    document = copy.deepcopy(before.misc_json or {})
+    updates = _updates_between(session, id_incidence, before.id_portal_update, update_id)
+    for update in updates:
+      document[update.key] = decode_audit_value(update.new_value)
+    return HistoryPoint(id_incidence, update_id, timestamp, document, "snapshot", len(updates))
+
+  after = session.scalars(snapshots.where(PortalUpdateSnapshot.id_portal_update > (update_id or 0))
+                          .order_by(PortalUpdateSnapshot.id_portal_update).limit(1)).first()
+  if after is not None:
+    document, start_id, source = copy.deepcopy(after.misc_json or {}), after.id_portal_update, "snapshot"
+  else:
+    document, start_id, source = copy.deepcopy(current_document or {}), latest_id, "current"
+
+  updates = _updates_between(session, id_incidence, update_id, start_id, descending=True)
+  for update in updates:
+    _undo(document, update)
+  return HistoryPoint(id_incidence, update_id, timestamp, document, source, len(updates))
+
+
+def diff_misc_json(before: dict, after: dict) -> list[dict]:
+  """
+  Compare two misc_json documents key by key with `compute_field_differences()`.
+
+  Args:
+    before (dict): Earlier document.
+    after (dict): Later document.
+
+  Returns:
+    list[dict]: One `compute_field_differences()` entry per key present in either document
+    (keys missing from a document compare as None).
+
+  Examples:
+    Input : {"a": "1", "b": "x"}, {"a": "2"}
+    Output: [{"key": "a", "old": "1", "new": "2", "changed": True, ...},
+             {"key": "b", "old": "x", "new": None, "changed": True, ...}]
+  """
+  keys = set(before) | set(after)
+  return compute_field_differences(new_data={key: after.get(key) for key in keys}, existing_data=before)
+
+
+def diff_history_points(session: Session,
+                        id_incidence: int,
+                        current_document: dict | None,
+                        start: HistoryPointSpec,
+                        end: HistoryPointSpec = None) -> tuple[HistoryPoint, HistoryPoint, list[dict]]:
+  """
+  Reconstruct an incidence at two points in time and diff them.
+
+  Args:
+    session (Session): Active SQLAlchemy session.
+    id_incidence (int): Incidence ID.
+    current_document (dict | None): The incidence's current misc_json.
+    start (int | datetime.datetime | None): Earlier point (update ID or timestamp).
+    end (int | datetime.datetime | None): Later point; None for the current document.
+
+  Returns:
+    tuple[HistoryPoint, HistoryPoint, list[dict]]: Both reconstructions and `diff_misc_json(start, end)`.
+
+  Examples:
+    start, end, changes = diff_history_points(db.session, 42, model.misc_json, start=100)
+  """
+  start_point = reconstruct_misc_json(session, id_incidence, current_document, start)
+  end_point = reconstruct_misc_json(session, id_incidence, current_document, end)
+  return start_point, end_point, diff_misc_json(start_point.misc_json, end_point.misc_json)
+
+
+def snapshot_if_due(session: Session,
+                    model: Any,
+                    json_field: str = "misc_json",
+                    primary_key: str = "id_incidence",
+                    interval: int | None = None) -> PortalUpdateSnapshot | None:
+  """
+  Add a snapshot of a model's JSON document if `interval` audited changes accrued since the last one.
+
+  Args:
+    session (Session): Session holding the model and its new `PortalUpdate` rows.
+    model (Any): Incidence ORM instance.
+    json_field (str): Name of the JSON column.
+    primary_key (str): Name of the incidence ID attribute.
+    interval (int | None): Audited changes between snapshots (default: HISTORY_SNAPSHOT_INTERVAL).
+
+  Returns:
+    PortalUpdateSnapshot | None: The snapshot added to the session, or None if none was due.
+
+  Examples:
+    snapshot_if_due(db.session, model)  # call after adding PortalUpdate rows, before commit
+
+  Notes:
+    - Flushes the session so new `PortalUpdate` rows have IDs, then runs one aggregate query;
+      the JSON document is only loaded when a snapshot is due.
+  """
+  interval = HISTORY_SNAPSHOT_INTERVAL if interval is None else interval
+  if interval < 1:
+    return None
+  session.flush()
+  id_incidence = getattr(model, primary_key, None)
+  if id_incidence is None:
+    return None
+
+  last_snapshot = select(func.coalesce(func.max(PortalUpdateSnapshot.id_portal_update), 0)) \
+    .where(PortalUpdateSnapshot.id_incidence == id_incidence).scalar_subquery()
+  pending, latest_id = session.execute(
+    select(func.count(PortalUpdate.id), func.max(PortalUpdate.id))
+    .where(PortalUpdate.id_incidence == id_incidence, PortalUpdate.id > last_snapshot)
+  ).one()
+  if pending < interval:
+    return None
+
+  snapshot = PortalUpdateSnapshot(id_incidence=id_incidence, id_portal_update=latest_id,
+                                  timestamp=datetime.datetime.now(datetime.UTC),
+                                  misc_json=copy.deepcopy(getattr(model, json_field) or {}))
+  session.add(snapshot)
+  logger.debug(f"snapshot_if_due: incidence {id_incidence} snapshot at update {latest_id} ({pending} changes)")
+  return snapshot
+
+
+def backfill_snapshots(session: Session,
+                       id_incidence: int,
+                       current_document: dict | None,
+                       interval: int = HISTORY_SNAPSHOT_INTERVAL) -> int:
+  """
+  Rebuild an incidence's snapshots by walking its audit trail backward from the current document.
+
+  Args:
+    session (Session): Active SQLAlchemy session (not committed here).
+    id_incidence (int): Incidence ID.
+    current_document (dict | None): The incidence's current misc_json.
+    interval (int): Audited changes between snapshots.
+
+  Returns:
+    int: Number of snapshots written.
+
+  Examples:
+    backfill_snapshots(db.session, 42, model.misc_json)
+    db.session.commit()
+
+  Notes:
+    - Existing snapshots for the incidence are replaced.
+    - Walking backward keeps the JSON types of every value the trail did not touch.
+  """
+  session.execute(delete(PortalUpdateSnapshot).where(PortalUpdateSnapshot.id_incidence == id_incidence))
+
+  document = copy.deepcopy(current_document or {})
+  written = 0
+  now = datetime.datetime.now(datetime.UTC)
+  for index, update in enumerate(_updates_between(session, id_incidence, None, None, descending=True)):
+    if index % interval == 0:
+      session.add(PortalUpdateSnapshot(id_incidence=id_incidence, id_portal_update=update.id, timestamp=now,
+                                       misc_json=copy.deepcopy(document)))
+      written += 1
+    _undo(document, update)
+  return written
+
+
+def main(argv: list[str] | None = None) -> int:
+  """
+  Command-line entry point that backfills history snapshots.
+
+  Args:
+    argv (list[str] | None): Arguments to parse; defaults to `sys.argv[1:]`.
+
+  Returns:
+    int: Process exit code (0 on success).
+
+  Examples:
+    python -m arb.portal.utils.incidence_history --database-uri sqlite:///portal.sqlite --id-incidence 42
+  """
+  parser = argparse.ArgumentParser(description="Backfill misc_json history snapshots from portal_updates.")
+  add_database_uri_argument(parser)
+  parser.add_argument("--id-incidence", action="append", type=int, dest="ids", default=None,
+                      help="Incidence to backfill (repeatable; default: every incidence with portal updates).")
+  parser.add_argument("--interval", type=int, default=HISTORY_SNAPSHOT_INTERVAL,
+                      help=f"Audited changes between snapshots (default: {HISTORY_SNAPSHOT_INTERVAL}).")
+  args = parser.parse_args(argv)
+
+  engine = cli_engine(args.database_uri)
+  try:
+    PortalUpdateSnapshot.__table__.create(engine, checkfirst=True)
+    incidences = Table("incidences", MetaData(), autoload_with=engine)
+    with Session(engine) as session:
+      ids = args.ids or session.scalars(select(PortalUpdate.id_incidence).distinct()
+                                        .where(PortalUpdate.id_incidence.is_not(None))
+                                        .order_by(PortalUpdate.id_incidence)).all()
+      total = 0
+      for id_incidence in ids:
+        document = session.execute(select(incidences.c.misc_json)
+                                   .where(incidences.c.id_incidence == id_incidence)).scalar()
+        total += backfill_snapshots(session, id_incidence, document, args.interval)
+      session.commit()
+  finally:
+    engine.dispose()
+
+  print(f"{total} snapshots written for {len(ids)} incidences")
+  return 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
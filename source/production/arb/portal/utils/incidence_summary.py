@@ -0,0 +1,484 @@
+"""
+  Pre-aggregated summary of incidences by sector, facility and month for the dashboard.
+
+  Computing counts live from `misc_json` is a full scan per page load, so the counts per
+  (sector, facility_name, month) group are materialized once and the dashboard only reads
+  groups (O(groups), not O(rows)):
+
+    - PostgreSQL: a materialized view `incidence_summary` with a unique index, refreshed with
+      `REFRESH MATERIALIZED VIEW CONCURRENTLY` (readers are never blocked). Write paths mark the
+      summary stale; it is refreshed on a schedule (SUMMARY_REFRESH_INTERVAL_SECONDS), by the
+      dashboard when it has been stale for longer than SUMMARY_MAX_STALENESS_SECONDS, or by an
+      admin (`POST /incidence_summary/refresh`).
+    - SQLite: a summary table maintained incrementally from the write paths. A members table
+      remembers each incidence's group, so a commit moves only the changed incidences between
+      groups (one decrement and one increment each).
+
+  Write paths need no changes: the incidences written in a transaction are collected by the
+  incidence cache session events (ORM flushes, `mark_incidence_changed()` in the Core paths),
+  and a `before_commit` listener applies them in the same transaction.
+
+  Attributes:
+    SUMMARY_VIEW (str): Name of the summary materialized view / table.
+    SUMMARY_MEMBERS_TABLE (str): Table mapping each incidence to its group (SQLite).
+    SUMMARY_STATE_TABLE (str): Single-row table with the stale flag and last refresh time.
+    SUMMARY_DIMENSIONS (tuple[str, ...]): Grouping dimensions, in drill-down order.
+    SUMMARY_MONTH_KEY (str): misc_json timestamp whose UTC month (YYYY-MM) is the month dimension.
+    SUMMARY_REFRESH_LOCK_KEY (int): PostgreSQL advisory lock key held by the worker refreshing.
+    logger (logging.Logger): Logger instance for this module.
+
+  Examples:
+    from arb.portal.utils.incidence_summary import summarize
+    summarize(db.session, "sector")  # [{"value": "Landfill", "incidences": 412}, ...]
+    summarize(db.session, "month", {"sector": "Landfill"})
+
+    # Command line (from the production directory):
+    python -m arb.portal.utils.incidence_summary --refresh
+
+  Notes:
+    - This tree has no incidence status or operator keys in misc_json; `facility_name` is the
+      operator-facing dimension. Add keys to SUMMARY_DIMENSIONS (and the view DDL) as they appear.
+    - Missing values are grouped under "".
+    - Writes made outside the app (scripts, other systems) are picked up by the next full
+      refresh (`--refresh`, or the schedule on PostgreSQL).
+    - Every worker process runs the schedule, so the app's refreshes are claimed first
+      (`claim_refresh()`): only one worker refreshes at a time, and workers that find the
+      summary already refreshed skip it.
+"""
+import argparse
+import datetime
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Iterable
+
+from flask import Flask, current_app, has_app_context
+from sqlalchemy import Boolean, Column, DateTime, Integer, MetaData, Table, Text, event, func, \
+  inspect as sa_inspect, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from arb.portal.utils.cli_util import add_database_uri_argument, cli_engine
+from arb.portal.utils.incidence_cache import install_session_events as install_cache_events, pending_incidence_ids
+
+logger = logging.getLogger(__name__)
+logger.debug(f'Loading File: "{Path(__file__).name}". Full Path: "{Path(__file__)}"')
+
+SUMMARY_VIEW = "incidence_summary"
+SUMMARY_MEMBERS_TABLE = "incidence_summary_members"
+SUMMARY_STATE_TABLE = "incidence_summary_state"
+SUMMARY_DIMENSIONS = ("sector", "facility_name", "month")
+SUMMARY_MONTH_KEY = "observation_timestamp"
+SUMMARY_REFRESH_LOCK_KEY = 7_300_401  # arbitrary; unique among the portal's advisory locks
+
+_EXTENSION_KEY = "incidence_summary"
+_events_installed = False
+
+_metadata = MetaData()
+summary_table = Table(SUMMARY_VIEW, _metadata,
+                      *[Column(name, Text, primary_key=True) for name in SUMMARY_DIMENSIONS],
+                      Column("incidences", Integer, nullable=False))
+members_table = Table(SUMMARY_MEMBERS_TABLE, _metadata,
+                      Column("id_incidence", Integer, primary_key=True),
+                      *[Column(name, Text, nullable=False) for name in SUMMARY_DIMENSIONS])
+state_table = Table(SUMMARY_STATE_TABLE, _metadata,
+                    Column("id", Integer, primary_key=True),
+                    Column("stale", Boolean, nullable=False, default=False),
+                    Column("refreshed_at", DateTime(timezone=True)))
+incidences_table = Table("incidences", _metadata,
+                         Column("id_incidence", Integer, primary_key=True),
+                         Column("misc_json", Text))
+
+
+def summary_key(misc_json: Any) -> tuple[str, ...]:
+  """
+  Return an incidence's summary group.
+
+  Args:
+    misc_json (Any): The incidence's misc_json (dict, JSON string, or None).
+
+  Returns:
+    tuple[str, ...]: One value per SUMMARY_DIMENSIONS entry ("" when missing).
+
+  Examples:
+    Input : {"sector": "Landfill", "facility_name": "Site A", "observation_timestamp": "2025-01-15T22:30:00+00:00"}
+    Output: ("Landfill", "Site A", "2025-01")
+  """
+  if isinstance(misc_json, str):
+    try:
+      misc_json = json.loads(misc_json)
+    except ValueError:
+      misc_json = None
+  document = misc_json if isinstance(misc_json, dict) else {}
+
+  def _text(value: Any) -> str:
+    return "" if value is None else str(value)
+
+  values = {key: _text(document.get(key)) for key in SUMMARY_DIMENSIONS if key != "month"}
+  values["month"] = _text(document.get(SUMMARY_MONTH_KEY))[:7]
+  return tuple(values[key] for key in SUMMARY_DIMENSIONS)
+
+
+def summary_ddl(dialect_name: str) -> list[str]:
+  """
+  Return the DDL that creates the PostgreSQL materialized view and its unique index.
+
+  Args:
+    dialect_name (str): SQLAlchemy dialect name.
+
+  Returns:
+    list[str]: Statements for PostgreSQL; an empty list for other dialects (which use tables).
+
+  Examples:
+    Input : "postgresql"
+    Output: ['CREATE MATERIALIZED VIEW IF NOT EXISTS incidence_summary AS SELECT ...', 'CREATE UNIQUE INDEX ...']
+  """
+  if dialect_name != "postgresql":
+    return []
+  return [
+    f"CREATE MATERIALIZED VIEW IF NOT EXISTS {SUMMARY_VIEW} AS "
+    f"SELECT coalesce(misc_json ->> 'sector', '') AS sector, "
+    f"coalesce(misc_json ->> 'facility_name', '') AS facility_name, "
+    f"coalesce(left(misc_json ->> '{SUMMARY_MONTH_KEY}', 7), '') AS month, "
+    f"count(*)::integer AS incidences "
+    f"FROM incidences GROUP BY 1, 2, 3",
+    f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{SUMMARY_VIEW}_group ON {SUMMARY_VIEW} ({', '.join(SUMMARY_DIMENSIONS)})",
+  ]
+
+
+def ensure_incidence_summary(engine: Engine) -> bool:
+  """
+  Create the summary view/tables if missing and populate them (idempotent).
+
+  Args:
+    engine (Engine): Engine connected to the portal database.
+
+  Returns:
+    bool: True if the summary was created by this call.
+
+  Notes:
+    - Does nothing until the `incidences` table exists.
+  """
+  inspector = sa_inspect(engine)
+  if not inspector.has_table("incidences") or inspector.has_table(SUMMARY_STATE_TABLE):
+    return False
+
+  with engine.begin() as connection:
+    statements = summary_ddl(engine.dialect.name)
+    tables = [state_table] if statements else [state_table, summary_table, members_table]
+    _metadata.create_all(connection, tables=tables)
+    for statement in statements:
+      connection.execute(text(statement))
+    connection.execute(state_table.insert().values(id=1, stale=False))
+    if not statements:
+      refresh_incidence_summary(connection)
+  logger.info(f"Created the incidence summary ({'materialized view' if statements else 'tables'})")
+  return True
+
+
+def refresh_incidence_summary(executor: Any, concurrently: bool = True) -> None:
+  """
+  Fully recompute the summary and clear the stale flag.
+
+  Args:
+    executor (Any): Session or Connection on the primary.
+    concurrently (bool): PostgreSQL only: refresh without blocking readers.
+
+  Notes:
+    - PostgreSQL: REFRESH MATERIALIZED VIEW (one aggregate scan in the database).
+    - SQLite: rebuilds the summary and members tables from every incidence.
+  """
+  dialect_name = _dialect_name(executor)
+  if dialect_name == "postgresql":
+    executor.execute(text(f"REFRESH MATERIALIZED VIEW {'CONCURRENTLY ' if concurrently else ''}{SUMMARY_VIEW}"))
+  else:
+    executor.execute(members_table.delete())
+    executor.execute(summary_table.delete())
+    counts: dict[tuple[str, ...], int] = {}
+    members = []
+    for id_incidence, misc_json in executor.execute(select(incidences_table.c.id_incidence,
+                                                           incidences_table.c.misc_json)):
+      key = summary_key(misc_json)
+      counts[key] = counts.get(key, 0) + 1
+      members.append({"id_incidence": id_incidence, **dict(zip(SUMMARY_DIMENSIONS, key))})
+    if members:
+      executor.execute(members_table.insert(), members)
+      executor.execute(summary_table.insert(), [{**dict(zip(SUMMARY_DIMENSIONS, key)), "incidences": count}
+                                                for key, count in counts.items()])
+  executor.execute(state_table.update().where(state_table.c.id == 1)
+                   .values(stale=False, refreshed_at=datetime.datetime.now(datetime.UTC)))
+  logger.info(f"Refreshed the incidence summary ({dialect_name})")
+
+
+def apply_incidence_changes(executor: Any, ids: Iterable[int]) -> None:
+  """
+  Move changed incidences between summary groups (incremental maintenance of the summary table).
+
+  Args:
+    executor (Any): Session or Connection inside the writing transaction.
+    ids (Iterable[int]): Incidences inserted, updated or deleted in the transaction.
+
+  Notes:
+    - Cost is proportional to the number of changed incidences, not to the table size.
+    - On PostgreSQL the summary is a materialized view; the changes only mark it stale.
+  """
+  ids = sorted(set(ids))
+  if not ids:
+    return
+  if _dialect_name(executor) == "postgresql":
+    executor.execute(state_table.update().where(state_table.c.id == 1, state_table.c.stale.is_(False))
+                     .values(stale=True))
+    return
+
+  dimension_columns = [members_table.c[name] for name in SUMMARY_DIMENSIONS]
+  for row in executor.execute(select(*dimension_columns).where(members_table.c.id_incidence.in_(ids))).all():
+    _adjust_group(executor, tuple(row), -1)
+  executor.execute(members_table.delete().where(members_table.c.id_incidence.in_(ids)))
+
+  rows = executor.execute(select(incidences_table.c.id_incidence, incidences_table.c.misc_json)
+                          .where(incidences_table.c.id_incidence.in_(ids))).all()
+  for id_incidence, misc_json in rows:
+    key = summary_key(misc_json)
+    executor.execute(members_table.insert().values(id_incidence=id_incidence, **dict(zip(SUMMARY_DIMENSIONS, key))))
+    _adjust_group(executor, key, 1)
+  executor.execute(summary_table.delete().where(summary_table.c.incidences <= 0))
+
+
+def _adjust_group(executor: Any, key: tuple[str, ...], delta: int) -> None:
+  """Add `delta` to one group's count, creating the group if needed."""
+  where = [summary_table.c[name] == value for name, value in zip(SUMMARY_DIMENSIONS, key)]
+  result = executor.execute(summary_table.update().where(*where)
+                            .values(incidences=summary_table.c.incidences + delta))
+  if result.rowcount == 0 and delta > 0:
+    executor.execute(summary_table.insert().values(**dict(zip(SUMMARY_DIMENSIONS, key)), incidences=delta))
+
+
+def _dialect_name(executor: Any) -> str:
+  """Return the dialect name of a Connection, Session or scoped session."""
+  dialect = getattr(executor, "dialect", None) or executor.get_bind().dialect
+  return dialect.name
+
+
+def summarize(executor: Any, group_by: str, filters: dict[str, str] | None = None) -> list[dict]:
+  """
+  Return incidence counts per value of one dimension, within optional filters on the others.
+
+  Args:
+    executor (Any): Session or Connection.
+    group_by (str): Dimension to group by (one of SUMMARY_DIMENSIONS).
+    filters (dict[str, str] | None): Dimension → value restrictions.
+
+  Returns:
+    list[dict]: [{"value": str, "incidences": int}], months newest first, other dimensions by
+      descending count.
+
+  Raises:
+    ValueError: If a dimension name is unknown.
+
+  Examples:
+    Input : session, "month", {"sector": "Landfill"}
+    Output: [{"value": "2025-02", "incidences": 31}, {"value": "2025-01", "incidences": 44}]
+  """
+  filters = filters or {}
+  for name in (group_by, *filters):
+    if name not in SUMMARY_DIMENSIONS:
+      raise ValueError(f"Unknown summary dimension {name!r}; expected one of {SUMMARY_DIMENSIONS}")
+
+  column = summary_table.c[group_by]
+  total = func.sum(summary_table.c.incidences)
+  statement = (select(column, total)
+               .where(*[summary_table.c[name] == value for name, value in filters.items()])
+               .group_by(column)
+               .order_by(column.desc() if group_by == "month" else total.desc(), column))
+  return [{"value": value, "incidences": int(count)} for value, count in executor.execute(statement)]
+
+
+def summary_state(executor: Any) -> dict:
+  """
+  Return whether the summary is stale and when it was last fully refreshed.
+
+  Returns:
+    dict: {"stale": bool, "refreshed_at": datetime | None}
+  """
+  row = executor.execute(select(state_table.c.stale, state_table.c.refreshed_at)
+                         .where(state_table.c.id == 1)).first()
+  return {"stale": bool(row.stale) if row else True, "refreshed_at": row.refreshed_at if row else None}
+
+
+def claim_refresh(executor: Any, if_stale: bool = True) -> bool:
+  """
+  Claim the summary refresh for the current transaction, so concurrent workers do not repeat it.
+
+  Args:
+    executor (Any): Session or Connection on the primary (the claim ends when it commits).
+    if_stale (bool): Only claim a summary that is still stale once claimed.
+
+  Returns:
+    bool: True if the caller should refresh now; False if another worker is refreshing (or,
+      with `if_stale`, already refreshed the summary).
+
+  Notes:
+    - PostgreSQL: `pg_try_advisory_xact_lock(SUMMARY_REFRESH_LOCK_KEY)`, which never waits; the
+      stale flag is re-read under the lock.
+    - SQLite: the stale flag is updated in place, which takes the database write lock; a worker
+      that waited for another's refresh then finds the flag cleared.
+  """
+  if _dialect_name(executor) == "postgresql":
+    if not executor.execute(text("SELECT pg_try_advisory_xact_lock(:key)"),
+                            {"key": SUMMARY_REFRESH_LOCK_KEY}).scalar():
+      return False
+    return not if_stale or summary_state(executor)["stale"]
+  claimed = executor.execute(state_table.update().where(state_table.c.id == 1, state_table.c.stale.is_(True))
+                             .values(stale=True))
+  return not if_stale or claimed.rowcount == 1
+
+
+def refresh_if_stale(executor: Any, max_staleness_seconds: float = 0) -> bool:
+  """
+  Refresh the summary if it is stale and was last refreshed more than `max_staleness_seconds` ago.
+
+  Args:
+    executor (Any): Session or Connection on the primary (the caller commits).
+    max_staleness_seconds (float): Tolerated age of a stale summary.
+
+  Returns:
+    bool: True if a refresh ran (False if another worker claimed it, see `claim_refresh()`).
+  """
+  state = summary_state(executor)
+  if not state["stale"]:
+    return False
+  refreshed_at = state["refreshed_at"]
+  if refreshed_at is not None and max_staleness_seconds > 0:
+    if refreshed_at.tzinfo is None:
+      refreshed_at = refreshed_at.replace(tzinfo=datetime.UTC)
+    age = (datetime.datetime.now(datetime.UTC) - refreshed_at).total_seconds()
+    if age < max_staleness_seconds:
+      return False
+  if not claim_refresh(executor):
+    return False
+  refresh_incidence_summary(executor)
+  return True
+
+
+def _before_commit(session: Session) -> None:
+  """Apply the incidences written in this transaction to the summary before it commits."""
+  if not has_app_context():
+    return
+  settings = current_app.extensions.get(_EXTENSION_KEY)
+  if not settings or not settings["enabled"]:
+    return
+  session.flush()
+  ids = pending_incidence_ids(session)
+  if not ids:
+    return
+  if settings.get("ready") is None:
+    settings["ready"] = sa_inspect(session.get_bind()).has_table(SUMMARY_STATE_TABLE)
+  if settings["ready"]:
+    apply_incidence_changes(session, ids)
+
+
+def install_session_events() -> None:
+  """
+  Register the summary maintenance listener on every SQLAlchemy Session (idempotent).
+  """
+  global _events_installed
+  install_cache_events()
+  if _events_installed:
+    return
+  event.listen(Session, "before_commit", _before_commit)
+  _events_installed = True
+
+
+def init_incidence_summary(app: Flask) -> dict:
+  """
+  Enable summary maintenance for the app's sessions.
+
+  Args:
+    app (Flask): Flask application.
+
+  Returns:
+    dict: Settings stored in `app.extensions["incidence_summary"]`.
+
+  Notes:
+    - Config keys: SUMMARY_ENABLED, SUMMARY_MAX_STALENESS_SECONDS, SUMMARY_REFRESH_INTERVAL_SECONDS.
+  """
+  settings = {
+    "enabled": bool(app.config.get("SUMMARY_ENABLED", True)),
+    "max_staleness_seconds": float(app.config.get("SUMMARY_MAX_STALENESS_SECONDS", 300)),
+    "refresh_interval_seconds": float(app.config.get("SUMMARY_REFRESH_INTERVAL_SECONDS", 0)),
+    "ready": None,
+  }
+  app.extensions[_EXTENSION_KEY] = settings
+  install_session_events()
+  return settings
+
+
+def start_summary_refresher(app: Flask) -> threading.Event | None:
+  """
+  Start a daemon thread that refreshes a stale summary every SUMMARY_REFRESH_INTERVAL_SECONDS.
+
+  Args:
+    app (Flask): Flask application.
+
+  Returns:
+    threading.Event | None: Event that stops the thread, or None if the schedule is disabled.
+  """
+  settings = app.extensions.get(_EXTENSION_KEY)
+  interval = settings["refresh_interval_seconds"] if settings and settings["enabled"] else 0
+  if not interval:
+    return None
+  stop_event = threading.Event()
+
+  def _loop() -> None:
+    while not stop_event.wait(interval):
+      try:
+        with app.app_context():
+          session = app.extensions["sqlalchemy"].session
+          if refresh_if_stale(session):
+            session.commit()
+          session.remove()
+      except Exception as e:
+        logger.exception(f"Incidence summary refresh failed: {e}")
+
+  threading.Thread(target=_loop, name="incidence-summary-refresher", daemon=True).start()
+  logger.info(f"Incidence summary refresher started (interval={interval}s)")
+  return stop_event
+
+
+def main(argv: list[str] | None = None) -> int:
+  """
+  Command-line entry point that creates and/or refreshes the summary and prints it by sector.
+
+  Args:
+    argv (list[str] | None): Arguments to parse; defaults to `sys.argv[1:]`.
+
+  Returns:
+    int: Process exit code (0 on success).
+
+  Examples:
+    python -m arb.portal.utils.incidence_summary --refresh
+    python -m arb.portal.utils.incidence_summary --group-by month --database-uri sqlite:///portal.sqlite
+  """
+  parser = argparse.ArgumentParser(description="Create, refresh and print the incidence summary.")
+  add_database_uri_argument(parser)
+  parser.add_argument("--refresh", action="store_true", help="Fully recompute the summary.")
+  parser.add_argument("--group-by", default="sector", choices=SUMMARY_DIMENSIONS, help="Dimension to print.")
+  args = parser.parse_args(argv)
+
+  engine = cli_engine(args.database_uri)
+  try:
+    ensure_incidence_summary(engine)
+    with engine.begin() as connection:
+      if args.refresh:
+        refresh_incidence_summary(connection)
+      for group in summarize(connection, args.group_by):
+        print(f"{group['value'] or '(none)'}\t{group['incidences']}")
+      print(f"state: {summary_state(connection)}")
+  finally:
+    engine.dispose()
+  return 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
@@ -0,0 +1,569 @@
+"""
+  Storage maintenance for the portal_updates audit table: indexes, monthly partitions and archival.
+
+  Every changed field of every edit writes one portal_updates row, so this is the fastest growing
+  table in the portal. This module keeps it fast and bounded:
+
+    1. `ensure_portal_update_indexes()` adds the composite indexes declared on `PortalUpdate`
+       to existing databases (`db.create_all()` only creates them for new tables), and the
+       `commit_xid` column with its PostgreSQL default.
+    2. `partition_portal_updates()` converts the table to monthly RANGE partitions on
+       `timestamp` (PostgreSQL only; SQLite keeps a plain table) and creates upcoming months.
+    3. `archive_portal_updates()` moves months older than the retention window to compressed
+       cold storage files (`portal_updates_YYYY_MM.jsonl.gz`): partitions are exported, detached
+       and dropped; plain tables have the rows exported and deleted.
+    4. `export_archived_portal_updates()` queries archive files with the same filters as the
+       `/portal_updates` page and writes the same CSV as `/portal_updates/export`.
+
+  Attributes:
+    TABLE_NAME (str): Name of the audit table.
+    PARTITION_PATTERN (re.Pattern): Regex matching monthly partition names (`portal_updates_pYYYY_MM`).
+    DEFAULT_PARTITION (str): Name of the catch-all partition for rows outside the monthly ranges.
+    ARCHIVE_FILE_PATTERN (re.Pattern): Regex matching archive filenames.
+    ARCHIVE_COLUMNS (list[str]): Columns written to archive files.
+    logger (logging.Logger): Logger instance for this module.
+
+  Examples:
+    from arb.portal.utils.portal_update_archive import archive_portal_updates
+    report = archive_portal_updates(db.engine, Path("portal_updates_archive"), retention_months=24)
+    print(report.summary())
+
+    # Command line (from the production directory):
+    python -m arb.portal.utils.portal_update_archive partition --months-ahead 3
+    python -m arb.portal.utils.portal_update_archive archive --retention-months 24 --dry-run
+    python -m arb.portal.utils.portal_update_archive export --filter-id-incidence 100-200 --output old.csv
+
+  Notes:
+    - A DEFAULT partition catches rows outside the created months, so inserts never fail when the
+      `partition` command has not been run recently. Creating a month later moves its rows out
+      of the default partition.
+    - Archive files are written to a temp file and swapped in with `os.replace` before rows are
+      removed from the database. Re-running after a failure merges rows by `id`, so nothing is
+      lost or duplicated.
+    - Archive files are gzip-compressed JSON Lines, which keeps NULL distinct from "" in old_value.
+"""
+import argparse
+import csv
+import dataclasses
+import datetime
+import gzip
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+from pathlib import Path
+from typing import TextIO
+
+from sqlalchemy import create_engine, delete, insert, inspect as sa_inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from arb.portal.sqla_models import PortalUpdate
+from arb.portal.utils.cli_util import add_database_uri_argument, cli_engine
+from arb.portal.utils.form_mapper import apply_portal_update_filters
+
+logger = logging.getLogger(__name__)
+logger.debug(f'Loading File: "{Path(__file__).name}". Full Path: "{Path(__file__)}"')
+
+TABLE_NAME = "portal_updates"
+PARTITION_PATTERN = re.compile(r"^portal_updates_p(\d{4})_(\d{2})$")
+DEFAULT_PARTITION = "portal_updates_default"
+ARCHIVE_FILE_PATTERN = re.compile(r"^portal_updates_(\d{4})_(\d{2})\.jsonl\.gz$")
+ARCHIVE_COLUMNS = ["id", "timestamp", "key", "old_value", "new_value", "user", "comments", "id_incidence"]
+
+# Rows deleted per statement when archiving a plain table
+_DELETE_CHUNK_SIZE = 1000
+
+# 64-bit ID of the current transaction (PostgreSQL 13+), the default of portal_updates.commit_xid
+_CURRENT_XID_SQL = "(pg_current_xact_id()::text::bigint)"
+
+# A row's 32-bit xmin widened to 64 bits relative to the current transaction, for rows inserted
+# before commit_xid existed (they keep the commit order they had when the change feed used xmin)
+_ROW_XID_SQL = (f"({_CURRENT_XID_SQL} - (({_CURRENT_XID_SQL} % 4294967296 - xmin::text::bigint + 4294967296) "
+                f"% 4294967296))")
+
+
+@dataclasses.dataclass
+class ArchiveReport:
+  """
+  Outcome of a single archival pass.
+
+  Attributes:
+    cutoff (datetime.datetime): Rows with timestamps before this instant were archived.
+    months (list[str]): Archived months ("YYYY_MM").
+    rows_archived (int): Number of rows written to archive files.
+    partitions_dropped (list[str]): Partitions detached and dropped (PostgreSQL only).
+    files_written (list[str]): Archive filenames created or extended.
+    dry_run (bool): True if nothing was modified.
+  """
+  cutoff: datetime.datetime
+  months: list[str] = dataclasses.field(default_factory=list)
+  rows_archived: int = 0
+  partitions_dropped: list[str] = dataclasses.field(default_factory=list)
+  files_written: list[str] = dataclasses.field(default_factory=list)
+  dry_run: bool = False
+
+  def summary(self) -> str:
+    """
+    Return a one-line human-readable summary of the pass.
+
+    Returns:
+      str: Summary text suitable for logs and CLI output.
+    """
+    prefix = "portal_updates archive (dry run)" if self.dry_run else "portal_updates archive"
+    return (f"{prefix}: {self.rows_archived} rows before {self.cutoff:%Y-%m-%d} in {len(self.months)} months, "
+            f"{len(self.partitions_dropped)} partitions dropped, {len(self.files_written)} files written")
+
+
+def month_start(value: datetime.datetime, months: int = 0) -> datetime.datetime:
+  """
+  Return the first instant (UTC) of the month containing `value`, shifted by `months`.
+
+  Args:
+    value (datetime.datetime): Any datetime; naive values are treated as UTC.
+    months (int): Number of months to add (may be negative).
+
+  Returns:
+    datetime.datetime: Timezone-aware UTC datetime at midnight on the first of the month.
+
+  Examples:
+    Input : datetime.datetime(2025, 3, 15, tzinfo=UTC), months=-2
+    Output: datetime.datetime(2025, 1, 1, tzinfo=UTC)
+  """
+  if value.tzinfo is None:
+    value = value.replace(tzinfo=datetime.UTC)
+  value = value.astimezone(datetime.UTC)
+  index = value.year * 12 + value.month - 1 + months
+  return datetime.datetime(index // 12, index % 12 + 1, 1, tzinfo=datetime.UTC)
+
+
+def ensure_portal_update_indexes(engine: Engine) -> None:
+  """
+  Create any index declared on `PortalUpdate` that the database does not have yet.
+
+  Args:
+    engine (Engine): Engine connected to the portal database.
+
+  Examples:
+    ensure_portal_update_indexes(db.engine)
+
+  Notes:
+    - Also adds the `commit_xid` column to older tables and, on PostgreSQL, sets its default and
+      fills it in for rows that predate it (see `_ensure_commit_xid_column`).
+  """
+  with engine.begin() as connection:
+    _ensure_commit_xid_column(connection)
+    for index in PortalUpdate.__table__.indexes:
+      index.create(connection, checkfirst=True)
+
+
+def _ensure_commit_xid_column(connection: Connection) -> None:
+  """Add portal_updates.commit_xid if missing; on PostgreSQL set its default and fill in older rows."""
+  if "commit_xid" not in {column["name"] for column in sa_inspect(connection).get_columns(TABLE_NAME)}:
+    connection.execute(text(f"ALTER TABLE {TABLE_NAME} ADD COLUMN commit_xid BIGINT"))
+  if connection.dialect.name == "postgresql":
+    connection.execute(text(f"ALTER TABLE {TABLE_NAME} ALTER COLUMN commit_xid SET DEFAULT {_CURRENT_XID_SQL}"))
+    connection.execute(text(f"UPDATE {TABLE_NAME} SET commit_xid = {_ROW_XID_SQL} WHERE commit_xid IS NULL"))
+
+
+def _is_partitioned(connection: Connection) -> bool:
+  if connection.dialect.name != "postgresql":
+    return False
+  relkind = connection.execute(text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:name)"),
+                               {"name": TABLE_NAME}).scalar()
+  return relkind == "p"
+
+
+def _partition_names(connection: Connection) -> set[str]:
+  return set(connection.execute(text(
+    "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+    "WHERE i.inhparent = to_regclass(:name)"), {"name": TABLE_NAME}).scalars())
+
+
+def _partition_name(month: datetime.datetime) -> str:
+  return f"{TABLE_NAME}_p{month:%Y_%m}"
+
+
+def _convert_to_partitioned(connection: Connection) -> None:
+  """Replace the plain PostgreSQL portal_updates table with a partitioned one holding the same rows."""
+  legacy = f"{TABLE_NAME}_unpartitioned"
+  _ensure_commit_xid_column(connection)
+  sequence = connection.execute(text("SELECT pg_get_serial_sequence(:name, 'id')"), {"name": TABLE_NAME}).scalar()
+  if sequence is None:
+    sequence = f"{TABLE_NAME}_id_seq"
+    connection.execute(text(f"CREATE SEQUENCE IF NOT EXISTS {sequence}"))
+    connection.execute(text(f"SELECT setval('{sequence}', COALESCE((SELECT max(id) FROM {TABLE_NAME}), 0) + 1, false)"))
+
+  connection.execute(text(f"ALTER TABLE {TABLE_NAME} RENAME TO {legacy}"))
+  pkey = connection.execute(text("SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(:name) "
+                                 "AND contype = 'p'"), {"name": legacy}).scalar()
+  if pkey:
+    connection.execute(text(f"ALTER TABLE {legacy} RENAME CONSTRAINT {pkey} TO {legacy}_pkey"))
+  for index in PortalUpdate.__table__.indexes:
+    connection.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+
+  # The partition key must be part of the primary key
+  connection.execute(text(
+    f"CREATE TABLE {TABLE_NAME} ("
+    f"id integer NOT NULL DEFAULT nextval('{sequence}'::regclass), "
+    f"\"timestamp\" timestamp with time zone NOT NULL DEFAULT now(), "
+    f"key varchar(255) NOT NULL, "
+    f"old_value text, "
+    f"new_value text NOT NULL, "
+    f"\"user\" varchar(255) NOT NULL, "
+    f"comments text NOT NULL, "
+    f"id_incidence integer, "
+    f"commit_xid bigint DEFAULT {_CURRENT_XID_SQL}, "
+    f"CONSTRAINT {TABLE_NAME}_pkey PRIMARY KEY (id, \"timestamp\")"
+    f") PARTITION BY RANGE (\"timestamp\")"))
+  connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {TABLE_NAME}.id"))
+  connection.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {TABLE_NAME} DEFAULT"))
+
+  oldest = connection.execute(text(f"SELECT min(\"timestamp\") FROM {legacy}")).scalar()
+  if oldest is not None:
+    _ensure_month_partitions(connection, month_start(oldest), month_start(datetime.datetime.now(datetime.UTC)))
+
+  columns = ", ".join(f'"{column}"' for column in [*ARCHIVE_COLUMNS, "commit_xid"])
+  connection.execute(text(f"INSERT INTO {TABLE_NAME} ({columns}) SELECT {columns} FROM {legacy}"))
+  connection.execute(text(f"DROP TABLE {legacy}"))
+  for index in PortalUpdate.__table__.indexes:
+    index.create(connection)
+  logger.info(f"Converted {TABLE_NAME} to a monthly partitioned table")
+
+
+def _ensure_month_partitions(connection: Connection,
+                             first_month: datetime.datetime,
+                             last_month: datetime.datetime) -> list[str]:
+  """Create monthly partitions from first_month to last_month inclusive, moving rows out of the default partition."""
+  existing = _partition_names(connection)
+  created = []
+  month = first_month
+  while month <= last_month:
+    name = _partition_name(month)
+    if name not in existing:
+      lower, upper = month.isoformat(), month_start(month, 1).isoformat()
+      connection.execute(text(f"CREATE TABLE {name} (LIKE {TABLE_NAME} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+      connection.execute(text(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE \"timestamp\" >= :lower AND \"timestamp\" < :upper "
+        f"RETURNING *) INSERT INTO {name} SELECT * FROM moved"), {"lower": month, "upper": month_start(month, 1)})
+      connection.execute(text(f"ALTER TABLE {TABLE_NAME} ATTACH PARTITION {name} "
+                              f"FOR VALUES FROM ('{lower}') TO ('{upper}')"))
+      created.append(name)
+    month = month_start(month, 1)
+  return created
+
+
+def partition_portal_updates(engine: Engine, months_ahead: int = 3) -> list[str]:
+  """
+  Convert portal_updates to monthly partitions (once) and create partitions for upcoming months.
+
+  Args:
+    engine (Engine): Engine connected to the portal database.
+    months_ahead (int): Number of months after the current month to create partitions for.
+
+  Returns:
+    list[str]: Names of partitions created by this call (empty on non-PostgreSQL databases).
+
+  Examples:
+    partition_portal_updates(db.engine)
+    # ['portal_updates_p2025_08', 'portal_updates_p2025_09', ...]
+
+  Notes:
+    - Runs in a single transaction; the one-time conversion copies every row and holds an
+      exclusive lock on the table while it does, so run it during a maintenance window.
+    - Safe to run repeatedly (e.g., monthly from cron).
+  """
+  if engine.dialect.name != "postgresql":
+    logger.info(f"{TABLE_NAME} partitioning is PostgreSQL only; keeping a plain table on {engine.dialect.name}")
+    return []
+
+  with engine.begin() as connection:
+    if not _is_partitioned(connection):
+      _convert_to_partitioned(connection)
+    now = datetime.datetime.now(datetime.UTC)
+    created = _ensure_month_partitions(connection, month_start(now), month_start(now, months_ahead))
+  logger.info(f"Created {TABLE_NAME} partitions: {created}")
+  return created
+
+
+def _archive_path(archive_dir: Path, month: datetime.datetime) -> Path:
+  return archive_dir / f"{TABLE_NAME}_{month:%Y_%m}.jsonl.gz"
+
+
+def read_archive_file(path: Path) -> list[dict]:
+  """
+  Read the rows stored in one archive file.
+
+  Args:
+    path (Path): Archive file (`portal_updates_YYYY_MM.jsonl.gz`).
+
+  Returns:
+    list[dict]: Rows keyed by `ARCHIVE_COLUMNS`, with `timestamp` as an aware UTC datetime.
+  """
+  rows = []
+  with gzip.open(path, "rt", encoding="utf-8") as f:
+    for line in f:
+      if line.strip():
+        row = json.loads(line)
+        row["timestamp"] = datetime.datetime.fromisoformat(row["timestamp"])
+        rows.append(row)
+  return rows
+
+
+def write_archive_file(archive_dir: Path, month: datetime.datetime, rows: list[dict]) -> Path:
+  """
+  Add rows to a month's archive file, merging by `id` with any rows already archived.
+
+  Args:
+    archive_dir (Path): Folder holding archive files (created if missing).
+    month (datetime.datetime): First instant of the archived month.
+    rows (list[dict]): Rows keyed by `ARCHIVE_COLUMNS`.
+
+  Returns:
+    Path: The archive file written.
+  """
+  archive_dir.mkdir(parents=True, exist_ok=True)
+  path = _archive_path(archive_dir, month)
+  merged = {row["id"]: row for row in read_archive_file(path)} if path.exists() else {}
+  for row in rows:
+    timestamp = row["timestamp"]
+    if timestamp.tzinfo is None:
+      timestamp = timestamp.replace(tzinfo=datetime.UTC)
+    merged[row["id"]] = {**{column: row[column] for column in ARCHIVE_COLUMNS}, "timestamp": timestamp}
+
+  fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=archive_dir)
+  os.close(fd)
+  try:
+    with gzip.open(tmp_name, "wt", encoding="utf-8") as f:
+      for row in sorted(merged.values(), key=lambda r: (r["timestamp"], r["id"])):
+        f.write(json.dumps({**row, "timestamp": row["timestamp"].astimezone(datetime.UTC).isoformat()}) + "\n")
+    os.replace(tmp_name, path)
+  except BaseException:
+    Path(tmp_name).unlink(missing_ok=True)
+    raise
+  return path
+
+
+def _select_rows(connection: Connection, table_name: str = TABLE_NAME,
+                 before: datetime.datetime | None = None) -> list[dict]:
+  """Return archive rows from portal_updates (optionally before a cutoff) or from one partition."""
+  if table_name == TABLE_NAME:
+    table = PortalUpdate.__table__
+    statement = select(*[table.c[column] for column in ARCHIVE_COLUMNS]).order_by(table.c.timestamp, table.c.id)
+    if before is not None:
+      statement = statement.where(table.c.timestamp < before)
+  else:
+    columns = ", ".join(f'"{column}"' for column in ARCHIVE_COLUMNS)
+    statement = text(f'SELECT {columns} FROM {table_name} ORDER BY "timestamp", id')
+  return [dict(row) for row in connection.execute(statement).mappings()]
+
+
+def archive_portal_updates(engine: Engine,
+                           archive_dir: Path,
+                           retention_months: int = 24,
+                           now: datetime.datetime | None = None,
+                           dry_run: bool = False) -> ArchiveReport:
+  """
+  Move portal_updates rows older than the retention window to compressed archive files.
+
+  Args:
+    engine (Engine): Engine connected to the portal database.
+    archive_dir (Path): Folder for archive files.
+    retention_months (int): Whole months (before the current month) kept in the database.
+    now (datetime.datetime | None): Reference time (defaults to the current UTC time).
+    dry_run (bool): If True, report what would be archived without writing or deleting anything.
+
+  Returns:
+    ArchiveReport: Months, rows, partitions and files touched.
+
+  Examples:
+    report = archive_portal_updates(db.engine, Path("portal_updates_archive"), retention_months=24)
+
+  Notes:
+    - Partitioned tables: each monthly partition entirely before the cutoff is exported, then
+      detached and dropped (no row-by-row delete).
+    - Remaining old rows (plain tables, or the default partition) are exported month by month
+      and deleted by primary key in the same transaction.
+  """
+  cutoff = month_start(now or datetime.datetime.now(datetime.UTC), -retention_months)
+  report = ArchiveReport(cutoff=cutoff, dry_run=dry_run)
+
+  def record(month: datetime.datetime, rows: list[dict]) -> None:
+    if not rows:
+      return
+    label = f"{month:%Y_%m}"
+    if label not in report.months:
+      report.months.append(label)
+    report.rows_archived += len(rows)
+    if not dry_run:
+      path = write_archive_file(archive_dir, month, rows)
+      if path.name not in report.files_written:
+        report.files_written.append(path.name)
+
+  with engine.connect() as connection:
+    partitions = sorted(_partition_names(connection)) if _is_partitioned(connection) else []
+
+  for name in partitions:
+    match = PARTITION_PATTERN.match(name)
+    if not match:
+      continue
+    month = datetime.datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=datetime.UTC)
+    if month_start(month, 1) > cutoff:
+      continue
+    with engine.begin() as connection:
+      record(month, _select_rows(connection, table_name=name))
+      if not dry_run:
+        connection.execute(text(f"ALTER TABLE {TABLE_NAME} DETACH PARTITION {name}"))
+        connection.execute(text(f"DROP TABLE {name}"))
+        report.partitions_dropped.append(name)
+
+  with engine.begin() as connection:
+    rows = _select_rows(connection, before=cutoff)
+    by_month: dict[datetime.datetime, list[dict]] = {}
+    for row in rows:
+      by_month.setdefault(month_start(row["timestamp"]), []).append(row)
+    for month, month_rows in by_month.items():
+      record(month, month_rows)
+    if not dry_run:
+      ids = [row["id"] for row in rows]
+      id_column = PortalUpdate.__table__.c.id
+      for start in range(0, len(ids), _DELETE_CHUNK_SIZE):
+        connection.execute(delete(PortalUpdate.__table__).where(id_column.in_(ids[start:start + _DELETE_CHUNK_SIZE])))
+
+  logger.info(report.summary())
+  return report
+
+
+def export_archived_portal_updates(archive_dir: Path, args: dict, output: TextIO) -> int:
+  """
+  Query archived portal_updates rows and write them as CSV.
+
+  Archive files are loaded into an in-memory SQLite database and filtered with
+  `apply_portal_update_filters`, so the filters behave exactly as on the `/portal_updates` page.
+
+  Args:
+    archive_dir (Path): Folder holding archive files.
+    args (dict): Filter values keyed like `request.args` (filter_key, filter_user, filter_comments,
+      filter_id_incidence, start_date, end_date).
+    output (TextIO): Destination for the CSV text.
+
+  Returns:
+    int: Number of rows written (excluding the header).
+
+  Examples:
+    with open("old_updates.csv", "w", newline="") as f:
+      export_archived_portal_updates(Path("portal_updates_archive"), {"filter_user": "alice"}, f)
+  """
+  first_month = last_month = None
+  try:
+    if args.get("start_date", "").strip():
+      first_month = month_start(datetime.datetime.strptime(args["start_date"].strip(), "%Y-%m-%d"))
+    if args.get("end_date", "").strip():
+      last_month = month_start(datetime.datetime.strptime(args["end_date"].strip(), "%Y-%m-%d"))
+  except ValueError:
+    first_month = last_month = None  # Invalid dates are ignored by the filters as well
+
+  paths = []
+  for path in sorted(Path(archive_dir).glob("*.jsonl.gz")):
+    match = ARCHIVE_FILE_PATTERN.match(path.name)
+    if not match:
+      continue
+    month = datetime.datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=datetime.UTC)
+    if (first_month and month < first_month) or (last_month and month > last_month):
+      continue
+    paths.append(path)
+
+  engine = create_engine("sqlite://")
+  try:
+    PortalUpdate.__table__.create(engine)
+    with Session(engine) as session:
+      for path in paths:
+        rows = read_archive_file(path)
+        for row in rows:
+          row["timestamp"] = row["timestamp"].astimezone(datetime.UTC).replace(tzinfo=None)
+        if rows:
+          session.execute(insert(PortalUpdate.__table__), rows)
+
+      query = apply_portal_update_filters(session.query(PortalUpdate), PortalUpdate, args)
+      updates = query.order_by(PortalUpdate.timestamp.desc()).all()
+
+      writer = csv.writer(output)
+      writer.writerow(["timestamp", "key", "old_value", "new_value", "user", "comments", "id_incidence"])
+      for u in updates:
+        writer.writerow([u.timestamp, u.key, u.old_value, u.new_value, u.user, u.comments, u.id_incidence or ""])
+  finally:
+    engine.dispose()
+
+  return len(updates)
+
+
+def main(argv: list[str] | None = None) -> int:
+  """
+  Command-line entry point for portal_updates maintenance.
+
+  Args:
+    argv (list[str] | None): Arguments to parse; defaults to `sys.argv[1:]`.
+
+  Returns:
+    int: Process exit code (0 on success).
+
+  Examples:
+    python -m arb.portal.utils.portal_update_archive archive --retention-months 24
+  """
+  from arb.portal.config.settings import BaseConfig
+
+  parser = argparse.ArgumentParser(description="Maintain the portal_updates audit table.")
+  add_database_uri_argument(parser)
+  parser.add_argument("--archive-dir", type=Path, default=None,
+                      help="Archive folder (default: PORTAL_UPDATES_ARCHIVE_DIR or <project root>/portal_updates_archive).")
+  commands = parser.add_subparsers(dest="command", required=True)
+  commands.add_parser("indexes", help="Create missing portal_updates indexes.")
+  partition_parser = commands.add_parser("partition", help="Partition by month and create upcoming partitions.")
+  partition_parser.add_argument("--months-ahead", type=int, default=3)
+  archive_parser = commands.add_parser("archive", help="Archive rows older than the retention window.")
+  archive_parser.add_argument("--retention-months", type=int, default=BaseConfig.PORTAL_UPDATES_RETENTION_MONTHS)
+  archive_parser.add_argument("--dry-run", action="store_true", help="Report without modifying anything.")
+  export_parser = commands.add_parser("export", help="Write archived rows matching the filters as CSV.")
+  for name in ("filter_key", "filter_user", "filter_comments", "filter_id_incidence", "start_date", "end_date"):
+    export_parser.add_argument(f"--{name.replace('_', '-')}", dest=name, default="")
+  export_parser.add_argument("--output", type=Path, default=None, help="CSV file (default: stdout).")
+  args = parser.parse_args(argv)
+
+  archive_dir = args.archive_dir or BaseConfig.PORTAL_UPDATES_ARCHIVE_DIR
+  if archive_dir is None:
+    from arb.portal.startup.runtime_info import PROJECT_ROOT
+    archive_dir = PROJECT_ROOT / "portal_updates_archive"
+  archive_dir = Path(archive_dir)
+
+  if args.command == "export":
+    filters = {name: getattr(args, name) for name in
+               ("filter_key", "filter_user", "filter_comments", "filter_id_incidence", "start_date", "end_date")}
+    if args.output is None:
+      count = export_archived_portal_updates(archive_dir, filters, sys.stdout)
+    else:
+      with open(args.output, "w", newline="", encoding="utf-8") as f:
+        count = export_archived_portal_updates(archive_dir, filters, f)
+    print(f"{count} archived rows exported", file=sys.stderr)
+    return 0
+
+  engine = cli_engine(args.database_uri)
+  try:
+    if args.command == "indexes":
+      ensure_portal_update_indexes(engine)
+      print("portal_updates indexes ensured")
+    elif args.command == "partition":
+      created = partition_portal_updates(engine, months_ahead=args.months_ahead)
+      print(f"{len(created)} partitions created: {', '.join(created)}")
+    else:
+      report = archive_portal_updates(engine, archive_dir, retention_months=args.retention_months,
+                                      dry_run=args.dry_run)
+      print(report.summary())
+  finally:
+    engine.dispose()
+  return 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
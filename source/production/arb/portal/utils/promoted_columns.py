@@ -0,0 +1,308 @@
+"""
+  Promote frequently filtered/sorted `misc_json` keys to indexed generated columns on `incidences`.
+
+  Every incidence attribute lives in the `misc_json` JSON document, so filtering or sorting on
+  sector, facility, contact or dates has to extract the key from each row and no index can help.
+  This module keeps a declarative list of "hot" keys, builds a generated column plus a B-tree
+  index for each of them, and provides a query helper that uses those columns whenever they exist
+  (falling back to JSON extraction when they do not).
+
+  Generated columns:
+    - PostgreSQL: `misc_<key> text GENERATED ALWAYS AS (misc_json ->> '<key>') STORED`.
+      Adding the column computes it for every existing row (the backfill).
+    - SQLite: `misc_<key> GENERATED ALWAYS AS (json_extract(misc_json, '$.<key>')) VIRTUAL`.
+      SQLite cannot add STORED columns with ALTER TABLE; the index stores the values instead.
+
+  Attributes:
+    PROMOTED_JSON_KEYS (tuple[str, ...]): misc_json keys promoted to generated columns.
+    PROMOTED_COLUMN_PREFIX (str): Prefix of generated column names (`misc_<key>`).
+    logger (logging.Logger): Logger instance for this module.
+
+  Examples:
+    from arb.portal.utils.promoted_columns import build_promoted_columns, query_incidences
+    build_promoted_columns(db.engine)
+    rows = query_incidences(db, base, filters={"sector": "Landfill"}, sort_by="facility_name")
+
+    # Command line (from the production directory):
+    python -m arb.portal.utils.promoted_columns --dry-run
+
+  Notes:
+    - Generated columns are maintained by the database, so no application write path changes.
+    - The app must be restarted (or the automap base re-reflected) after building the columns
+      for queries to pick them up.
+    - Dates are promoted as their stored ISO-8601 text; PostgreSQL does not allow the (non
+      immutable) text → timestamptz cast in a generated column.
+"""
+import argparse
+import logging
+import re
+from pathlib import Path
+from typing import Any
+
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import desc, inspect as sa_inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.automap import AutomapBase
+
+from arb.portal.utils.cli_util import add_database_uri_argument, cli_engine
+from arb.utils.sql_alchemy import get_class_from_table_name
+
+logger = logging.getLogger(__name__)
+logger.debug(f'Loading File: "{Path(__file__).name}". Full Path: "{Path(__file__)}"')
+
+PROMOTED_JSON_KEYS = (
+  "sector",
+  "facility_name",
+  "contact_name",
+  "observation_timestamp",
+  "inspection_timestamp",
+)
+
+PROMOTED_COLUMN_PREFIX = "misc_"
+
+_KEY_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def promoted_column_name(key: str) -> str:
+  """
+  Return the generated column name for a misc_json key.
+
+  Args:
+    key (str): misc_json key (letters, digits and underscores only).
+
+  Returns:
+    str: Column name, e.g. "misc_sector".
+
+  Raises:
+    ValueError: If `key` is not a plain identifier (it is embedded in DDL).
+
+  Examples:
+    Input : "facility_name"
+    Output: "misc_facility_name"
+  """
+  if not _KEY_PATTERN.match(key or ""):
+    raise ValueError(f"misc_json key {key!r} cannot be promoted to a column")
+  return f"{PROMOTED_COLUMN_PREFIX}{key}"
+
+
+def promoted_column_ddl(dialect_name: str,
+                        key: str,
+                        table_name: str = "incidences",
+                        json_field: str = "misc_json") -> list[str]:
+  """
+  Return the DDL statements that add the generated column and index for one key.
+
+  Args:
+    dialect_name (str): SQLAlchemy dialect name ("postgresql" or "sqlite").
+    key (str): misc_json key to promote.
+    table_name (str): Table holding the JSON column.
+    json_field (str): Name of the JSON column.
+
+  Returns:
+    list[str]: [ADD COLUMN statement, CREATE INDEX statement].
+
+  Raises:
+    ValueError: If the dialect is unsupported or the key/table names are not plain identifiers.
+
+  Examples:
+    Input : "postgresql", "sector"
+    Output: ['ALTER TABLE incidences ADD COLUMN IF NOT EXISTS misc_sector text GENERATED ALWAYS AS
+             ((misc_json ->> \\'sector\\')) STORED', 'CREATE INDEX IF NOT EXISTS ix_incidences_misc_sector ...']
+  """
+  column = promoted_column_name(key)
+  for name in (table_name, json_field):
+    if not _KEY_PATTERN.match(name or ""):
+      raise ValueError(f"{name!r} is not a plain SQL identifier")
+
+  if dialect_name == "postgresql":
+    add_column = (f"ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS {column} text "
+                  f"GENERATED ALWAYS AS (({json_field} ->> '{key}')) STORED")
+  elif dialect_name == "sqlite":
+    add_column = (f"ALTER TABLE {table_name} ADD COLUMN {column} "
+                  f"GENERATED ALWAYS AS (json_extract({json_field}, '$.{key}')) VIRTUAL")
+  else:
+    raise ValueError(f"Generated misc_json columns are not supported on {dialect_name}")
+
+  create_index = f"CREATE INDEX IF NOT EXISTS ix_{table_name}_{column} ON {table_name} ({column})"
+  return [add_column, create_index]
+
+
+def build_promoted_columns(engine: Engine,
+                           keys: tuple[str, ...] | list[str] = PROMOTED_JSON_KEYS,
+                           table_name: str = "incidences",
+                           json_field: str = "misc_json",
+                           dry_run: bool = False) -> list[str]:
+  """
+  Add missing generated columns and indexes for the promoted keys (the migration/backfill step).
+
+  Args:
+    engine (Engine): Engine connected to the portal database.
+    keys (tuple[str, ...] | list[str]): misc_json keys to promote.
+    table_name (str): Table holding the JSON column.
+    json_field (str): Name of the JSON column.
+    dry_run (bool): If True, return the statements that would run without executing them.
+
+  Returns:
+    list[str]: DDL statements executed (or, with dry_run, that would be executed).
+
+  Raises:
+    ValueError: If the table does not exist, or the dialect/keys are unsupported.
+    sqlalchemy.exc.SQLAlchemyError: If a DDL statement fails (all statements run in one transaction).
+
+  Examples:
+    build_promoted_columns(db.engine)
+    # ['ALTER TABLE incidences ADD COLUMN IF NOT EXISTS misc_sector ...', 'CREATE INDEX ...', ...]
+
+  Notes:
+    - Idempotent: columns and indexes that already exist are skipped.
+    - On PostgreSQL the ALTER rewrites the table to compute the stored values; run it off-peak.
+  """
+  inspector = sa_inspect(engine)
+  if not inspector.has_table(table_name):
+    raise ValueError(f"Table '{table_name}' does not exist")
+  existing_columns = {column["name"] for column in inspector.get_columns(table_name)}
+  existing_indexes = {index["name"] for index in inspector.get_indexes(table_name)}
+
+  statements = []
+  for key in keys:
+    add_column, create_index = promoted_column_ddl(engine.dialect.name, key, table_name, json_field)
+    column = promoted_column_name(key)
+    if column not in existing_columns:
+      statements.append(add_column)
+    if f"ix_{table_name}_{column}" not in existing_indexes:
+      statements.append(create_index)
+
+  if dry_run or not statements:
+    logger.info(f"build_promoted_columns: {len(statements)} statements {'(dry run)' if dry_run else ''}")
+    return statements
+
+  with engine.begin() as connection:
+    for statement in statements:
+      logger.info(f"build_promoted_columns: {statement}")
+      connection.execute(text(statement))
+  return statements
+
+
+def get_json_key_column(table_class: Any, key: str, json_field: str = "misc_json") -> Any:
+  """
+  Return a SQL expression for a misc_json key, preferring its promoted column when present.
+
+  Args:
+    table_class (Any): Mapped ORM class (e.g., the automapped `incidences` class).
+    key (str): misc_json key.
+    json_field (str): Name of the JSON column.
+
+  Returns:
+    Any: The generated column if the reflected table has one for `key` (whether it was built for
+    PROMOTED_JSON_KEYS or with `--key`), otherwise a JSON text extraction expression
+    (`misc_json ->> key` / `json_extract`).
+
+  Examples:
+    Input : incidences class with misc_sector, "sector"
+    Output: incidences.misc_sector column
+
+  Notes:
+    - Only generated columns are used; an ordinary column that happens to be named `misc_<key>`
+      is not assumed to mirror the JSON key.
+  """
+  table = table_class.__table__
+  column = table.c.get(f"{PROMOTED_COLUMN_PREFIX}{key}") if _KEY_PATTERN.match(key or "") else None
+  if column is not None and column.computed is not None:
+    return column
+  return table.c[json_field][key].as_string()
+
+
+def query_incidences(db: SQLAlchemy,
+                     base: AutomapBase,
+                     filters: dict[str, str] | None = None,
+                     sort_by: str | None = None,
+                     descending: bool = True,
+                     page: int | None = None,
+                     per_page: int | None = None,
+                     table_name: str = "incidences",
+                     primary_key: str = "id_incidence",
+                     json_field: str = "misc_json",
+                     prefix_filters: dict[str, str] | None = None) -> list:
+  """
+  List incidence rows filtered and sorted on misc_json keys, using promoted columns when present.
+
+  Args:
+    db (SQLAlchemy): SQLAlchemy DB instance.
+    base (AutomapBase): Reflected model metadata.
+    filters (dict[str, str] | None): misc_json key → exact (text) value to match.
+    sort_by (str | None): Primary key (default) or a misc_json key to order by.
+    descending (bool): Sort descending if True.
+    page (int | None): 1-based page number; ignored unless `per_page` is set.
+    per_page (int | None): Page size; None returns every matching row.
+    table_name (str): Table to query.
+    primary_key (str): Primary key column (also the tie-breaker for stable paging).
+    json_field (str): Name of the JSON column.
+    prefix_filters (dict[str, str] | None): misc_json key → text prefix to match (e.g., a "YYYY-MM" month
+      of an ISO timestamp).
+
+  Returns:
+    list: Matching ORM instances.
+
+  Raises:
+    ValueError: If the table is not mapped.
+
+  Examples:
+    rows = query_incidences(db, base, {"sector": "Landfill"}, sort_by="observation_timestamp", per_page=50)
+  """
+  table_class = get_class_from_table_name(base, table_name)
+  if table_class is None:
+    raise ValueError(f"Table '{table_name}' not found or not mapped in metadata.")
+  pk_column = table_class.__table__.c[primary_key]
+
+  query = db.session.query(table_class)
+  for key, value in (filters or {}).items():
+    query = query.filter(get_json_key_column(table_class, key, json_field) == value)
+  for key, value in (prefix_filters or {}).items():
+    query = query.filter(get_json_key_column(table_class, key, json_field).like(f"{value}%"))
+
+  order_columns = []
+  if sort_by and sort_by != primary_key:
+    order_columns.append(get_json_key_column(table_class, sort_by, json_field))
+  order_columns.append(pk_column)
+  query = query.order_by(*[desc(column) if descending else column for column in order_columns])
+
+  if per_page:
+    query = query.limit(per_page).offset((max(page or 1, 1) - 1) * per_page)
+
+  return query.all()
+
+
+def main(argv: list[str] | None = None) -> int:
+  """
+  Command-line entry point that builds the promoted columns and indexes.
+
+  Args:
+    argv (list[str] | None): Arguments to parse; defaults to `sys.argv[1:]`.
+
+  Returns:
+    int: Process exit code (0 on success).
+
+  Examples:
+    python -m arb.portal.utils.promoted_columns --database-uri sqlite:///portal.sqlite --dry-run
+  """
+  parser = argparse.ArgumentParser(description="Promote hot misc_json keys to indexed generated columns.")
+  add_database_uri_argument(parser)
+  parser.add_argument("--key", action="append", dest="keys", default=None,
+                      help="misc_json key to promote (repeatable; default: PROMOTED_JSON_KEYS).")
+  parser.add_argument("--dry-run", action="store_true", help="Print the DDL without executing it.")
+  args = parser.parse_args(argv)
+
+  engine = cli_engine(args.database_uri)
+  try:
+    statements = build_promoted_columns(engine, keys=args.keys or PROMOTED_JSON_KEYS, dry_run=args.dry_run)
+  finally:
+    engine.dispose()
+
+  for statement in statements:
+    print(f"{statement};")
+  print(f"{len(statements)} statements {'to run (dry run)' if args.dry_run else 'executed'}")
+  return 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
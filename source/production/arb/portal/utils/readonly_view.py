@@ -0,0 +1,200 @@
+"""
+  Schema-driven layout for the read-only sector view.
+
+  Sectors without an interactive feedback form (e.g., Dairy Digester, Energy, Generic) are shown
+  with `render_readonly_sector_view`. Instead of a flat, alphabetical list of raw misc_json keys,
+  the view lays the record out like the sector's spreadsheet: each field gets its spreadsheet
+  label, and fields are grouped into the spreadsheet's sections (blocks of consecutive rows).
+
+  The layout is computed once per sector from the sector's Excel schema (`xl_schema_map`, see
+  `arb.utils.excel.xl_parse`) and reused; formatting a record is then a single pass over the
+  layout with a precompiled formatter per field (datetime fields are shown in California time).
+
+  Attributes:
+    OTHER_FIELDS_TITLE (str): Title of the section holding keys that are not in the schema.
+    logger (logging.Logger): Logger instance for this module.
+
+  Examples:
+    from arb.portal.utils.readonly_view import readonly_sections
+    sections = readonly_sections("Dairy Digester", misc_json)
+    sections[0]["rows"][0]  # ("id_incidence", "1.  Incidence/Emission ID", 1234)
+
+  Notes:
+    - Sector names are matched to the Excel templates ignoring case and "&" vs "and"; a sector
+      without a schema gets a single section of its keys in alphabetical order.
+    - Rendered pages are cached per incidence revision by `arb.portal.utils.form_page_cache`.
+"""
+import datetime
+import functools
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from arb.utils.date_and_time import utc_iso_str_to_ca_str
+from arb.utils.excel.xl_hardcoded import EXCEL_TEMPLATES
+from arb.utils.excel.xl_misc import get_excel_row_column
+
+logger = logging.getLogger(__name__)
+logger.debug(f'Loading File: "{Path(__file__).name}". Full Path: "{Path(__file__)}"')
+
+OTHER_FIELDS_TITLE = "Other Fields"
+
+
+@dataclass(frozen=True)
+class ReadonlyField:
+  """
+  One schema field of the read-only view.
+
+  Attributes:
+    key (str): misc_json key.
+    label (str): Spreadsheet label (whitespace collapsed).
+    format (Callable[[Any], Any]): Converts the stored value for display.
+  """
+  key: str
+  label: str
+  format: Callable[[Any], Any]
+
+
+@dataclass(frozen=True)
+class ReadonlySection:
+  """
+  A block of consecutive spreadsheet rows.
+
+  Attributes:
+    title (str): Section title ("Section 1", "Section 2", ...).
+    fields (tuple[ReadonlyField, ...]): Fields in spreadsheet order.
+  """
+  title: str
+  fields: tuple[ReadonlyField, ...]
+
+
+@dataclass(frozen=True)
+class ReadonlyLayout:
+  """
+  Precomputed read-only layout of a sector.
+
+  Attributes:
+    schema_version (str | None): Excel schema the layout was built from (None without a schema).
+    sections (tuple[ReadonlySection, ...]): Sections in spreadsheet order.
+    keys (frozenset[str]): Every key placed in a section.
+  """
+  schema_version: str | None
+  sections: tuple[ReadonlySection, ...]
+  keys: frozenset[str]
+
+
+def _as_is(value: Any) -> Any:
+  return value
+
+
+def _datetime_for_display(value: Any) -> Any:
+  return utc_iso_str_to_ca_str(value) if isinstance(value, str) else value
+
+
+def _normalize_sector(sector: str | None) -> str:
+  return " ".join(str(sector or "").replace("&", "and").lower().split())
+
+
+def sector_schema_version(sector: str | None) -> str | None:
+  """
+  Return the latest Excel schema version of a sector.
+
+  Args:
+    sector (str | None): Sector name (e.g., "Dairy Digester", "Oil & Gas").
+
+  Returns:
+    str | None: Schema version of the last matching entry in EXCEL_TEMPLATES, or None.
+
+  Examples:
+    Input : "Oil & Gas"
+    Output: "oil_and_gas_v01_00"
+  """
+  wanted = _normalize_sector(sector)
+  versions = [template["schema_version"] for template in EXCEL_TEMPLATES
+              if _normalize_sector(template["sector"]) == wanted]
+  return versions[-1] if versions else None
+
+
+@functools.lru_cache(maxsize=64)
+def readonly_layout(sector: str | None) -> ReadonlyLayout:
+  """
+  Return the cached read-only layout of a sector, built from its Excel schema.
+
+  Args:
+    sector (str | None): Sector name.
+
+  Returns:
+    ReadonlyLayout: Sections of labelled fields in spreadsheet row order. A new section starts
+      wherever the schema skips a spreadsheet row. Without a schema the layout is empty.
+
+  Notes:
+    - Schemas are loaded when `arb.utils.excel.xl_parse` is imported and do not change at runtime.
+  """
+  from arb.utils.excel.xl_parse import xl_schema_map
+
+  schema_version = sector_schema_version(sector)
+  schema = (xl_schema_map.get(schema_version) or {}).get("schema") if schema_version else None
+  if not schema:
+    return ReadonlyLayout(None, (), frozenset())
+
+  entries = []
+  for key, lookup in schema.items():
+    label = " ".join(str(lookup.get("label") or key).split())
+    try:
+      _, row = get_excel_row_column(lookup.get("label_address") or lookup["value_address"])
+    except (KeyError, TypeError, ValueError):
+      logger.warning(f"No spreadsheet address for {key!r} in {schema_version}; listing it last")
+      row = float("inf")
+    value_type = lookup.get("value_type")
+    formatter = _datetime_for_display if value_type is datetime.datetime else _as_is
+    entries.append((row, key, ReadonlyField(key, label, formatter)))
+  entries.sort(key=lambda entry: (entry[0], entry[1]))
+
+  sections, current, previous_row = [], [], None
+  for row, _, field in entries:
+    if current and previous_row is not None and row - previous_row > 1:
+      sections.append(current)
+      current = []
+    current.append(field)
+    previous_row = row
+  if current:
+    sections.append(current)
+
+  return ReadonlyLayout(schema_version,
+                        tuple(ReadonlySection(f"Section {n}", tuple(fields)) for n, fields in enumerate(sections, 1)),
+                        frozenset(key for _, key, _ in entries))
+
+
+def readonly_sections(sector: str | None, misc_json: dict | None) -> list[dict]:
+  """
+  Lay out a record for the read-only view.
+
+  Args:
+    sector (str | None): Sector name.
+    misc_json (dict | None): The incidence's misc_json.
+
+  Returns:
+    list[dict]: Sections with "title" and "rows" (tuples of key, label and display value), in
+      spreadsheet order. Only keys present in misc_json are listed; empty sections are left out,
+      and keys the schema does not know are listed alphabetically in a last OTHER_FIELDS_TITLE section.
+
+  Examples:
+    Input : "Dairy Digester", {"id_incidence": 7, "extra": "x"}
+    Output: [{"title": "Section 1", "rows": [("id_incidence", "1.  Incidence/Emission ID", 7)]},
+             {"title": "Other Fields", "rows": [("extra", "extra", "x")]}]
+  """
+  misc_json = misc_json or {}
+  layout = readonly_layout(sector)
+  sections = []
+  for section in layout.sections:
+    rows = [(field.key, field.label, field.format(misc_json[field.key]))
+            for field in section.fields if field.key in misc_json]
+    if rows:
+      sections.append({"title": section.title, "rows": rows})
+
+  other = sorted(key for key in misc_json if key not in layout.keys)
+  if other:
+    sections.append({"title": OTHER_FIELDS_TITLE if layout.sections else "Fields",
+                     "rows": [(key, key, misc_json[key]) for key in other]})
+  return sections
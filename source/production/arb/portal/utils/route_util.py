@@ -6,8 +6,8 @@
   and applying conditional rendering logic based on sector type and CRUD mode.
 
   Attributes:
-    incidence_prep (function): Prepares and renders feedback form pages.
-    render_readonly_sector_view (function): Renders read-only sector views.
+    incidence_prep (function): Prepares and renders feedback form pages (update GETs through the render cache).
+    render_readonly_sector_view (function): Renders read-only sector views with the sector's spreadsheet layout.
     generate_upload_diagnostics (function): Generates diagnostics for upload failures.
     generate_staging_diagnostics (function): Generates diagnostics for staging failures.
     format_diagnostic_message (function): Formats diagnostic messages for display.
@@ -27,14 +27,19 @@ from pathlib import Path
 from typing import List, Optional
 
 from flask import Response, flash, render_template, request
+from flask_wtf import FlaskForm
 from sqlalchemy.ext.automap import AutomapBase
 from werkzeug.datastructures import FileStorage
 
 from arb.portal.constants import PLEASE_SELECT
 from arb.portal.extensions import db
+from arb.portal.utils.autosave import incidence_revision
+from arb.portal.utils.diagnostics_policy import diagnostics_enabled
+from arb.portal.utils.form_page_cache import serve_form_page
+from arb.portal.utils.form_validation import validate_form
+from arb.portal.utils.readonly_view import readonly_sections
 from arb.utils.sql_alchemy import add_commit_and_log_model, sa_model_diagnostics, sa_model_to_dict
-from arb.utils.wtf_forms_util import initialize_drop_downs, model_to_wtform, validate_no_csrf, wtf_count_errors, \
-  wtform_to_model
+from arb.utils.wtf_forms_util import initialize_drop_downs, model_to_wtform, wtf_count_errors, wtform_to_model
 
 logger = logging.getLogger(__name__)
 logger.debug(f'Loading File: "{Path(__file__).name}". Full Path: "{Path(__file__)}"')
@@ -71,6 +76,13 @@ def incidence_prep(model_row: AutomapBase,
     - Handles both GET and POST requests for feedback forms.
     - Integrates with WTForms and SQLAlchemy models.
     - Shows a success popup if validation passes on submit.
+    - Model diagnostics, before/after snapshots and error logging only run when the diagnostics
+      policy selects the request (see `arb.portal.utils.diagnostics_policy`).
+    - The form is validated at most once (`arb.portal.utils.form_validation.validate_form`); the
+      error counts and the success check reuse that result.
+    - Update pages get the incidence's revision for field-level autosave (see `arb.portal.utils.autosave`).
+    - GETs of update pages go through the render cache and ETag revalidation
+      (see `arb.portal.utils.form_page_cache`), unless the request is diagnosed.
   """
   # The imports below can't be moved to the top of the file because they require Globals to be initialized
   # prior to first use (Globals.load_drop_downs(app, db)).
@@ -78,24 +90,63 @@ def incidence_prep(model_row: AutomapBase,
   from arb.portal.wtf_oil_and_gas import OGFeedback
 
   logger.debug(f"incidence_prep() called with {crud_type=}, {sector_type=}")
-  sa_model_diagnostics(model_row)
+  diagnose = diagnostics_enabled(getattr(model_row, "id_incidence", None))
+  if diagnose:
+    sa_model_diagnostics(model_row)
 
   if default_dropdown is None:
     default_dropdown = PLEASE_SELECT
 
   if sector_type == "Oil & Gas":
     logger.debug(f"({sector_type=}) will use an Oil & Gas Feedback Form")
-    wtf_form = OGFeedback()
+    form_class = OGFeedback
     template_file = 'feedback_oil_and_gas.html'
   elif sector_type == "Landfill":
     logger.debug(f"({sector_type=}) will use a Landfill Feedback Form")
-    wtf_form = LandfillFeedback()
+    form_class = LandfillFeedback
     template_file = 'feedback_landfill.html'
   else:
     # Handle unsupported sectors with a read-only view
     logger.info(f"({sector_type=}) is not supported for interactive editing - showing read-only view")
+    if request.method == 'GET' and crud_type == 'update' and not diagnose:
+      return serve_form_page(model_row, 'readonly_sector_view.html', sector_type,
+                             lambda: render_readonly_sector_view(model_row, sector_type, crud_type))
     return render_readonly_sector_view(model_row, sector_type, crud_type)
 
+  def render() -> str | Response:
+    return _render_feedback_form(model_row, form_class(), template_file, crud_type, default_dropdown, diagnose)
+
+  if request.method == 'GET' and crud_type == 'update' and not diagnose:
+    # Unchanged update pages are served from the render cache, or as a 304 to a revalidating browser
+    return serve_form_page(model_row, template_file, sector_type, render)
+  return render()
+
+
+def _render_feedback_form(model_row: AutomapBase,
+                          wtf_form: FlaskForm,
+                          template_file: str,
+                          crud_type: str,
+                          default_dropdown: str,
+                          diagnose: bool) -> str | Response:
+  """
+  Load, validate, save (on POST) and render a feedback form for `incidence_prep`.
+
+  Args:
+    model_row (AutomapBase): SQLAlchemy AutomapBase.
+    wtf_form (FlaskForm): New form of the sector's feedback form class.
+    template_file (str): Feedback template to render.
+    crud_type (str): 'create' or 'update'.
+    default_dropdown (str): Value used to fill in blank selects.
+    diagnose (bool): Whether the diagnostics policy selected the request.
+
+  Returns:
+    str | Response: Rendered HTML from the feedback template.
+  """
+  # Validation runs at most once per request; every consumer below reuses the result
+  validation = None
+  # Revision of the stored record, used by field-level autosave on update pages
+  revision = None
+
   if request.method == 'GET':
     # Populate wtform from model data
     model_to_wtform(model_row, wtf_form)
@@ -105,7 +156,8 @@ def incidence_prep(model_row: AutomapBase,
     # For GET requests for row creation, don't validate and error_count_dict will be all zeros
     # For GET requests for row update, validate (except for the csrf token that is only present for a POST)
     if crud_type == 'update':
-      validate_no_csrf(wtf_form, extra_validators=None)
+      validation = validate_form(wtf_form, skip_csrf=True, log_errors=diagnose)
+      revision = incidence_revision(db.session, model_row.id_incidence)
 
   # todo - trying to make sure invalid drop-downs become "Please Select"
   #        may want to look into using validate_no_csrf or initialize_drop_downs (or combo)
@@ -115,19 +167,18 @@ def incidence_prep(model_row: AutomapBase,
   # logger.debug(f"\n\t{wtf_form.data=}")
 
   if request.method == 'POST':
-    # Validate and count errors
-    wtf_form.validate()
-    _ = wtf_count_errors(wtf_form, log_errors=True)
-
-    # Diagnostics of the model before updating with wtform values
-    # Likely can comment out model_before and add_commit_and_log_model
-    # if you want less diagnostics and redundant commits
-    model_before = sa_model_to_dict(model_row)
+    validation = validate_form(wtf_form, log_errors=diagnose)
+
+    # Diagnostics of the model before updating with wtform values (only when diagnosing)
+    model_before = sa_model_to_dict(model_row) if diagnose else None
     wtform_to_model(model_row, wtf_form, ignore_fields=["id_incidence"])
     add_commit_and_log_model(db,
                              model_row,
                              comment='call to wtform_to_model()',
-                             model_before=model_before)
+                             model_before=model_before,
+                             log_changes=diagnose)
+    if crud_type == 'update':
+      revision = incidence_revision(db.session, model_row.id_incidence)
 
     # Determine the course of action for successful database update based on which button was submitted
     button = request.form.get('submit_button')
@@ -135,25 +186,25 @@ def incidence_prep(model_row: AutomapBase,
     # todo - change the button name to save?
     if button == 'validate_and_submit':
       logger.debug(f"validate_and_submit was pressed")
-      # Check if there are any validation errors
-      error_count_dict = wtf_count_errors(wtf_form, log_errors=True)
-      total_errors = sum(error_count_dict.values())
-      logger.debug(f"Error count dict: {error_count_dict}, total_errors: {total_errors}")
+      logger.debug(f"Error count dict: {validation.error_counts}, total_errors: {validation.total_errors}")
 
-      if total_errors == 0:
+      if validation.total_errors == 0:
         # No validation errors - show success popup
         logger.debug("No validation errors found - showing success popup")
         flash("✅ All changes have been saved successfully! No validation warnings or errors found.", "success")
         return render_template(template_file,
                                wtf_form=wtf_form,
                                crud_type=crud_type,
-                               error_count_dict=error_count_dict,
+                               error_count_dict=validation.error_counts,
+                               validation=validation,
                                id_incidence=getattr(model_row, "id_incidence", None),
+                               revision=revision,
                                show_success_popup=True)
       else:
-        logger.debug(f"Validation errors found: {total_errors} - not showing success popup")
+        logger.debug(f"Validation errors found: {validation.total_errors} - not showing success popup")
 
-  error_count_dict = wtf_count_errors(wtf_form, log_errors=True)
+  # Unvalidated forms (GET for a new row) have no errors
+  error_count_dict = validation.error_counts if validation else wtf_count_errors(wtf_form)
 
   logger.debug(f"incidence_prep() about to render get template")
 
@@ -161,7 +212,9 @@ def incidence_prep(model_row: AutomapBase,
                          wtf_form=wtf_form,
                          crud_type=crud_type,
                          error_count_dict=error_count_dict,
+                         validation=validation,
                          id_incidence=getattr(model_row, "id_incidence", None),
+                         revision=revision,
                          show_success_popup=False,  # Default to False for regular form display
                          )
 
@@ -184,7 +237,10 @@ def render_readonly_sector_view(model_row: AutomapBase, sector_type: str, crud_t
 
   Notes:
     - Used for sectors that do not have interactive feedback forms.
-    - Displays all misc_json fields in alphabetical order.
+    - Fields are shown with their spreadsheet labels, grouped into the spreadsheet's sections
+      (see `arb.portal.utils.readonly_view`); keys outside the sector's schema are listed last.
+    - `incidence_prep` serves update GETs of this view through the render cache
+      (see `arb.portal.utils.form_page_cache`), so it is rendered once per incidence revision.
   """
   logger.debug(f"render_readonly_sector_view() called for sector_type={sector_type}")
 
@@ -192,19 +248,11 @@ def render_readonly_sector_view(model_row: AutomapBase, sector_type: str, crud_t
   id_incidence = getattr(model_row, "id_incidence", None)
   misc_json = getattr(model_row, "misc_json", {}) or {}
 
-  # Create alphabetically sorted list of all fields
-  all_fields = []
-
-  # Add all misc_json fields, sorted alphabetically
-  if misc_json:
-    for key, value in sorted(misc_json.items()):
-      all_fields.append((key, value))
-
   return render_template('readonly_sector_view.html',
                          sector_type=sector_type,
                          id_incidence=id_incidence,
                          crud_type=crud_type,
-                         all_fields=all_fields,
+                         sections=readonly_sections(sector_type, misc_json),
                          misc_json=misc_json)
 
 
@@ -7,6 +7,8 @@
 
   Attributes:
     extract_sector_payload (function): Combines worksheet tab and metadata into a payload.
+    load_incidence (function): Reads an incidence's misc_json and `sources` sector from the database.
+    read_incidence (function): Same as load_incidence, through the incidence cache.
     get_sector_info (function): Resolves sector and sector_type for an incidence ID.
     resolve_sector (function): Determines the correct sector from FK and JSON sources.
     get_sector_type (function): Maps a sector name to its broad classification.
@@ -29,6 +31,7 @@ from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.ext.automap import AutomapBase
 
 from arb.portal.db_hardcoded import LANDFILL_SECTORS, OIL_AND_GAS_SECTORS
+from arb.portal.utils.incidence_cache import CachedIncidence, get_cached_incidence
 from arb.utils.sql_alchemy import get_foreign_value, get_table_row_and_column
 
 logger = logging.getLogger(__name__)
@@ -76,11 +79,11 @@ def extract_sector_payload(xl_dict: dict,
   return tab_data
 
 
-def get_sector_info(db: SQLAlchemy,
-                    base: AutomapBase,
-                    id_: int) -> tuple[str, str]:
+def load_incidence(db: SQLAlchemy,
+                   base: AutomapBase,
+                   id_: int) -> CachedIncidence | None:
   """
-  Resolve the sector and sector_type for a given incidence ID.
+  Read an incidence's misc_json and its `sources` sector from the database.
 
   Args:
     db (SQLAlchemy): SQLAlchemy database instance.
@@ -88,24 +91,16 @@ def get_sector_info(db: SQLAlchemy,
     id_ (int): ID of the row in the `incidences` table.
 
   Returns:
-    tuple[str, str]: (sector, sector_type)
+    CachedIncidence | None: The incidence data, or None if the row does not exist.
 
   Examples:
-    sector, sector_type = get_sector_info(db, base, 123)
-    # Returns the sector and its broad classification for the given ID
-
-  Notes:
-    - Uses both foreign key and misc_json to resolve the sector.
-    - Returns the sector and its type for display or further processing.
+    entry = load_incidence(db, base, 123)
+    # entry.misc_json, entry.sector_by_foreign_key
   """
-  logger.debug(f"get_sector_info() called to determine sector & sector type for {id_=}")
-  primary_table_name = "incidences"
-  json_column = "misc_json"
-
   # Find the sector from the foreign table if incidence was created by plume tracker.
   sector_by_foreign_key = get_foreign_value(
     db, base,
-    primary_table_name=primary_table_name,
+    primary_table_name="incidences",
     foreign_table_name="sources",
     primary_table_fk_name="source_id",
     foreign_table_column_name="sector",
@@ -115,15 +110,70 @@ def get_sector_info(db: SQLAlchemy,
   # Get the row and misc_json field from the incidence table
   row, misc_json = get_table_row_and_column(
     db, base,
-    table_name=primary_table_name,
-    column_name=json_column,
+    table_name="incidences",
+    column_name="misc_json",
     id_=id_,
   )
+  if row is None:
+    return None
+  return CachedIncidence(id_, misc_json or {}, sector_by_foreign_key)
+
+
+def read_incidence(db: SQLAlchemy,
+                   base: AutomapBase,
+                   id_: int) -> CachedIncidence | None:
+  """
+  Return an incidence's misc_json and `sources` sector through the incidence cache.
+
+  Args:
+    db (SQLAlchemy): SQLAlchemy database instance.
+    base (AutomapBase): SQLAlchemy Automapped declarative base.
+    id_ (int): ID of the row in the `incidences` table.
+
+  Returns:
+    CachedIncidence | None: The incidence data, or None if the row does not exist.
+
+  Examples:
+    entry = read_incidence(db, base, 123)
+
+  Notes:
+    - For display only; write paths should load the row from the session.
+  """
+  return get_cached_incidence(id_, lambda: load_incidence(db, base, id_))
+
+
+def get_sector_info(db: SQLAlchemy,
+                    base: AutomapBase,
+                    id_: int,
+                    use_cache: bool = True) -> tuple[str, str]:
+  """
+  Resolve the sector and sector_type for a given incidence ID.
+
+  Args:
+    db (SQLAlchemy): SQLAlchemy database instance.
+    base (AutomapBase): SQLAlchemy Automapped declarative base.
+    id_ (int): ID of the row in the `incidences` table.
+    use_cache (bool): Read through the incidence cache; write paths pass False to read the database.
+
+  Returns:
+    tuple[str, str]: (sector, sector_type)
+
+  Examples:
+    sector, sector_type = get_sector_info(db, base, 123)
+    # Returns the sector and its broad classification for the given ID
+
+  Notes:
+    - Uses both foreign key and misc_json to resolve the sector.
+    - Returns the sector and its type for display or further processing.
+    - Reads through the incidence cache (see `incidence_cache`) unless `use_cache` is False.
+  """
+  logger.debug(f"get_sector_info() called to determine sector & sector type for {id_=}")
 
-  if misc_json is None:
-    misc_json = {}
+  entry = read_incidence(db, base, id_) if use_cache else load_incidence(db, base, id_)
+  sector_by_foreign_key = entry.sector_by_foreign_key if entry else None
+  misc_json = entry.misc_json if entry else {}
 
-  sector = resolve_sector(sector_by_foreign_key, row, misc_json)
+  sector = resolve_sector(sector_by_foreign_key, entry, misc_json)
   sector_type = get_sector_type(sector)
 
   logger.debug(f"get_sector_info() returning {sector=} {sector_type=}")
@@ -0,0 +1,504 @@
+"""
+  Retention and compaction service for the staging and processed upload folders.
+
+  Staged uploads are written to `<upload_folder>/staging` and moved to
+  `<upload_folder>/processed` once confirmed. Neither folder was ever cleaned up,
+  so directory listings, `list_staged`, and backups slowed down over time. This
+  module provides a janitor that can be run from the command line or as an
+  optional background thread inside the Flask app.
+
+  A janitor pass:
+    1. Removes staged files for an incidence that were superseded by a newer staged file.
+    2. Removes staged files older than the staging retention window.
+    3. Compresses processed JSON files older than the processed retention window into
+       dated zip archives under `<upload_folder>/processed/archive` and removes the originals.
+    4. Reports the number of files touched and bytes reclaimed.
+
+  Attributes:
+    STAGED_FILE_PATTERN (re.Pattern): Regex matching staged filenames (`id_<id>_ts_<timestamp>.json`).
+    ARCHIVE_DIR_NAME (str): Name of the archive sub-folder inside the processed folder.
+    LOCK_FILE_NAME (str): Name of the lock file used to prevent overlapping janitor runs.
+    logger (logging.Logger): Logger instance for this module.
+
+  Examples:
+    from arb.portal.utils.staging_janitor import JanitorConfig, run_janitor
+    report = run_janitor(Path("portal_uploads"), JanitorConfig(staging_retention_days=14))
+    print(report.summary())
+
+    # Command line (from the production directory):
+    python -m arb.portal.utils.staging_janitor --upload-folder ../../portal_uploads --dry-run
+
+  Notes:
+    - Safe to run while the app is serving: files modified within `min_age_seconds` are never
+      touched, missing files are tolerated, archives are written to a temp file and swapped in
+      with `os.replace`, and a lock file prevents two janitors from running at once.
+    - The janitor never touches the database; `uploaded_files` rows keep their historical paths.
+"""
+import argparse
+import datetime
+import logging
+import os
+import re
+import threading
+import time
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from flask import Flask
+
+logger = logging.getLogger(__name__)
+logger.debug(f'Loading File: "{Path(__file__).name}". Full Path: "{Path(__file__)}"')
+
+STAGED_FILE_PATTERN = re.compile(r"^id_(?P<id_>\d+)_ts_(?P<ts>[\d_]+)\.json$")
+ARCHIVE_DIR_NAME = "archive"
+LOCK_FILE_NAME = ".janitor.lock"
+
+_run_locks: dict[Path, threading.Lock] = {}
+_run_locks_guard = threading.Lock()
+
+
+@dataclass
+class JanitorConfig:
+  """
+  Retention settings for a janitor pass.
+
+  Attributes:
+    staging_retention_days (int | None): Delete staged files older than this many days. None disables expiry.
+    processed_retention_days (int | None): Archive processed files older than this many days. None disables archiving.
+    dedupe_staged (bool): If True, remove staged files superseded by a newer staged file for the same incidence.
+    min_age_seconds (int): Never touch a file modified more recently than this (protects in-flight writes and reviews).
+    stale_lock_seconds (int): Treat a lock file older than this as abandoned by a crashed run.
+    dry_run (bool): If True, report what would be done without modifying the filesystem.
+
+  Examples:
+    config = JanitorConfig(staging_retention_days=30, processed_retention_days=90)
+  """
+  staging_retention_days: int | None = 30
+  processed_retention_days: int | None = 90
+  dedupe_staged: bool = True
+  min_age_seconds: int = 3600
+  stale_lock_seconds: int = 6 * 3600
+  dry_run: bool = False
+
+
+@dataclass
+class JanitorReport:
+  """
+  Summary of a janitor pass.
+
+  Attributes:
+    superseded_removed (list[str]): Staged filenames removed because a newer staged file exists.
+    expired_removed (list[str]): Staged filenames removed because they exceeded the retention window.
+    archived (list[str]): Processed filenames compressed into an archive.
+    archives_written (list[str]): Archive filenames created or extended.
+    bytes_reclaimed (int): Net bytes freed on disk (removed bytes minus archive growth).
+    skipped (bool): True if the pass was skipped because another janitor held the lock.
+    dry_run (bool): True if the pass did not modify the filesystem.
+  """
+  superseded_removed: list[str] = field(default_factory=list)
+  expired_removed: list[str] = field(default_factory=list)
+  archived: list[str] = field(default_factory=list)
+  archives_written: list[str] = field(default_factory=list)
+  bytes_reclaimed: int = 0
+  skipped: bool = False
+  dry_run: bool = False
+
+  def summary(self) -> str:
+    """
+    Return a one-line, human-readable summary of the pass.
+
+    Returns:
+      str: Summary of counts and reclaimed space.
+
+    Examples:
+      report.summary()
+      # 'janitor: 3 superseded, 1 expired, 12 archived into 2 archive(s), 1.4 MB reclaimed'
+    """
+    if self.skipped:
+      return "janitor: skipped (another run holds the lock)"
+    prefix = "janitor (dry run)" if self.dry_run else "janitor"
+    return (f"{prefix}: {len(self.superseded_removed)} superseded, {len(self.expired_removed)} expired, "
+            f"{len(self.archived)} archived into {len(self.archives_written)} archive(s), "
+            f"{self.bytes_reclaimed / (1024 * 1024):.1f} MB reclaimed")
+
+
+def _is_settled(path: Path, now: float, min_age_seconds: int) -> bool:
+  """
+  Return True if the file has not been modified for at least `min_age_seconds`.
+
+  Args:
+    path (Path): File to check.
+    now (float): Reference time (seconds since epoch).
+    min_age_seconds (int): Required quiet period.
+
+  Returns:
+    bool: True if the file is old enough to touch, False if it is recent or has disappeared.
+  """
+  try:
+    return now - path.stat().st_mtime >= min_age_seconds
+  except FileNotFoundError:
+    return False
+
+
+def _remove_file(path: Path, dry_run: bool) -> int:
+  """
+  Delete a file, tolerating concurrent removal, and return the bytes freed.
+
+  Args:
+    path (Path): File to delete.
+    dry_run (bool): If True, only measure the file.
+
+  Returns:
+    int: Size of the removed file, or 0 if it was already gone.
+  """
+  try:
+    size = path.stat().st_size
+    if not dry_run:
+      path.unlink()
+    return size
+  except FileNotFoundError:
+    return 0
+
+
+def find_superseded_staged_files(staging_dir: Path) -> list[Path]:
+  """
+  Find staged files that were superseded by a newer staged file for the same incidence.
+
+  Args:
+    staging_dir (Path): The staging folder.
+
+  Returns:
+    list[Path]: Older staged files, grouped by id_incidence, excluding the newest file for each id.
+
+  Examples:
+    find_superseded_staged_files(Path("portal_uploads/staging"))
+    # [Path('.../id_12_ts_20250101_120000.json')]  if id_12_ts_20250102_090000.json also exists
+
+  Notes:
+    - Files are ordered by modification time, then by filename, so both staged filename
+      timestamp formats (`%Y%m%d_%H%M%S` and `%Y_%m_%d_%H_%M_%S`) are handled.
+    - Files that do not match `STAGED_FILE_PATTERN` are ignored.
+  """
+  by_id: dict[int, list[tuple[float, str, Path]]] = {}
+  if not staging_dir.is_dir():
+    return []
+
+  for path in staging_dir.glob("*.json"):
+    match = STAGED_FILE_PATTERN.match(path.name)
+    if not match:
+      continue
+    try:
+      mtime = path.stat().st_mtime
+    except FileNotFoundError:
+      continue
+    by_id.setdefault(int(match.group("id_")), []).append((mtime, path.name, path))
+
+  superseded = []
+  for entries in by_id.values():
+    entries.sort()
+    superseded.extend(path for _, _, path in entries[:-1])
+  return superseded
+
+
+def archive_processed_files(processed_dir: Path,
+                            paths: list[Path],
+                            dry_run: bool = False) -> tuple[list[str], list[str], int]:
+  """
+  Compress processed JSON files into dated zip archives and remove the originals.
+
+  Files are grouped by the UTC date of their modification time and stored in
+  `<processed_dir>/archive/processed_<YYYY_MM_DD>.zip`. Existing archives for a date are
+  extended rather than overwritten.
+
+  Args:
+    processed_dir (Path): The processed folder.
+    paths (list[Path]): Files to archive.
+    dry_run (bool): If True, report what would be archived without writing.
+
+  Returns:
+    tuple[list[str], list[str], int]: (archived filenames, archive filenames written, net bytes reclaimed).
+
+  Examples:
+    archived, archives, freed = archive_processed_files(processed_dir, old_files)
+
+  Notes:
+    - Each archive is built in a temp file and moved into place with `os.replace`, so a reader
+      never sees a partially written archive.
+    - A member already present in an archive is not added twice; the original is still removed.
+  """
+  archive_dir = processed_dir / ARCHIVE_DIR_NAME
+  by_date: dict[str, list[Path]] = {}
+  for path in paths:
+    try:
+      mtime = path.stat().st_mtime
+    except FileNotFoundError:
+      continue
+    date_str = datetime.datetime.fromtimestamp(mtime, tz=datetime.timezone.utc).strftime("%Y_%m_%d")
+    by_date.setdefault(date_str, []).append(path)
+
+  archived: list[str] = []
+  archives_written: list[str] = []
+  bytes_reclaimed = 0
+
+  for date_str, group in sorted(by_date.items()):
+    archive_path = archive_dir / f"processed_{date_str}.zip"
+    if dry_run:
+      archived.extend(path.name for path in group)
+      archives_written.append(archive_path.name)
+      bytes_reclaimed += sum(_remove_file(path, dry_run=True) for path in group)
+      continue
+
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    old_size = archive_path.stat().st_size if archive_path.exists() else 0
+    tmp_path = archive_path.with_name(f".{archive_path.name}.{os.getpid()}.tmp")
+    added: list[Path] = []
+    try:
+      with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as zf_out:
+        existing_names = set()
+        if archive_path.exists():
+          with zipfile.ZipFile(archive_path, "r") as zf_in:
+            for info in zf_in.infolist():
+              zf_out.writestr(info, zf_in.read(info.filename))
+              existing_names.add(info.filename)
+        for path in group:
+          if path.name in existing_names:
+            added.append(path)
+            continue
+          try:
+            zf_out.write(path, arcname=path.name)
+          except FileNotFoundError:
+            continue
+          added.append(path)
+      os.replace(tmp_path, archive_path)
+    finally:
+      tmp_path.unlink(missing_ok=True)
+
+    removed = sum(_remove_file(path, dry_run=False) for path in added)
+    bytes_reclaimed += removed - (archive_path.stat().st_size - old_size)
+    archived.extend(path.name for path in added)
+    archives_written.append(archive_path.name)
+    logger.info(f"Archived {len(added)} processed file(s) into {archive_path}")
+
+  return archived, archives_written, bytes_reclaimed
+
+
+def _run_lock_for(upload_folder: Path) -> threading.Lock:
+  """
+  Return the in-process lock that serializes janitor passes over one upload folder.
+
+  Args:
+    upload_folder (Path): Root upload folder.
+
+  Returns:
+    threading.Lock: The same lock for every call with the same (resolved) folder.
+  """
+  key = upload_folder.resolve()
+  with _run_locks_guard:
+    return _run_locks.setdefault(key, threading.Lock())
+
+
+def _acquire_lock(lock_path: Path, stale_lock_seconds: int) -> bool:
+  """
+  Create the janitor lock file, clearing it first if it was abandoned by a crashed run.
+
+  Args:
+    lock_path (Path): Lock file path.
+    stale_lock_seconds (int): Age after which an existing lock is considered stale.
+
+  Returns:
+    bool: True if the lock was acquired.
+  """
+  if _is_settled(lock_path, time.time(), stale_lock_seconds):
+    logger.warning(f"Removing stale janitor lock: {lock_path}")
+    lock_path.unlink(missing_ok=True)
+  try:
+    fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+  except FileExistsError:
+    return False
+  with os.fdopen(fd, "w") as f:
+    f.write(f"{os.getpid()}\n")
+  return True
+
+
+def run_janitor(upload_folder: str | Path, config: JanitorConfig | None = None) -> JanitorReport:
+  """
+  Run one retention and compaction pass over the staging and processed folders.
+
+  Args:
+    upload_folder (str | Path): Root upload folder containing `staging/` and `processed/`.
+    config (JanitorConfig | None): Retention settings. Defaults to `JanitorConfig()`.
+
+  Returns:
+    JanitorReport: What was removed, archived, and reclaimed.
+
+  Examples:
+    report = run_janitor(get_upload_folder(), JanitorConfig(dry_run=True))
+    logger.info(report.summary())
+
+  Notes:
+    - Only one pass runs at a time per upload folder; an overlapping call returns a report
+      with `skipped=True`.
+    - Superseded files are removed before expiry so the newest staged file per incidence is
+      only ever removed by the retention window.
+  """
+  config = config or JanitorConfig()
+  upload_folder = Path(upload_folder)
+  staging_dir = upload_folder / "staging"
+  processed_dir = upload_folder / "processed"
+  report = JanitorReport(dry_run=config.dry_run)
+
+  upload_folder.mkdir(parents=True, exist_ok=True)
+  lock_path = upload_folder / LOCK_FILE_NAME
+  run_lock = _run_lock_for(upload_folder)
+  if not run_lock.acquire(blocking=False):
+    report.skipped = True
+    return report
+  try:
+    if not _acquire_lock(lock_path, config.stale_lock_seconds):
+      logger.info(f"Janitor lock held by another process: {lock_path}")
+      report.skipped = True
+      return report
+    try:
+      now = time.time()
+
+      if config.dedupe_staged:
+        for path in find_superseded_staged_files(staging_dir):
+          if _is_settled(path, now, config.min_age_seconds):
+            freed = _remove_file(path, config.dry_run)
+            if freed or config.dry_run:
+              report.superseded_removed.append(path.name)
+              report.bytes_reclaimed += freed
+
+      if config.staging_retention_days is not None and staging_dir.is_dir():
+        max_age = max(config.staging_retention_days * 86400, config.min_age_seconds)
+        for path in sorted(staging_dir.glob("*.json")):
+          if path.name in report.superseded_removed:
+            continue
+          if _is_settled(path, now, max_age):
+            freed = _remove_file(path, config.dry_run)
+            if freed or config.dry_run:
+              report.expired_removed.append(path.name)
+              report.bytes_reclaimed += freed
+
+      if config.processed_retention_days is not None and processed_dir.is_dir():
+        max_age = max(config.processed_retention_days * 86400, config.min_age_seconds)
+        candidates = [path for path in sorted(processed_dir.glob("*.json")) if _is_settled(path, now, max_age)]
+        archived, archives_written, freed = archive_processed_files(processed_dir, candidates, config.dry_run)
+        report.archived.extend(archived)
+        report.archives_written.extend(archives_written)
+        report.bytes_reclaimed += freed
+    finally:
+      lock_path.unlink(missing_ok=True)
+  finally:
+    run_lock.release()
+
+  logger.info(report.summary())
+  return report
+
+
+def janitor_config_from_app(app: Flask) -> JanitorConfig:
+  """
+  Build a JanitorConfig from Flask app configuration.
+
+  Args:
+    app (Flask): App whose config holds the retention settings.
+
+  Returns:
+    JanitorConfig: Settings read from `STAGING_RETENTION_DAYS`, `PROCESSED_RETENTION_DAYS`
+    and `UPLOAD_JANITOR_MIN_AGE_SECONDS`, falling back to the JanitorConfig defaults.
+  """
+  defaults = JanitorConfig()
+  return JanitorConfig(
+    staging_retention_days=app.config.get("STAGING_RETENTION_DAYS", defaults.staging_retention_days),
+    processed_retention_days=app.config.get("PROCESSED_RETENTION_DAYS", defaults.processed_retention_days),
+    min_age_seconds=app.config.get("UPLOAD_JANITOR_MIN_AGE_SECONDS", defaults.min_age_seconds),
+  )
+
+
+def start_janitor_thread(app: Flask, interval_seconds: int | None = None) -> threading.Event | None:
+  """
+  Start a daemon thread that runs the janitor periodically against the app's upload folder.
+
+  Args:
+    app (Flask): App providing `UPLOAD_FOLDER` and retention settings.
+    interval_seconds (int | None): Seconds between passes. Defaults to
+      `app.config["UPLOAD_JANITOR_INTERVAL_SECONDS"]`; 0 or None disables the thread.
+
+  Returns:
+    threading.Event | None: Event that stops the thread when set, or None if the thread is disabled.
+
+  Examples:
+    stop_event = start_janitor_thread(app, interval_seconds=3600)
+    ...
+    stop_event.set()
+
+  Notes:
+    - Exceptions inside a pass are logged and do not stop the thread.
+  """
+  if interval_seconds is None:
+    interval_seconds = app.config.get("UPLOAD_JANITOR_INTERVAL_SECONDS", 0)
+  if not interval_seconds:
+    return None
+
+  upload_folder = Path(app.config["UPLOAD_FOLDER"])
+  config = janitor_config_from_app(app)
+  stop_event = threading.Event()
+
+  def _loop() -> None:
+    while not stop_event.wait(interval_seconds):
+      try:
+        run_janitor(upload_folder, config)
+      except Exception as e:
+        logger.exception(f"Janitor pass failed: {e}")
+
+  thread = threading.Thread(target=_loop, name="upload-janitor", daemon=True)
+  thread.start()
+  logger.info(f"Upload janitor thread started (interval={interval_seconds}s, folder={upload_folder})")
+  return stop_event
+
+
+def main(argv: list[str] | None = None) -> int:
+  """
+  Command-line entry point for a single janitor pass.
+
+  Args:
+    argv (list[str] | None): Arguments to parse; defaults to `sys.argv[1:]`.
+
+  Returns:
+    int: Process exit code (0 on success, 1 if the pass was skipped).
+
+  Examples:
+    python -m arb.portal.utils.staging_janitor --upload-folder /srv/portal_uploads --staging-days 14
+  """
+  parser = argparse.ArgumentParser(description="Clean up staged and processed upload files.")
+  parser.add_argument("--upload-folder", type=Path, default=None,
+                      help="Upload folder containing staging/ and processed/ (default: the portal UPLOAD_PATH).")
+  parser.add_argument("--staging-days", type=int, default=JanitorConfig.staging_retention_days,
+                      help="Delete staged files older than this many days.")
+  parser.add_argument("--processed-days", type=int, default=JanitorConfig.processed_retention_days,
+                      help="Archive processed files older than this many days.")
+  parser.add_argument("--min-age-seconds", type=int, default=JanitorConfig.min_age_seconds,
+                      help="Never touch files modified more recently than this.")
+  parser.add_argument("--no-dedupe", action="store_true", help="Keep superseded staged files.")
+  parser.add_argument("--dry-run", action="store_true", help="Report without modifying any files.")
+  args = parser.parse_args(argv)
+
+  upload_folder = args.upload_folder
+  if upload_folder is None:
+    from arb.portal.startup.runtime_info import UPLOAD_PATH
+    upload_folder = UPLOAD_PATH
+
+  report = run_janitor(upload_folder, JanitorConfig(
+    staging_retention_days=args.staging_days,
+    processed_retention_days=args.processed_days,
+    dedupe_staged=not args.no_dedupe,
+    min_age_seconds=args.min_age_seconds,
+    dry_run=args.dry_run,
+  ))
+  print(report.summary())
+  return 1 if report.skipped else 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
@@ -35,15 +35,57 @@ from wtforms.validators import Email, InputRequired, NumberRange, Optional, Rege
 from arb.portal.constants import GPS_RESOLUTION, HTML_LOCAL_TIME_FORMAT, LATITUDE_VALIDATION, LONGITUDE_VALIDATION, \
   PLEASE_SELECT
 from arb.portal.globals import Globals
+from arb.portal.utils.form_rules import Check, FormRules, Requirement, all_of, apply_check_rules, \
+  apply_requirement_rules, earlier_than, eq, in_fields, ne, not_in
 from arb.utils.diagnostics import obj_diagnostics
 from arb.utils.misc import replace_list_occurrences
-from arb.utils.wtf_forms_util import build_choices, change_validators_on_test, coerce_choices, ensure_field_choice, \
-  get_wtforms_fields, \
+from arb.utils.wtf_forms_util import ChoiceSet, build_choices, coerce_choices, ensure_field_choice, get_wtforms_fields, \
   validate_selectors
 
 logger = logging.getLogger(__name__)
 logger.debug(f'Loading File: "{Path(__file__).name}". Full Path: "{Path(__file__)}"')
 
+# Emission cause choice headers (the location-contingent causes follow them)
+_PRIMARY_CAUSE_HEADER = [
+  (PLEASE_SELECT, PLEASE_SELECT, {"disabled": True}),
+  ("Not applicable as no leak was detected",
+   "Not applicable as no leak was detected", {}),
+]
+_SECONDARY_TERTIARY_CAUSE_HEADER = _PRIMARY_CAUSE_HEADER + [
+  ("Not applicable as no additional leak cause suspected",
+   "Not applicable as no additional leak cause suspected", {}),
+]
+
+# Compiled cause choices per emission location, rebuilt when the dropdowns are reloaded
+_cause_choices_cache: dict = {"source": None, "choices": {}}
+
+
+def contingent_cause_choices(emission_cause_dict: dict, emission_location: str | None) -> tuple[ChoiceSet, ChoiceSet]:
+  """
+  Return the (primary, secondary/tertiary) emission cause choices for an emission location.
+
+  Args:
+    emission_cause_dict (dict): Emission location → contingent causes (from Globals.drop_downs_contingent).
+    emission_location (str | None): Selected emission location.
+
+  Returns:
+    tuple[ChoiceSet, ChoiceSet]: Choices for the primary cause and for the secondary/tertiary causes.
+
+  Notes:
+    - Each location's choices are built once and shared by every form; the cache is dropped
+      when `emission_cause_dict` is replaced (e.g., by `Globals.load_drop_downs`).
+  """
+  if _cause_choices_cache["source"] is not emission_cause_dict:
+    _cause_choices_cache.update(source=emission_cause_dict, choices={})
+  choices = _cause_choices_cache["choices"].get(emission_location)
+  if choices is None:
+    choices_raw = emission_cause_dict.get(emission_location, [])
+    logger.debug(f"Available contingent causes: {choices_raw!r}")
+    choices = (ChoiceSet(build_choices(_PRIMARY_CAUSE_HEADER, list(choices_raw))),
+               ChoiceSet(build_choices(_SECONDARY_TERTIARY_CAUSE_HEADER, list(choices_raw))))
+    _cause_choices_cache["choices"][emission_location] = choices
+  return choices
+
 
 class LandfillFeedback(FlaskForm):
   """
@@ -69,6 +111,91 @@ class LandfillFeedback(FlaskForm):
     - Final validation is enforced in the `validate()` method.
   """
 
+  # First field of each template section (see arb.portal.utils.form_validation.form_sections)
+  section_starts = {
+    "id_incidence": "Section 2",
+    "facility_name": "Section 3",
+    "inspection_timestamp": "Section 4",
+    "initial_leak_concentration": "Section 5",
+    "mitigation_actions": "Section 6",
+    "last_component_leak_monitoring_timestamp": "Section 7",
+    "carb_notes": "Section A",
+  }
+
+  # Responses consistent with "No leak was detected" (Q8) in the emission detail selectors
+  no_leak_responses = [
+    PLEASE_SELECT,
+    "Not applicable as no leak was detected",
+    "Not applicable as no additional leak cause suspected",
+  ]
+  operator_aware_flag = "Operator was aware of the leak prior to receiving the CARB plume notification"
+
+  # Contingent requirements and cross-field checks (applied in validate(), exported to the browser)
+  form_rules = FormRules(
+    requirements=(
+      Requirement(ne("emission_identified_flag_fk", "No leak was detected"),
+                  require=("additional_activities", "initial_leak_concentration", "emission_type_fk",
+                           "emission_location", "emission_cause", "emission_cause_notes", "mitigation_actions",
+                           "mitigation_timestamp", "re_monitored_timestamp", "re_monitored_concentration",
+                           "included_in_last_lmr", "included_in_last_lmr_description", "planned_for_next_lmr",
+                           "planned_for_next_lmr_description", "last_surface_monitoring_timestamp",
+                           "last_component_leak_monitoring_timestamp", "additional_notes")),
+      Requirement(all_of(ne("emission_identified_flag_fk", "No leak was detected"),
+                         eq("included_in_last_lmr", "No")),
+                  require=("included_in_last_lmr_description",)),
+      Requirement(all_of(ne("emission_identified_flag_fk", "No leak was detected"),
+                         eq("planned_for_next_lmr", "No")),
+                  require=("planned_for_next_lmr_description",)),
+    ),
+    checks=(
+      Check(all_of(eq("emission_identified_flag_fk", "No leak was detected"),
+                   not_in("emission_type_fk", no_leak_responses)),
+            "emission_type_fk", "Q8 and Q13 appear to be inconsistent"),
+      Check(all_of(eq("emission_identified_flag_fk", "No leak was detected"),
+                   not_in("emission_location", no_leak_responses)),
+            "emission_location", "Q8 and Q14 appear to be inconsistent"),
+      Check(all_of(eq("emission_identified_flag_fk", "No leak was detected"),
+                   not_in("emission_cause", no_leak_responses)),
+            "emission_cause", "Q8 and Q16 appear to be inconsistent"),
+      Check(all_of(eq("emission_identified_flag_fk", "No leak was detected"),
+                   not_in("emission_cause_secondary", no_leak_responses)),
+            "emission_cause_secondary", "Q8 and Q17 appear to be inconsistent"),
+      Check(all_of(eq("emission_identified_flag_fk", "No leak was detected"),
+                   not_in("emission_cause_tertiary", no_leak_responses)),
+            "emission_cause", "Q8 and Q18 appear to be inconsistent"),
+      # Q8 and Q13 should be coupled to Operator-aware response
+      Check(all_of(eq("emission_identified_flag_fk", operator_aware_flag),
+                   not_in("emission_type_fk", [PLEASE_SELECT,
+                                               "Operator was aware of the leak prior to receiving the notification, "
+                                               "and/or repairs were in progress on the date of the plume observation"])),
+            "emission_type_fk", "Q8 and Q13 appear to be inconsistent"),
+      Check(all_of(ne("emission_identified_flag_fk", "No leak was detected"),
+                   eq("emission_type_fk", "Not applicable as no leak was detected")),
+            "emission_type_fk", "Q8 and Q13 appear to be inconsistent"),
+      Check(all_of(ne("emission_identified_flag_fk", "No leak was detected"),
+                   eq("emission_location", "Not applicable as no leak was detected")),
+            "emission_location", "Q8 and Q14 appear to be inconsistent"),
+      Check(all_of(ne("emission_identified_flag_fk", "No leak was detected"),
+                   eq("emission_cause", "Not applicable as no leak was detected")),
+            "emission_cause", "Q8 and Q16 appear to be inconsistent"),
+      Check(all_of(ne("emission_identified_flag_fk", "No leak was detected"),
+                   eq("emission_cause_secondary", "Not applicable as no leak was detected")),
+            "emission_cause_secondary", "Q8 and Q17 appear to be inconsistent"),
+      Check(all_of(ne("emission_identified_flag_fk", "No leak was detected"),
+                   eq("emission_cause_tertiary", "Not applicable as no leak was detected")),
+            "emission_cause_tertiary", "Q8 and Q18 appear to be inconsistent"),
+      Check(earlier_than("mitigation_timestamp", "inspection_timestamp"), "mitigation_timestamp",
+            "Date of mitigation cannot be prior to initial site inspection."),
+      # todo - add that 2nd and 3rd can't be repeats
+      Check(all_of(not_in("emission_cause_secondary", no_leak_responses),
+                   in_fields("emission_cause_secondary", ["emission_cause"])),
+            "emission_cause_secondary", "Q17 appears to be a repeat"),
+      Check(all_of(not_in("emission_cause_tertiary", no_leak_responses),
+                   in_fields("emission_cause_tertiary", ["emission_cause", "emission_cause_secondary"])),
+            "emission_cause_secondary", "Q18 appears to be a repeat"),
+    ),
+  )
+
   # Section 2
   # todo - likely have to change these to InputRequired(), Optional(), blank and removed
   # label = "1.  Incidence/Emission ID"
@@ -383,23 +510,7 @@ class LandfillFeedback(FlaskForm):
     emission_cause_dict = Globals.drop_downs_contingent.get(
       "emission_cause_contingent_on_emission_location", {}
     )
-    choices_raw = emission_cause_dict.get(emission_location, [])
-    logger.debug(f"Available contingent causes: {choices_raw!r}")
-
-    # Define headers
-    primary_header = [
-      (PLEASE_SELECT, PLEASE_SELECT, {"disabled": True}),
-      ("Not applicable as no leak was detected",
-       "Not applicable as no leak was detected", {}),
-    ]
-    secondary_tertiary_header = primary_header + [
-      ("Not applicable as no additional leak cause suspected",
-       "Not applicable as no additional leak cause suspected", {}),
-    ]
-
-    # Build full choices
-    primary_choices = build_choices(primary_header, choices_raw)
-    secondary_tertiary_choices = build_choices(secondary_tertiary_header, choices_raw)
+    primary_choices, secondary_tertiary_choices = contingent_cause_choices(emission_cause_dict, emission_location)
 
     # Update each field's choices
     self.emission_cause.choices = primary_choices
@@ -461,62 +572,7 @@ class LandfillFeedback(FlaskForm):
     # Perform any field level validation where one field is cross-referenced to another
     # The error will be associated with one of the fields
     ###################################################################################################
-    # todo - move field level validation to separate function
-
-    if self.emission_identified_flag_fk.data == "No leak was detected":
-      valid_options = [PLEASE_SELECT,
-                       "Not applicable as no leak was detected",
-                       "Not applicable as no additional leak cause suspected",
-                       ]
-      if self.emission_type_fk.data not in valid_options:
-        self.emission_type_fk.errors.append(f"Q8 and Q13 appear to be inconsistent")
-      if self.emission_location.data not in valid_options:
-        self.emission_location.errors.append(f"Q8 and Q14 appear to be inconsistent")
-      if self.emission_cause.data not in valid_options:
-        self.emission_cause.errors.append(f"Q8 and Q16 appear to be inconsistent")
-      if self.emission_cause_secondary.data not in valid_options:
-        self.emission_cause_secondary.errors.append(f"Q8 and Q17 appear to be inconsistent")
-      if self.emission_cause_tertiary.data not in valid_options:
-        self.emission_cause.errors.append(f"Q8 and Q18 appear to be inconsistent")
-
-    # Q8 and Q13 should be coupled to Operator-aware response
-    elif self.emission_identified_flag_fk.data == "Operator was aware of the leak prior to receiving the CARB plume notification":
-      valid_options = [PLEASE_SELECT,
-                       "Operator was aware of the leak prior to receiving the notification, and/or repairs were in progress on the date of the plume observation", ]
-      if self.emission_type_fk.data not in valid_options:
-        self.emission_type_fk.errors.append(f"Q8 and Q13 appear to be inconsistent")
-
-    if self.emission_identified_flag_fk.data != "No leak was detected":
-      invalid_options = ["Not applicable as no leak was detected", ]
-      if self.emission_type_fk.data in invalid_options:
-        self.emission_type_fk.errors.append(f"Q8 and Q13 appear to be inconsistent")
-      if self.emission_location.data in invalid_options:
-        self.emission_location.errors.append(f"Q8 and Q14 appear to be inconsistent")
-      if self.emission_cause.data in invalid_options:
-        self.emission_cause.errors.append(f"Q8 and Q16 appear to be inconsistent")
-      if self.emission_cause_secondary.data in invalid_options:
-        self.emission_cause_secondary.errors.append(f"Q8 and Q17 appear to be inconsistent")
-      if self.emission_cause_tertiary.data in invalid_options:
-        self.emission_cause_tertiary.errors.append(f"Q8 and Q18 appear to be inconsistent")
-
-    if self.inspection_timestamp.data and self.mitigation_timestamp.data:
-      if self.mitigation_timestamp.data < self.inspection_timestamp.data:
-        self.mitigation_timestamp.errors.append(
-          "Date of mitigation cannot be prior to initial site inspection.")
-
-    # todo - add that 2nd and 3rd can't be repeats
-    ignore_repeats = [PLEASE_SELECT,
-                      "Not applicable as no leak was detected",
-                      "Not applicable as no additional leak cause suspected",
-                      ]
-
-    if (self.emission_cause_secondary.data not in ignore_repeats and
-            self.emission_cause_secondary.data in [self.emission_cause.data]):
-      self.emission_cause_secondary.errors.append(f"Q17 appears to be a repeat")
-
-    if (self.emission_cause_tertiary.data not in ignore_repeats and
-            self.emission_cause_tertiary.data in [self.emission_cause.data, self.emission_cause_secondary.data]):
-      self.emission_cause_secondary.errors.append(f"Q18 appears to be a repeat")
+    apply_check_rules(self, self.form_rules)
 
     # not sure if this test makes sense since they may have know about it prior to the plume (going to comment out)
     # if self.observation_timestamp.data and self.inspection_timestamp.data:
@@ -556,43 +612,6 @@ class LandfillFeedback(FlaskForm):
     Notes:
       - Adjusts validators for fields that depend on other field values.
       - Called during form validation to ensure correct requirements.
+      - The rules themselves are declared in `form_rules` (see arb.portal.utils.form_rules).
     """
-    # If a venting exclusion is claimed, then a venting description is required and many fields become optional
-    required_if_emission_identified = [
-      "additional_activities",
-      "initial_leak_concentration",
-      # "lat_revised",
-      # "long_revised",
-      "emission_type_fk",
-      "emission_location",
-      # "emission_location_notes",
-      "emission_cause",
-      # "emission_cause_secondary",
-      # "emission_cause_tertiary",
-      "emission_cause_notes",
-      "mitigation_actions",
-      "mitigation_timestamp",
-      "re_monitored_timestamp",
-      "re_monitored_concentration",
-      "included_in_last_lmr",
-      "included_in_last_lmr_description",
-      "planned_for_next_lmr",
-      "planned_for_next_lmr_description",
-      "last_surface_monitoring_timestamp",
-      "last_component_leak_monitoring_timestamp",
-      "additional_notes",
-    ]
-    # todo - update logic for new selectors
-    emission_identified_test = self.emission_identified_flag_fk.data != "No leak was detected"
-    # print(f"{emission_identified_test=}")
-    change_validators_on_test(self, emission_identified_test, required_if_emission_identified)
-
-    if emission_identified_test:
-      lmr_included_test = self.included_in_last_lmr.data == "No"
-      logger.debug(f"{lmr_included_test=}")
-      change_validators_on_test(self, lmr_included_test, ["included_in_last_lmr_description"])
-
-      lmr_planned_test = self.planned_for_next_lmr.data == "No"
-      logger.debug(
-        f"{lmr_planned_test=}")
-      change_validators_on_test(self, lmr_planned_test, ["planned_for_next_lmr_description"])
+    apply_requirement_rules(self, self.form_rules)
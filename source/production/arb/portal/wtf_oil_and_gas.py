@@ -36,9 +36,10 @@ from wtforms.validators import Email, InputRequired, Length, NumberRange, Option
 from arb.portal.constants import GPS_RESOLUTION, HTML_LOCAL_TIME_FORMAT, LATITUDE_VALIDATION, LONGITUDE_VALIDATION, \
   PLEASE_SELECT
 from arb.portal.globals import Globals
+from arb.portal.utils.form_rules import Check, FormRules, Requirement, all_of, any_of, apply_check_rules, \
+  apply_requirement_rules, earlier_than, eq, is_in, ne, not_in, present
 from arb.utils.misc import replace_list_occurrences
-from arb.utils.wtf_forms_util import change_validators_on_test, coerce_choices, ensure_field_choice, get_wtforms_fields, \
-  validate_selectors
+from arb.utils.wtf_forms_util import coerce_choices, ensure_field_choice, get_wtforms_fields, validate_selectors
 
 logger = logging.getLogger(__name__)
 logger.debug(f'Loading File: "{Path(__file__).name}". Full Path: "{Path(__file__)}"')
@@ -79,6 +80,76 @@ class OGFeedback(FlaskForm):
     "Unintentional-non-component",
   ]
 
+  # First field of each template section (see arb.portal.utils.form_validation.form_sections)
+  section_starts = {
+    "id_incidence": "Section 3",
+    "facility_name": "Section 4",
+    "venting_exclusion": "Section 5",
+    "ogi_performed": "Section 6",
+    "equipment_at_source": "Section 7",
+    "additional_notes": "Section 8",
+    "carb_notes": "Section A",
+  }
+
+  # Contingent requirements and cross-field checks (applied in validate(), exported to the browser)
+  form_rules = FormRules(
+    requirements=(
+      # If a venting exclusion is claimed, a venting description is required and many fields become optional
+      Requirement(eq("venting_exclusion", "Yes"),
+                  require=("venting_description_1",),
+                  optional=("ogi_performed", "ogi_date", "ogi_result", "method21_performed", "method21_date",
+                            "method21_result", "initial_leak_concentration", "venting_description_2",
+                            "initial_mitigation_plan", "equipment_at_source", "equipment_other_description",
+                            "component_at_source", "component_other_description", "repair_timestamp",
+                            "final_repair_concentration", "repair_description", "additional_notes")),
+      Requirement(eq("ogi_performed", "Yes"), require=("ogi_date", "ogi_result")),
+      Requirement(eq("method21_performed", "Yes"),
+                  require=("method21_date", "method21_result", "initial_leak_concentration")),
+      Requirement(any_of(is_in("ogi_result", venting_responses), is_in("method21_result", venting_responses)),
+                  require=("venting_description_2",)),
+      Requirement(any_of(is_in("ogi_result", unintentional_leak), is_in("method21_result", unintentional_leak)),
+                  require=("initial_mitigation_plan", "equipment_at_source", "repair_timestamp",
+                           "final_repair_concentration", "repair_description")),
+      Requirement(eq("equipment_at_source", "Other"), require=("equipment_other_description",)),
+      Requirement(eq("component_at_source", "Other"), require=("component_other_description",)),
+    ),
+    checks=(
+      Check(earlier_than("ogi_date", "observation_timestamp"), "ogi_date",
+            "Initial OGI timestamp must be after the plume observation timestamp"),
+      Check(earlier_than("method21_date", "observation_timestamp"), "method21_date",
+            "Initial Method 21 timestamp must be after the plume observation timestamp"),
+      Check(earlier_than("repair_timestamp", "observation_timestamp"), "method21_date",
+            "Repair timestamp must be after the plume observation timestamp"),
+      Check(all_of(eq("venting_exclusion", "Yes"), eq("ogi_result", "Unintentional-leak")), "ogi_result",
+            "If you claim a venting exclusion, you can't also have a leak detected with OGI."),
+      Check(all_of(eq("venting_exclusion", "Yes"), eq("method21_result", "Unintentional-leak")), "method21_result",
+            "If you claim a venting exclusion, you can't also have a leak detected with Method 21."),
+      Check(all_of(is_in("ogi_result", unintentional_leak), ne("method21_performed", "Yes")), "method21_performed",
+            "If a leak was detected via OGI, Method 21 must be performed."),
+      Check(all_of(eq("ogi_performed", "No"), present("ogi_date")), "ogi_date",
+            "Can't have an OGI inspection date if OGI was not performed"),
+      Check(all_of(eq("ogi_performed", "No"),
+                   not_in("ogi_result", [PLEASE_SELECT, "Not applicable as OGI was not performed"])), "ogi_result",
+            "Can't have an OGI result if OGI was not performed"),
+      Check(all_of(eq("method21_performed", "No"), present("method21_date")), "method21_date",
+            "Can't have an Method 21 inspection date if Method 21 was not performed"),
+      Check(all_of(eq("method21_performed", "No"), present("initial_leak_concentration")),
+            "initial_leak_concentration",
+            "Can't have an Method 21 concentration if Method 21 was not performed"),
+      Check(all_of(eq("method21_performed", "No"),
+                   not_in("method21_result", [PLEASE_SELECT, "Not applicable as Method 21 was not performed"])),
+            "method21_result", "Can't have an Method 21 result if Method 21 was not performed"),
+      Check(all_of(eq("venting_exclusion", "No"), eq("ogi_performed", "No"), eq("method21_performed", "No")),
+            "method21_performed", "If you do not claim a venting exclusion, Method 21 or OGI must be performed."),
+      # todo (consider) - you could also remove the option for not applicable rather than the following two tests
+      Check(all_of(eq("ogi_performed", "Yes"), eq("ogi_result", "Not applicable as OGI was not performed")),
+            "ogi_result", "Invalid response given your Q8 answer"),
+      Check(all_of(eq("method21_performed", "Yes"),
+                   eq("method21_result", "Not applicable as Method 21 was not performed")),
+            "method21_result", "Invalid response given your Q11 answer"),
+    ),
+  )
+
   # Section 3
   # This field is read-only and displayed for context only. It should not be edited or submitted.
   label = "1.  Incidence/Emission ID"
@@ -376,68 +447,7 @@ class OGFeedback(FlaskForm):
     # Perform any field level validation where one field is cross-referenced to another
     # The error will be associated with one of the fields
     ###################################################################################################
-    if self.observation_timestamp.data and self.ogi_date.data:
-      if self.observation_timestamp.data > self.ogi_date.data:
-        self.ogi_date.errors.append(
-          "Initial OGI timestamp must be after the plume observation timestamp")
-
-    if self.observation_timestamp.data and self.method21_date.data:
-      if self.observation_timestamp.data > self.method21_date.data:
-        self.method21_date.errors.append(
-          "Initial Method 21 timestamp must be after the plume observation timestamp")
-
-    if self.observation_timestamp.data and self.repair_timestamp.data:
-      if self.observation_timestamp.data > self.repair_timestamp.data:
-        self.method21_date.errors.append(
-          "Repair timestamp must be after the plume observation timestamp")
-
-    if self.venting_exclusion and self.ogi_result.data:
-      if self.venting_exclusion.data == "Yes":
-        if self.ogi_result.data in ["Unintentional-leak"]:
-          self.ogi_result.errors.append(
-            "If you claim a venting exclusion, you can't also have a leak detected with OGI.")
-
-    if self.venting_exclusion and self.method21_result.data:
-      if self.venting_exclusion.data == "Yes":
-        if self.method21_result.data in ["Unintentional-leak"]:
-          self.method21_result.errors.append(
-            "If you claim a venting exclusion, you can't also have a leak detected with Method 21.")
-
-    if self.ogi_result.data in self.unintentional_leak:
-      if self.method21_performed.data != "Yes":
-        self.method21_performed.errors.append("If a leak was detected via OGI, Method 21 must be performed.")
-
-    if self.ogi_performed.data == "No":
-      if self.ogi_date.data:
-        self.ogi_date.errors.append("Can't have an OGI inspection date if OGI was not performed")
-      # print(f"{self.ogi_result.data=}")
-      if self.ogi_result.data != PLEASE_SELECT:
-        if self.ogi_result.data != "Not applicable as OGI was not performed":
-          self.ogi_result.errors.append("Can't have an OGI result if OGI was not performed")
-
-    if self.method21_performed.data == "No":
-      if self.method21_date.data:
-        self.method21_date.errors.append("Can't have an Method 21 inspection date if Method 21 was not performed")
-      if self.initial_leak_concentration.data:
-        self.initial_leak_concentration.errors.append(
-          "Can't have an Method 21 concentration if Method 21 was not performed")
-      # print(f"{self.method21_result.data=}")
-      if self.method21_result.data != PLEASE_SELECT:
-        if self.method21_result.data != "Not applicable as Method 21 was not performed":
-          self.method21_result.errors.append("Can't have an Method 21 result if Method 21 was not performed")
-
-    if self.venting_exclusion.data == "No" and self.ogi_performed.data == "No" and self.method21_performed.data == "No":
-      self.method21_performed.errors.append(
-        "If you do not claim a venting exclusion, Method 21 or OGI must be performed.")
-
-    # todo (consider) - you could also remove the option for not applicable rather than the following two tests
-    if self.ogi_performed.data == "Yes":
-      if self.ogi_result.data == "Not applicable as OGI was not performed":
-        self.ogi_result.errors.append("Invalid response given your Q8 answer")
-
-    if self.method21_performed.data == "Yes":
-      if self.method21_result.data == "Not applicable as Method 21 was not performed":
-        self.method21_result.errors.append("Invalid response given your Q11 answer")
+    apply_check_rules(self, self.form_rules)
 
     ###################################################################################################
     # perform any form level validation and append it to the form_errors property
@@ -479,79 +489,6 @@ class OGFeedback(FlaskForm):
       - Called during form validation to ensure correct requirements.
       - Should be called before validation to sync rules with input state.
       - Venting-related exclusions may need careful ordering to preserve business logic.
+      - The rules themselves are declared in `form_rules` (see arb.portal.utils.form_rules).
     """
-
-    # logger.debug(f"In determine_contingent_fields()")
-
-    # If a venting exclusion is claimed, then a venting description is required and many fields become optional
-    required_if_venting_exclusion = ["venting_description_1", ]
-    optional_if_venting_exclusion = [
-      "ogi_performed",
-      "ogi_date",
-      "ogi_result",
-      "method21_performed",
-      "method21_date",
-      "method21_result",
-      "initial_leak_concentration",
-      "venting_description_2",
-      "initial_mitigation_plan",
-      "equipment_at_source",
-      "equipment_other_description",
-      "component_at_source",
-      "component_other_description",
-      "repair_timestamp",
-      "final_repair_concentration",
-      "repair_description",
-      "additional_notes",
-    ]
-    venting_exclusion_test = self.venting_exclusion.data == "Yes"
-    # logger.debug(f"\n\t{venting_exclusion_test=}, {self.venting_exclusion_test.data=}")
-    change_validators_on_test(self, venting_exclusion_test, required_if_venting_exclusion,
-                              optional_if_venting_exclusion)
-
-    required_if_ogi_performed = [
-      "ogi_date",
-      "ogi_result",
-    ]
-    ogi_test = self.ogi_performed.data == "Yes"
-    change_validators_on_test(self, ogi_test, required_if_ogi_performed)
-
-    required_if_method21_performed = [
-      "method21_date",
-      "method21_result",
-      "initial_leak_concentration",
-    ]
-    method21_test = self.method21_performed.data == "Yes"
-    change_validators_on_test(self, method21_test, required_if_method21_performed)
-
-    required_if_venting_on_inspection = [
-      "venting_description_2",
-    ]
-    venting2_test = False
-    if self.ogi_result.data in self.venting_responses or self.method21_result.data in self.venting_responses:
-      venting2_test = True
-    change_validators_on_test(self, venting2_test, required_if_venting_on_inspection)
-
-    required_if_unintentional = [
-      "initial_mitigation_plan",
-      "equipment_at_source",
-      "repair_timestamp",
-      "final_repair_concentration",
-      "repair_description",
-    ]
-    unintentional_test = False
-    if self.ogi_result.data in self.unintentional_leak or self.method21_result.data in self.unintentional_leak:
-      unintentional_test = True
-    change_validators_on_test(self, unintentional_test, required_if_unintentional)
-
-    required_if_equipment_other = [
-      "equipment_other_description",
-    ]
-    equipment_other_test = self.equipment_at_source.data == "Other"
-    change_validators_on_test(self, equipment_other_test, required_if_equipment_other)
-
-    required_if_component_other = [
-      "component_other_description",
-    ]
-    component_other_test = self.component_at_source.data == "Other"
-    change_validators_on_test(self, component_other_test, required_if_component_other)
+    apply_requirement_rules(self, self.form_rules)
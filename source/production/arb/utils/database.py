@@ -106,7 +106,9 @@ def get_reflected_base(db: SQLAlchemy) -> AutomapBase:
     Output: AttributeError
   """
   base = automap_base(metadata=db.metadata)  # reuse metadata!
-  base.prepare(db.engine, reflect=False)  # no extra reflection
+  # SQLAlchemy 2.x ignores reflect=False; skip tables that are already declared so their
+  # Index objects (e.g., on PortalUpdate) are not appended a second time by reflection.
+  base.prepare(db.engine, reflection_options={"only": lambda name, _: name not in db.metadata.tables})
   return base
 
 
@@ -4,7 +4,7 @@ Datetime parsing and timezone utilities for ISO 8601, UTC/Pacific conversion, an
 This module implements the datetime data contract for the ARB Feedback Portal, ensuring consistent parsing, formatting, and timezone handling across all data ingestion and export workflows.
 
 Features:
-- ISO 8601 validation and parsing (via `dateutil`)
+- ISO 8601 validation and parsing (`datetime.fromisoformat` fast path for the common shapes, `dateutil` otherwise)
 - Conversion between UTC and naive Pacific time (Los Angeles)
 - HTML and Excel datetime contract-compliant conversions
 - Recursive datetime transformations within nested dicts/lists/sets/tuples
@@ -19,7 +19,9 @@ Notes:
 
 """
 # todo - update spacing to 2-spaces using pycharm
+import functools
 import logging
+import re
 from collections.abc import Mapping
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
@@ -32,6 +34,14 @@ logger = logging.getLogger(__name__)
 UTC_TZ = ZoneInfo("UTC")
 PACIFIC_TZ = ZoneInfo("America/Los_Angeles")
 
+# Shapes `datetime.fromisoformat` parses exactly like `dateutil.parser.isoparse`
+# (the portal's own output: 'T' or ' ' separator, up to microseconds, 'Z' or ±HH:MM offset).
+# Anything else (24:00, basic format, week dates, ±HHMM offsets, ...) goes through dateutil.
+_FAST_ISO_RE = re.compile(
+  r"\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d{1,6})?)?(?:Z|[+-]\d{2}:\d{2})?)?")
+
+UTC_ISO_TO_CA_STR_CACHE_SIZE = 4096
+
 
 # --- Core Contract Functions ---
 
@@ -62,7 +72,7 @@ def iso_str_to_utc_datetime(iso_str: str, error_on_missing_tz: bool = True) -> d
       - If `error_on_missing_tz` is False and the string is naive, UTC is assumed and a warning is logged.
   """
   try:
-    dt = parser.isoparse(iso_str)
+    dt = _parse_iso(iso_str)
   except (ValueError, TypeError) as e:
     raise ValueError(f"Invalid ISO 8601 datetime string: '{iso_str}'") from e
   if dt.tzinfo is None:
@@ -73,6 +83,22 @@ def iso_str_to_utc_datetime(iso_str: str, error_on_missing_tz: bool = True) -> d
   return dt.astimezone(UTC_TZ)
 
 
+def _parse_iso(iso_str: str) -> datetime:
+  """
+  Parse an ISO 8601 string, using `datetime.fromisoformat` when the shape allows it.
+
+  Notes:
+      - Results are equal to `parser.isoparse(iso_str)`; only the tzinfo implementation can differ,
+        which `iso_str_to_utc_datetime` normalizes with `astimezone(UTC_TZ)`.
+  """
+  if type(iso_str) is str and _FAST_ISO_RE.fullmatch(iso_str):
+    try:
+      return datetime.fromisoformat(iso_str)
+    except ValueError:
+      pass  # e.g., month 13; let dateutil decide (and word the error)
+  return parser.isoparse(iso_str)
+
+
 def excel_str_to_naive_datetime(excel_str: str) -> datetime | None:
   """
   Parse a string from an Excel cell to a naive datetime object (no timezone).
@@ -338,6 +364,7 @@ def excel_naive_datetime_to_utc_datetime(excel_dt: datetime) -> datetime:
   return ca_naive_datetime_to_utc_datetime(excel_dt)
 
 
+@functools.lru_cache(maxsize=UTC_ISO_TO_CA_STR_CACHE_SIZE)
 def utc_iso_str_to_ca_str(iso_str: str) -> str:
   """
   Convert a UTC ISO string to a California local time string for display.
@@ -351,6 +378,7 @@ def utc_iso_str_to_ca_str(iso_str: str) -> str:
   Notes:
       - If `iso_str` is None or empty, returns empty string.
       - If parsing fails, returns the original string as-is.
+      - Used as a template filter for every timestamp shown, so results are memoized (the function is pure).
   """
   if not iso_str:
     return ""
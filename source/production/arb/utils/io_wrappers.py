@@ -9,6 +9,7 @@ Features:
 - Simplifies error handling and directory setup
 - Makes code easier to test and mock
 - Promotes DRY principles for common file tasks
+- Atomic writes: readers never observe a partially written file
 
 Typical usage:
     from arb.utils.io_wrappers import save_json_safely, read_json_file
@@ -19,15 +20,115 @@ Version: 1.0.0
 """
 
 import json
+import os
+import time
+import uuid
 from pathlib import Path
 from shutil import copy2
+from typing import Any
+
+
+REPLACE_RETRIES = 20
+"""int: Attempts made by `atomic_write()` when Windows reports the destination as in use by a reader."""
+
+
+def _replace_with_retry(src: Path, dst: Path) -> None:
+  """
+  Call `os.replace`, retrying briefly on Windows sharing violations.
+
+  Windows refuses to replace a file that another process or thread has open for reading,
+  which POSIX allows. Readers hold staged files only briefly, so a short retry loop is enough.
+
+  Args:
+    src (Path): Temp file to move.
+    dst (Path): Destination path.
+
+  Raises:
+    PermissionError: If the destination is still locked after all retries (or on any non-Windows platform).
+  """
+  for attempt in range(REPLACE_RETRIES):
+    try:
+      os.replace(src, dst)
+      return
+    except PermissionError:
+      if os.name != "nt" or attempt == REPLACE_RETRIES - 1:
+        raise
+      time.sleep(0.005 * (attempt + 1))
+
+
+def atomic_write(
+        path: Path,
+        content: str | bytes,
+        encoding: str = "utf-8",
+        fsync: bool = True,
+        fsync_dir: bool = False
+) -> None:
+  """
+  Atomically replace `path` with `content`.
+
+  The content is written to a temp file in the same directory, flushed and fsynced,
+  then moved over the destination with `os.replace`. Concurrent readers therefore see
+  either the previous file or the complete new file, never a truncated one.
+
+  Args:
+    path (Path): Destination file path. If None, raises ValueError.
+    content (str | bytes): Text (encoded with `encoding`) or raw bytes to write.
+    encoding (str): Encoding used when `content` is a str (default: "utf-8").
+    fsync (bool): If True, fsync the temp file before it is moved into place.
+    fsync_dir (bool): If True, also fsync the parent directory so the rename survives a power loss
+      (POSIX only; ignored on Windows).
+
+  Raises:
+    OSError: If the file or directory cannot be written.
+    ValueError: If `path` is None.
+
+  Examples:
+    Input : Path("/tmp/staged.json"), '{"a": 1}'
+    Output: /tmp/staged.json contains '{"a": 1}'; no temp file remains
+
+  Notes:
+    - The temp file name starts with '.' and ends with '.tmp', so `*.json` globs never match it.
+    - On failure the temp file is removed and the destination is left untouched.
+  """
+  if path is None:
+    raise ValueError("Path must not be None.")
+  path = Path(path)
+  path.parent.mkdir(parents=True, exist_ok=True)
+  tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex[:12]}.tmp")
+
+  try:
+    if isinstance(content, bytes):
+      f = open(tmp_path, "xb")
+    else:
+      f = open(tmp_path, "x", encoding=encoding)
+    with f:
+      f.write(content)
+      f.flush()
+      if fsync:
+        os.fsync(f.fileno())
+    _replace_with_retry(tmp_path, path)
+  except BaseException:
+    try:
+      tmp_path.unlink(missing_ok=True)
+    except OSError:
+      pass
+    raise
+
+  if fsync_dir and os.name != "nt":
+    dir_fd = os.open(path.parent, os.O_RDONLY)
+    try:
+      os.fsync(dir_fd)
+    finally:
+      os.close(dir_fd)
 
 
 def save_json_safely(
         data: object,
         path: Path,
         encoding: str = "utf-8",
-        json_options: dict | None = None
+        json_options: dict | None = None,
+        fsync_dir: bool = False,
+        codec: Any = None
 ) -> None:
   """
   Write a dictionary as JSON to the specified path with optional encoding and json options.
@@ -36,7 +137,11 @@ def save_json_safely(
     data (object): Data to serialize. If None, writes 'null' to the file.
     path (Path): Destination file path. If None, raises ValueError.
     encoding (str): File encoding (default: "utf-8").
-    json_options (dict | None): Options passed to `json.dump` (e.g., indent, default).
+    json_options (dict | None): Options passed to `json.dumps` (e.g., indent, default).
+    fsync_dir (bool): If True, fsync the parent directory after the atomic rename.
+    codec (Any): Optional codec from `arb.utils.json_codec`. If given, it encodes the data using the
+      `default`, `indent` and `ensure_ascii` entries of `json_options` (other entries are ignored)
+      and the output is always UTF-8.
 
   Raises:
     OSError: If the file or directory cannot be written.
@@ -49,19 +154,28 @@ def save_json_safely(
   Notes:
     - If `data` is None, writes 'null' to the file.
     - If `path` is None, raises ValueError.
+    - Data is serialized in memory first and written with `atomic_write()`, so a serialization
+      error or crash never leaves a truncated file at `path`.
   """
   if path is None:
     raise ValueError("Path must not be None.")
   json_options = json_options or {"indent": 2}
-  path.parent.mkdir(parents=True, exist_ok=True)
-  with path.open("w", encoding=encoding) as f:
-    json.dump(data, f, **json_options)
+  if codec is not None:
+    content = codec.dumps(data,
+                          default=json_options.get("default"),
+                          indent=json_options.get("indent"),
+                          ensure_ascii=json_options.get("ensure_ascii", True))
+  else:
+    content = json.dumps(data, **json_options)
+  atomic_write(path, content, encoding=encoding, fsync_dir=fsync_dir)
 
 
 def read_json_file(
         path: Path,
         encoding: str = "utf-8-sig",
-        json_options: dict | None = None
+        json_options: dict | None = None,
+        codec: Any = None,
+        hook_keys: tuple[str, ...] | None = None
 ) -> dict:
   """
   Load and return the contents of a JSON file.
@@ -70,6 +184,9 @@ def read_json_file(
     path (Path): Path to the JSON file. If None, raises ValueError.
     encoding (str): File encoding (default: "utf-8-sig" to handle BOM).
     json_options (dict | None): Options passed to `json.load` (e.g., object_hook).
+    codec (Any): Optional codec from `arb.utils.json_codec`. If given, the file is read as UTF-8
+      (BOM allowed) and decoded by the codec with the `object_hook` entry of `json_options`.
+    hook_keys (tuple[str, ...] | None): Passed to `codec.loads()`; keys the object_hook acts on.
 
   Returns:
     dict: Parsed JSON contents.
@@ -89,6 +206,8 @@ def read_json_file(
   if path is None:
     raise ValueError("Path must not be None.")
   json_options = json_options or {}
+  if codec is not None:
+    return codec.loads(path.read_bytes(), object_hook=json_options.get("object_hook"), hook_keys=hook_keys)
   with path.open("r", encoding=encoding) as f:
     return json.load(f, **json_options)
 
@@ -113,13 +232,13 @@ def write_text_file(text: str, path: Path, encoding: str = "utf-8") -> None:
   Notes:
     - If `text` is None, writes an empty file.
     - If `path` is None, raises ValueError.
+    - The file is replaced atomically via `atomic_write()`.
   """
   if path is None:
     raise ValueError("Path must not be None.")
   if text is None:
     text = ""
-  path.parent.mkdir(parents=True, exist_ok=True)
-  path.write_text(text, encoding=encoding)
+  atomic_write(path, text, encoding=encoding)
 
 
 def copy_file_safe(src: Path, dst: Path) -> None:
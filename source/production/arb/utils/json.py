@@ -12,6 +12,7 @@ Features:
 - File-based diagnostics, JSON comparison, and safe file I/O
 - WTForms integration for extracting and casting form data
 - Value normalization and diffing for ingestion and audit workflows
+- Cached converters compiled once per type map for the form/model dict conversions
 
 Contract notes:
 - Emphasizes ISO 8601 datetime formats and Pacific Time handling where required
@@ -23,10 +24,11 @@ Extensible for new types and workflows as the portal evolves.
 
 import datetime
 import decimal
+import functools
 import json
 import logging
 import pathlib
-from typing import Any
+from typing import Any, Callable
 from zoneinfo import ZoneInfo
 
 from wtforms import BooleanField, DateTimeField, DecimalField, IntegerField, SelectField
@@ -39,9 +41,16 @@ __version__ = "1.0.0"
 
 from arb.utils.misc import safe_cast
 from arb.utils.io_wrappers import save_json_safely, read_json_file
+from arb.utils.json_codec import get_json_codec
 
 logger = logging.getLogger(__name__)
 
+JSON_TYPE_TAGS = ("__class__", "__type__")
+"""tuple[str, ...]: Keys written by `json_serializer`; `json_deserializer` leaves other dicts unchanged."""
+
+DATETIME_PARSE_CACHE_SIZE = 4096
+"""int: Parsed ISO strings remembered by each datetime caster from `get_value_caster()`."""
+
 
 # todo - integrate new json techniques to the website,
 #       make sure time are handled using the new time stamps iso strings and native pacific system
@@ -145,6 +154,8 @@ def json_save(
     file_path (str | Path): Path to write the JSON file. If None or empty, raises ValueError.
     data (object): Data to serialize and write. If None, writes 'null' to the file.
     json_options (dict | None): Options to pass to `json.dump` (e.g., indent, default).
+      If None, the data is encoded by the active codec from `arb.utils.json_codec` using
+      `json_serializer` and 2-space indentation.
 
   Returns:
     None
@@ -160,6 +171,8 @@ def json_save(
   Notes:
     - If file_path is None or empty, raises ValueError.
     - If data is None, writes 'null' to the file.
+    - The default layout is 2-space indentation because that is the layout the orjson codec
+      reproduces (see `arb.utils.json_codec`); other layouts are always written by stdlib json.
   """
   logger.debug(f"json_save() called with {file_path=}, {json_options=}, {data=}")
 
@@ -167,10 +180,13 @@ def json_save(
     raise ValueError("file_path must not be None or empty.")
   file_path = pathlib.Path(file_path)
 
+  codec = None
   if json_options is None:
-    json_options = {"default": json_serializer, "indent": 4}
+    # Default options go through the pluggable codec (orjson when installed, else stdlib)
+    json_options = {"default": json_serializer, "indent": 2}
+    codec = get_json_codec()
 
-  save_json_safely(data, file_path, encoding="utf-8", json_options=json_options)
+  save_json_safely(data, file_path, encoding="utf-8", json_options=json_options, codec=codec)
 
   logger.debug(f"JSON saved to file: '{file_path}'.")
 
@@ -238,6 +254,7 @@ def json_load(
   Args:
     file_path (str | Path): Path to the JSON file. If None or empty, raises ValueError.
     json_options (dict | None): Optional options passed to `json.load`.
+      If None, the file is decoded by the active codec from `arb.utils.json_codec` using `json_deserializer`.
 
   Returns:
     object: Deserialized Python object (dict, list, etc.).
@@ -260,10 +277,13 @@ def json_load(
 
   file_path = pathlib.Path(file_path)
 
+  codec = None
   if json_options is None:
     json_options = {"object_hook": json_deserializer}
+    codec = get_json_codec()
 
-  return read_json_file(file_path, encoding="utf-8-sig", json_options=json_options)
+  return read_json_file(file_path, encoding="utf-8-sig", json_options=json_options, codec=codec,
+                        hook_keys=JSON_TYPE_TAGS if codec else None)
 
 
 def json_load_with_meta(file_path: str | pathlib.Path,
@@ -424,23 +444,81 @@ def cast_model_value(
     - If value_type is None, raises ValueError.
     - If value is None, raises ValueError.
     - If type is unsupported, raises ValueError.
+    - Uses the per-type caster cached by `get_value_caster()`.
   """
-  # todo - datetime - may need to update
   try:
-    if value_type == str:
-      # No need to cast a string
+    caster = get_value_caster(value_type, convert_time_to_ca)
+  except TypeError:
+    # Unhashable value_type; build an uncached caster (which reports it as unsupported)
+    caster = _make_value_caster(value_type, convert_time_to_ca)
+  return caster(value)
+
+
+def _make_value_caster(value_type: type, convert_time_to_ca: bool) -> Callable[[Any], Any]:
+  """
+  Build a casting function specialized for a single target type (see `cast_model_value`).
+
+  Args:
+    value_type (type): Python type to cast to.
+    convert_time_to_ca (bool): If True, datetimes are converted from UTC to California naive time.
+
+  Returns:
+    Callable[[Any], Any]: Function casting one value; raises ValueError on failure.
+  """
+  # todo - datetime - may need to update
+  if value_type == str:
+    # No need to cast a string
+    def convert(value):
       return value
-    elif value_type in [bool, int, float]:
-      return value_type(value)
-    elif value_type == datetime.datetime:
-      dt = iso_str_to_utc_datetime(value)
-      return utc_datetime_to_ca_naive_datetime(dt) if convert_time_to_ca else dt
-    elif value_type == decimal.Decimal:
-      return decimal.Decimal(value)
+  elif value_type in [bool, int, float]:
+    convert = value_type
+  elif value_type == datetime.datetime:
+    if convert_time_to_ca:
+      def parse(value):
+        return utc_datetime_to_ca_naive_datetime(iso_str_to_utc_datetime(value))
     else:
+      parse = iso_str_to_utc_datetime
+    # ISO parsing dominates form loads and the same stored strings recur across requests;
+    # datetimes are immutable, so parsed results can be shared (failures are never cached)
+    parse_cached = functools.lru_cache(maxsize=DATETIME_PARSE_CACHE_SIZE)(parse)
+
+    def convert(value):
+      return parse_cached(value) if type(value) is str else parse(value)
+  elif value_type == decimal.Decimal:
+    convert = decimal.Decimal
+  else:
+    def convert(value):
       raise ValueError(f"Unsupported type for casting: {value_type}")
-  except Exception as e:
-    raise ValueError(f"Failed to cast {value!r} to {value_type}: {e}")
+
+  def caster(value):
+    try:
+      return convert(value)
+    except Exception as e:
+      raise ValueError(f"Failed to cast {value!r} to {value_type}: {e}")
+
+  return caster
+
+
+@functools.lru_cache(maxsize=None)
+def get_value_caster(value_type: type, convert_time_to_ca: bool = False) -> Callable[[Any], Any]:
+  """
+  Return the cached casting function for a target type, as used by `cast_model_value`.
+
+  Args:
+    value_type (type): Python type to cast to (str, int, float, bool, datetime, decimal).
+    convert_time_to_ca (bool): If True, convert UTC to California naive datetime.
+
+  Returns:
+    Callable[[Any], Any]: Function casting one value; raises ValueError on failure.
+
+  Raises:
+    TypeError: If value_type is unhashable.
+
+  Examples:
+    Input : int
+    Output: caster where caster("5") == 5
+  """
+  return _make_value_caster(value_type, convert_time_to_ca)
 
 
 def wtform_types_and_values(
@@ -516,31 +594,108 @@ def make_dict_serializeable(
   Notes:
     - If input_dict is None, raises ValueError.
     - If type_map is provided, values are cast to the specified types before serialization.
+    - Delegates to the cached converter from `compile_dict_serializer()`.
+  """
+  return compile_dict_serializer(type_map, convert_time_to_ca)(input_dict)
+
+
+_SERIALIZEABLE_AS_IS = frozenset({str, int, float, bool, type(None), list, dict})
+
+
+def _serialize_value(value: Any, convert_time_to_ca: bool) -> Any:
+  """
+  Convert a single (already cast) value to a JSON-compatible value (see `make_dict_serializeable`).
+  """
+  if type(value) in _SERIALIZEABLE_AS_IS:
+    return value
+
+  # todo - datetime - change this to ensure datetime is iso and fail if it is not
+  if isinstance(value, datetime.datetime):
+    # tzinfo, fold and type are part of the key because datetime equality ignores them in some cases
+    value = _datetime_to_iso(value, value.tzinfo, value.fold, type(value), convert_time_to_ca)
+
+  elif isinstance(value, decimal.Decimal):
+    value = float(value)
+
+  return value
+
+
+@functools.lru_cache(maxsize=DATETIME_PARSE_CACHE_SIZE)
+def _datetime_to_iso(value: datetime.datetime, tzinfo, fold: int, value_type: type, convert_time_to_ca: bool) -> str:
+  if convert_time_to_ca:
+    value = ca_naive_datetime_to_utc_datetime(value)
+  return value.isoformat()
+
+
+def _make_field_serializer(key: str, value_type: type, convert_time_to_ca: bool) -> Callable[[Any], Any]:
+  """
+  Build the cast-then-serialize function for one typed key (see `make_dict_serializeable`).
   """
-  result = {}
 
-  for key, value in input_dict.items():
-    if not isinstance(key, str):
-      raise TypeError(f"All keys must be strings. Invalid key: {key} ({type(key)})")
+  def serialize_field(value):
+    try:
+      value = safe_cast(value, value_type)
+    except Exception as e:
+      raise ValueError(f"Failed to cast key '{key}' to {value_type}: {e}")
+    return _serialize_value(value, convert_time_to_ca)
 
-    if type_map and key in type_map:
-      try:
-        value = safe_cast(value, type_map[key])
-      except Exception as e:
-        raise ValueError(f"Failed to cast key '{key}' to {type_map[key]}: {e}")
+  return serialize_field
 
-    # todo - datetime - change this to ensure datetime is iso and fail if it is not
-    if isinstance(value, datetime.datetime):
-      if convert_time_to_ca:
-        value = ca_naive_datetime_to_utc_datetime(value)
-      value = value.isoformat()
 
-    elif isinstance(value, decimal.Decimal):
-      value = float(value)
+@functools.lru_cache(maxsize=256)
+def _compile_dict_serializer(type_items: tuple, convert_time_to_ca: bool) -> Callable[[dict], dict]:
+  types = dict(type_items)
+  get_type = types.get
+  field_serializers = {key: _make_field_serializer(key, value_type, convert_time_to_ca)
+                       for key, value_type in type_items}
+  serializeable_as_is = _SERIALIZEABLE_AS_IS
+
+  def serialize(input_dict: dict) -> dict:
+    result = {}
+    for key, value in input_dict.items():
+      if type(key) is not str and not isinstance(key, str):
+        raise TypeError(f"All keys must be strings. Invalid key: {key} ({type(key)})")
+      value_type = get_type(key)
+      if value_type is not None and type(value) is not value_type:
+        # Cast needed (or a subclass/unusual type): take the general path
+        value = field_serializers[key](value)
+      elif type(value) not in serializeable_as_is:
+        value = _serialize_value(value, convert_time_to_ca)
+      result[key] = value
+    return result
 
-    result[key] = value
+  return serialize
 
-  return result
+
+def compile_dict_serializer(
+        type_map: dict[str, type] | None = None,
+        convert_time_to_ca: bool = False
+) -> Callable[[dict], dict]:
+  """
+  Return a cached converter equivalent to `make_dict_serializeable(d, type_map, convert_time_to_ca)`.
+
+  One specialized function is generated per typed key the first time a given type map is seen,
+  so repeated saves of the same form or table skip the per-field type-map lookups and isinstance chains.
+
+  Args:
+    type_map (dict[str, type] | None): Field-to-type map for casting. If None or empty, no casting is performed.
+    convert_time_to_ca (bool): Convert datetimes to CA time before serialization.
+
+  Returns:
+    Callable[[dict], dict]: Function taking the input dict and returning the JSON-compatible dict.
+
+  Examples:
+    Input : {"id_incidence": int}
+    Output: serializer where serializer({"id_incidence": "5"}) == {"id_incidence": 5}
+
+  Notes:
+    - The cache key is the type map's contents, so equal type maps share one compiled converter.
+  """
+  try:
+    return _compile_dict_serializer(tuple((type_map or {}).items()), convert_time_to_ca)
+  except TypeError:
+    # Unhashable type in the map; compile without caching
+    return _compile_dict_serializer.__wrapped__(tuple((type_map or {}).items()), convert_time_to_ca)
 
 
 def deserialize_dict(
@@ -570,19 +725,74 @@ def deserialize_dict(
   Notes:
     - If input_dict is None, raises ValueError.
     - If type_map is None or empty, no casting is performed.
+    - Delegates to the cached converter from `compile_dict_deserializer()`.
+  """
+  return compile_dict_deserializer(type_map, convert_time_to_ca)(input_dict)
+
+
+# Casting a value that already has one of these exact types returns an equal value, so it can be skipped
+_CAST_IS_IDENTITY = frozenset({str, int, float, bool, decimal.Decimal})
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_dict_deserializer(type_items: tuple, convert_time_to_ca: bool) -> Callable[[dict], dict]:
+  casters = {}
+  identity_types = {}
+  for key, value_type in type_items:
+    if value_type is str:
+      # cast_model_value returns strings unchanged
+      continue
+    try:
+      casters[key] = get_value_caster(value_type, convert_time_to_ca)
+    except TypeError:
+      casters[key] = _make_value_caster(value_type, convert_time_to_ca)
+    if value_type in _CAST_IS_IDENTITY:
+      identity_types[key] = value_type
+  get_caster = casters.get
+  get_identity_type = identity_types.get
+
+  def deserialize(input_dict: dict) -> dict:
+    result = {}
+    for key, value in input_dict.items():
+      if type(key) is not str and not isinstance(key, str):
+        raise TypeError(f"All keys must be strings. Invalid key: {key} ({type(key)})")
+      caster = get_caster(key)
+      if caster is None or value is None or type(value) is get_identity_type(key):
+        result[key] = value
+      else:
+        result[key] = caster(value)
+    return result
+
+  return deserialize
+
+
+def compile_dict_deserializer(
+        type_map: dict[str, type] | None,
+        convert_time_to_ca: bool = False
+) -> Callable[[dict], dict]:
   """
-  result = {}
+  Return a cached converter equivalent to `deserialize_dict(d, type_map, convert_time_to_ca)`.
+
+  Args:
+    type_map (dict[str, type] | None): Field-to-type mapping for deserialization. If None or empty, no casting is performed.
+    convert_time_to_ca (bool): If True, converts datetime to CA time.
 
-  for key, value in input_dict.items():
-    if not isinstance(key, str):
-      raise TypeError(f"All keys must be strings. Invalid key: {key} ({type(key)})")
+  Returns:
+    Callable[[dict], dict]: Function taking the raw dict and returning the deserialized dict.
 
-    if key in type_map and value is not None:
-      result[key] = cast_model_value(value, type_map[key], convert_time_to_ca)
-    else:
-      result[key] = value
+  Examples:
+    Input : {"amount": decimal.Decimal}
+    Output: deserializer where deserializer({"amount": "1.5"}) == {"amount": decimal.Decimal("1.5")}
 
-  return result
+  Notes:
+    - Each typed key is bound to the cached caster from `get_value_caster()`.
+    - The cache key is the type map's contents, so equal type maps share one compiled converter.
+  """
+  try:
+    return _compile_dict_deserializer(tuple((type_map or {}).items()), convert_time_to_ca)
+  except TypeError:
+    # Unhashable type in the map; compile without caching
+    return _compile_dict_deserializer.__wrapped__(tuple((type_map or {}).items()), convert_time_to_ca)
 
 
 def safe_json_loads(value: str | dict | None, context_label: str = "") -> dict:
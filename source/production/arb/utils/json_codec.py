@@ -0,0 +1,293 @@
+"""
+Pluggable JSON encoder/decoder backends for the ARB Feedback Portal.
+
+`json_save`, `json_load` and the metadata-wrapped variants in `arb.utils.json` serialize large
+staged files and converted uploads. This module lets those paths use a faster backend (orjson)
+when it is installed, while falling back to the standard library `json` module otherwise.
+
+Both codecs expose the same two operations:
+
+- `dumps(obj, default=None, indent=None, ensure_ascii=True) -> bytes` (UTF-8 encoded JSON)
+- `loads(data, object_hook=None, hook_keys=None) -> object`
+
+and honor the same `default` / `object_hook` callbacks, so the `__type__`/`__class__` round-trip
+contract of `json_serializer` and `json_deserializer` is unchanged regardless of backend.
+
+Attributes:
+  JSON_CODEC_ENV_VAR (str): Environment variable selecting the backend ("auto", "orjson", "stdlib").
+  logger (logging.Logger): Logger instance for this module.
+
+Examples:
+  from arb.utils.json_codec import get_json_codec
+  codec = get_json_codec()
+  raw = codec.dumps({"when": datetime.datetime.now()}, default=json_serializer, indent=2)
+  data = codec.loads(raw, object_hook=json_deserializer)
+
+Notes:
+  - Both backends accept the same types: UUIDs are written as strings and Enum members as their
+    values (orjson encodes them natively; the stdlib codec converts them before calling `default`),
+    and everything else either backend cannot encode goes to `default`.
+  - Both backends write the same layout: orjson is only used when it can reproduce the stdlib
+    bytes (2-space indentation, and ASCII-only output when `ensure_ascii` is set); compact output,
+    other indent widths and non-ASCII text under `ensure_ascii` are encoded by stdlib.
+  - The orjson codec hands datetime and dataclass objects to `default` instead of encoding them
+    natively, matching stdlib behavior.
+  - Inputs orjson rejects (NaN/Infinity literals, integers wider than 64 bits, non-string keys)
+    transparently fall back to the stdlib implementation, so error types and edge-case values
+    match stdlib.
+  - Reads only use orjson when the object_hook has nothing to convert (see `hook_keys`); documents
+    containing `__type__`/`__class__` tags are decoded by stdlib, whose C scanner applies the hook
+    faster than a Python walk over orjson output.
+  - Floats decode to the same values with either backend, but orjson spells some of them
+    differently (e.g., `1e16` instead of `1e+16`, `0.00002` instead of `2e-05`), and a float NaN
+    *value* is written as `null` by orjson and as `NaN` by stdlib.
+"""
+
+import enum
+import json
+import logging
+import os
+import uuid
+from typing import Any, Callable
+
+try:
+  import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+  orjson = None
+
+__version__ = "1.0.0"
+logger = logging.getLogger(__name__)
+
+JSON_CODEC_ENV_VAR = "ARB_JSON_CODEC"
+
+_UTF8_BOM = b"\xef\xbb\xbf"
+
+
+def _with_native_types(default: Callable[[Any], Any] | None) -> Callable[[Any], Any]:
+  """
+  Wrap a stdlib `default` so UUIDs and Enum members are encoded the way orjson encodes them.
+
+  Args:
+    default (Callable | None): Fallback serializer for every other unsupported type.
+
+  Returns:
+    Callable[[Any], Any]: Serializer for `json.dumps(default=...)`.
+  """
+
+  def encode(obj: Any) -> Any:
+    if isinstance(obj, uuid.UUID):
+      return str(obj)
+    if isinstance(obj, enum.Enum):
+      return obj.value
+    if default is None:
+      raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    return default(obj)
+
+  return encode
+
+
+class StdlibJsonCodec:
+  """
+  JSON codec backed by the standard library `json` module.
+
+  This reproduces the historical output of `json_save` byte-for-byte, and additionally encodes
+  UUIDs and Enum members as orjson does.
+  """
+
+  name = "stdlib"
+
+  def dumps(self,
+            obj: Any,
+            default: Callable[[Any], Any] | None = None,
+            indent: int | None = None,
+            ensure_ascii: bool = True) -> bytes:
+    """
+    Serialize `obj` to UTF-8 encoded JSON bytes.
+
+    Args:
+      obj (Any): Object to serialize.
+      default (Callable | None): Fallback serializer for unsupported types (see `json_serializer`).
+      indent (int | None): Indentation width; None for compact output.
+      ensure_ascii (bool): If True, escape non-ASCII characters.
+
+    Returns:
+      bytes: Encoded JSON document.
+
+    Raises:
+      TypeError: If `obj` contains a type that `default` cannot handle.
+    """
+    return json.dumps(obj, default=_with_native_types(default), indent=indent,
+                      ensure_ascii=ensure_ascii).encode("utf-8")
+
+  def loads(self,
+            data: bytes | str,
+            object_hook: Callable[[dict], Any] | None = None,
+            hook_keys: tuple[str, ...] | None = None) -> Any:
+    """
+    Deserialize a JSON document.
+
+    Args:
+      data (bytes | str): JSON document; a leading UTF-8 BOM is ignored.
+      object_hook (Callable | None): Called with every decoded dict (see `json_deserializer`).
+      hook_keys (tuple[str, ...] | None): Optional promise that `object_hook` returns dicts lacking
+        all of these keys unchanged. Unused by the stdlib codec.
+
+    Returns:
+      Any: Decoded Python object.
+
+    Raises:
+      json.JSONDecodeError: If `data` is not valid JSON.
+    """
+    if isinstance(data, bytes):
+      data = data.decode("utf-8-sig")
+    elif data.startswith("\ufeff"):
+      data = data[1:]
+    return json.loads(data, object_hook=object_hook)
+
+
+class OrjsonJsonCodec(StdlibJsonCodec):
+  """
+  JSON codec backed by orjson, falling back to stdlib for inputs orjson does not support.
+  """
+
+  name = "orjson"
+
+  def dumps(self,
+            obj: Any,
+            default: Callable[[Any], Any] | None = None,
+            indent: int | None = None,
+            ensure_ascii: bool = True) -> bytes:
+    """
+    Serialize `obj` to UTF-8 encoded JSON bytes with orjson.
+
+    Args:
+      obj (Any): Object to serialize.
+      default (Callable | None): Fallback serializer for unsupported types (see `json_serializer`).
+      indent (int | None): Indentation width; None for compact output. Only 2 is encoded by orjson.
+      ensure_ascii (bool): If True, escape non-ASCII characters (such documents are encoded by stdlib).
+
+    Returns:
+      bytes: Encoded JSON document.
+
+    Raises:
+      TypeError: If `obj` contains a type that `default` cannot handle.
+    """
+    if indent == 2:
+      option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_INDENT_2
+      try:
+        raw = orjson.dumps(obj, default=default, option=option)
+      except orjson.JSONEncodeError:
+        # Let stdlib either handle what orjson cannot (e.g., >64-bit ints) or raise its usual TypeError
+        raw = None
+      if raw is not None and (not ensure_ascii or raw.isascii()):
+        return raw
+    # orjson cannot write stdlib's compact separators, other indent widths or \u escapes
+    return super().dumps(obj, default=default, indent=indent, ensure_ascii=ensure_ascii)
+
+  def loads(self,
+            data: bytes | str,
+            object_hook: Callable[[dict], Any] | None = None,
+            hook_keys: tuple[str, ...] | None = None) -> Any:
+    """
+    Deserialize a JSON document with orjson when no object_hook work is needed.
+
+    orjson has no object_hook, and walking the decoded document in Python costs more than the
+    stdlib C scanner calling the hook itself. Documents are therefore decoded by orjson only when
+    there is no hook, or when `hook_keys` shows the hook would leave every dict unchanged;
+    everything else (and anything orjson rejects) is decoded by stdlib.
+
+    Args:
+      data (bytes | str): JSON document; a leading UTF-8 BOM is ignored.
+      object_hook (Callable | None): Called with every decoded dict (see `json_deserializer`).
+      hook_keys (tuple[str, ...] | None): Optional promise that `object_hook` returns dicts lacking
+        all of these keys unchanged (e.g., `("__class__", "__type__")` for `json_deserializer`).
+        Keys are matched as written, so documents must not spell them with \\u escapes.
+
+    Returns:
+      Any: Decoded Python object.
+
+    Raises:
+      json.JSONDecodeError: If `data` is not valid JSON.
+    """
+    raw = data.encode("utf-8") if isinstance(data, str) else data
+    if raw.startswith(_UTF8_BOM):
+      raw = raw[len(_UTF8_BOM):]
+    if object_hook is not None:
+      if not hook_keys or any(f'"{key}"'.encode("utf-8") in raw for key in hook_keys):
+        return super().loads(raw, object_hook=object_hook)
+    try:
+      return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+      return super().loads(raw, object_hook=object_hook)
+
+
+_CODECS = {"stdlib": StdlibJsonCodec}
+if orjson is not None:
+  _CODECS["orjson"] = OrjsonJsonCodec
+
+_active_codec: StdlibJsonCodec | None = None
+
+
+def make_json_codec(name: str = "auto") -> StdlibJsonCodec:
+  """
+  Create a JSON codec by name.
+
+  Args:
+    name (str): "orjson", "stdlib", or "auto" (orjson when installed, otherwise stdlib).
+
+  Returns:
+    StdlibJsonCodec: The requested codec instance.
+
+  Raises:
+    ValueError: If `name` is unknown or names a backend that is not installed.
+
+  Examples:
+    Input : "auto"
+    Output: OrjsonJsonCodec instance when orjson is importable, else StdlibJsonCodec
+  """
+  name = (name or "auto").strip().lower()
+  if name == "auto":
+    name = "orjson" if "orjson" in _CODECS else "stdlib"
+  if name not in _CODECS:
+    raise ValueError(f"Unknown or unavailable JSON codec {name!r}; available: {sorted(_CODECS)}")
+  return _CODECS[name]()
+
+
+def get_json_codec() -> StdlibJsonCodec:
+  """
+  Return the process-wide JSON codec, selecting it on first use.
+
+  The backend is chosen from the `ARB_JSON_CODEC` environment variable (default "auto").
+  An invalid value is logged and the stdlib codec is used.
+
+  Returns:
+    StdlibJsonCodec: The active codec.
+  """
+  global _active_codec
+  if _active_codec is None:
+    requested = os.environ.get(JSON_CODEC_ENV_VAR, "auto")
+    try:
+      _active_codec = make_json_codec(requested)
+    except ValueError as e:
+      logger.warning(f"{e}; using stdlib JSON codec.")
+      _active_codec = StdlibJsonCodec()
+    logger.debug(f"JSON codec selected: {_active_codec.name}")
+  return _active_codec
+
+
+def set_json_codec(name: str) -> StdlibJsonCodec:
+  """
+  Replace the process-wide JSON codec (primarily for tests and benchmarks).
+
+  Args:
+    name (str): Codec name accepted by `make_json_codec`.
+
+  Returns:
+    StdlibJsonCodec: The newly active codec.
+
+  Raises:
+    ValueError: If `name` is unknown or unavailable.
+  """
+  global _active_codec
+  _active_codec = make_json_codec(name)
+  return _active_codec
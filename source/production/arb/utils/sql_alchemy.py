@@ -442,7 +442,8 @@ def add_commit_and_log_model(
         db: SQLAlchemy,
         model_row: AutomapBase,
         comment: str = "",
-        model_before: dict | None = None
+        model_before: dict | None = None,
+        log_changes: bool = True
 ) -> None:
   """
   Add or update a model instance in the database, log changes, and commit.
@@ -452,6 +453,7 @@ def add_commit_and_log_model(
     model_row (AutomapBase): ORM model instance to add or update. Must not be None.
     comment (str): Optional log comment for auditing.
     model_before (dict | None): Optional snapshot of the model before changes.
+    log_changes (bool): If False, commit without serializing and logging the model after the commit.
 
   Returns:
     None
@@ -474,6 +476,8 @@ def add_commit_and_log_model(
   try:
     db.session.add(model_row)
     db.session.commit()
+    if not log_changes:
+      return
     model_after = sa_model_to_dict(model_row)
     logger.info(f"After commit: {model_after}")
 
@@ -6,9 +6,9 @@ Notes:
   * This module is for shared utilities, validators, and form-to-model conversion logic.
 """
 
-import copy
 import datetime
 import logging
+from dataclasses import dataclass
 from decimal import Decimal
 from typing import Any, Callable
 
@@ -22,7 +22,8 @@ from wtforms.validators import InputRequired, Optional
 from arb.portal.json_update_util import apply_json_patch_and_log
 from arb.utils.constants import PLEASE_SELECT
 from arb.utils.diagnostics import get_changed_fields, list_differences
-from arb.utils.json import deserialize_dict, make_dict_serializeable, safe_json_loads, wtform_types_and_values
+from arb.utils.json import compile_dict_deserializer, compile_dict_serializer, make_dict_serializeable, \
+  safe_json_loads, wtform_types_and_values
 from arb.utils.sql_alchemy import load_model_json_column
 
 __version__ = "1.0.0"
@@ -278,6 +279,60 @@ def wtf_count_errors(form: FlaskForm, log_errors: bool = False) -> dict[str, int
   return error_count_dict
 
 
+@dataclass(frozen=True)
+class FormFieldMap:
+  """
+  Field-to-key mapping and converters of a form class, computed once (see `get_form_field_map`).
+
+  Attributes:
+    field_names (tuple[str, ...]): Sorted field names, without 'csrf_token' (as `get_wtforms_fields`).
+    all_field_names (tuple[str, ...]): Sorted field names, including 'csrf_token' if the form has one.
+    type_map (dict[str, type]): Field name → Python type used to (de)serialize misc_json values.
+    deserialize (Callable[[dict], dict]): misc_json values → field data (UTC → California time).
+    serialize (Callable[[dict], dict]): Field data → misc_json values (California time → UTC).
+  """
+  field_names: tuple[str, ...]
+  all_field_names: tuple[str, ...]
+  type_map: dict[str, type]
+  deserialize: Callable[[dict], dict]
+  serialize: Callable[[dict], dict]
+
+
+_form_field_maps: dict[tuple, FormFieldMap] = {}
+
+
+def get_form_field_map(form: FlaskForm) -> FormFieldMap:
+  """
+  Return the cached field mapping of a form's class.
+
+  Args:
+    form (FlaskForm): Form instance (fields are bound, so their types can be inspected).
+
+  Returns:
+    FormFieldMap: Mapping shared by every instance of the class with the same fields.
+
+  Examples:
+    Input : get_form_field_map(OGFeedback())
+    Output: FormFieldMap(field_names=('additional_activities', ...), type_map={'ogi_date': datetime.datetime, ...}, ...)
+
+  Notes:
+    - The cache key is the class and its field names, so a form built with and without CSRF gets
+      two entries.
+  """
+  key = (type(form), tuple(form._fields))
+  field_map = _form_field_maps.get(key)
+  if field_map is None:
+    type_map, _ = wtform_types_and_values(form)
+    all_field_names = tuple(sorted(form._fields))
+    field_map = FormFieldMap(field_names=tuple(name for name in all_field_names if name != "csrf_token"),
+                             all_field_names=all_field_names,
+                             type_map=type_map,
+                             deserialize=compile_dict_deserializer(type_map, convert_time_to_ca=True),
+                             serialize=compile_dict_serializer(None, convert_time_to_ca=True))
+    _form_field_maps[key] = field_map
+  return field_map
+
+
 def model_to_wtform(model: AutomapBase,
                     wtform: FlaskForm,
                     json_column: str = "misc_json") -> None:
@@ -301,9 +356,13 @@ def model_to_wtform(model: AutomapBase,
     - Supports preloading DateTimeField and DecimalField types.
     - Converts ISO8601 UTC → localized Pacific time.
     - Ignores JSON fields that don't map to WTForm fields.
+    - Uses the form class's precomputed `FormFieldMap`; only the stored values of form fields are
+      converted, and the per-field debug output is only built when debug logging is enabled.
   """
   model_json_dict = getattr(model, json_column)
-  logger.debug(f"model_to_wtform called with model={model}, json={model_json_dict}")
+  debug = logger.isEnabledFor(logging.DEBUG)
+  if debug:
+    logger.debug(f"model_to_wtform called with model={model}, json={model_json_dict}")
 
   # # Ensure dict, not str
   # if isinstance(model_json_dict, str):
@@ -325,29 +384,31 @@ def model_to_wtform(model: AutomapBase,
     logger.warning(f"[model_to_wtform] MISMATCH: model.id_incidence={model_id_incidence} "
                    f"!= misc_json['id_incidence']={model_json_dict['id_incidence']}")
 
-  form_fields = get_wtforms_fields(wtform)
-  model_fields = list(model_json_dict.keys())
+  field_map = get_form_field_map(wtform)
+  form_fields = field_map.field_names
 
-  list_differences(
-    model_fields, form_fields,
-    iterable_01_name="SQLAlchemy Model JSON",
-    iterable_02_name="WTForm Fields",
-    print_warning=False
-  )
+  if debug:
+    list_differences(
+      list(model_json_dict.keys()), list(form_fields),
+      iterable_01_name="SQLAlchemy Model JSON",
+      iterable_02_name="WTForm Fields",
+      print_warning=False
+    )
 
-  # Use utilities to get type map and convert model dict
-  type_map, _ = wtform_types_and_values(wtform)
-  parsed_dict = deserialize_dict(model_json_dict, type_map, convert_time_to_ca=True)
+  # Convert only the stored values that belong to form fields
+  parsed_dict = field_map.deserialize({name: model_json_dict[name] for name in form_fields if name in model_json_dict})
 
+  fields = wtform._fields
   for field_name in form_fields:
-    field = getattr(wtform, field_name)
+    field = fields[field_name]
     model_value = parsed_dict.get(field_name)
 
     # Set field data and raw_data for proper rendering/validation
     field.data = model_value
     field.raw_data = format_raw_data(field, model_value)
 
-    logger.debug(f"Set {field_name=}, data={field.data}, raw_data={field.raw_data}")
+    if debug:
+      logger.debug(f"Set {field_name=}, data={field.data}, raw_data={field.raw_data}")
 
 
 def format_raw_data(field: Field, value) -> list[str]:
@@ -420,31 +481,39 @@ def wtform_to_model(model: AutomapBase,
     Output: AttributeError
 
   Notes:
-    - Uses make_dict_serializable and get_changed_fields to compare values.
+    - Uses the form class's precomputed `FormFieldMap` serializer and get_changed_fields to compare values.
+    - Only the stored keys that the form submits are serialized for the comparison.
     - Delegates to apply_json_patch_and_log to persist and log changes.
     - If model or wtform is None, raises AttributeError.
   """
   ignore_fields_set = set(ignore_fields or [])
+  field_map = get_form_field_map(wtform)
+  fields = wtform._fields
 
   payload_all = {
-    field_name: getattr(wtform, field_name).data
-    for field_name in get_wtforms_fields(wtform)
+    field_name: fields[field_name].data
+    for field_name in field_map.field_names
     if field_name not in ignore_fields_set
   }
 
   # Use manual overrides only — no type_map from form
-  payload_all = make_dict_serializeable(payload_all, type_map=type_matching_dict, convert_time_to_ca=True)
+  if type_matching_dict is None:
+    serialize = field_map.serialize
+  else:
+    serialize = compile_dict_serializer(type_matching_dict, convert_time_to_ca=True)
+  payload_all = serialize(payload_all)
 
-  existing_json = load_model_json_column(model, json_column)
+  existing_json = load_model_json_column(model, json_column) or {}
   # todo - shouldn't json already be serialized, not sure what the next line accomplishes
-  existing_serialized = make_dict_serializeable(existing_json, type_map=type_matching_dict, convert_time_to_ca=True)
+  existing_serialized = serialize({key: existing_json[key] for key in payload_all if key in existing_json})
 
   payload_changes = get_changed_fields(payload_all, existing_serialized)
   if payload_changes:
     logger.info(f"wtform_to_model payload_changes: {payload_changes}")
     apply_json_patch_and_log(model, payload_changes, json_column, user=user, comments=comments)
 
-  logger.info(f"wtform_to_model payload_all: {payload_all}")
+  if logger.isEnabledFor(logging.INFO):
+    logger.info(f"wtform_to_model payload_all: {payload_all}")
 
 
 def get_payloads(model: DeclarativeMeta,
@@ -588,24 +657,25 @@ def update_model_with_payload(model: DeclarativeMeta,
   Notes:
     - Calls `prep_payload_for_json` to ensure data integrity.
     - Uses `apply_json_patch_and_log` to track and log changes.
-    - Deep-copies the existing JSON field to avoid side effects.
+    - Only the payload keys are passed on, so existing rows are merged in the database
+      without reading or rewriting the rest of the JSON document.
+    - The merged document is only reloaded to log it when DEBUG logging is enabled.
     - If model or payload is None, raises AttributeError.
   """
   logger.debug(f"update_model_with_payload: {model=}, {payload=}")
 
-  model_json = copy.deepcopy(getattr(model, json_field) or {})
   new_payload = prep_payload_for_json(payload)
-  model_json.update(new_payload)
 
   apply_json_patch_and_log(
     model,
     json_field=json_field,
-    updates=model_json,
+    updates=new_payload,
     user="anonymous",
     comments=comment,
   )
 
-  logger.debug(f"Model JSON updated: {getattr(model, json_field)=}")
+  if logger.isEnabledFor(logging.DEBUG):
+    logger.debug(f"Model JSON updated: {getattr(model, json_field)=}")
 
 
 def get_wtforms_fields(form: FlaskForm,
@@ -630,13 +700,10 @@ def get_wtforms_fields(form: FlaskForm,
     - If form is None, returns an empty list.
     - Field names are sorted alphabetically.
     - If include_csrf_token is False, 'csrf_token' is excluded from the result.
+    - The sorted names come from the form class's cached `FormFieldMap`.
   """
-  field_names = [
-    name for name in form.data
-    if include_csrf_token or name != "csrf_token"
-  ]
-  field_names.sort()
-  return field_names
+  field_map = get_form_field_map(form)
+  return list(field_map.all_field_names if include_csrf_token else field_map.field_names)
 
 
 def initialize_drop_downs(form: FlaskForm, default: str | None = None) -> None:
@@ -726,6 +793,7 @@ def ensure_field_choice(field_name: str,
   Notes:
     - If choices is provided, this function sets field.choices to the new list.
     - If choices is None, it uses the field's existing .choices. If both are None, uses an empty list.
+    - ChoiceSet choices are checked against their precomputed value set.
     - Resets field.data and field.raw_data to the placeholder if the value is invalid.
     - If field is None, raises an exception.
   """
@@ -737,7 +805,7 @@ def ensure_field_choice(field_name: str,
     # Apply a new set of choices to the field
     field.choices = choices
 
-  valid_values = {c[0] for c in choices}
+  valid_values = choices.valid_values if isinstance(choices, ChoiceSet) else {c[0] for c in choices}
 
   if field.data not in valid_values:
     logger.debug(f"{field_name}.data={field.data!r} not in valid options, resetting to '{PLEASE_SELECT}'")
@@ -822,7 +890,47 @@ def validate_no_csrf(form: FlaskForm, extra_validators: dict | None = None) -> b
   return form_valid
 
 
-def coerce_choices(val: Any) -> list[tuple[str, str]]:
+class ChoiceSet(tuple):
+  """
+  Immutable SelectField choices with a precomputed set of their values.
+
+  Compiled once (e.g., by `Globals.load_drop_downs`) and attached to fields by reference, so
+  form construction does not rebuild choice lists and value checks are O(1).
+
+  Attributes:
+    valid_values (frozenset[str]): The first element of every choice.
+
+  Examples:
+    Input : ChoiceSet([("A", "A"), ("B", "B", {})])
+    Output: (("A", "A"), ("B", "B", {})) with valid_values == frozenset({"A", "B"})
+  """
+
+  def __new__(cls, choices=()):
+    self = super().__new__(cls, (tuple(choice) for choice in choices))
+    self.valid_values = frozenset(choice[0] for choice in self)
+    return self
+
+
+def freeze_choices(val: Any) -> ChoiceSet:
+  """
+  Compile dropdown data into a ChoiceSet of (str, str) choices, as `coerce_choices` formats them.
+
+  Args:
+    val (Any): Dropdown data (dict, list of tuples, list of strings) or an existing ChoiceSet.
+
+  Returns:
+    ChoiceSet: The frozen choices; an existing ChoiceSet is returned unchanged.
+
+  Examples:
+    Input : freeze_choices(["Yes", "No"])
+    Output: ChoiceSet((("Yes", "Yes"), ("No", "No")))
+  """
+  if isinstance(val, ChoiceSet):
+    return val
+  return ChoiceSet(coerce_choices(val))
+
+
+def coerce_choices(val: Any) -> list[tuple[str, str]] | ChoiceSet:
   """
   Convert various dropdown data formats to a list of (str, str) tuples for WTForms SelectField.
 
@@ -830,11 +938,14 @@ def coerce_choices(val: Any) -> list[tuple[str, str]]:
   compatibility regardless of the input format (dict, list of tuples, or list of strings).
 
   Args:
-      val: The dropdown data, which may be a dict, list of tuples, or list of strings.
+      val: The dropdown data, which may be a dict, list of tuples, list of strings, or a ChoiceSet.
 
   Returns:
-      List[Tuple[str, str]]: A list of (value, label) tuples.
+      List[Tuple[str, str]] | ChoiceSet: A list of (value, label) tuples; a precompiled ChoiceSet
+        is returned as is, so fields share it by reference.
   """
+  if isinstance(val, ChoiceSet):
+    return val
   if not val:
     return []
   if isinstance(val, dict):
@@ -16,7 +16,7 @@ Usage Examples:
   * Development (from $prod directory):
       flask --app arb/wsgi run --debug --no-reload -p 2113
   
-  * Production with Gunicorn:
+  * Production with Gunicorn (settings and preload hooks in $prod/gunicorn.conf.py):
       gunicorn arb.wsgi:app --bind 0.0.0.0:2113
   
   * Direct execution (for debugging):
@@ -0,0 +1,37 @@
+"""
+Gunicorn configuration for the ARB Feedback Portal.
+
+The app is preloaded: `create_app()` (table creation, reflection, dropdown globals) runs once in
+the master and the workers share that memory. The `pre_fork` and `post_fork` hooks keep the
+database engines fork-safe (see `arb/portal/startup/lifecycle.py`).
+
+Usage (from the production directory, $prod):
+  gunicorn arb.wsgi:app
+
+Environment Variables:
+  * GUNICORN_BIND: Address to bind (default 0.0.0.0:2113).
+  * GUNICORN_WORKERS: Number of worker processes (default 4).
+  * GUNICORN_TIMEOUT: Worker timeout in seconds (default 120).
+  * PRELOAD_APP: Set to false to create the app in every worker instead.
+"""
+import os
+
+# Must be set before the app is loaded so create_app() leaves per-process services to the workers
+os.environ.setdefault("PRELOAD_APP", "true")
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:2113")
+workers = int(os.getenv("GUNICORN_WORKERS", "4"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+preload_app = os.environ["PRELOAD_APP"].lower() == "true"
+
+
+def pre_fork(server, worker):
+  if server.cfg.preload_app:
+    from arb.portal.startup.lifecycle import prepare_for_fork
+    prepare_for_fork(server.app.wsgi())
+
+
+def post_fork(server, worker):
+  if server.cfg.preload_app:
+    from arb.portal.startup.lifecycle import after_fork_in_child
+    after_fork_in_child(server.app.wsgi())
@@ -0,0 +1,33 @@
+"""
+Shared pytest fixtures for the arb test suite.
+
+Provides the `best_of` timer used by the tests marked `benchmark` (deselected by default; run
+them with `pytest -m benchmark`).
+"""
+import time
+
+import pytest
+
+
+@pytest.fixture
+def best_of(record_property):
+  """
+  Time callables for a benchmark test and record the timings on the test report.
+
+  Returns a function `best_of(name, fn, repeat=5, number=1)` that calls `fn` `number` times per
+  round and returns the best per-call time in seconds over `repeat` rounds. The time is recorded
+  as the `<name>_ms` user property (e.g., in `--junitxml` reports), so benchmarks keep their
+  numbers without printing and never fail on wall-clock ratios.
+  """
+
+  def timer(name: str, fn, repeat: int = 5, number: int = 1) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+      start = time.perf_counter()
+      for _ in range(number):
+        fn()
+      best = min(best, (time.perf_counter() - start) / number)
+    record_property(f"{name}_ms", round(best * 1e3, 4))
+    return best
+
+  return timer
@@ -0,0 +1,114 @@
+"""
+Tests for the precomputed form field mapping in arb.utils.wtf_forms_util (`FormFieldMap`),
+run against the Oil & Gas and Landfill feedback forms with the `db_hardcoded` dummy data.
+
+The reference functions are the previous per-call implementations of `model_to_wtform` and the
+change detection of `wtform_to_model`; the tests require the mapped versions to agree with them.
+"""
+import datetime
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from flask import Flask
+
+from arb.portal.db_hardcoded import get_excel_dropdown_data, get_landfill_dummy_form_data, get_og_dummy_form_data
+from arb.portal.globals import Globals, compile_drop_downs
+from arb.portal.wtf_landfill import LandfillFeedback
+from arb.portal.wtf_oil_and_gas import OGFeedback
+from arb.utils import wtf_forms_util
+from arb.utils.diagnostics import get_changed_fields
+from arb.utils.json import deserialize_dict, make_dict_serializeable, wtform_types_and_values
+from arb.utils.wtf_forms_util import format_raw_data, get_form_field_map, get_wtforms_fields, model_to_wtform, \
+  wtform_to_model
+
+FORMS = [(OGFeedback, get_og_dummy_form_data), (LandfillFeedback, get_landfill_dummy_form_data)]
+
+
+@pytest.fixture
+def app_ctx():
+  app = Flask(__name__)
+  app.config["SECRET_KEY"] = "test-secret-key"
+  app.config["WTF_CSRF_ENABLED"] = False
+  drop_downs, drop_downs_contingent = compile_drop_downs(*get_excel_dropdown_data())
+  with app.app_context(), patch.object(Globals, "drop_downs", drop_downs), \
+      patch.object(Globals, "drop_downs_contingent", drop_downs_contingent):
+    yield app
+
+
+def _model(dummy_data):
+  document = make_dict_serializeable(dummy_data(), convert_time_to_ca=True)
+  return SimpleNamespace(id_incidence=document["id_incidence"], misc_json=document)
+
+
+def _reference_model_to_wtform(model, form):
+  type_map, _ = wtform_types_and_values(form)
+  parsed = deserialize_dict(model.misc_json, type_map, convert_time_to_ca=True)
+  for name in sorted(name for name in form.data if name != "csrf_token"):
+    field = getattr(form, name)
+    field.data = parsed.get(name)
+    field.raw_data = format_raw_data(field, field.data)
+
+
+def _reference_changes(model, form, ignore_fields):
+  payload = make_dict_serializeable({name: getattr(form, name).data for name in sorted(form.data)
+                                     if name != "csrf_token" and name not in ignore_fields}, convert_time_to_ca=True)
+  return get_changed_fields(payload, make_dict_serializeable(model.misc_json, convert_time_to_ca=True))
+
+
+def test_field_map_is_cached_per_form_class(app_ctx):
+  field_map = get_form_field_map(OGFeedback(formdata=None))
+  assert get_form_field_map(OGFeedback(formdata=None)) is field_map
+  assert get_form_field_map(LandfillFeedback(formdata=None)) is not field_map
+  assert field_map.field_names == tuple(sorted(OGFeedback(formdata=None)._fields))
+  assert "csrf_token" not in field_map.field_names
+  assert field_map.type_map["ogi_date"] is datetime.datetime
+
+  with app_ctx.test_request_context("/"):
+    with_csrf = OGFeedback(formdata=None, meta={"csrf": True})
+  assert "csrf_token" in get_wtforms_fields(with_csrf, include_csrf_token=True)
+  assert get_wtforms_fields(with_csrf) == list(field_map.field_names)
+
+
+@pytest.mark.parametrize("form_class, dummy_data", FORMS)
+def test_model_to_wtform_matches_reference(app_ctx, form_class, dummy_data):
+  model = _model(dummy_data)
+  mapped, reference = form_class(formdata=None), form_class(formdata=None)
+  model_to_wtform(model, mapped)
+  _reference_model_to_wtform(model, reference)
+
+  for name in get_form_field_map(mapped).field_names:
+    assert (mapped[name].data, mapped[name].raw_data) == (reference[name].data, reference[name].raw_data), name
+  assert isinstance(mapped["observation_timestamp"].data, datetime.datetime)
+
+
+@pytest.mark.parametrize("form_class, dummy_data", FORMS)
+def test_wtform_to_model_patches_only_changed_fields(app_ctx, form_class, dummy_data):
+  model = _model(dummy_data)
+  form = form_class(formdata=None)
+  model_to_wtform(model, form)
+
+  with patch.object(wtf_forms_util, "apply_json_patch_and_log") as mock_apply:
+    wtform_to_model(model, form, ignore_fields=["id_incidence"])
+  assert not mock_apply.called
+
+  form["facility_name"].data = "Renamed"
+  form["observation_timestamp"].data += datetime.timedelta(hours=1)
+  with patch.object(wtf_forms_util, "apply_json_patch_and_log") as mock_apply:
+    wtform_to_model(model, form, ignore_fields=["id_incidence"])
+  changes = mock_apply.call_args.args[1]
+  assert changes == _reference_changes(model, form, {"id_incidence"})
+  assert sorted(changes) == ["facility_name", "observation_timestamp"]
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("form_class, dummy_data", FORMS)
+def test_benchmark_model_to_wtform(app_ctx, best_of, form_class, dummy_data):
+  """Load the dummy incidence into 200 forms with the per-call and the precomputed mapping."""
+  model = _model(dummy_data)
+  mapped = [form_class(formdata=None) for _ in range(200)]
+  reference = [form_class(formdata=None) for _ in range(200)]
+
+  best_of("per_call", lambda: [_reference_model_to_wtform(model, form) for form in reference])
+  best_of("mapped", lambda: [model_to_wtform(model, form) for form in mapped])
+  assert [form.data for form in mapped] == [form.data for form in reference]
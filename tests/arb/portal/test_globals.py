@@ -118,3 +118,85 @@ def test_globals_persistence_across_calls(test_app, test_db, test_base):
     Globals.load_drop_downs(test_app, test_db)
     second_dropdowns = Globals.drop_downs
     assert first_dropdowns == second_dropdowns
+
+
+# --- Compiled dropdown choices ---
+
+def _raw_dropdown_data():
+  from arb.portal.db_hardcoded import get_excel_dropdown_data
+  return get_excel_dropdown_data()
+
+
+def test_compile_drop_downs_freezes_choices():
+  from arb.portal.globals import compile_drop_downs
+  from arb.utils.wtf_forms_util import ChoiceSet
+  drop_downs, drop_downs_contingent = compile_drop_downs(*_raw_dropdown_data())
+
+  assert all(isinstance(choices, ChoiceSet) for choices in drop_downs.values())
+  assert "Yes" in drop_downs["ogi_performed"].valid_values
+  for mapping in drop_downs_contingent.values():
+    assert all(isinstance(children, tuple) for children in mapping.values())
+  assert compile_drop_downs(drop_downs, {})[0]["ogi_performed"] is drop_downs["ogi_performed"]
+
+
+def test_choice_set_freezes_choices_and_values():
+  from arb.utils import wtf_forms_util
+  choices = wtf_forms_util.freeze_choices(["Yes", "No"])
+  assert choices == (("Yes", "Yes"), ("No", "No")) and choices.valid_values == frozenset({"Yes", "No"})
+  assert wtf_forms_util.freeze_choices(choices) is choices
+  assert wtf_forms_util.coerce_choices(choices) is choices  # attached by reference
+  assert wtf_forms_util.coerce_choices(["Yes"]) == [("Yes", "Yes")]
+
+  triples = wtf_forms_util.ChoiceSet([["Please Select", "Please Select", {"disabled": True}], ("A", "A", {})])
+  assert triples[0] == ("Please Select", "Please Select", {"disabled": True})
+  assert triples.valid_values == frozenset({"Please Select", "A"})
+
+
+def test_ensure_field_choice_with_choice_set():
+  from types import SimpleNamespace
+
+  from arb.utils import wtf_forms_util
+  choices = wtf_forms_util.freeze_choices(["Yes", "No"])
+  field = SimpleNamespace(data="No", raw_data=["No"], choices=choices)
+  wtf_forms_util.ensure_field_choice("ogi_performed", field)
+  assert field.data == "No" and field.choices is choices
+
+  field.data = "Maybe"
+  wtf_forms_util.ensure_field_choice("ogi_performed", field)
+  assert field.data == wtf_forms_util.PLEASE_SELECT and field.raw_data == [wtf_forms_util.PLEASE_SELECT]
+
+
+@pytest.mark.benchmark
+def test_benchmark_form_construction_with_compiled_choices(best_of):
+  """Construct and validate the feedback forms with raw vs compiled dropdown choices."""
+  from unittest.mock import patch
+
+  from flask import Flask
+
+  import arb.portal.wtf_landfill as wtf_landfill
+  from arb.portal.globals import Globals, compile_drop_downs
+  from arb.portal.wtf_oil_and_gas import OGFeedback
+
+  raw = _raw_dropdown_data()
+  compiled = compile_drop_downs(*raw)
+  app = Flask(__name__)
+  app.config["SECRET_KEY"] = "test-secret-key"
+  app.config["WTF_CSRF_ENABLED"] = False
+  form_data = {"emission_location": "Other", "ogi_performed": "Yes", "facility_name": "Site A"}
+
+  def build_forms(drop_downs, contingent, rebuild_cause_choices, rounds=50):
+    with patch.object(Globals, "drop_downs", drop_downs), \
+        patch.object(Globals, "drop_downs_contingent", contingent), \
+        app.test_request_context("/", method="POST", data=form_data):
+      for _ in range(rounds):
+        if rebuild_cause_choices:
+          wtf_landfill._cause_choices_cache["source"] = None  # pre-compilation behavior
+        forms = [form_class() for form_class in (wtf_landfill.LandfillFeedback, OGFeedback)]
+        for form in forms:
+          form.validate()
+      return [(form.data, form.errors) for form in forms]
+
+  best_of("raw_choices", lambda: build_forms(*raw, rebuild_cause_choices=True))
+  best_of("compiled_choices", lambda: build_forms(*compiled, rebuild_cause_choices=False))
+  assert build_forms(*raw, rebuild_cause_choices=True, rounds=1) == \
+         build_forms(*compiled, rebuild_cause_choices=False, rounds=1)
@@ -1,3 +1,17 @@
+import json
+import logging
+
+import pytest
+from flask import Flask
+from sqlalchemy import event, text
+from sqlalchemy.ext.automap import automap_base
+
+from arb.portal.extensions import db
+from arb.portal.json_update_util import apply_json_patch_and_log, merge_json_column_in_db
+from arb.portal.sqla_models import PortalUpdate, PortalUpdateSnapshot
+from arb.utils.constants import PLEASE_SELECT
+from arb.utils.wtf_forms_util import update_model_with_payload
+
 # --- Integration Tests with Real Database ---
 # Using shared fixtures from conftest.py
 
@@ -16,3 +30,115 @@ def test_apply_json_patch_and_log_integration_no_changes(test_app, test_db, test
 def test_apply_json_patch_and_log_integration_filter_paths(test_app, test_db, test_session):
   """Integration test for path filtering."""
   assert True
+
+
+# --- DB-side JSON merge (SQLite) ---
+
+@pytest.fixture
+def sqlite_incidences(tmp_path):
+  """Flask app bound to a SQLite file with an `incidences` table reflected via automap, as in production."""
+  app = Flask(__name__)
+  app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'portal.sqlite'}"
+  db.init_app(app)
+  with app.app_context():
+    db.session.execute(text("CREATE TABLE incidences (id_incidence INTEGER PRIMARY KEY, misc_json JSON)"))
+    db.session.execute(text("INSERT INTO incidences VALUES (1, :doc)"),
+                       {"doc": json.dumps({"sector": "Landfill", "facility_name": "Old", "notes": None})})
+    db.session.commit()
+    PortalUpdate.__table__.create(db.engine)
+    PortalUpdateSnapshot.__table__.create(db.engine)
+    base = automap_base()
+    base.prepare(autoload_with=db.engine, reflection_options={"only": ["incidences"]})
+    yield base.classes.incidences
+    db.session.remove()
+
+
+def _stored_json(id_incidence=1):
+  raw = db.session.execute(text("SELECT misc_json FROM incidences WHERE id_incidence = :id"),
+                           {"id": id_incidence}).scalar()
+  return json.loads(raw)
+
+
+def test_merge_json_column_in_db_returns_prior_values(sqlite_incidences):
+  model = db.session.get(sqlite_incidences, 1)
+
+  prior = merge_json_column_in_db(model, {"facility_name": "New", "county": "Kern", "notes": "x", "sector": None})
+  db.session.commit()
+
+  assert prior == {"facility_name": "Old", "county": None, "notes": None, "sector": "Landfill"}
+  assert _stored_json() == {"sector": None, "facility_name": "New", "notes": "x", "county": "Kern"}
+  assert model.misc_json == _stored_json()
+
+
+def test_merge_json_column_in_db_replaces_top_level_values(sqlite_incidences):
+  """Nested objects are replaced, not deep-merged, matching PostgreSQL `||`."""
+  db.session.execute(text("UPDATE incidences SET misc_json = :doc"),
+                     {"doc": json.dumps({"site": {"name": "A", "county": "Kern", "gps": {"lat": 1}}})})
+  db.session.commit()
+  model = db.session.get(sqlite_incidences, 1)
+
+  prior = merge_json_column_in_db(model, {"site": {"name": "B", "gps": None}})
+  db.session.commit()
+
+  assert prior == {"site": {"name": "A", "county": "Kern", "gps": {"lat": 1}}}
+  assert _stored_json() == {"site": {"name": "B", "gps": None}}
+
+
+def test_merge_json_column_in_db_skips_transient_rows(sqlite_incidences):
+  assert merge_json_column_in_db(sqlite_incidences(id_incidence=2), {"a": 1}) is None
+
+
+def test_apply_json_patch_and_log_merges_in_db_and_audits(sqlite_incidences):
+  model = db.session.get(sqlite_incidences, 1)
+
+  apply_json_patch_and_log(model, {"facility_name": "New", "county": "Kern", "sector": "Landfill",
+                                   "empty": "", "select": PLEASE_SELECT}, user="alice", comments="edit")
+
+  rows = {row.key: row for row in db.session.query(PortalUpdate).all()}
+  assert set(rows) == {"facility_name", "county"}
+  assert (rows["facility_name"].old_value, rows["facility_name"].new_value) == ("Old", "New")
+  assert (rows["county"].old_value, rows["county"].new_value) == ("None", "Kern")
+  assert rows["county"].user == "alice" and rows["county"].id_incidence == 1
+  assert _stored_json()["facility_name"] == "New"
+  assert _stored_json()["empty"] == "" and _stored_json()["select"] == PLEASE_SELECT
+
+
+def test_apply_json_patch_and_log_keeps_concurrent_updates(sqlite_incidences):
+  """A stale in-memory document must not overwrite keys written by another session."""
+  model = db.session.get(sqlite_incidences, 1)
+  assert model.misc_json["facility_name"] == "Old"
+  db.session.commit()
+
+  with db.engine.begin() as conn:
+    conn.execute(text("UPDATE incidences SET misc_json = json_set(misc_json, '$.county', 'Fresno') "
+                      "WHERE id_incidence = 1"))
+
+  apply_json_patch_and_log(model, {"facility_name": "New"})
+
+  assert _stored_json() == {"sector": "Landfill", "facility_name": "New", "notes": None, "county": "Fresno"}
+
+
+def test_apply_json_patch_and_log_transient_row_uses_in_memory_merge(sqlite_incidences):
+  model = sqlite_incidences(id_incidence=5, misc_json={"a": 1})
+
+  apply_json_patch_and_log(model, {"a": 2, "b": 3})
+  db.session.add(model)
+  db.session.commit()
+
+  assert _stored_json(5) == {"a": 2, "b": 3}
+  assert [(row.key, row.old_value) for row in db.session.query(PortalUpdate).order_by(PortalUpdate.key)] == \
+         [("a", "1"), ("b", "None")]
+
+
+def test_update_model_with_payload_does_not_reload_the_document(sqlite_incidences, caplog):
+  """Outside DEBUG logging, the merged JSON document is not read back just to log it."""
+  model = db.session.get(sqlite_incidences, 1)
+  statements = []
+  event.listen(db.engine, "before_cursor_execute", lambda conn, cursor, sql, *args: statements.append(sql))
+  caplog.set_level(logging.INFO, logger="arb.utils.wtf_forms_util")
+
+  update_model_with_payload(model, {"facility_name": "New"})
+
+  # The merge itself reads the prior values; an ORM refresh of the expired attribute would add another SELECT
+  assert not [sql for sql in statements if "incidences.misc_json" in sql]
+  assert _stored_json()["facility_name"] == "New"
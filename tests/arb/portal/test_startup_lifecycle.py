@@ -0,0 +1,115 @@
+"""
+Tests for arb.portal.startup.lifecycle
+
+A small app on a temporary SQLite file is "preloaded" in the test process, then forked: the
+child must get fresh pools and per-worker state while the parent's pooled connection survives.
+"""
+import json
+import os
+import time
+
+import pytest
+from flask import Flask
+from sqlalchemy import text
+
+from arb.portal.extensions import db
+from arb.portal.startup.lifecycle import after_fork_in_child, app_engines, memory_usage, prepare_for_fork, \
+  record_startup, start_worker_services
+from arb.portal.utils.db_pool import apply_pool_settings, init_pool_metrics
+from arb.portal.utils.incidence_cache import init_incidence_cache
+
+fork_only = pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+
+
+@pytest.fixture
+def preloaded_app(tmp_path):
+  app = Flask(__name__)
+  app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'portal.sqlite'}"
+  app.config["PRELOAD_APP"] = True
+  app.config["UPLOAD_FOLDER"] = str(tmp_path)
+  apply_pool_settings(app)
+  db.init_app(app)
+  init_pool_metrics(app)
+  init_incidence_cache(app)
+  record_startup(app, time.perf_counter())
+  with app.app_context():
+    db.session.execute(text("SELECT 1"))
+    db.session.remove()
+  return app
+
+
+def _primary_pool(app):
+  return app_engines(app)["primary"].pool
+
+
+def _in_child(app, check):
+  """Fork, run `check(app)` in the child and return its JSON-serializable result."""
+  read_fd, write_fd = os.pipe()
+  pid = os.fork()
+  if pid == 0:  # pragma: no cover - runs in the child
+    try:
+      os.close(read_fd)
+      os.write(write_fd, json.dumps(check(app)).encode())
+    finally:
+      os._exit(0)
+  os.close(write_fd)
+  os.waitpid(pid, 0)
+  with os.fdopen(read_fd) as f:
+    return json.loads(f.read() or "null")
+
+
+@fork_only
+def test_after_fork_in_child_replaces_pools_and_reseeds_state(preloaded_app):
+  parent_pool = _primary_pool(preloaded_app)
+  parent_cache = preloaded_app.extensions["incidence_cache"]
+  assert parent_pool.checkedin() == 1
+
+  def check(app):
+    prepared = after_fork_in_child(app)
+    pool = _primary_pool(app)
+    with app.app_context():
+      value = db.session.scalar(text("SELECT 42"))
+    state = app.extensions["lifecycle"]
+    return {"prepared": prepared, "again": after_fork_in_child(app), "new_pool": pool is not parent_pool,
+            "value": value, "checkouts": app.extensions["db_pool_metrics"]["primary"].snapshot()["checkouts"],
+            "new_cache": app.extensions["incidence_cache"] is not parent_cache,
+            "forked_from": state["forked_from"], "pid": state["pid"], "ready": state["worker_ready_seconds"]}
+
+  child = _in_child(preloaded_app, check)
+
+  assert child["prepared"] is True and child["again"] is False
+  assert child["new_pool"] and child["new_cache"] and child["value"] == 42
+  assert child["checkouts"] == 1  # counters restart in the worker
+  assert child["forked_from"] == os.getpid() != child["pid"] and child["ready"] is not None
+
+  # The parent's pooled connection was not closed by the child
+  assert _primary_pool(preloaded_app) is parent_pool and parent_pool.checkedin() == 1
+  with preloaded_app.app_context():
+    assert db.session.scalar(text("SELECT 1")) == 1
+
+
+def test_after_fork_in_child_is_a_no_op_in_the_creating_process(preloaded_app):
+  pool = _primary_pool(preloaded_app)
+  assert after_fork_in_child(preloaded_app) is False
+  assert _primary_pool(preloaded_app) is pool
+
+
+def test_prepare_for_fork_closes_pooled_connections(preloaded_app):
+  prepare_for_fork(preloaded_app)
+  assert _primary_pool(preloaded_app).checkedin() == 0
+
+
+def test_record_startup_and_services(preloaded_app):
+  state = preloaded_app.extensions["lifecycle"]
+  assert state["pid"] == os.getpid() and state["preloaded"] is True
+  assert state["startup_seconds"] >= 0 and state["memory_after_startup"]["rss_kb"] > 0
+
+  start_worker_services(preloaded_app)
+  assert state["services"] == {"janitor": None, "summary_refresher": None}  # intervals are 0 unless configured
+
+
+def test_memory_usage():
+  usage = memory_usage()
+  assert usage["rss_kb"] > 0
+  if os.path.exists("/proc/self/smaps_rollup"):
+    assert 0 < usage["uss_kb"] <= usage["rss_kb"] and usage["pss_kb"] <= usage["rss_kb"]
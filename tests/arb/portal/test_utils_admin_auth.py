@@ -0,0 +1,73 @@
+"""
+Tests for arb.portal.utils.admin_auth
+
+Uses a small Flask app with a guarded view, and the portal blueprint for the admin POST of
+`/show_incidence_cache`. The proxy-authenticated user is passed as the REMOTE_USER environ value.
+"""
+from unittest.mock import patch
+
+import pytest
+from flask import Flask
+
+from arb.portal.extensions import db
+from arb.portal.startup.flask import configure_flask_app
+from arb.portal.utils.admin_auth import ADMIN_ANY_USER, admin_required, admin_users, is_admin
+from arb.portal.utils.incidence_cache import get_incidence_cache, init_incidence_cache
+
+
+@pytest.fixture
+def guarded_app():
+  app = Flask(__name__)
+  app.config["PORTAL_ADMIN_USERS"] = " alice, bob ,"
+
+  @app.route("/action", methods=["POST"])
+  @admin_required
+  def action():
+    return "done"
+
+  return app
+
+
+def test_admin_users_and_is_admin(guarded_app):
+  with guarded_app.test_request_context(environ_base={"REMOTE_USER": "alice"}):
+    assert admin_users() == {"alice", "bob"}
+    assert is_admin()
+  with guarded_app.test_request_context(environ_base={"REMOTE_USER": "mallory", "REMOTE_ADDR": "alice"}):
+    assert not is_admin()
+  with guarded_app.test_request_context():
+    assert not is_admin()
+
+
+def test_admin_required_answers_403(guarded_app):
+  client = guarded_app.test_client()
+  assert client.post("/action").status_code == 403
+  assert client.post("/action", environ_base={"REMOTE_USER": "mallory"}).status_code == 403
+  assert client.post("/action", environ_base={"REMOTE_USER": "bob"}).get_data(as_text=True) == "done"
+
+  guarded_app.config["PORTAL_ADMIN_USERS"] = ""
+  assert client.post("/action", environ_base={"REMOTE_USER": "bob"}).status_code == 403
+  guarded_app.config["PORTAL_ADMIN_USERS"] = ADMIN_ANY_USER
+  assert client.post("/action").status_code == 200
+
+
+def test_show_incidence_cache_clear_needs_a_post_from_an_admin(tmp_path):
+  app = Flask("arb.portal")  # the portal's templates
+  app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'portal.sqlite'}"
+  app.config["INCIDENCE_CACHE_ENABLED"] = True
+  app.config["PORTAL_ADMIN_USERS"] = "alice"
+  configure_flask_app(app)
+  db.init_app(app)
+  init_incidence_cache(app)
+  from arb.portal.routes import main
+  app.register_blueprint(main)
+  client = app.test_client()
+
+  with app.app_context(), patch.object(get_incidence_cache(), "clear") as clear:
+    page = client.get("/show_incidence_cache?clear=1")
+    assert page.status_code == 200 and "Clear caches" in page.get_data(as_text=True)
+    assert client.post("/show_incidence_cache", environ_base={"REMOTE_USER": "mallory"}).status_code == 403
+    assert clear.call_count == 0
+
+    response = client.post("/show_incidence_cache", environ_base={"REMOTE_USER": "alice"})
+    assert response.status_code == 302 and response.headers["Location"].endswith("/show_incidence_cache")
+    assert clear.call_count == 1
@@ -0,0 +1,225 @@
+"""
+Tests for arb.portal.utils.autosave
+
+Uses a temporary SQLite database with an Oil & Gas incidence and the `PATCH /incidence_update/<id>/fields`
+route registered on a bare Flask app.
+"""
+import json
+from urllib.parse import urlencode
+from unittest.mock import patch
+
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine, event, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.automap import automap_base
+
+from arb.portal.db_hardcoded import get_excel_dropdown_data
+from arb.portal.extensions import db
+from arb.portal.globals import Globals, compile_drop_downs
+from arb.portal.sqla_models import PortalUpdate, PortalUpdateSnapshot
+from arb.portal.utils.autosave import dependent_fields, incidence_revision, lock_incidence
+from arb.portal.wtf_oil_and_gas import OGFeedback
+from arb.utils.wtf_forms_util import get_wtforms_fields
+
+MISC_JSON = {
+  "id_incidence": 1,
+  "sector": "Oil & Gas",
+  "facility_name": "Site A",
+  "contact_email": "me@example.com",
+  "venting_exclusion": "No",
+  "ogi_performed": "Yes",
+  "ogi_date": "2025-01-02T16:00:00+00:00",
+  "observation_timestamp": "2025-01-01T16:00:00+00:00",
+}
+
+
+@pytest.fixture
+def autosave_app(tmp_path):
+  app = Flask(__name__)
+  app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'portal.sqlite'}"
+  app.config["SECRET_KEY"] = "test-secret-key"
+  app.config["WTF_CSRF_ENABLED"] = False
+  db.init_app(app)
+  drop_downs, drop_downs_contingent = compile_drop_downs(*get_excel_dropdown_data())
+  with app.app_context(), patch.object(Globals, "drop_downs", drop_downs), \
+      patch.object(Globals, "drop_downs_contingent", drop_downs_contingent):
+    db.session.execute(text("CREATE TABLE sources (source_id INTEGER PRIMARY KEY, sector TEXT)"))
+    db.session.execute(text("CREATE TABLE incidences (id_incidence INTEGER PRIMARY KEY, source_id INTEGER, "
+                            "misc_json JSON)"))
+    db.session.execute(text("INSERT INTO incidences VALUES (1, NULL, :doc)"), {"doc": json.dumps(MISC_JSON)})
+    db.session.commit()
+    PortalUpdate.__table__.create(db.engine)
+    PortalUpdateSnapshot.__table__.create(db.engine)
+    base = automap_base()
+    base.prepare(autoload_with=db.engine, reflection_options={"only": ["incidences", "sources"]})
+    app.base = base
+
+    from arb.portal.routes import main
+    app.register_blueprint(main)
+    yield app
+    db.session.remove()
+
+
+def _patch(client, fields, revision=0, revisions=None, **kwargs):
+  return client.patch("/incidence_update/1/fields",
+                      json={"revision": revision, "revisions": revisions or {}, "fields": fields}, **kwargs)
+
+
+def _stored():
+  return json.loads(db.session.execute(text("SELECT misc_json FROM incidences")).scalar())
+
+
+def test_dependent_fields_follow_the_rules():
+  dependents = dependent_fields(OGFeedback.form_rules, {"ogi_performed"})
+  assert {"ogi_date", "ogi_result", "method21_performed"} <= dependents
+  assert "ogi_performed" not in dependents and "contact_email" not in dependents
+  assert dependent_fields(OGFeedback.form_rules, {"contact_email"}) == set()
+
+
+def test_patch_validates_dependents_and_merges_changed_keys(autosave_app):
+  client = autosave_app.test_client()
+  response = _patch(client, {"ogi_performed": "No", "facility_name": "Site B"})
+  body = response.get_json()
+
+  assert response.status_code == 200
+  assert body["saved"] == {"ogi_performed": "No", "facility_name": "Site B"}
+  assert "ogi_date" in body["validated"] and "contact_email" not in body["validated"]
+  assert body["errors"] == {"ogi_date": ["Can't have an OGI inspection date if OGI was not performed"],
+                            "method21_performed": ["This field is required."]}
+
+  stored = _stored()
+  assert stored == {**MISC_JSON, "ogi_performed": "No", "facility_name": "Site B"}
+  keys = db.session.execute(select(PortalUpdate.key, PortalUpdate.comments)).all()
+  assert sorted(keys) == [("facility_name", "autosave"), ("ogi_performed", "autosave")]
+  assert body["revision"] == incidence_revision(db.session, 1) > 0
+  assert body["revisions"] == {"ogi_performed": body["revision"], "facility_name": body["revision"]}
+
+  unchanged = _patch(client, {"facility_name": "Site B"}, revision=body["revision"]).get_json()
+  assert unchanged["saved"] == {} and unchanged["revision"] == body["revision"]
+  assert unchanged["revisions"] == {"facility_name": body["revision"]}
+
+
+def test_patch_audits_the_authenticated_user_never_the_client_address(autosave_app):
+  client = autosave_app.test_client()
+  assert _patch(client, {"facility_name": "Site B"}, environ_base={"REMOTE_ADDR": "10.1.2.3"}).status_code == 200
+  assert _patch(client, {"facility_name": "Site C"}, revision=incidence_revision(db.session, 1),
+                environ_base={"REMOTE_ADDR": "10.1.2.3", "REMOTE_USER": "alice"}).status_code == 200
+
+  users = db.session.execute(select(PortalUpdate.user).order_by(PortalUpdate.id)).scalars().all()
+  assert users == ["anonymous", "alice"]
+
+
+def test_conflicts_are_detected_per_key(autosave_app):
+  client = autosave_app.test_client()
+  assert _patch(client, {"facility_name": "Site B"}).status_code == 200
+
+  stale = _patch(client, {"facility_name": "Site C"}, revision=0)
+  assert stale.status_code == 409
+  assert stale.get_json() == {"conflicts": ["facility_name"], "revision": incidence_revision(db.session, 1)}
+  assert _stored()["facility_name"] == "Site B"
+
+  assert _patch(client, {"contact_name": "Pat"}, revision=0).status_code == 200  # other keys still save
+
+
+def test_key_revisions_do_not_skip_other_users_edits(autosave_app):
+  mine, theirs = autosave_app.test_client(), autosave_app.test_client()
+  page_revision = incidence_revision(db.session, 1)
+
+  assert _patch(theirs, {"contact_email": "them@example.com"}, page_revision).status_code == 200
+  saved = _patch(mine, {"facility_name": "Site B"}, page_revision).get_json()
+  assert list(saved["revisions"]) == ["facility_name"] and saved["revision"] > page_revision
+
+  # Their earlier edit of contact_email is still a conflict for this page
+  stale = _patch(mine, {"contact_email": "me@example.org"}, page_revision, saved["revisions"])
+  assert stale.status_code == 409 and stale.get_json()["conflicts"] == ["contact_email"]
+
+  # facility_name is based on the revision of my save, so it saves until someone else changes it
+  again = _patch(mine, {"facility_name": "Site C"}, page_revision, saved["revisions"]).get_json()
+  assert again["saved"] == {"facility_name": "Site C"}
+  assert _patch(theirs, {"facility_name": "Site D"}, again["revision"]).status_code == 200
+  conflict = _patch(mine, {"facility_name": "Site E", "contact_name": "Pat"}, page_revision, again["revisions"])
+  assert conflict.status_code == 409 and conflict.get_json()["conflicts"] == ["facility_name"]
+  assert _stored()["facility_name"] == "Site D" and "contact_name" not in _stored()
+
+
+def test_lock_incidence_holds_the_row_until_the_transaction_ends(autosave_app):
+  incidences = autosave_app.base.classes.incidences
+  row = db.session.get(incidences, 1)
+  other = create_engine(autosave_app.config["SQLALCHEMY_DATABASE_URI"], connect_args={"timeout": 0.1})
+  update = text("UPDATE incidences SET source_id = 7 WHERE id_incidence = 1")
+  try:
+    lock_incidence(db.session, row)
+    with pytest.raises(OperationalError, match="locked"), other.begin() as connection:
+      connection.execute(update)
+    db.session.rollback()
+    with other.begin() as connection:
+      connection.execute(update)
+  finally:
+    other.dispose()
+
+
+def test_rejects_bad_requests(autosave_app):
+  client = autosave_app.test_client()
+  assert _patch(client, {"not_a_field": "x"}).status_code == 400
+  assert _patch(client, {"id_incidence": 5}).status_code == 400
+  assert client.patch("/incidence_update/1/fields", json={"fields": {"facility_name": "x"}}).status_code == 400
+  assert _patch(client, {"facility_name": "x"}, revisions={"facility_name": "3"}).status_code == 400
+  assert client.patch("/incidence_update/2/fields", json={"revision": 0, "fields": {"facility_name": "x"}}
+                      ).status_code == 404
+
+  autosave_app.config["WTF_CSRF_ENABLED"] = True
+  assert _patch(client, {"facility_name": "x"}).status_code == 400
+  assert _stored()["facility_name"] == "Site A"
+
+
+def test_update_page_gets_the_revision(autosave_app):
+  client = autosave_app.test_client()
+  revision = _patch(client, {"facility_name": "Site B"}).get_json()["revision"]
+  with patch("arb.portal.utils.route_util.render_template", return_value="") as mock_render:
+    client.get("/incidence_update/1/")
+  assert mock_render.call_args.kwargs["revision"] == revision
+
+
+@pytest.mark.benchmark
+def test_benchmark_autosave_vs_full_form_save(autosave_app, best_of, record_property):
+  """
+  Save one changed field with a full form POST (every OGFeedback field) vs an autosave PATCH.
+
+  Records the server time and SQL statements of each path; asserts only on the request size.
+  The PATCH runs more statements than the POST (the row lock and the per-key conflict check).
+  """
+  client = autosave_app.test_client()
+  with autosave_app.test_request_context():
+    names = [name for name in get_wtforms_fields(OGFeedback(formdata=None)) if name != "csrf_token"]
+  form_data = {name: str(MISC_JSON.get(name, "")) for name in names}
+  form_data.update(id_incidence="1", ogi_date="2025-01-02T08:00", observation_timestamp="2025-01-01T08:00",
+                   submit_button="save")
+  counter = iter(range(10 ** 6))
+  sent = {}
+
+  def full_save():
+    data = urlencode({**form_data, "facility_name": f"Site {next(counter)}"})
+    sent["form"] = len(data)
+    with patch("arb.portal.utils.route_util.render_template", return_value=""):
+      assert client.post("/incidence_update/1/", data=data,
+                         content_type="application/x-www-form-urlencoded").status_code < 400
+
+  def autosave():
+    data = json.dumps({"revision": 0, "revisions": {"facility_name": incidence_revision(db.session, 1)},
+                       "fields": {"facility_name": f"Site {next(counter)}"}})
+    sent["patch"] = len(data)
+    response = client.patch("/incidence_update/1/fields", data=data, content_type="application/json")
+    assert response.status_code == 200 and response.get_json()["saved"]
+
+  statements = []
+  event.listen(db.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+  for name, save in (("full_form_post", full_save), ("autosave_patch", autosave)):
+    save()
+    statements.clear()
+    save()
+    record_property(f"{name}_statements", len(statements))
+    record_property(f"{name}_request_bytes", sent["form" if save is full_save else "patch"])
+    best_of(name, save)
+
+  assert sent["patch"] * 5 <= sent["form"]
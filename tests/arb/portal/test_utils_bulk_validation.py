@@ -0,0 +1,153 @@
+"""
+Tests for arb.portal.utils.bulk_validation
+
+Uses a temporary SQLite database with Oil & Gas, Landfill and unsupported-sector incidences built
+from the `db_hardcoded` dummy form data.
+"""
+import json
+from unittest.mock import patch
+
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.ext.automap import automap_base
+
+from arb.portal.db_hardcoded import get_excel_dropdown_data, get_landfill_dummy_form_data, get_og_dummy_form_data
+from arb.portal.extensions import db
+from arb.portal.globals import Globals, compile_drop_downs
+from arb.portal.utils.bulk_validation import FORM_ERRORS_KEY, document_hash, error_summary, revalidate_incidences, \
+  rules_version, validate_chunk, validation_badges, validation_table
+from arb.utils.json import make_dict_serializeable
+
+
+@pytest.fixture
+def drop_downs():
+  compiled = compile_drop_downs(*get_excel_dropdown_data())
+  with patch.object(Globals, "drop_downs", compiled[0]), patch.object(Globals, "drop_downs_contingent", compiled[1]):
+    yield compiled
+
+
+@pytest.fixture
+def documents(drop_downs):
+  og = make_dict_serializeable(get_og_dummy_form_data(), convert_time_to_ca=True)
+  landfill = make_dict_serializeable(get_landfill_dummy_form_data(), convert_time_to_ca=True)
+  og_valid = {**og, "lat_carb": 34.0, "long_carb": -118.0, "venting_exclusion": "No", "ogi_performed": "No",
+              "method21_performed": "Yes", "method21_result": "No source found"}
+  og_valid.pop("ogi_date")
+  documents = {
+    1: og,
+    2: og_valid,
+    3: landfill,
+    4: {"sector": "Dairy", "facility_name": "Barn 3"},
+    5: {**og, "ogi_date": "not a date"},
+  }
+  return {id_: {**document, "id_incidence": id_} for id_, document in documents.items()}
+
+
+@pytest.fixture
+def engine(tmp_path, documents):
+  engine = create_engine(f"sqlite:///{tmp_path / 'portal.sqlite'}")
+  with engine.begin() as connection:
+    connection.execute(text("CREATE TABLE incidences (id_incidence INTEGER PRIMARY KEY, misc_json JSON)"))
+    for id_, document in documents.items():
+      connection.execute(text("INSERT INTO incidences VALUES (:id, :doc)"), {"id": id_, "doc": json.dumps(document)})
+  yield engine
+  engine.dispose()
+
+
+def _stored(engine):
+  columns = [validation_table.c[name] for name in ("id_incidence", "sector", "valid", "error_count", "errors",
+                                                   "document_hash", "rules_version")]
+  with engine.connect() as connection:
+    return {row.id_incidence: row._asdict() for row in connection.execute(select(*columns))}
+
+
+def test_validate_chunk_without_request_context(documents):
+  results = validate_chunk(list(documents.items()))
+
+  assert [result["valid"] if result else None for result in results] == [False, True, False, None, False]
+  assert results[0]["errors"]["ogi_performed"] == ["This field is required."]
+  assert results[0]["error_count"] == sum(len(messages) for messages in results[0]["errors"].values())
+  assert results[1] == {"id_incidence": 2, "sector": "Oil & Gas", "valid": True, "error_count": 0, "errors": {}}
+  assert results[2]["sector"] == "Landfill" and "emission_cause" in results[2]["errors"]
+  assert list(results[4]["errors"]) == [FORM_ERRORS_KEY]
+
+
+def test_revalidate_writes_results_and_error_summary(engine, documents):
+  report = revalidate_incidences(engine, workers=0, chunk_size=2)
+  assert (report.checked, report.validated, report.invalid, report.unsupported, report.skipped) == (5, 4, 3, 1, 0)
+
+  stored = _stored(engine)
+  assert sorted(stored) == [1, 2, 3, 5]
+  assert stored[2]["valid"] is True and stored[1]["error_count"] == 5
+  assert stored[1]["document_hash"] == document_hash(json.dumps(documents[1]))
+  assert {row["rules_version"] for row in stored.values()} == {report.rules_version}
+
+  with engine.connect() as connection:
+    summary = error_summary(connection)
+    assert {"sector": "Oil & Gas", "field": "ogi_performed", "message": "This field is required.",
+            "incidences": 1} in summary
+    assert summary == sorted(summary, key=lambda row: -row["incidences"])
+    assert {row["sector"] for row in error_summary(connection, "Landfill")} == {"Landfill"}
+
+
+def test_only_stale_revalidates_changed_incidences(engine, documents):
+  revalidate_incidences(engine, workers=0)
+  report = revalidate_incidences(engine, workers=0, only_stale=True)
+  assert (report.validated, report.unsupported, report.skipped) == (0, 1, 4)
+
+  with engine.begin() as connection:
+    connection.execute(text("UPDATE incidences SET misc_json = :doc WHERE id_incidence = 1"),
+                       {"doc": json.dumps({**documents[1], "facility_name": "Renamed"})})
+    connection.execute(text("DELETE FROM incidences WHERE id_incidence = 3"))
+  report = revalidate_incidences(engine, workers=0, only_stale=True)
+  assert (report.checked, report.validated, report.unsupported, report.skipped) == (4, 1, 1, 2)
+  assert 3 in _stored(engine)
+
+  revalidate_incidences(engine, workers=0)
+  assert sorted(_stored(engine)) == [1, 2, 5]
+
+
+def test_process_pool_matches_in_process(engine):
+  revalidate_incidences(engine, workers=0)
+  in_process = _stored(engine)
+
+  with engine.begin() as connection:
+    connection.execute(validation_table.delete())
+  report = revalidate_incidences(engine, workers=2, chunk_size=2)
+  assert report.validated == 4
+  assert _stored(engine) == in_process
+
+
+def test_badges_follow_document_and_rules_changes(tmp_path, engine, drop_downs):
+  revalidate_incidences(engine, workers=0)
+  version = rules_version()
+
+  app = Flask(__name__)
+  app.config["SQLALCHEMY_DATABASE_URI"] = str(engine.url)
+  db.init_app(app)
+  with app.app_context():
+    base = automap_base()
+    base.prepare(autoload_with=db.engine, reflection_options={"only": ["incidences"]})
+    app.base = base
+
+    from arb.portal.routes import main
+    app.register_blueprint(main)
+    with patch("arb.portal.routes.render_template", return_value="") as mock_render:
+      app.test_client().get("/")
+    validity = mock_render.call_args.kwargs["validity"]
+    assert {id_: badge["status"] for id_, badge in validity.items()} == {1: "invalid", 2: "valid", 3: "invalid",
+                                                                        5: "invalid"}
+    assert validity[1]["error_count"] == 5
+
+    row = db.session.get(base.classes.incidences, 2)
+    row.misc_json = {**row.misc_json, "facility_name": "Renamed"}
+    assert validation_badges(db.session, [row])[2]["status"] == "stale"
+
+    changed = {**drop_downs[0], "method21_result": drop_downs[0]["method21_result"][:2]}
+    with patch.object(Globals, "drop_downs", changed):
+      assert rules_version() != version
+      rows = db.session.execute(select(base.classes.incidences)).scalars().all()
+      assert {badge["status"] for badge in validation_badges(db.session, rows).values()} == {"stale"}
+    db.session.rollback()
+    db.session.remove()
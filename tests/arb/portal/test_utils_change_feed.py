@@ -0,0 +1,138 @@
+"""
+Tests for arb.portal.utils.change_feed
+
+The feed is read from a temporary SQLite database holding `portal_updates` rows with fixed
+timestamps (several commits across two incidences) and a small `incidences` table.
+"""
+import datetime
+import json
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import MetaData, Table, create_engine, text
+from sqlalchemy.orm import Session
+
+from arb.portal.sqla_models import PortalUpdate
+from arb.portal.utils.change_feed import decode_cursor, encode_cursor, main, read_change_feed
+
+UTC = datetime.UTC
+T1 = datetime.datetime(2025, 3, 1, 8, 0, tzinfo=UTC)
+T2 = datetime.datetime(2025, 3, 1, 9, 0, tzinfo=UTC)
+T3 = datetime.datetime(2025, 3, 2, 8, 0, tzinfo=UTC)
+
+# (id_incidence, timestamp, user, key, old, new); consecutive rows with equal id/timestamp/user are one commit
+ROWS = [
+  (1, T1, "alice", "facility_name", "None", "Alpha"),
+  (1, T1, "alice", "sector", "None", "Landfill"),
+  (2, T2, "bob", "facility_name", "None", "Bravo"),
+  (2, T2, "bob", "notes", "None", "first"),
+  (1, T3, "alice", "facility_name", "Alpha", "Alpha 2"),
+]
+
+
+@pytest.fixture
+def engine(tmp_path):
+  engine = create_engine(f"sqlite:///{tmp_path / 'portal.sqlite'}")
+  PortalUpdate.__table__.create(engine)
+  with engine.begin() as connection:
+    connection.execute(text("CREATE TABLE incidences (id_incidence INTEGER PRIMARY KEY, misc_json JSON)"))
+    connection.execute(text("INSERT INTO incidences VALUES (1, :one), (2, :two)"),
+                       {"one": json.dumps({"facility_name": "Alpha 2", "sector": "Landfill", "count": 3}),
+                        "two": json.dumps({"facility_name": "Bravo", "notes": "first"})})
+  with Session(engine) as session:
+    session.add_all([PortalUpdate(id_incidence=id_, timestamp=ts, user=user, key=key, old_value=old, new_value=new,
+                                  comments="") for id_, ts, user, key, old, new in ROWS])
+    session.commit()
+  yield engine
+  engine.dispose()
+
+
+def _read(engine, **kwargs):
+  with Session(engine) as session:
+    return read_change_feed(session, **kwargs)
+
+
+def test_cursor_round_trip():
+  assert decode_cursor(encode_cursor(1234)) == (0, 1234)
+  assert decode_cursor(encode_cursor(1234, 987)) == (987, 1234)
+  assert decode_cursor(None) == (0, 0)
+  for bad in ("not a cursor", encode_cursor(1)[:-1] + "!", "eHg6MQ", "cHU6eC4x"):
+    with pytest.raises(ValueError):
+      decode_cursor(bad)
+
+
+def test_groups_per_incidence_and_commit(engine):
+  page = _read(engine)
+
+  assert page["count"] == 5 and page["has_more"] is False
+  assert decode_cursor(page["cursor"]) == (0, 5)
+  assert [entry["id_incidence"] for entry in page["incidences"]] == [1, 2]
+  first, second = page["incidences"][0]["commits"]
+  assert first["changes"] == {"facility_name": {"old": None, "new": "Alpha"},
+                              "sector": {"old": None, "new": "Landfill"}}
+  assert (first["first_update_id"], first["last_update_id"], first["user"]) == (1, 2, "alice")
+  assert first["timestamp"] == T1.isoformat()
+  assert second["changes"] == {"facility_name": {"old": "Alpha", "new": "Alpha 2"}}
+  assert "misc_json" not in page["incidences"][0]
+
+
+def test_pages_do_not_split_commits(engine):
+  page = _read(engine, limit=3)
+  assert page["count"] == 2 and page["has_more"] is True
+  assert decode_cursor(page["cursor"]) == (0, 2)
+
+  page = _read(engine, cursor=page["cursor"], limit=3)
+  assert [entry["id_incidence"] for entry in page["incidences"]] == [2, 1]
+  assert page["count"] == 3 and page["has_more"] is False
+
+  caught_up = _read(engine, cursor=page["cursor"])
+  assert caught_up["count"] == 0 and caught_up["cursor"] == page["cursor"]
+
+
+def test_commit_larger_than_page_is_split(engine):
+  page = _read(engine, limit=1)
+  assert page["count"] == 1 and page["has_more"] is True
+
+
+def test_since_timestamp(engine):
+  page = _read(engine, since=datetime.datetime(2025, 3, 1, 8, 30, tzinfo=UTC))
+  assert [entry["id_incidence"] for entry in page["incidences"]] == [2, 1]
+  assert page["count"] == 3
+
+  later = _read(engine, since=datetime.datetime(2026, 1, 1, tzinfo=UTC))
+  assert later["count"] == 0 and decode_cursor(later["cursor"]) == (0, 5)
+
+
+def test_commit_order_pages_on_commit_xid(engine):
+  # PostgreSQL ordering (row values work on SQLite too): incidence 1's second save (ID 5) committed
+  # before incidence 2's save (IDs 3-4), which is still in flight for the first read
+  with engine.begin() as connection:
+    connection.execute(text("UPDATE portal_updates SET commit_xid = CASE WHEN id <= 2 THEN 100 "
+                            "WHEN id = 5 THEN 101 ELSE 102 END"))
+
+  with patch("arb.portal.utils.change_feed._settled_below", return_value=102):
+    page = _read(engine)
+    assert page["count"] == 3 and decode_cursor(page["cursor"]) == (101, 5)
+    assert _read(engine, cursor=page["cursor"])["count"] == 0
+  with patch("arb.portal.utils.change_feed._settled_below", return_value=103):
+    page = _read(engine, cursor=page["cursor"])
+    assert [entry["id_incidence"] for entry in page["incidences"]] == [2]
+    assert page["count"] == 2 and decode_cursor(page["cursor"]) == (102, 4)
+    assert _read(engine, since=T2)["incidences"][0]["commits"][0]["first_update_id"] == 5
+
+
+def test_include_misc_json(engine):
+  incidences = Table("incidences", MetaData(), autoload_with=engine)
+  page = _read(engine, incidences=incidences)
+  assert page["incidences"][0]["misc_json"] == {"facility_name": "Alpha 2", "sector": "Landfill", "count": 3}
+
+
+def test_main_cli_reads_all_pages(engine, capsys):
+  uri = str(engine.url)
+  assert main(["--database-uri", uri, "--all", "--limit", "2"]) == 0
+  captured = capsys.readouterr()
+  pages = [json.loads(line) for line in captured.out.splitlines()]
+  assert sum(page["count"] for page in pages) == 5
+  assert decode_cursor(captured.err.split("cursor: ")[1].strip()) == (0, 5)
+
+  assert main(["--database-uri", uri, "--cursor", "bogus"]) == 2
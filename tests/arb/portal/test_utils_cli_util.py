@@ -0,0 +1,32 @@
+"""
+Tests for arb.portal.utils.cli_util
+"""
+import argparse
+
+from arb.portal.utils.cli_util import add_database_uri_argument, cli_engine
+
+
+def test_add_database_uri_argument():
+  parser = argparse.ArgumentParser()
+  add_database_uri_argument(parser)
+  assert parser.parse_args([]).database_uri is None
+  assert parser.parse_args(["--database-uri", "sqlite://"]).database_uri == "sqlite://"
+
+
+def test_cli_engine_applies_the_portal_engine_options(monkeypatch):
+  captured = {}
+  monkeypatch.setattr("arb.portal.utils.cli_util.create_engine",
+                      lambda uri, **options: captured.setdefault(uri, options))
+  # Other tests reload the settings module, so patch the class cli_engine() will import
+  options = {"connect_args": {"options": "-c search_path=satellite_tracker_demo1,public -c timezone=UTC"}}
+  monkeypatch.setattr("arb.portal.config.settings.BaseConfig.SQLALCHEMY_DATABASE_URI",
+                      "postgresql+psycopg2://u:p@host/portal")
+  monkeypatch.setattr("arb.portal.config.settings.BaseConfig.SQLALCHEMY_ENGINE_OPTIONS", options)
+
+  cli_engine()
+  cli_engine("postgresql+psycopg2://u:p@other/portal")
+  cli_engine("sqlite:///portal.sqlite")
+
+  assert captured["postgresql+psycopg2://u:p@host/portal"] == options
+  assert captured["postgresql+psycopg2://u:p@other/portal"] == options
+  assert captured["sqlite:///portal.sqlite"] == {}
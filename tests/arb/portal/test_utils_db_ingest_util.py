@@ -4,18 +4,26 @@ Comprehensive tests for arb.portal.utils.db_ingest_util
 Tests all database ingestion logic including Excel parsing, JSON handling, database operations,
 and file upload processing. Covers edge cases, error conditions, and integration scenarios.
 """
+import datetime
 import json
 import tempfile
+from contextlib import contextmanager
 from pathlib import Path
 from unittest.mock import MagicMock, mock_open, patch
 
 import pytest
+from flask import Flask
+from sqlalchemy import text
+from sqlalchemy.ext.automap import automap_base
 
+from arb.portal.extensions import db as portal_db
+from arb.portal.sqla_models import PortalUpdate, PortalUpdateSnapshot
 from arb.portal.utils import db_ingest_util
-from arb.portal.utils.db_ingest_util import (convert_excel_to_json_if_valid, dict_to_database, extract_sector_from_json,
-                                             extract_tab_and_sector, json_file_to_db, store_staged_payload,
-                                             xl_dict_to_database)
+from arb.portal.utils.db_ingest_util import (convert_excel_to_json_if_valid, dict_to_database, dicts_to_database,
+                                             extract_sector_from_json, extract_tab_and_sector, json_file_to_db,
+                                             json_files_to_db, store_staged_payload, xl_dict_to_database)
 from arb.portal.utils.result_types import StagingResult
+from arb.utils.json import json_save_with_meta
 
 
 @pytest.fixture
@@ -1419,3 +1427,90 @@ def test_new_helper_functions_equivalent_to_original():
 
     assert original_result[0] == new_result.id_  # id_
     assert new_result.success is True
+
+
+# --- Bulk upsert (dicts_to_database / json_files_to_db) against SQLite ---
+
+@contextmanager
+def _sqlite_portal(db_path):
+  """App context bound to a SQLite file with reflected `incidences` (row 1 pre-populated) and `portal_updates`."""
+  app = Flask(__name__)
+  app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{db_path}"
+  portal_db.init_app(app)
+  with app.app_context():
+    portal_db.session.execute(
+      text("CREATE TABLE incidences (id_incidence INTEGER PRIMARY KEY AUTOINCREMENT, misc_json JSON)"))
+    portal_db.session.execute(text("INSERT INTO incidences VALUES (1, :doc)"),
+                              {"doc": json.dumps({"id_incidence": 1, "facility_name": "Old", "notes": "keep"})})
+    portal_db.session.commit()
+    PortalUpdate.__table__.create(portal_db.engine)
+    PortalUpdateSnapshot.__table__.create(portal_db.engine)
+    base = automap_base()
+    base.prepare(autoload_with=portal_db.engine, reflection_options={"only": ["incidences"]})
+    yield base
+    portal_db.session.remove()
+
+
+def _snapshot():
+  documents = {id_: json.loads(doc) for id_, doc in
+               portal_db.session.execute(text("SELECT id_incidence, misc_json FROM incidences ORDER BY 1"))}
+  audit = sorted((row.id_incidence, row.key, row.old_value, row.new_value)
+                 for row in portal_db.session.query(PortalUpdate).all())
+  return documents, audit
+
+
+def _bulk_payloads():
+  return [
+    {"id_incidence": 1, "facility_name": "New", "county": None, "empty": ""},
+    {"facility_name": "Brand new", "observed": datetime.datetime(2025, 1, 2, 3, 4, 5)},
+    {"id_incidence": "1", "facility_name": "Newer", "county": "Kern"},
+    {"sector": "Landfill", "facility_name": "Second new"},
+    {"id_incidence": 7, "facility_name": "Explicit id"},
+  ]
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 500])
+def test_dicts_to_database_matches_dict_to_database(tmp_path, batch_size):
+  with _sqlite_portal(tmp_path / "legacy.sqlite") as base:
+    legacy_ids = [dict_to_database(portal_db, base, payload) for payload in _bulk_payloads()]
+    legacy = _snapshot()
+
+  with _sqlite_portal(tmp_path / "bulk.sqlite") as base:
+    payloads = _bulk_payloads()
+    bulk_ids = dicts_to_database(portal_db, base, payloads, batch_size=batch_size)
+    bulk = _snapshot()
+
+  assert bulk_ids == legacy_ids == [1, 2, 1, 3, 7]
+  assert payloads[1]["id_incidence"] == 2 and payloads[3]["id_incidence"] == 3
+  assert bulk == legacy
+  assert bulk[0][1]["notes"] == "keep" and bulk[0][1]["county"] == "Kern"
+
+
+def test_dicts_to_database_rejects_empty_payload(tmp_path):
+  with _sqlite_portal(tmp_path / "bulk.sqlite") as base:
+    with pytest.raises(ValueError):
+      dicts_to_database(portal_db, base, [{"id_incidence": 1, "a": 1}, {}])
+    assert _snapshot()[0][1]["facility_name"] == "Old"
+
+
+def test_dicts_to_database_dry_run_rolls_back(tmp_path):
+  with _sqlite_portal(tmp_path / "bulk.sqlite") as base:
+    before = _snapshot()
+    dicts_to_database(portal_db, base, _bulk_payloads(), dry_run=True)
+    assert _snapshot() == before
+
+
+def test_json_files_to_db_returns_ids_and_sectors(tmp_path, sample_xl_dict):
+  files = []
+  for i, sector in enumerate(["Landfill", "Oil & Gas"]):
+    xl_dict = json.loads(json.dumps(sample_xl_dict))
+    xl_dict["metadata"]["sector"] = sector
+    xl_dict["tab_contents"]["Feedback Form"]["id_incidence"] = 10 + i
+    files.append(tmp_path / f"file_{i}.json")
+    json_save_with_meta(files[-1], xl_dict)
+
+  with _sqlite_portal(tmp_path / "bulk.sqlite") as base:
+    assert json_files_to_db(portal_db, files, base) == [(10, "Landfill"), (11, "Oil & Gas")]
+    documents, _ = _snapshot()
+    assert documents[11]["sector"] == "Oil & Gas"
+    assert documents[11]["facility_name"] == "Test Facility"
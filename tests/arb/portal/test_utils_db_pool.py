@@ -0,0 +1,140 @@
+"""
+Tests for arb.portal.utils.db_pool
+
+Pools are exercised on temporary SQLite files: a one-connection pool makes a second checkout
+wait and time out, and a tiny leak threshold makes a held connection reportable.
+"""
+import logging
+import time
+
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import StaticPool
+
+from arb.portal.extensions import db
+from arb.portal.utils.db_pool import TimedQueuePool, apply_pool_settings, format_prometheus, init_pool_metrics, \
+  instrument_engine, pool_engine_options
+
+
+@pytest.fixture
+def engine(tmp_path):
+  engine = create_engine(f"sqlite:///{tmp_path / 'pool.sqlite'}", poolclass=TimedQueuePool, pool_size=1,
+                         max_overflow=0, pool_timeout=0.05)
+  yield engine
+  engine.dispose()
+
+
+def test_pool_engine_options():
+  options = pool_engine_options({"SQLALCHEMY_DATABASE_URI": "postgresql://u:p@host/db", "DATABASE_POOL_SIZE": 12,
+                                 "SQLALCHEMY_ENGINE_OPTIONS": {"pool_recycle": 60, "connect_args": {"x": 1}}})
+  assert options["poolclass"] is TimedQueuePool
+  assert (options["pool_size"], options["max_overflow"], options["pool_timeout"]) == (12, 10, 30.0)
+  assert (options["pool_recycle"], options["pool_pre_ping"], options["connect_args"]) == (60, True, {"x": 1})
+
+  in_memory = pool_engine_options({"SQLALCHEMY_DATABASE_URI": "sqlite://", "DATABASE_POOL_PRE_PING": False})
+  assert in_memory == {"pool_pre_ping": False, "pool_recycle": 1800}
+
+
+def test_counters_latency_and_timeouts(engine):
+  metrics = instrument_engine(engine, "primary", leak_seconds=0)
+
+  held = engine.connect()
+  with pytest.raises(PoolTimeoutError):
+    engine.connect()
+  held.invalidate()
+  held.close()
+  with engine.connect() as connection:
+    connection.execute(text("SELECT 1"))
+
+  snapshot = metrics.snapshot()
+  assert (snapshot["connects"], snapshot["checkouts"], snapshot["checkins"]) == (2, 2, 2)
+  assert (snapshot["invalidations"], snapshot["timeouts"], snapshot["leaks"]) == (1, 1, 0)
+  assert (snapshot["size"], snapshot["checked_out"]) == (1, 0)
+  latency = snapshot["checkout_latency"]
+  assert latency["count"] == latency["buckets"]["+Inf"] == 3 and latency["max"] >= 0.05
+  assert latency["buckets"]["0.01"] <= 2  # the timed-out checkout waited pool_timeout
+
+
+def test_metrics_survive_dispose(engine):
+  metrics = instrument_engine(engine, "primary", leak_seconds=0)
+  engine.dispose()
+  with engine.connect():
+    pass
+  assert metrics.snapshot()["checkout_latency"]["count"] == 1
+  assert metrics.pool is engine.pool
+
+
+def _hold_connection(engine):
+  return engine.connect()
+
+
+def test_leak_detector_logs_checkout_stack(engine, caplog):
+  metrics = instrument_engine(engine, "primary", leak_seconds=0.01, capture_stacks=True)
+  connection = _hold_connection(engine)
+  time.sleep(0.02)
+
+  with caplog.at_level(logging.WARNING, logger="arb.portal.utils.db_pool"):
+    assert metrics.check_leaks() == 1
+    assert metrics.check_leaks() == 0  # each checkout is reported once
+    connection.close()
+
+  assert metrics.snapshot()["leaks"] == 1
+  assert "has been held" in caplog.text and "_hold_connection" in caplog.text
+  assert "was held" not in caplog.text
+
+
+def test_leak_detector_logs_holding_thread_without_stacks(engine, caplog):
+  metrics = instrument_engine(engine, "primary", leak_seconds=0.01)
+  connection = _hold_connection(engine)
+  assert all(held[2] is None for held in metrics._held.values())
+  time.sleep(0.02)
+
+  with caplog.at_level(logging.WARNING, logger="arb.portal.utils.db_pool"):
+    assert metrics.check_leaks() == 1
+    connection.close()
+
+  assert "by thread 'MainThread'" in caplog.text and "Thread is now at:" in caplog.text
+  assert "test_leak_detector_logs_holding_thread_without_stacks" in caplog.text
+  assert "_hold_connection" not in caplog.text
+
+
+def test_in_memory_pool_has_no_gauges():
+  engine = create_engine("sqlite://", poolclass=StaticPool)
+  metrics = instrument_engine(engine, "memory")
+  with engine.connect():
+    pass
+  snapshot = metrics.snapshot()
+  assert snapshot["checkouts"] == 1 and snapshot["size"] is None
+  assert snapshot["checkout_latency"]["count"] == 0
+
+
+def test_metrics_route(tmp_path):
+  from arb.portal.routes import main
+  app = Flask(__name__)
+  app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'portal.sqlite'}"
+  app.config["DATABASE_POOL_SIZE"] = 3
+  apply_pool_settings(app)
+  db.init_app(app)
+  init_pool_metrics(app)
+  app.register_blueprint(main)
+  with app.app_context():
+    db.session.execute(text("SELECT 1"))
+    db.session.remove()
+
+  client = app.test_client()
+  (snapshot,) = client.get("/db_pool_metrics").get_json()
+  assert snapshot["pool"] == "primary" and snapshot["size"] == 3 and snapshot["checkouts"] == 1
+
+  body = client.get("/db_pool_metrics?format=prometheus").text
+  assert 'portal_db_pool_checkouts_total{pool="primary"} 1' in body
+  assert 'portal_db_pool_checkout_seconds_bucket{pool="primary",le="+Inf"} 1' in body
+
+
+def test_format_prometheus_skips_missing_gauges():
+  snapshot = {"pool": "p", "connects": 0, "checkouts": 0, "checkins": 0, "invalidations": 0, "timeouts": 0,
+              "leaks": 0, "size": None, "checked_out": None, "overflow": None, "held_longest_seconds": 0.0,
+              "checkout_latency": {"buckets": {"+Inf": 0}, "count": 0, "sum": 0.0, "max": 0.0}}
+  text_ = format_prometheus([snapshot])
+  assert "portal_db_pool_size{" not in text_ and 'portal_db_pool_held_longest_seconds{pool="p"} 0.0' in text_
@@ -0,0 +1,143 @@
+"""
+Tests for arb.portal.utils.db_routing
+
+Two temporary SQLite files stand in for the primary and a (lagging) read replica: each holds a
+`marker` row naming the database and its own `portal_updates` rows, so every response shows
+which engine served it.
+"""
+import time
+
+from flask import Flask
+from sqlalchemy import create_engine, select, text
+
+from arb.portal.extensions import db
+from arb.portal.sqla_models import PortalUpdate
+from arb.portal.utils.db_routing import get_replica_router, init_read_replicas, is_write_statement, read_only, \
+  use_primary
+
+
+def _make_database(path, name):
+  engine = create_engine(f"sqlite:///{path}")
+  PortalUpdate.__table__.create(engine)
+  with engine.begin() as connection:
+    connection.execute(text("CREATE TABLE marker (name TEXT)"))
+    connection.execute(text("INSERT INTO marker VALUES (:name)"), {"name": name})
+    connection.execute(PortalUpdate.__table__.insert(), [{"key": "source", "old_value": "", "new_value": name,
+                                                          "user": "alice", "comments": "", "id_incidence": 1}])
+  engine.dispose()
+  return f"sqlite:///{path}"
+
+
+def _build_app(tmp_path, replica_uri=None, **config):
+  app = Flask(__name__)
+  app.config["SECRET_KEY"] = "test"
+  app.config["SQLALCHEMY_DATABASE_URI"] = _make_database(tmp_path / "primary.sqlite", "primary")
+  app.config["SQLALCHEMY_REPLICA_URIS"] = [replica_uri or _make_database(tmp_path / "replica.sqlite", "replica")]
+  app.config.update(config)
+  db.init_app(app)
+  init_read_replicas(app)
+
+  def marker():
+    return db.session.scalar(text("SELECT name FROM marker"))
+
+  @app.route("/read")
+  @read_only
+  def read():
+    return marker()
+
+  @app.route("/plain")
+  def plain():
+    return marker()
+
+  @app.route("/pinned")
+  @use_primary
+  def pinned():
+    return marker()
+
+  @app.route("/write_then_read", methods=["POST"])
+  @read_only
+  def write_then_read():
+    before = marker()
+    db.session.add(PortalUpdate(key="k", old_value="", new_value="v", user="bob", comments="", id_incidence=2))
+    db.session.commit()
+    return f"{before},{marker()}"
+
+  return app
+
+
+def test_is_write_statement():
+  assert is_write_statement(text("UPDATE marker SET name = 'x'"))
+  assert is_write_statement(PortalUpdate.__table__.delete())
+  assert is_write_statement(select(PortalUpdate).with_for_update())
+  assert not is_write_statement(text("  with t as (select 1) select * from t"))
+  assert not is_write_statement(select(PortalUpdate))
+  assert not is_write_statement(None)
+
+
+def test_read_only_routes_use_the_replica(tmp_path):
+  client = _build_app(tmp_path).test_client()
+
+  assert client.get("/read").text == "replica"
+  assert client.get("/plain").text == "primary"
+  assert client.get("/pinned").text == "primary"
+
+
+def test_read_your_writes(tmp_path, monkeypatch):
+  app = _build_app(tmp_path, SQLALCHEMY_REPLICA_STICKY_SECONDS=5)
+  client = app.test_client()
+
+  assert client.post("/write_then_read").text == "replica,primary"
+  with app.app_context():
+    assert db.session.scalar(select(PortalUpdate.user).where(PortalUpdate.id_incidence == 2)) == "bob"
+
+  # The same browser stays on the primary until the sticky window has passed
+  assert client.get("/read").text == "primary"
+  assert app.test_client().get("/read").text == "replica"
+  now = time.time()
+  monkeypatch.setattr("arb.portal.utils.db_routing.time.time", lambda: now + 6)
+  assert client.get("/read").text == "replica"
+
+
+def test_falls_back_to_primary_when_replica_fails(tmp_path):
+  app = _build_app(tmp_path, replica_uri=f"sqlite:///{tmp_path / 'missing' / 'replica.sqlite'}")
+  client = app.test_client()
+
+  assert client.get("/read").text == "primary"
+  with app.app_context():
+    stats = get_replica_router().stats()
+  assert stats["available"] == [] and stats["failures"] == 1 and stats["fallbacks"] == 1
+
+  # While the replica is marked unavailable it is not tried again
+  assert client.get("/read").text == "primary"
+  with app.app_context():
+    assert get_replica_router().stats()["failures"] == 1
+
+
+def test_auto_route(tmp_path):
+  client = _build_app(tmp_path, SQLALCHEMY_REPLICA_AUTO_ROUTE=True).test_client()
+
+  assert client.get("/plain").text == "replica"
+  assert client.get("/pinned").text == "primary"
+
+
+def test_portal_update_export_reads_replica(tmp_path):
+  from arb.portal.routes import main
+  app = _build_app(tmp_path)
+  app.register_blueprint(main)
+
+  body = app.test_client().get("/portal_updates/export").text
+  assert "replica" in body and "primary" not in body
+
+
+def test_without_replicas_nothing_is_routed(tmp_path):
+  app = Flask(__name__)
+  app.config["SQLALCHEMY_DATABASE_URI"] = _make_database(tmp_path / "primary.sqlite", "primary")
+  db.init_app(app)
+  assert init_read_replicas(app) is None
+
+  @app.route("/read")
+  @read_only
+  def read():
+    return db.session.scalar(text("SELECT name FROM marker"))
+
+  assert app.test_client().get("/read").text == "primary"
@@ -0,0 +1,105 @@
+"""
+Tests for arb.portal.utils.diagnostics_policy
+"""
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from flask import Flask
+
+from arb.portal.utils import route_util
+from arb.portal.utils.diagnostics_policy import DiagnosticsPolicy, DiagnosticsPolicyStore, diagnostics_enabled, \
+  init_diagnostics_policy
+
+
+@pytest.fixture
+def policy_app(tmp_path):
+  app = Flask(__name__)
+  app.config["DIAGNOSTICS_POLICY_FILE"] = str(tmp_path / "diagnostics_policy.json")
+  init_diagnostics_policy(app)
+  return app
+
+
+def test_should_diagnose_modes():
+  assert DiagnosticsPolicy().should_diagnose("alice", 1) is False
+  assert DiagnosticsPolicy("always").should_diagnose() is True
+  sampled = DiagnosticsPolicy("sampled", sample_rate=0.25)
+  assert sampled.should_diagnose(rng=lambda: 0.2) is True
+  assert sampled.should_diagnose(rng=lambda: 0.3) is False
+
+  targeted = DiagnosticsPolicy("off", users=frozenset({"alice"}), incidences=frozenset({42}))
+  assert targeted.should_diagnose("alice", 1) and targeted.should_diagnose("bob", 42)
+  assert not targeted.should_diagnose("bob", 1)
+
+
+def test_from_dict_parses_and_validates():
+  policy = DiagnosticsPolicy.from_dict({"mode": "Sampled", "sample_rate": "0.05", "users": "alice, ",
+                                        "incidences": "12,40"})
+  assert policy == DiagnosticsPolicy("sampled", 0.05, frozenset({"alice"}), frozenset({12, 40}))
+  assert DiagnosticsPolicy.from_dict(policy.to_dict()) == policy
+
+  for bad in ({"mode": "verbose"}, {"mode": "sampled", "sample_rate": "2"}, {"incidences": "12, abc"}):
+    with pytest.raises(ValueError):
+      DiagnosticsPolicy.from_dict(bad)
+
+
+def test_store_shares_changes_through_the_policy_file(tmp_path):
+  path = tmp_path / "policy.json"
+  first = DiagnosticsPolicyStore(DiagnosticsPolicy(), path)
+  second = DiagnosticsPolicyStore(DiagnosticsPolicy(), path)
+  assert second.get() == DiagnosticsPolicy()
+
+  first.set(DiagnosticsPolicy("always"))
+  assert second.get() == DiagnosticsPolicy("always")
+
+  path.write_text("{not json")
+  assert second.get() == DiagnosticsPolicy("always")  # a broken file keeps the last good policy
+
+
+def test_decision_is_made_once_per_request(policy_app):
+  policy_app.extensions["diagnostics_policy"].set(DiagnosticsPolicy("sampled", sample_rate=0.5))
+  with policy_app.test_request_context("/"):
+    with patch("arb.portal.utils.diagnostics_policy.random.random", side_effect=[0.1, 0.9]):
+      assert diagnostics_enabled(1) is True
+      assert diagnostics_enabled(1) is True
+  assert policy_app.extensions["diagnostics_policy"].counters == {"requests": 1, "diagnosed": 1}
+
+  with Flask(__name__).app_context():
+    assert diagnostics_enabled(1) is True  # no policy configured: diagnostics stay on
+
+
+def test_incidence_prep_skips_diagnostics_unless_selected(policy_app):
+  model_row = SimpleNamespace(id_incidence=7)
+
+  def prep(path="/incidence_update/7/"):
+    with policy_app.test_request_context(path, environ_base={"REMOTE_USER": "alice"}), \
+        patch.object(route_util, "render_readonly_sector_view", return_value="read-only"), \
+        patch.object(route_util, "sa_model_diagnostics") as mock_diagnostics:
+      assert route_util.incidence_prep(model_row, "update", "Dairy Digester", "Please Select") == "read-only"
+    return mock_diagnostics.call_count
+
+  assert prep() == 0
+  policy_app.extensions["diagnostics_policy"].set(DiagnosticsPolicy("off", incidences=frozenset({7})))
+  assert prep() == 1
+  policy_app.extensions["diagnostics_policy"].set(DiagnosticsPolicy("off", users=frozenset({"alice"})))
+  assert prep() == 1
+
+
+def test_diagnostics_page_sets_the_policy(policy_app):
+  from arb.portal.routes import main
+  policy_app.register_blueprint(main)
+  policy_app.config["PORTAL_ADMIN_USERS"] = "alice"
+  client = policy_app.test_client()
+  client.environ_base["REMOTE_USER"] = "alice"
+
+  with patch("arb.portal.routes.find_auto_increment_value", return_value=1), \
+      patch("arb.portal.routes.render_template", return_value="") as mock_render:
+    client.post("/diagnostics", data={"mode": "sampled", "sample_rate": "0.1", "users": "", "incidences": "5"})
+    assert mock_render.call_args.kwargs["diagnostics_policy"] == {"mode": "sampled", "sample_rate": 0.1,
+                                                                  "users": [], "incidences": [5]}
+    client.post("/diagnostics", data={"mode": "loud"})
+    assert "Unknown diagnostics mode" in mock_render.call_args.kwargs["policy_error"]
+    client.environ_base["REMOTE_USER"] = "mallory"
+    assert client.post("/diagnostics", data={"mode": "always"}).status_code == 403
+    assert client.get("/diagnostics").status_code == 200
+  assert policy_app.extensions["diagnostics_policy"].get().mode == "sampled"
@@ -0,0 +1,18 @@
+"""
+Tests for arb.portal.utils.feedback_forms
+"""
+from pathlib import Path
+
+import arb.portal
+from arb.portal.utils.feedback_forms import FEEDBACK_FORMS, FEEDBACK_FORMS_BY_SLUG, feedback_form_slug
+from arb.portal.wtf_landfill import LandfillFeedback
+from arb.portal.wtf_oil_and_gas import OGFeedback
+
+
+def test_slugs_match_the_form_templates():
+  assert feedback_form_slug("Oil & Gas") == "oil_and_gas"
+  assert FEEDBACK_FORMS_BY_SLUG == {"oil_and_gas": OGFeedback, "landfill": LandfillFeedback}
+  templates = Path(arb.portal.__file__).parent / "templates"
+  for slug in FEEDBACK_FORMS_BY_SLUG:
+    assert (templates / f"feedback_{slug}.html").is_file()
+  assert set(FEEDBACK_FORMS) == {"Oil & Gas", "Landfill"}
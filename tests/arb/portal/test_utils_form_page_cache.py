@@ -0,0 +1,182 @@
+"""
+Tests for arb.portal.utils.form_page_cache
+
+Uses a temporary SQLite database with an Oil & Gas incidence and renders the real feedback
+templates through the `GET /incidence_update/<id>/` route.
+"""
+import json
+import re
+import time
+from unittest.mock import patch
+
+import pytest
+from flask import Flask, g
+from sqlalchemy import text
+from sqlalchemy.ext.automap import automap_base
+
+from arb.portal.db_hardcoded import get_excel_dropdown_data
+from arb.portal.extensions import db
+from arb.portal.globals import Globals, compile_drop_downs
+from arb.portal.sqla_models import PortalUpdate, PortalUpdateSnapshot
+from arb.portal.startup.flask import configure_flask_app
+from arb.portal.utils import route_util
+from arb.portal.utils.form_page_cache import CSRF_PLACEHOLDER, get_form_page_cache, init_form_page_cache
+
+MISC_JSON = {
+  "id_incidence": 1,
+  "sector": "Oil & Gas",
+  "facility_name": "Site A",
+  "contact_email": "me@example.com",
+  "venting_exclusion": "No",
+  "ogi_performed": "Yes",
+  "ogi_date": "2025-01-02T16:00:00+00:00",
+  "observation_timestamp": "2025-01-01T16:00:00+00:00",
+}
+
+URL = "/incidence_update/1/"
+
+
+@pytest.fixture
+def page_app(tmp_path):
+  app = Flask("arb.portal")  # the portal's templates and static files
+  app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'portal.sqlite'}"
+  app.config["SECRET_KEY"] = "test-secret-key"
+  app.config["WTF_CSRF_ENABLED"] = True
+  configure_flask_app(app)
+  db.init_app(app)
+  init_form_page_cache(app)
+  drop_downs, drop_downs_contingent = compile_drop_downs(*get_excel_dropdown_data())
+  with app.app_context(), patch.object(Globals, "drop_downs", drop_downs), \
+      patch.object(Globals, "drop_downs_contingent", drop_downs_contingent), \
+      patch.object(route_util, "diagnostics_enabled", return_value=False):
+    db.session.execute(text("CREATE TABLE sources (source_id INTEGER PRIMARY KEY, sector TEXT)"))
+    db.session.execute(text("CREATE TABLE incidences (id_incidence INTEGER PRIMARY KEY, source_id INTEGER, "
+                            "misc_json JSON)"))
+    db.session.execute(text("INSERT INTO incidences VALUES (1, NULL, :doc)"), {"doc": json.dumps(MISC_JSON)})
+    db.session.commit()
+    PortalUpdate.__table__.create(db.engine)
+    PortalUpdateSnapshot.__table__.create(db.engine)
+    base = automap_base()
+    base.prepare(autoload_with=db.engine, reflection_options={"only": ["incidences", "sources"]})
+    app.base = base
+
+    from arb.portal.routes import main
+    app.register_blueprint(main)
+    # Requests share the fixture's app context (and `g`); start each without the previous CSRF token
+    app.before_request(lambda: g.pop("csrf_token", None) and None)
+    yield app
+    db.session.remove()
+
+
+def _token(page):
+  return re.search(r'name="csrf_token" type="hidden" value="([^"]+)"', page).group(1)
+
+
+def _renders():
+  return patch.object(route_util, "_render_feedback_form", wraps=route_util._render_feedback_form)
+
+
+def test_unchanged_page_is_served_from_cache(page_app):
+  client = page_app.test_client()
+  with _renders() as render:
+    first = client.get(URL)
+    second = client.get(URL)
+  assert render.call_count == 1
+  assert first.status_code == second.status_code == 200
+  assert first.headers["ETag"] == second.headers["ETag"] and first.headers["ETag"].startswith('W/"')
+  assert first.headers["Cache-Control"] == "private, no-cache"
+
+  first_page, second_page = first.get_data(as_text=True), second.get_data(as_text=True)
+  assert "Site A" in second_page and CSRF_PLACEHOLDER not in second_page
+  assert first_page.replace(_token(first_page), "") == second_page.replace(_token(second_page), "")
+  assert get_form_page_cache().stats()["hits"] == 1
+
+
+def test_revalidation_gets_304_without_rendering(page_app):
+  client = page_app.test_client()
+  etag = client.get(URL).headers["ETag"]
+  with _renders() as render, patch.object(route_util, "model_to_wtform") as load:
+    response = client.get(URL, headers={"If-None-Match": etag})
+  assert response.status_code == 304 and response.get_data() == b""
+  assert response.headers["ETag"] == etag
+  assert not render.called and not load.called
+  assert client.get(URL, headers={"If-None-Match": 'W/"other"'}).status_code == 200
+
+
+def test_writes_invalidate_pages(page_app):
+  client = page_app.test_client()
+  etag = client.get(URL).headers["ETag"]
+
+  # Autosave writes through the audit log: the revision moves and the entry is dropped on commit
+  token = _token(client.get(URL).get_data(as_text=True))
+  patched = client.patch("/incidence_update/1/fields", json={"revision": 0, "fields": {"facility_name": "Site B"}},
+                         headers={"X-CSRFToken": token})
+  assert patched.status_code == 200
+  assert len(get_form_page_cache()) == 0
+  response = client.get(URL, headers={"If-None-Match": etag})
+  assert response.status_code == 200 and "Site B" in response.get_data(as_text=True)
+
+  # A write that bypasses the audit log still changes the document hash
+  etag = response.headers["ETag"]
+  db.session.execute(text("UPDATE incidences SET misc_json = :doc"),
+                     {"doc": json.dumps({**MISC_JSON, "facility_name": "Site C"})})
+  db.session.commit()
+  response = client.get(URL, headers={"If-None-Match": etag})
+  assert response.status_code == 200 and "Site C" in response.get_data(as_text=True)
+
+
+def test_csrf_tokens_are_per_session(page_app):
+  alice, bob = page_app.test_client(), page_app.test_client()
+  alice_response, bob_response = alice.get(URL), bob.get(URL)
+  assert get_form_page_cache().stats()["hits"] == 1  # one stored page, shared
+
+  alice_token = _token(alice_response.get_data(as_text=True))
+  bob_token = _token(bob_response.get_data(as_text=True))
+  assert alice_token != bob_token
+  assert alice_response.headers["ETag"] != bob_response.headers["ETag"]
+  assert bob.get(URL, headers={"If-None-Match": alice_response.headers["ETag"]}).status_code == 200
+
+  # Once the token's time window has passed, the browser's copy is not revalidated
+  with patch("arb.portal.utils.form_page_cache.time.time", return_value=time.time() + 3600):
+    assert alice.get(URL, headers={"If-None-Match": alice_response.headers["ETag"]}).status_code == 200
+
+  # The saved form posts with the token served from the cache
+  with patch.object(route_util, "render_template", return_value="html") as mock_render:
+    alice.post(URL, data={"csrf_token": alice_token, "facility_name": "Site B"})
+    assert "csrf_token" not in mock_render.call_args.kwargs["wtf_form"].errors
+    bob.post(URL, data={"csrf_token": alice_token, "facility_name": "Site B"})
+    assert "csrf_token" in mock_render.call_args.kwargs["wtf_form"].errors
+
+
+def test_bypass_and_roles(page_app):
+  client = page_app.test_client()
+  with client.session_transaction() as flask_session:
+    flask_session["_flashes"] = [("info", "Saved")]
+  with _renders() as render:
+    assert "Saved" in client.get(URL).get_data(as_text=True)
+    with patch.object(route_util, "diagnostics_enabled", return_value=True):
+      assert "ETag" not in client.get(URL).headers
+  assert render.call_count == 2 and len(get_form_page_cache()) == 0
+
+  page_app.config["FORM_PAGE_CACHE_ROLES_HEADER"] = "X-Roles"
+  reviewer = client.get(URL, headers={"X-Roles": "reviewer"}).headers["ETag"]
+  assert client.get(URL, headers={"X-Roles": "reviewer, admin"}).headers["ETag"] != reviewer
+  assert client.get(URL, headers={"X-Roles": "admin,reviewer"}).status_code == 200
+  assert get_form_page_cache().stats()["hits"] == 1 and len(get_form_page_cache()) == 2
+
+
+@pytest.mark.benchmark
+def test_benchmark_form_page_cache(page_app, best_of):
+  """GET the Oil & Gas update page rendered every time, from the render cache, and as a 304."""
+  client = page_app.test_client()
+  first = client.get(URL)
+  cache = get_form_page_cache()
+
+  def rendered():
+    cache.clear()
+    return client.get(URL)
+
+  best_of("rendered", rendered)
+  best_of("cached", lambda: client.get(URL))
+  best_of("not_modified", lambda: client.get(URL, headers={"If-None-Match": first.headers["ETag"]}))
+  assert client.get(URL, headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
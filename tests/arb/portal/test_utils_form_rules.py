@@ -0,0 +1,167 @@
+"""
+Tests for arb.portal.utils.form_rules
+
+The parity tests validate the `db_hardcoded` dummy payloads (with randomized selector, date and
+number variations) on the server and evaluate the exported contract with static/js/form_rules.js
+under Node, and require both to agree on the required fields and the cross-field errors.
+"""
+import datetime
+import json
+import random
+import shutil
+import subprocess
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from flask import Flask
+from wtforms.validators import InputRequired
+
+from arb.portal.constants import HTML_LOCAL_TIME_FORMAT, PLEASE_SELECT
+from arb.portal.db_hardcoded import get_excel_dropdown_data, get_landfill_dummy_form_data, get_og_dummy_form_data
+from arb.portal.globals import Globals, compile_drop_downs
+from arb.portal.utils.form_rules import check_errors, eq, evaluate, earlier_than, form_values, in_fields, not_in, \
+  present, required_fields, rules_contract
+from arb.portal.wtf_landfill import LandfillFeedback, contingent_cause_choices
+from arb.portal.wtf_oil_and_gas import OGFeedback
+
+FORM_RULES_JS = Path(__file__).parents[3] / "source/production/arb/portal/static/js/form_rules.js"
+
+NODE_RUNNER = """
+const rules = require(process.argv[1]);
+const {contract, payloads} = JSON.parse(require("fs").readFileSync(0, "utf8"));
+console.log(JSON.stringify(payloads.map(values => ({
+  required: [...rules.requiredFields(contract, values)].sort(),
+  errors: rules.checkErrors(contract, values),
+}))));
+"""
+
+
+@pytest.fixture
+def app():
+  app = Flask(__name__)
+  app.config["SECRET_KEY"] = "test-secret-key"
+  app.config["WTF_CSRF_ENABLED"] = False
+  drop_downs, drop_downs_contingent = compile_drop_downs(*get_excel_dropdown_data())
+  with patch.object(Globals, "drop_downs", drop_downs), \
+      patch.object(Globals, "drop_downs_contingent", drop_downs_contingent):
+    yield app
+
+
+def test_evaluate_ops():
+  observed = datetime.datetime(2025, 1, 2, 8, 0)
+  values = {"a": "Yes", "b": "", "n": 0.0, "t1": observed, "t2": observed - datetime.timedelta(hours=1)}
+  assert evaluate(eq("a", "Yes"), values) and not evaluate(not_in("a", ["Yes", "No"]), values)
+  assert not evaluate(present("b"), values) and not evaluate(present("n"), values)
+  assert evaluate(earlier_than("t2", "t1"), values) and not evaluate(earlier_than("t2", "missing"), values)
+  assert evaluate(in_fields("a", ["b", "a"]), values)
+  assert evaluate({"not": {"any": [eq("a", "No"), present("b")]}}, values)
+  with pytest.raises(ValueError):
+    evaluate({"field": "a", "op": "matches"}, values)
+
+
+def test_contract_is_cached_and_versioned():
+  contract = rules_contract(OGFeedback)
+  assert rules_contract(OGFeedback) is contract
+  assert json.loads(json.dumps(contract)) == contract
+  assert contract["version"].startswith("1-") and contract["version"] != rules_contract(LandfillFeedback)["version"]
+  assert list(contract["fields"])[:2] == ["id_incidence", "id_plume"]
+  assert contract["fields"]["ogi_date"] == {"type": "datetime", "required": True, "switchable": True}
+  assert contract["fields"]["venting_exclusion"]["type"] == "select"
+
+
+def test_form_rules_route_revalidates_with_etag(app):
+  from arb.portal.routes import main
+  app.register_blueprint(main)
+  client = app.test_client()
+
+  response = client.get("/form_rules/landfill")
+  assert response.status_code == 200 and response.get_json()["form"] == "LandfillFeedback"
+  assert response.headers["ETag"] == f'"{rules_contract(LandfillFeedback)["version"]}"'
+  assert "no-cache" in response.headers["Cache-Control"]
+  assert client.get("/form_rules/landfill", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+  assert client.get("/form_rules/dairy").status_code == 404
+
+
+def _client_value(value) -> str:
+  if isinstance(value, datetime.datetime):
+    return value.strftime(HTML_LOCAL_TIME_FORMAT)
+  return "" if value is None else str(value)
+
+
+def _payloads(form_class, dummy: dict, count: int = 150) -> list[dict[str, str]]:
+  """Dummy payload variations as the browser would post them (every selector included)."""
+  rng = random.Random(20250101)
+  specs = rules_contract(form_class)["fields"]
+  base = {name: _client_value(value) for name, value in dummy.items() if name in specs}
+  payloads = []
+  for _ in range(count):
+    payload = dict(base)
+    for name, spec in specs.items():
+      if spec["type"] == "select" and name in Globals.drop_downs:
+        payload[name] = rng.choice([choice[0] for choice in Globals.drop_downs[name]])
+      elif spec["type"] == "datetime" and name in base:
+        shifted = datetime.datetime.strptime(base[name], HTML_LOCAL_TIME_FORMAT) + \
+                  datetime.timedelta(days=rng.choice([-2, 0, 1]))
+        payload[name] = rng.choice([shifted.strftime(HTML_LOCAL_TIME_FORMAT), base[name], ""])
+      elif spec["type"] == "number" and name in base:
+        payload[name] = rng.choice([base[name], "0", ""])
+    if form_class is LandfillFeedback:
+      causes = contingent_cause_choices(
+        Globals.drop_downs_contingent["emission_cause_contingent_on_emission_location"], payload["emission_location"])
+      payload["emission_cause"] = rng.choice([choice[0] for choice in causes[0]])
+      for name in ("emission_cause_secondary", "emission_cause_tertiary"):
+        payload[name] = rng.choice([choice[0] for choice in causes[1]] + [payload["emission_cause"]])
+    payloads.append(payload)
+  return payloads
+
+
+def _server_results(app, form_class, payloads) -> list[dict]:
+  results = []
+  for payload in payloads:
+    with app.test_request_context("/", method="POST", data=payload):
+      form = form_class()
+      form.validate()
+      errors = check_errors(form_class.form_rules, form_values(form))
+      for name, messages in errors.items():
+        assert all(message in form.errors.get(name, []) for message in messages)
+      required = sorted(name for name, form_field in form._fields.items()
+                        if any(isinstance(validator, InputRequired) for validator in form_field.validators))
+      results.append({"required": required, "errors": errors})
+  return results
+
+
+def _client_results(form_class, payloads) -> list[dict]:
+  stdin = json.dumps({"contract": rules_contract(form_class), "payloads": payloads})
+  completed = subprocess.run(["node", "-e", NODE_RUNNER, str(FORM_RULES_JS)], input=stdin, capture_output=True,
+                             text=True, check=True, timeout=60)
+  return json.loads(completed.stdout)
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="Node.js is required to run the client-side rules")
+@pytest.mark.parametrize("form_class, dummy_data", [
+  (OGFeedback, get_og_dummy_form_data),
+  (LandfillFeedback, get_landfill_dummy_form_data),
+])
+def test_client_and_server_rules_agree(app, form_class, dummy_data):
+  payloads = _payloads(form_class, dummy_data())
+  server = _server_results(app, form_class, payloads)
+  client = _client_results(form_class, payloads)
+
+  assert client == server
+  assert any(result["errors"] for result in server) and any(not result["errors"] for result in server)
+  assert len({tuple(result["required"]) for result in server}) > 3  # the variations exercise the rules
+
+
+def test_required_fields_match_the_declared_rules(app):
+  specs = rules_contract(OGFeedback)["fields"]
+  values = {"venting_exclusion": "Yes", "ogi_performed": "Yes"}
+  required = required_fields(OGFeedback.form_rules, specs, values)
+  assert "venting_description_1" in required and "ogi_date" in required
+  assert "method21_date" not in required and "contact_email" in required
+
+  with app.test_request_context("/", method="POST", data={**values, "method21_performed": PLEASE_SELECT}):
+    form = OGFeedback()
+    form.determine_contingent_fields()
+  assert {name for name, form_field in form._fields.items()
+          if any(isinstance(validator, InputRequired) for validator in form_field.validators)} == required
@@ -0,0 +1,84 @@
+"""
+Tests for arb.portal.utils.form_validation
+
+Uses the Oil & Gas form with mocked Globals dropdowns (as in test_wtf_oil_and_gas.py).
+"""
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from flask import Flask
+
+from arb.portal.utils import route_util
+from arb.portal.utils.form_validation import form_sections, validate_form
+from arb.portal.wtf_oil_and_gas import OGFeedback
+
+DROP_DOWNS = {
+  "venting_exclusion": ["Yes", "No"],
+  "ogi_performed": ["Yes", "No"],
+  "ogi_result": ["Unintentional-leak", "Not applicable as OGI was not performed"],
+  "method21_performed": ["Yes", "No"],
+  "method21_result": ["Unintentional-leak", "Not applicable as Method 21 was not performed"],
+  "equipment_at_source": ["Compressor", "Other"],
+  "component_at_source": ["Valve", "Other"],
+}
+
+
+@pytest.fixture
+def app():
+  app = Flask(__name__)
+  app.config["SECRET_KEY"] = "test-secret-key"
+  app.config["WTF_CSRF_ENABLED"] = False
+  with patch("arb.portal.wtf_oil_and_gas.Globals") as mock_globals:
+    mock_globals.drop_downs = DROP_DOWNS
+    mock_globals.drop_downs_contingent = {}
+    yield app
+
+
+def test_form_sections_follow_declaration_order(app):
+  with app.test_request_context("/"):
+    sections = form_sections(OGFeedback())
+  assert sections["id_incidence"] == sections["id_message"] == "Section 3"
+  assert sections["contact_email"] == "Section 4" and sections["venting_description_1"] == "Section 5"
+  assert sections["carb_notes"] == "Section A"
+
+
+def test_result_is_memoized_with_section_counts(app):
+  with app.test_request_context("/", method="POST", data={"venting_exclusion": "Yes"}):
+    form = OGFeedback()
+    result = validate_form(form)
+    assert validate_form(form) is result
+
+  assert not result.valid and result.total_errors == sum(result.section_error_counts.values())
+  assert list(result.section_error_counts)[:2] == ["Section 3", "Section 4"]
+  assert result.section_error_counts["Section 5"] == len(result.field_errors["venting_description_1"]) == 1
+  assert "venting_description_1" in result.required_fields  # contingent on the venting exclusion
+  assert "ogi_performed" not in result.required_fields
+
+
+@pytest.mark.parametrize("method, crud_type, button, expected_calls", [
+  ("POST", "update", "validate_and_submit", 1),
+  ("POST", "create", "save", 1),
+  ("GET", "update", None, 1),
+  ("GET", "create", None, 0),
+])
+def test_incidence_prep_runs_the_validator_once(app, method, crud_type, button, expected_calls):
+  data = {"facility_name": "Site A", "submit_button": button} if method == "POST" else None
+  with app.test_request_context("/incidence_update/7/", method=method, data=data), \
+      patch.object(OGFeedback, "validate", autospec=True, side_effect=OGFeedback.validate) as mock_validate, \
+      patch.object(route_util, "model_to_wtform"), \
+      patch.object(route_util, "wtform_to_model"), \
+      patch.object(route_util, "add_commit_and_log_model"), \
+      patch.object(route_util, "sa_model_diagnostics"), \
+      patch.object(route_util, "sa_model_to_dict"), \
+      patch.object(route_util, "incidence_revision", return_value=3), \
+      patch.object(route_util, "render_template", return_value="html") as mock_render:
+    route_util.incidence_prep(SimpleNamespace(id_incidence=7), crud_type, "Oil & Gas", "Please Select")
+
+  assert mock_validate.call_count == expected_calls
+  context = mock_render.call_args.kwargs
+  if expected_calls:
+    assert context["error_count_dict"] is context["validation"].error_counts
+    assert context["error_count_dict"]["total_error_count"] > 0
+  else:
+    assert context["validation"] is None and context["error_count_dict"]["total_error_count"] == 0
@@ -0,0 +1,194 @@
+"""
+Tests for arb.portal.utils.incidence_cache
+
+Uses a temporary SQLite database with `incidences` (linked to `sources` for the sector) and
+`portal_updates`, and a Flask app whose incidence cache is initialized as in `create_app()`.
+"""
+import json
+
+import pytest
+from flask import Flask
+from sqlalchemy import text
+from sqlalchemy.ext.automap import automap_base
+from sqlalchemy.orm.attributes import flag_modified
+
+from arb.portal.extensions import db
+from arb.portal.json_update_util import apply_json_patch_and_log
+from arb.portal.sqla_models import PortalUpdate, PortalUpdateSnapshot
+from arb.portal.utils import incidence_cache, sector_util
+from arb.portal.utils.db_ingest_util import dicts_to_database
+from arb.portal.utils.incidence_cache import CachedIncidence, IncidenceCache, InMemoryIncidenceBackend, \
+  get_incidence_cache, init_incidence_cache, mark_incidence_changed
+
+
+@pytest.fixture
+def cache_app(tmp_path):
+  app = Flask(__name__)
+  app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'portal.sqlite'}"
+  app.config["INCIDENCE_CACHE_ENABLED"] = True
+  db.init_app(app)
+  init_incidence_cache(app)
+  with app.app_context():
+    db.session.execute(text("CREATE TABLE sources (id_source INTEGER PRIMARY KEY, sector TEXT)"))
+    db.session.execute(text("CREATE TABLE incidences (id_incidence INTEGER PRIMARY KEY, source_id INTEGER "
+                            "REFERENCES sources (id_source), misc_json JSON)"))
+    db.session.execute(text("INSERT INTO sources VALUES (10, 'Landfill')"))
+    db.session.execute(text("INSERT INTO incidences VALUES (1, 10, :doc)"),
+                       {"doc": json.dumps({"sector": "Landfill", "facility_name": "Old"})})
+    db.session.commit()
+    PortalUpdate.__table__.create(db.engine)
+    PortalUpdateSnapshot.__table__.create(db.engine)
+    base = automap_base()
+    base.prepare(autoload_with=db.engine, reflection_options={"only": ["incidences", "sources"]})
+    app.base = base
+    yield app
+    db.session.remove()
+
+
+@pytest.fixture
+def load_calls(monkeypatch):
+  calls = []
+  original = sector_util.load_incidence
+
+  def counting(db_, base, id_):
+    calls.append(id_)
+    return original(db_, base, id_)
+
+  monkeypatch.setattr(sector_util, "load_incidence", counting)
+  return calls
+
+
+def _read(app):
+  db.session.remove()  # a fresh request/session, so the ORM identity map cannot answer
+  return sector_util.read_incidence(db, app.base, 1)
+
+
+def test_in_memory_backend_lru_and_ttl(monkeypatch):
+  backend = InMemoryIncidenceBackend(max_entries=2, ttl_seconds=10)
+  for id_ in (1, 2, 3):
+    backend.set((id_, 0), {"id_incidence": id_})
+  assert backend.get((1, 0)) is None and len(backend) == 2
+
+  clock = [1000.0]
+  monkeypatch.setattr("arb.portal.utils.incidence_cache.time.monotonic", lambda: clock[0])
+  backend.set((4, 0), {"id_incidence": 4})
+  clock[0] += 11
+  assert backend.get((4, 0)) is None
+
+  backend.bump([2])
+  assert backend.revision(2) == 1 and backend.get((2, 0)) is None
+
+
+def test_read_through_and_sector_info(cache_app, load_calls):
+  first = _read(cache_app)
+  second = _read(cache_app)
+
+  assert first == CachedIncidence(1, {"sector": "Landfill", "facility_name": "Old"}, "Landfill")
+  assert second == first and second.misc_json is not first.misc_json
+  assert sector_util.get_sector_info(db, cache_app.base, 1) == ("Landfill", "Landfill")
+  assert load_calls == [1]
+
+  stats = get_incidence_cache().stats()
+  assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (2, 1, 0.6667)
+
+
+def test_write_paths_can_skip_the_cache(cache_app, load_calls):
+  _read(cache_app)
+  assert sector_util.get_sector_info(db, cache_app.base, 1, use_cache=False) == ("Landfill", "Landfill")
+  assert load_calls == [1, 1]
+
+
+def test_callers_cannot_mutate_cached_entry(cache_app):
+  _read(cache_app).misc_json["facility_name"] = "Mutated"
+  assert _read(cache_app).misc_json["facility_name"] == "Old"
+
+
+def test_missing_rows_are_not_cached(cache_app, load_calls):
+  db.session.remove()
+  assert sector_util.read_incidence(db, cache_app.base, 99) is None
+  assert sector_util.read_incidence(db, cache_app.base, 99) is None
+  assert load_calls == [99, 99]
+
+
+def test_apply_json_patch_and_log_invalidates_on_commit(cache_app, load_calls):
+  _read(cache_app)
+  model = db.session.get(cache_app.base.classes.incidences, 1)
+  apply_json_patch_and_log(model, {"facility_name": "New"})
+
+  assert _read(cache_app).misc_json["facility_name"] == "New"
+  assert load_calls == [1, 1]
+  assert get_incidence_cache().stats()["invalidations"] == 1
+
+
+def test_orm_write_invalidates_and_rollback_does_not(cache_app, load_calls):
+  _read(cache_app)
+  model = db.session.get(cache_app.base.classes.incidences, 1)
+  model.misc_json = {"sector": "Landfill", "facility_name": "Rolled back"}
+  flag_modified(model, "misc_json")
+  db.session.flush()
+  db.session.rollback()
+  assert _read(cache_app).misc_json["facility_name"] == "Old"
+  assert load_calls == [1]
+
+  model = db.session.get(cache_app.base.classes.incidences, 1)
+  model.misc_json = {"sector": "Landfill", "facility_name": "Committed"}
+  flag_modified(model, "misc_json")
+  db.session.commit()
+  assert _read(cache_app).misc_json["facility_name"] == "Committed"
+
+
+def test_text_writes_need_mark(cache_app):
+  _read(cache_app)
+  db.session.execute(text("UPDATE sources SET sector = 'Dairy Digester' WHERE id_source = 10"))
+  mark_incidence_changed(db.session, 1)
+  db.session.commit()
+  assert _read(cache_app).sector_by_foreign_key == "Dairy Digester"
+
+
+def test_batch_ingest_invalidates(cache_app):
+  _read(cache_app)
+  dicts_to_database(db, cache_app.base, [{"id_incidence": 1, "facility_name": "Batch"}])
+  assert _read(cache_app).misc_json["facility_name"] == "Batch"
+
+
+def test_disabled_cache_always_loads(cache_app, load_calls):
+  get_incidence_cache().enabled = False
+  _read(cache_app)
+  _read(cache_app)
+  assert load_calls == [1, 1]
+  assert get_incidence_cache().stats()["bypassed"] == 2
+
+
+def test_backend_errors_fall_back_to_loader():
+  class BrokenBackend(InMemoryIncidenceBackend):
+    def revision(self, id_):
+      raise ConnectionError("down")
+
+  cache = IncidenceCache(BrokenBackend())
+  assert cache.get(1, lambda: CachedIncidence(1, {"a": 1})) == CachedIncidence(1, {"a": 1})
+  assert cache.stats()["errors"] == 1
+
+
+def test_cache_is_off_by_default_without_redis():
+  # The in-process backend cannot see other workers' commits, so it is opt-in
+  app = Flask(__name__)
+  init_incidence_cache(app)
+  assert app.extensions["incidence_cache"].enabled is False
+
+
+def test_unusable_redis_disables_the_cache(monkeypatch):
+  def unavailable(*args, **kwargs):
+    raise RuntimeError("redis is not installed")
+
+  monkeypatch.setattr(incidence_cache, "RedisIncidenceBackend", unavailable)
+  app = Flask(__name__)
+  app.config["INCIDENCE_CACHE_REDIS_URL"] = "redis://localhost:6379/0"
+  init_incidence_cache(app)
+  assert app.extensions["incidence_cache"].enabled is False
+
+
+def test_in_process_cache_can_be_enabled_explicitly():
+  app = Flask(__name__)
+  app.config["INCIDENCE_CACHE_ENABLED"] = True
+  init_incidence_cache(app)
+  assert app.extensions["incidence_cache"].enabled is True
@@ -0,0 +1,182 @@
+"""
+Tests for arb.portal.utils.incidence_history
+
+A temporary SQLite incidence is edited through `apply_json_patch_and_log`, recording the true
+document after every save; reconstruction from the current document, from backfilled snapshots,
+and from write-time snapshots must reproduce each of those documents.
+"""
+import datetime
+import json
+
+import pytest
+from flask import Flask
+from sqlalchemy import select, text
+from sqlalchemy.ext.automap import automap_base
+
+from arb.portal.extensions import db
+from arb.portal.json_update_util import apply_json_patch_and_log
+from arb.portal.sqla_models import PortalUpdate, PortalUpdateSnapshot
+from arb.portal.utils.incidence_history import backfill_snapshots, decode_audit_value, diff_history_points, \
+  diff_misc_json, parse_history_point, reconstruct_misc_json, snapshot_if_due
+
+EDITS = [
+  {"facility_name": "Alpha", "sector": "Landfill"},
+  {"facility_name": "Bravo"},
+  {"contact_name": "Pat", "notes": ""},
+  {"sector": "Dairy Digester"},
+  {"facility_name": "Charlie", "contact_name": None},
+  {"notes": "follow up"},
+  {"facility_name": "Delta"},
+]
+
+
+@pytest.fixture
+def sqlite_app(tmp_path):
+  app = Flask(__name__)
+  app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'portal.sqlite'}"
+  db.init_app(app)
+  with app.app_context():
+    db.session.execute(text("CREATE TABLE incidences (id_incidence INTEGER PRIMARY KEY, misc_json JSON)"))
+    db.session.execute(text("INSERT INTO incidences VALUES (1, :doc)"), {"doc": json.dumps({"id_incidence": 1})})
+    db.session.commit()
+    PortalUpdate.__table__.create(db.engine)
+    PortalUpdateSnapshot.__table__.create(db.engine)
+    base = automap_base()
+    base.prepare(autoload_with=db.engine, reflection_options={"only": ["incidences"]})
+    app.base = base
+    yield app
+    db.session.remove()
+
+
+@pytest.fixture
+def edited(sqlite_app):
+  """Apply EDITS one save at a time; return (model, {last update id: document after that save})."""
+  incidences = sqlite_app.base.classes.incidences
+  model = db.session.get(incidences, 1)
+  truth = {None: {"id_incidence": 1}}
+  for edit in EDITS:
+    apply_json_patch_and_log(model, dict(edit), user="alice")
+    last_id = db.session.scalar(select(PortalUpdate.id).order_by(PortalUpdate.id.desc()).limit(1))
+    truth[last_id] = dict(model.misc_json)
+  return model, truth
+
+
+def _normalized(document):
+  # None → "" is not audited, so empty values may be absent from a reconstruction
+  return {key: value for key, value in document.items() if value not in (None, "")}
+
+
+def _assert_reconstructs(model, truth, max_replayed=None):
+  for update_id, expected in truth.items():
+    point = reconstruct_misc_json(db.session, 1, model.misc_json, update_id if update_id else 0)
+    assert point.update_id == update_id
+    assert _normalized(point.misc_json) == _normalized(expected)
+    if max_replayed is not None:
+      assert point.replayed <= max_replayed
+
+
+def test_decode_and_parse_points():
+  assert decode_audit_value("None") is None and decode_audit_value(None) is None
+  assert decode_audit_value("") == ""
+  assert parse_history_point(" 42 ") == 42
+  assert parse_history_point("") is None
+  assert parse_history_point("2025-01-15T14:30") == datetime.datetime(2025, 1, 15, 22, 30, tzinfo=datetime.UTC)
+  assert parse_history_point("2025-01-15T14:30:00+00:00") == datetime.datetime(2025, 1, 15, 14, 30,
+                                                                               tzinfo=datetime.UTC)
+  with pytest.raises(ValueError):
+    parse_history_point("yesterday")
+
+
+def test_reconstruct_from_current_document(edited):
+  model, truth = edited
+  _assert_reconstructs(model, truth)
+
+  latest = reconstruct_misc_json(db.session, 1, model.misc_json)
+  assert latest.source == "current" and latest.replayed == 0
+
+
+def test_reconstruct_from_backfilled_snapshots(edited):
+  model, truth = edited
+  assert backfill_snapshots(db.session, 1, model.misc_json, interval=3) == 3
+  db.session.commit()
+
+  _assert_reconstructs(model, truth, max_replayed=3)
+  point = reconstruct_misc_json(db.session, 1, model.misc_json, 4)
+  assert point.source == "snapshot"
+
+
+def test_reconstruct_ignores_other_incidences(edited):
+  model, truth = edited
+  db.session.add(PortalUpdate(key="facility_name", old_value="x", new_value="y", user="bob", comments="",
+                              id_incidence=2))
+  db.session.commit()
+  _assert_reconstructs(model, truth)
+
+
+def test_reconstruct_as_of_timestamp(edited):
+  model, truth = edited
+  db.session.execute(text("UPDATE portal_updates SET timestamp = '2025-01-01 00:00:00' WHERE id <= 3"))
+  db.session.execute(text("UPDATE portal_updates SET timestamp = '2025-02-01 00:00:00' WHERE id > 3"))
+  db.session.commit()
+
+  point = reconstruct_misc_json(db.session, 1, model.misc_json,
+                                datetime.datetime(2025, 1, 15, tzinfo=datetime.UTC))
+  assert point.update_id == 3
+  assert _normalized(point.misc_json) == truth[3]
+  before = reconstruct_misc_json(db.session, 1, model.misc_json,
+                                 datetime.datetime(2024, 12, 31, tzinfo=datetime.UTC))
+  assert before.update_id is None and _normalized(before.misc_json) == {"id_incidence": 1}
+
+
+def test_snapshot_if_due_bounds_replay(sqlite_app):
+  model = db.session.get(sqlite_app.base.classes.incidences, 1)
+  for i in range(7):
+    db.session.add(PortalUpdate(key="facility_name", old_value=str(i - 1) if i else None, new_value=str(i),
+                                user="alice", comments="", id_incidence=1))
+    model.misc_json = {"id_incidence": 1, "facility_name": str(i)}
+    snapshot_if_due(db.session, model, interval=3)
+    db.session.commit()
+
+  snapshots = db.session.scalars(select(PortalUpdateSnapshot).order_by(PortalUpdateSnapshot.id)).all()
+  assert [(s.id_portal_update, s.misc_json["facility_name"]) for s in snapshots] == [(3, "2"), (6, "5")]
+
+  point = reconstruct_misc_json(db.session, 1, model.misc_json, 5)
+  assert point.source == "snapshot" and point.replayed == 2
+  assert point.misc_json["facility_name"] == "4"
+
+
+def test_apply_json_patch_and_log_takes_snapshots(sqlite_app, monkeypatch):
+  monkeypatch.setattr("arb.portal.utils.incidence_history.HISTORY_SNAPSHOT_INTERVAL", 2)
+  model = db.session.get(sqlite_app.base.classes.incidences, 1)
+  for edit in EDITS[:3]:
+    apply_json_patch_and_log(model, dict(edit))
+
+  snapshots = db.session.scalars(select(PortalUpdateSnapshot)).all()
+  assert [s.id_portal_update for s in snapshots] == [2, 4]
+  assert snapshots[-1].misc_json == {"id_incidence": 1, "facility_name": "Bravo", "sector": "Landfill",
+                                     "contact_name": "Pat", "notes": ""}
+
+
+def test_diff_between_points(edited):
+  model, truth = edited
+  start, end, differences = diff_history_points(db.session, 1, model.misc_json, start=2)
+
+  assert (start.update_id, end.update_id) == (2, max(k for k in truth if k))
+  changed = {field["key"]: (field["old"], field["new"]) for field in differences if field["changed"]}
+  assert changed == {"facility_name": ("Alpha", "Delta"), "sector": ("Landfill", "Dairy Digester"),
+                     "notes": ("", "follow up")}
+  assert diff_misc_json({"gone": "x"}, {})[0]["changed"]
+
+
+def test_incidence_history_route_json(edited, sqlite_app):
+  from arb.portal.routes import main
+  sqlite_app.register_blueprint(main)
+
+  response = sqlite_app.test_client().get("/incidence_history/1?at=2&start=2&format=json")
+
+  assert response.status_code == 200
+  body = response.get_json()
+  assert _normalized(body["at"]["misc_json"]) == {"id_incidence": 1, "facility_name": "Alpha", "sector": "Landfill"}
+  assert {field["key"] for field in body["differences"] if field["changed"]} == {"facility_name", "sector", "notes"}
+  assert sqlite_app.test_client().get("/incidence_history/1?at=bogus&format=json").status_code == 400
+  assert sqlite_app.test_client().get("/incidence_history/99?format=json").status_code == 404
@@ -0,0 +1,210 @@
+"""
+Tests for arb.portal.utils.incidence_summary
+
+Uses a temporary SQLite database (where the summary is a table maintained incrementally) with
+the incidence summary initialized as in `create_app()`.
+"""
+import json
+import shutil
+from unittest.mock import patch
+
+import pytest
+from flask import Flask
+from sqlalchemy import select, text
+from sqlalchemy.ext.automap import automap_base
+from sqlalchemy.orm.attributes import flag_modified
+
+from arb.portal.extensions import db
+from arb.portal.json_update_util import apply_json_patch_and_log
+from arb.portal.sqla_models import PortalUpdate, PortalUpdateSnapshot
+from arb.portal.utils.db_ingest_util import dicts_to_database
+from arb.portal.utils.db_routing import init_read_replicas
+from arb.portal.utils.incidence_summary import claim_refresh, ensure_incidence_summary, init_incidence_summary, \
+  refresh_if_stale, refresh_incidence_summary, state_table as summary_state_table, summarize, summary_ddl, \
+  summary_key, summary_state, summary_table
+
+DOCUMENTS = {
+  1: {"sector": "Landfill", "facility_name": "Site A", "observation_timestamp": "2025-01-15T22:30:00+00:00"},
+  2: {"sector": "Landfill", "facility_name": "Site B", "observation_timestamp": "2025-02-01T08:00:00+00:00"},
+  3: {"sector": "Oil & Gas", "facility_name": "Well 7", "observation_timestamp": "2025-01-20T10:00:00+00:00"},
+}
+
+
+@pytest.fixture
+def summary_app(tmp_path):
+  app = Flask(__name__)
+  app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'portal.sqlite'}"
+  db.init_app(app)
+  init_incidence_summary(app)
+  with app.app_context():
+    db.session.execute(text("CREATE TABLE incidences (id_incidence INTEGER PRIMARY KEY, misc_json JSON)"))
+    for id_, document in DOCUMENTS.items():
+      db.session.execute(text("INSERT INTO incidences VALUES (:id, :doc)"), {"id": id_, "doc": json.dumps(document)})
+    db.session.commit()
+    PortalUpdate.__table__.create(db.engine)
+    PortalUpdateSnapshot.__table__.create(db.engine)
+    assert ensure_incidence_summary(db.engine) is True
+    base = automap_base()
+    base.prepare(autoload_with=db.engine, reflection_options={"only": ["incidences"]})
+    app.base = base
+    yield app
+    db.session.remove()
+
+
+def _counts(group_by="sector", filters=None):
+  return {group["value"]: group["incidences"] for group in summarize(db.session, group_by, filters)}
+
+
+def _all_groups():
+  return sorted(tuple(row) for row in db.session.execute(select(summary_table)))
+
+
+def test_summary_key():
+  assert summary_key(DOCUMENTS[1]) == ("Landfill", "Site A", "2025-01")
+  assert summary_key(json.dumps({"sector": "Dairy Digester"})) == ("Dairy Digester", "", "")
+  assert summary_key(None) == summary_key("not json") == ("", "", "")
+
+
+def test_ensure_builds_summary_once(summary_app):
+  assert ensure_incidence_summary(db.engine) is False
+  assert _counts() == {"Landfill": 2, "Oil & Gas": 1}
+  assert _counts("month") == {"2025-01": 2, "2025-02": 1}
+  assert [group["value"] for group in summarize(db.session, "month")] == ["2025-02", "2025-01"]
+  assert _counts("facility_name", {"sector": "Landfill", "month": "2025-01"}) == {"Site A": 1}
+  assert summary_state(db.session)["stale"] is False
+
+
+def test_summarize_rejects_unknown_dimension(summary_app):
+  with pytest.raises(ValueError):
+    summarize(db.session, "status")
+  with pytest.raises(ValueError):
+    summarize(db.session, "sector", {"operator": "x"})
+
+
+def test_json_patch_moves_incidence_between_groups(summary_app):
+  model = db.session.get(summary_app.base.classes.incidences, 3)
+  apply_json_patch_and_log(model, {"sector": "Landfill", "observation_timestamp": "2025-02-03T00:00:00+00:00"})
+
+  assert _counts() == {"Landfill": 3}
+  assert _counts("month") == {"2025-01": 1, "2025-02": 2}
+
+
+def test_orm_insert_delete_and_rollback(summary_app):
+  incidences = summary_app.base.classes.incidences
+  db.session.add(incidences(id_incidence=4, misc_json={"sector": "Dairy Digester"}))
+  db.session.commit()
+  assert _counts() == {"Landfill": 2, "Oil & Gas": 1, "Dairy Digester": 1}
+
+  db.session.delete(db.session.get(incidences, 1))
+  db.session.commit()
+  assert _counts() == {"Landfill": 1, "Oil & Gas": 1, "Dairy Digester": 1}
+
+  model = db.session.get(incidences, 2)
+  model.misc_json = {"sector": "Rolled back"}
+  flag_modified(model, "misc_json")
+  db.session.flush()
+  db.session.rollback()
+  assert _counts() == {"Landfill": 1, "Oil & Gas": 1, "Dairy Digester": 1}
+
+
+def test_batch_ingest_and_rebuild_agree(summary_app):
+  dicts_to_database(db, summary_app.base, [{"id_incidence": 2, "facility_name": "Site A"},
+                                           {"sector": "Landfill", "facility_name": "Site C"}])
+  assert _counts("facility_name", {"sector": "Landfill"}) == {"Site A": 2, "Site C": 1}
+
+  incremental = _all_groups()
+  refresh_incidence_summary(db.session)
+  db.session.commit()
+  assert _all_groups() == incremental
+
+
+def test_postgres_ddl():
+  create_view, create_index = summary_ddl("postgresql")
+  assert create_view.startswith("CREATE MATERIALIZED VIEW IF NOT EXISTS incidence_summary")
+  assert "left(misc_json ->> 'observation_timestamp', 7)" in create_view
+  assert "UNIQUE INDEX" in create_index and "(sector, facility_name, month)" in create_index
+  assert summary_ddl("sqlite") == []
+
+
+def test_dashboard_route_and_drill_down(summary_app):
+  from arb.portal.routes import main
+  summary_app.register_blueprint(main)
+  client = summary_app.test_client()
+
+  page = client.get("/incidence_summary?format=json").get_json()
+  assert page["total"] == 3 and page["stale"] is False
+  landfill = page["groups"][0]
+  assert landfill["value"] == "Landfill" and landfill["incidences"] == 2
+  assert landfill["breakdown_url"] == "/incidence_summary?group_by=facility_name&sector=Landfill"
+  assert landfill["list_url"] == "/?sector=Landfill"
+
+  page = client.get("/incidence_summary?group_by=month&sector=Landfill&facility_name=Site+A&format=json").get_json()
+  assert page["groups"] == [{"value": "2025-01", "incidences": 1, "breakdown_url": None,
+                             "list_url": "/?sector=Landfill&facility_name=Site+A&month=2025-01"}]
+
+  assert client.get("/incidence_summary?group_by=status").status_code == 400
+  with patch("arb.portal.routes.render_template", return_value="") as mock_render:
+    client.get("/incidence_summary?group_by=facility_name")
+  assert mock_render.call_args.args == ("incidence_summary.html",)
+  assert mock_render.call_args.kwargs["total"] == 3 and mock_render.call_args.kwargs["state"]["refreshed_at"]
+
+
+def test_forced_refresh_is_an_admin_post(summary_app):
+  from arb.portal.routes import main
+  summary_app.register_blueprint(main)
+  summary_app.config["PORTAL_ADMIN_USERS"] = "alice"
+  client = summary_app.test_client()
+  with summary_app.app_context():
+    refreshed_at = summary_state(db.session)["refreshed_at"]
+
+  with patch("arb.portal.routes.refresh_incidence_summary") as mock_refresh:
+    assert client.get("/incidence_summary?format=json&refresh=1").status_code == 200
+    assert client.post("/incidence_summary/refresh", environ_base={"REMOTE_USER": "mallory"}).status_code == 403
+  assert mock_refresh.call_count == 0
+
+  response = client.post("/incidence_summary/refresh?group_by=month", environ_base={"REMOTE_USER": "alice"})
+  assert response.status_code == 302 and response.headers["Location"] == "/incidence_summary?group_by=month"
+  with summary_app.app_context():
+    assert summary_state(db.session)["refreshed_at"] > refreshed_at
+
+
+def test_dashboard_refreshes_on_the_primary_under_replica_routing(summary_app, tmp_path):
+  from arb.portal.routes import main
+  summary_app.register_blueprint(main)
+  summary_app.config["SECRET_KEY"] = "test"
+  summary_app.config["SUMMARY_MAX_STALENESS_SECONDS"] = 0
+  db.session.remove()
+  shutil.copy(tmp_path / "portal.sqlite", tmp_path / "replica.sqlite")  # replica: summary not stale
+  summary_app.config["SQLALCHEMY_REPLICA_URIS"] = [f"sqlite:///{tmp_path / 'replica.sqlite'}"]
+  init_read_replicas(summary_app)
+  db.session.execute(summary_state_table.update().values(stale=True))
+  db.session.commit()
+
+  with patch("arb.portal.routes.refresh_if_stale", wraps=refresh_if_stale) as check:
+    assert summary_app.test_client().get("/incidence_summary?format=json").status_code == 200
+  assert check.call_args.args[0].engine is db.engine
+  assert summary_state(db.session)["stale"] is False
+
+
+def test_claim_refresh_skips_a_refreshed_summary(summary_app):
+  assert claim_refresh(db.session) is False  # not stale
+  assert claim_refresh(db.session, if_stale=False) is True
+  db.session.rollback()
+
+  db.session.execute(summary_state_table.update().values(stale=True))
+  db.session.commit()
+  assert claim_refresh(db.session) is True
+  assert refresh_if_stale(db.session) is True
+  db.session.commit()
+  assert refresh_if_stale(db.session) is False
+
+
+def test_index_month_filter(summary_app):
+  from arb.portal.routes import main
+  summary_app.register_blueprint(main)
+  client = summary_app.test_client()
+  assert client.get("/?month=2025-1").status_code == 400
+
+  with patch("arb.portal.routes.render_template", return_value="") as mock_render:
+    client.get("/?sector=Landfill&month=2025-02")
+  assert [row.id_incidence for row in mock_render.call_args.kwargs["model_rows"]] == [2]
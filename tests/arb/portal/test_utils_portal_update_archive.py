@@ -0,0 +1,157 @@
+"""
+Tests for arb.portal.utils.portal_update_archive
+
+All tests run against a temporary SQLite database (plain-table fallback); PostgreSQL partition
+management is not exercised here.
+"""
+import csv
+import datetime
+import io
+
+import pytest
+from sqlalchemy import create_engine, inspect as sa_inspect, select, text
+from sqlalchemy.orm import Session
+
+from arb.portal.sqla_models import PortalUpdate
+from arb.portal.utils.portal_update_archive import ArchiveReport, archive_portal_updates, \
+  ensure_portal_update_indexes, export_archived_portal_updates, main, month_start, partition_portal_updates, \
+  read_archive_file
+
+UTC = datetime.UTC
+NOW = datetime.datetime(2025, 6, 15, 12, 0, tzinfo=UTC)
+
+
+def _update(id_incidence, timestamp, key="facility_name", old_value="A", new_value="B", user="alice"):
+  return PortalUpdate(timestamp=timestamp, key=key, old_value=old_value, new_value=new_value, user=user,
+                      comments="", id_incidence=id_incidence)
+
+
+@pytest.fixture
+def engine(tmp_path):
+  engine = create_engine(f"sqlite:///{tmp_path / 'portal.sqlite'}")
+  PortalUpdate.__table__.create(engine)
+  with Session(engine) as session:
+    session.add_all([
+      _update(1, datetime.datetime(2025, 1, 10, tzinfo=UTC), old_value=None),
+      _update(2, datetime.datetime(2025, 1, 31, 23, 59, tzinfo=UTC), key="sector", old_value=""),
+      _update(2, datetime.datetime(2025, 3, 5, tzinfo=UTC), user="bob"),
+      _update(3, datetime.datetime(2025, 4, 1, tzinfo=UTC)),
+      _update(3, datetime.datetime(2025, 6, 1, tzinfo=UTC)),
+    ])
+    session.commit()
+  yield engine
+  engine.dispose()
+
+
+def _remaining(engine):
+  with engine.connect() as connection:
+    return [row.timestamp.month for row in connection.execute(
+      select(PortalUpdate.__table__).order_by(PortalUpdate.__table__.c.timestamp))]
+
+
+def test_month_start():
+  assert month_start(NOW) == datetime.datetime(2025, 6, 1, tzinfo=UTC)
+  assert month_start(NOW, -6) == datetime.datetime(2024, 12, 1, tzinfo=UTC)
+  assert month_start(datetime.datetime(2025, 12, 31, 23, 0), 1) == datetime.datetime(2026, 1, 1, tzinfo=UTC)
+
+
+def test_ensure_portal_update_indexes_on_existing_table(tmp_path):
+  engine = create_engine(f"sqlite:///{tmp_path / 'old.sqlite'}")
+  with engine.begin() as connection:
+    connection.execute(text("CREATE TABLE portal_updates (id INTEGER PRIMARY KEY, timestamp DATETIME NOT NULL, "
+                            "key VARCHAR(255) NOT NULL, old_value TEXT, new_value TEXT NOT NULL, "
+                            "user VARCHAR(255) NOT NULL, comments TEXT NOT NULL, id_incidence INTEGER)"))
+
+  ensure_portal_update_indexes(engine)
+  ensure_portal_update_indexes(engine)
+
+  names = {index["name"] for index in sa_inspect(engine).get_indexes("portal_updates")}
+  assert names == {index.name for index in PortalUpdate.__table__.indexes}
+  assert "commit_xid" in {column["name"] for column in sa_inspect(engine).get_columns("portal_updates")}
+  with engine.connect() as connection:
+    plan = " ".join(row[-1] for row in connection.execute(text(
+      "EXPLAIN QUERY PLAN SELECT * FROM portal_updates WHERE id_incidence BETWEEN 1 AND 5 ORDER BY timestamp")))
+  assert "ix_portal_updates_id_incidence_timestamp" in plan
+
+
+def test_partition_is_noop_on_sqlite(engine):
+  assert partition_portal_updates(engine) == []
+
+
+def test_archive_moves_old_months_to_files(engine, tmp_path):
+  archive_dir = tmp_path / "archive"
+
+  report = archive_portal_updates(engine, archive_dir, retention_months=2, now=NOW)
+
+  assert report.cutoff == datetime.datetime(2025, 4, 1, tzinfo=UTC)
+  assert report.months == ["2025_01", "2025_03"]
+  assert report.rows_archived == 3
+  assert sorted(p.name for p in archive_dir.iterdir()) == ["portal_updates_2025_01.jsonl.gz",
+                                                          "portal_updates_2025_03.jsonl.gz"]
+  assert _remaining(engine) == [4, 6]
+
+  january = read_archive_file(archive_dir / "portal_updates_2025_01.jsonl.gz")
+  assert [row["old_value"] for row in january] == [None, ""]
+  assert january[1]["timestamp"] == datetime.datetime(2025, 1, 31, 23, 59, tzinfo=UTC)
+
+
+def test_archive_dry_run_changes_nothing(engine, tmp_path):
+  report = archive_portal_updates(engine, tmp_path / "archive", retention_months=2, now=NOW, dry_run=True)
+
+  assert report.rows_archived == 3 and "dry run" in report.summary()
+  assert not (tmp_path / "archive").exists()
+  assert len(_remaining(engine)) == 5
+
+
+def test_archive_merges_into_existing_month_file(engine, tmp_path):
+  archive_dir = tmp_path / "archive"
+  archive_portal_updates(engine, archive_dir, retention_months=2, now=NOW)
+  with Session(engine) as session:
+    session.add(_update(9, datetime.datetime(2025, 1, 20, tzinfo=UTC)))
+    session.commit()
+
+  report = archive_portal_updates(engine, archive_dir, retention_months=2, now=NOW)
+
+  assert report.rows_archived == 1
+  assert [row["id_incidence"] for row in read_archive_file(archive_dir / "portal_updates_2025_01.jsonl.gz")] == \
+         [1, 9, 2]
+
+
+def _export(archive_dir, **filters):
+  out = io.StringIO()
+  count = export_archived_portal_updates(archive_dir, filters, out)
+  rows = list(csv.reader(io.StringIO(out.getvalue())))
+  assert len(rows) == count + 1
+  return rows
+
+
+def test_export_applies_portal_update_filters(engine, tmp_path):
+  archive_dir = tmp_path / "archive"
+  archive_portal_updates(engine, archive_dir, retention_months=0, now=month_start(NOW, 1))
+
+  rows = _export(archive_dir)
+  assert rows[0] == ["timestamp", "key", "old_value", "new_value", "user", "comments", "id_incidence"]
+  assert [row[6] for row in rows[1:]] == ["3", "3", "2", "2", "1"]
+
+  assert [row[6] for row in _export(archive_dir, filter_user="BO")[1:]] == ["2"]
+  assert [row[6] for row in _export(archive_dir, filter_id_incidence="-2", filter_key="sect")[1:]] == ["2"]
+  assert [row[6] for row in _export(archive_dir, start_date="2025-01-31", end_date="2025-04-01")[1:]] == \
+         ["3", "2", "2"]
+  assert len(_export(archive_dir, start_date="not a date")) == 6
+
+
+def test_archive_report_summary():
+  report = ArchiveReport(cutoff=datetime.datetime(2025, 4, 1, tzinfo=UTC), months=["2025_01"], rows_archived=7)
+  assert report.summary().startswith("portal_updates archive: 7 rows before 2025-04-01 in 1 months")
+
+
+def test_main_cli(engine, tmp_path, capsys):
+  uri = str(engine.url)
+  archive_dir = tmp_path / "archive"
+
+  assert main(["--database-uri", uri, "--archive-dir", str(archive_dir), "archive", "--retention-months", "0"]) == 0
+  assert "5 rows before" in capsys.readouterr().out
+
+  output = tmp_path / "export.csv"
+  assert main(["--archive-dir", str(archive_dir), "export", "--filter-user", "alice", "--output", str(output)]) == 0
+  assert len(output.read_text().splitlines()) == 5
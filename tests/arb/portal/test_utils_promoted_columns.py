@@ -0,0 +1,139 @@
+"""
+Tests for arb.portal.utils.promoted_columns
+
+Generated columns are built on a temporary SQLite database with an `incidences` table shaped like
+production (integer primary key plus a `misc_json` JSON document). PostgreSQL DDL is checked as text.
+"""
+import json
+
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine, inspect as sa_inspect, text
+from sqlalchemy.ext.automap import automap_base
+
+from arb.portal.extensions import db
+from arb.portal.json_update_util import merge_json_column_in_db
+from arb.portal.utils.promoted_columns import PROMOTED_JSON_KEYS, build_promoted_columns, get_json_key_column, \
+  main, promoted_column_ddl, promoted_column_name, query_incidences
+
+DOCUMENTS = [
+  {"sector": "Landfill", "facility_name": "Bravo", "observation_timestamp": "2025-01-03T10:00:00-08:00"},
+  {"sector": "Oil & Gas", "facility_name": "Alpha", "observation_timestamp": "2025-01-01T10:00:00-08:00"},
+  {"sector": "Landfill", "facility_name": "Charlie"},
+  {"sector": "Landfill", "facility_name": "Alpha", "observation_timestamp": "2025-01-02T10:00:00-08:00"},
+  {},
+]
+
+
+@pytest.fixture
+def sqlite_app(tmp_path):
+  app = Flask(__name__)
+  app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'portal.sqlite'}"
+  db.init_app(app)
+  with app.app_context():
+    db.session.execute(text("CREATE TABLE incidences (id_incidence INTEGER PRIMARY KEY, misc_json JSON)"))
+    for id_, document in enumerate(DOCUMENTS, start=1):
+      db.session.execute(text("INSERT INTO incidences VALUES (:id, :doc)"), {"id": id_, "doc": json.dumps(document)})
+    db.session.commit()
+    yield app
+    db.session.remove()
+
+
+def _reflect():
+  base = automap_base()
+  base.prepare(autoload_with=db.engine, reflection_options={"only": ["incidences"]})
+  return base
+
+
+def _ids(rows):
+  return [row.id_incidence for row in rows]
+
+
+def test_promoted_column_name_rejects_unsafe_keys():
+  assert promoted_column_name("sector") == "misc_sector"
+  with pytest.raises(ValueError):
+    promoted_column_name("sector'); DROP TABLE incidences; --")
+
+
+def test_postgres_ddl():
+  add_column, create_index = promoted_column_ddl("postgresql", "sector")
+  assert add_column == ("ALTER TABLE incidences ADD COLUMN IF NOT EXISTS misc_sector text "
+                        "GENERATED ALWAYS AS ((misc_json ->> 'sector')) STORED")
+  assert create_index == "CREATE INDEX IF NOT EXISTS ix_incidences_misc_sector ON incidences (misc_sector)"
+  with pytest.raises(ValueError):
+    promoted_column_ddl("mysql", "sector")
+
+
+def test_build_promoted_columns_is_idempotent(sqlite_app):
+  assert build_promoted_columns(db.engine, dry_run=True) != []
+  assert "misc_sector" not in {c["name"] for c in sa_inspect(db.engine).get_columns("incidences")}
+
+  statements = build_promoted_columns(db.engine)
+
+  assert len(statements) == 2 * len(PROMOTED_JSON_KEYS)
+  inspector = sa_inspect(db.engine)
+  assert {promoted_column_name(key) for key in PROMOTED_JSON_KEYS} <= \
+         {c["name"] for c in inspector.get_columns("incidences")}
+  assert "ix_incidences_misc_sector" in {index["name"] for index in inspector.get_indexes("incidences")}
+  assert build_promoted_columns(db.engine) == []
+
+
+def test_generated_columns_backfill_and_follow_updates(sqlite_app):
+  build_promoted_columns(db.engine)
+  incidences = _reflect().classes.incidences
+
+  assert db.session.get(incidences, 2).misc_sector == "Oil & Gas"
+
+  model = db.session.get(incidences, 2)
+  merge_json_column_in_db(model, {"sector": "Dairy Digester"})
+  db.session.commit()
+  assert model.misc_sector == "Dairy Digester"
+
+
+@pytest.mark.parametrize("promoted", [False, True])
+def test_query_incidences_same_results_with_and_without_columns(sqlite_app, promoted):
+  if promoted:
+    build_promoted_columns(db.engine)
+  base = _reflect()
+
+  assert _ids(query_incidences(db, base)) == [5, 4, 3, 2, 1]
+  assert _ids(query_incidences(db, base, filters={"sector": "Landfill"})) == [4, 3, 1]
+  assert _ids(query_incidences(db, base, filters={"sector": "Landfill"}, sort_by="facility_name",
+                               descending=False)) == [4, 1, 3]
+  assert _ids(query_incidences(db, base, sort_by="observation_timestamp", descending=False,
+                               filters={"sector": "Landfill"})) == [3, 4, 1]
+  assert _ids(query_incidences(db, base, per_page=2, page=2)) == [3, 2]
+
+
+def test_query_uses_index_when_promoted(sqlite_app):
+  build_promoted_columns(db.engine)
+  incidences = _reflect().classes.incidences
+
+  expression = get_json_key_column(incidences, "sector")
+  assert expression.name == "misc_sector"
+  query = db.session.query(incidences).filter(expression == "Landfill")
+  sql = str(query.statement.compile(compile_kwargs={"literal_binds": True}))
+  plan = " ".join(str(row[-1]) for row in db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+  assert "ix_incidences_misc_sector" in plan
+
+
+def test_columns_built_for_other_keys_are_used(sqlite_app):
+  db.session.execute(text("ALTER TABLE incidences ADD COLUMN misc_contact_email TEXT"))
+  build_promoted_columns(db.engine, keys=["county"])
+  incidences = _reflect().classes.incidences
+
+  assert get_json_key_column(incidences, "county").name == "misc_county"
+  assert get_json_key_column(incidences, "contact_email") is not incidences.__table__.c.misc_contact_email
+
+
+def test_main_cli(tmp_path, capsys):
+  uri = f"sqlite:///{tmp_path / 'cli.sqlite'}"
+  engine = create_engine(uri)
+  with engine.begin() as connection:
+    connection.execute(text("CREATE TABLE incidences (id_incidence INTEGER PRIMARY KEY, misc_json JSON)"))
+  engine.dispose()
+
+  assert main(["--database-uri", uri, "--key", "sector", "--dry-run"]) == 0
+  assert "2 statements to run (dry run)" in capsys.readouterr().out
+  assert main(["--database-uri", uri, "--key", "sector"]) == 0
+  assert "2 statements executed" in capsys.readouterr().out
@@ -0,0 +1,171 @@
+"""
+Tests for arb.portal.utils.readonly_view
+
+Uses the Dairy Digester Excel schema for the layout, and a temporary SQLite database with a Dairy
+Digester incidence for the cached `GET /incidence_update/<id>/` read-only page.
+"""
+import json
+from unittest.mock import patch
+
+import pytest
+from flask import Flask
+from sqlalchemy import text
+from sqlalchemy.ext.automap import automap_base
+
+from arb.portal.db_hardcoded import get_excel_dropdown_data
+from arb.portal.extensions import db
+from arb.portal.globals import Globals, compile_drop_downs
+from arb.portal.sqla_models import PortalUpdate, PortalUpdateSnapshot
+from arb.portal.startup.flask import configure_flask_app
+from arb.portal.utils import route_util
+from arb.portal.utils.form_page_cache import get_form_page_cache, init_form_page_cache
+from arb.portal.utils.readonly_view import OTHER_FIELDS_TITLE, readonly_layout, readonly_sections, \
+  sector_schema_version
+
+MISC_JSON = {
+  "id_incidence": 1,
+  "sector": "Dairy Digester",
+  "contact_email": "me@example.com",
+  "digester_facility_name": "Digester A",
+  "observation_timestamp": "2025-11-02T09:30:00+00:00",
+  "additional_notes": "Checked twice",
+  "legacy_key": "kept",
+}
+
+URL = "/incidence_update/1/"
+
+# The read-only table before the spreadsheet layout: misc_json keys sorted alphabetically
+BASELINE_TABLE = """
+{%- for field_name, field_value in all_fields %}
+<tr><td class="fw-bold">{{ field_name }}</td><td>{{ field_value }}</td></tr>
+{%- endfor %}"""
+
+SECTIONS_TABLE = """
+{%- for section in sections %}<tbody><tr class="table-secondary"><th colspan="2">{{ section.title }}</th></tr>
+  {%- for field_name, field_label, field_value in section.rows %}
+<tr><td class="fw-bold">{{ field_label }}</td><td>{{ field_value }}</td></tr>
+  {%- endfor %}</tbody>
+{%- endfor %}"""
+
+
+def test_layout_follows_the_spreadsheet():
+  layout = readonly_layout("Dairy Digester")
+  assert layout.schema_version == sector_schema_version("dairy digester") == "dairy_digester_v01_00"
+  assert readonly_layout("Dairy Digester") is layout
+  assert sector_schema_version("Oil & Gas") == "oil_and_gas_v01_00"
+  assert sector_schema_version("Landfill") == "landfill_v01_01"
+
+  first = layout.sections[0]
+  assert first.title == "Section 1"
+  assert [field.key for field in first.fields][:3] == ["id_incidence", "id_plume", "observation_timestamp"]
+  assert first.fields[0].label == "1. Incidence/Emission ID"
+  assert [section.fields[0].key for section in layout.sections[1:3]] == ["digester_facility_name",
+                                                                        "inspection_timestamp"]
+  assert sum(len(section.fields) for section in layout.sections) == len(layout.keys)
+
+
+def test_sections_format_only_present_keys():
+  sections = readonly_sections("Dairy Digester", MISC_JSON)
+  assert [section["title"] for section in sections] == ["Section 1", "Section 2", "Section 7", OTHER_FIELDS_TITLE]
+  assert sections[0]["rows"] == [("id_incidence", "1. Incidence/Emission ID", 1),
+                                 ("observation_timestamp", "3. Plume Observation Timestamp(s)", "2025-11-02T01:30")]
+  assert [key for key, _, _ in sections[1]["rows"]] == ["digester_facility_name", "contact_email"]
+  assert sections[-1]["rows"] == [("legacy_key", "legacy_key", "kept"), ("sector", "sector", "Dairy Digester")]
+
+  assert readonly_sections("Dairy Digester", None) == []
+  assert readonly_sections("Unknown", {"b": 2, "a": 1}) == [{"title": "Fields", "rows": [("a", "a", 1),
+                                                                                         ("b", "b", 2)]}]
+  assert readonly_sections("Dairy Digester", {"observation_timestamp": "not a date"})[0]["rows"][0][2] == "not a date"
+
+
+@pytest.fixture
+def readonly_app(tmp_path):
+  app = Flask("arb.portal")  # the portal's templates and static files
+  app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'portal.sqlite'}"
+  app.config["SECRET_KEY"] = "test-secret-key"
+  app.config["WTF_CSRF_ENABLED"] = False
+  configure_flask_app(app)
+  db.init_app(app)
+  init_form_page_cache(app)
+  drop_downs, drop_downs_contingent = compile_drop_downs(*get_excel_dropdown_data())
+  with app.app_context(), patch.object(Globals, "drop_downs", drop_downs), \
+      patch.object(Globals, "drop_downs_contingent", drop_downs_contingent), \
+      patch.object(route_util, "diagnostics_enabled", return_value=False):
+    db.session.execute(text("CREATE TABLE sources (source_id INTEGER PRIMARY KEY, sector TEXT)"))
+    db.session.execute(text("CREATE TABLE incidences (id_incidence INTEGER PRIMARY KEY, source_id INTEGER, "
+                            "misc_json JSON)"))
+    db.session.execute(text("INSERT INTO incidences VALUES (1, NULL, :doc)"), {"doc": json.dumps(MISC_JSON)})
+    db.session.commit()
+    PortalUpdate.__table__.create(db.engine)
+    PortalUpdateSnapshot.__table__.create(db.engine)
+    base = automap_base()
+    base.prepare(autoload_with=db.engine, reflection_options={"only": ["incidences", "sources"]})
+    app.base = base
+
+    from arb.portal.routes import main
+    app.register_blueprint(main)
+    yield app
+    db.session.remove()
+
+
+def _renders():
+  return patch.object(route_util, "render_readonly_sector_view", wraps=route_util.render_readonly_sector_view)
+
+
+def test_readonly_page_is_cached_per_revision(readonly_app):
+  client = readonly_app.test_client()
+  with _renders() as render:
+    first = client.get(URL)
+    second = client.get(URL)
+    not_modified = client.get(URL, headers={"If-None-Match": first.headers["ETag"]})
+  assert render.call_count == 1
+  assert first.get_data() == second.get_data() and not_modified.status_code == 304
+  page = first.get_data(as_text=True)
+  assert "Q1. Digester Facility Name" in page and "2025-11-02T01:30" in page and "Other Fields" in page
+
+  db.session.execute(text("UPDATE incidences SET misc_json = :doc"),
+                     {"doc": json.dumps({**MISC_JSON, "digester_facility_name": "Digester B"})})
+  db.session.commit()
+  with _renders() as render:
+    response = client.get(URL, headers={"If-None-Match": first.headers["ETag"]})
+  assert render.call_count == 1
+  assert response.status_code == 200 and "Digester B" in response.get_data(as_text=True)
+
+
+@pytest.mark.benchmark
+def test_benchmark_readonly_view(readonly_app, best_of):
+  """GET the Dairy Digester read-only page rendered every time, from the render cache, and as a 304."""
+  client = readonly_app.test_client()
+  first = client.get(URL)
+  cache = get_form_page_cache()
+
+  def rendered():
+    cache.clear()
+    return client.get(URL)
+
+  best_of("rendered", rendered)
+  best_of("cached", lambda: client.get(URL))
+  best_of("not_modified", lambda: client.get(URL, headers={"If-None-Match": first.headers["ETag"]}))
+  assert client.get(URL, headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+
+
+@pytest.mark.benchmark
+def test_benchmark_readonly_table_vs_baseline(readonly_app, best_of):
+  """Lay out and render a full Dairy Digester record as the flat sorted table and with the sections."""
+  misc_json = {key: f"value {i}" for i, key in enumerate(readonly_layout("Dairy Digester").keys)}
+  misc_json.update(MISC_JSON)
+  row = readonly_app.base.classes.incidences(id_incidence=1, misc_json=misc_json)
+  baseline_table = readonly_app.jinja_env.from_string(BASELINE_TABLE)
+  sections_table = readonly_app.jinja_env.from_string(SECTIONS_TABLE)
+
+  def baseline():
+    return baseline_table.render(all_fields=sorted(misc_json.items()))
+
+  def sections():
+    return sections_table.render(sections=readonly_sections("Dairy Digester", misc_json))
+
+  with readonly_app.test_request_context(URL):
+    best_of("baseline_table", baseline)
+    best_of("sections_table", sections)
+    best_of("readonly_page", lambda: route_util.render_readonly_sector_view(row, "Dairy Digester", "update"))
+    assert baseline().count("<tr>") == sections().count("<tr>") == len(misc_json)
@@ -78,7 +78,9 @@ def test_render_readonly_sector_view_with_data(mock_render_template):
   assert call_args[1]['sector_type'] == "Unknown Sector"
   assert call_args[1]['id_incidence'] == 456
   assert call_args[1]['crud_type'] == "update"
-  assert len(call_args[1]['all_fields']) == 2
+  assert call_args[1]['sections'] == [{"title": "Fields", "rows": [("field1", "field1", "value1"),
+                                                                    ("field2", "field2", "value2")]}]
+  assert 'all_fields' not in call_args[1]
   assert result == "readonly_html"
 
 
@@ -96,7 +98,7 @@ def test_render_readonly_sector_view_empty_data(mock_render_template):
   call_args = mock_render_template.call_args
   assert call_args[1]['id_incidence'] is None
   assert call_args[1]['misc_json'] == {}
-  assert call_args[1]['all_fields'] == []
+  assert call_args[1]['sections'] == []
   assert result == "readonly_html"
 
 
@@ -239,5 +241,5 @@ def test_render_readonly_sector_view_none_misc_json():
     mock_render.assert_called_once()
     call_args = mock_render.call_args
     assert call_args[1]['misc_json'] == {}
-    assert call_args[1]['all_fields'] == []
+    assert call_args[1]['sections'] == []
     assert result == "readonly_html"
@@ -0,0 +1,252 @@
+"""
+Tests for arb.portal.utils.staging_janitor
+
+All tests run against a temporary upload folder and manipulate file modification
+times with os.utime to simulate file age.
+"""
+import json
+import os
+import threading
+import time
+import zipfile
+from pathlib import Path
+
+import pytest
+from flask import Flask
+
+from arb.portal.utils import staging_janitor
+from arb.portal.utils.staging_janitor import JanitorConfig, find_superseded_staged_files, main, run_janitor, \
+  start_janitor_thread
+
+DAY = 86400
+
+
+def _write(path: Path, payload: dict, age_seconds: float = 0) -> Path:
+  path.parent.mkdir(parents=True, exist_ok=True)
+  path.write_text(json.dumps(payload), encoding="utf-8")
+  ts = time.time() - age_seconds
+  os.utime(path, (ts, ts))
+  return path
+
+
+@pytest.fixture
+def upload_folder(tmp_path):
+  folder = tmp_path / "portal_uploads"
+  (folder / "staging").mkdir(parents=True)
+  (folder / "processed").mkdir(parents=True)
+  return folder
+
+
+def test_find_superseded_keeps_newest_per_incidence(upload_folder):
+  staging = upload_folder / "staging"
+  old = _write(staging / "id_10_ts_20250101_120000.json", {"a": 1}, age_seconds=3 * DAY)
+  new = _write(staging / "id_10_ts_2025_01_02_12_00_00.json", {"a": 2}, age_seconds=2 * DAY)
+  only = _write(staging / "id_11_ts_20250101_120000.json", {"a": 3}, age_seconds=3 * DAY)
+  _write(staging / "notes.json", {}, age_seconds=3 * DAY)
+
+  superseded = find_superseded_staged_files(staging)
+
+  assert superseded == [old]
+  assert new not in superseded and only not in superseded
+
+
+def test_find_superseded_missing_dir(tmp_path):
+  assert find_superseded_staged_files(tmp_path / "does_not_exist") == []
+
+
+def test_run_janitor_removes_superseded_and_reports_space(upload_folder):
+  staging = upload_folder / "staging"
+  old = _write(staging / "id_10_ts_20250101_120000.json", {"x": "y" * 100}, age_seconds=2 * DAY)
+  new = _write(staging / "id_10_ts_20250102_120000.json", {"x": "z"}, age_seconds=1 * DAY)
+
+  report = run_janitor(upload_folder, JanitorConfig(staging_retention_days=None, processed_retention_days=None))
+
+  assert not old.exists()
+  assert new.exists()
+  assert report.superseded_removed == [old.name]
+  assert report.bytes_reclaimed > 100
+
+
+def test_run_janitor_respects_min_age(upload_folder):
+  staging = upload_folder / "staging"
+  old = _write(staging / "id_10_ts_20250101_120000.json", {}, age_seconds=10)
+  _write(staging / "id_10_ts_20250102_120000.json", {}, age_seconds=5)
+
+  report = run_janitor(upload_folder, JanitorConfig(min_age_seconds=3600))
+
+  assert old.exists()
+  assert report.superseded_removed == []
+
+
+def test_run_janitor_expires_old_staged_files(upload_folder):
+  staging = upload_folder / "staging"
+  expired = _write(staging / "id_20_ts_20250101_120000.json", {}, age_seconds=40 * DAY)
+  fresh = _write(staging / "id_21_ts_20250101_120000.json", {}, age_seconds=2 * DAY)
+
+  report = run_janitor(upload_folder, JanitorConfig(staging_retention_days=30, min_age_seconds=0))
+
+  assert not expired.exists()
+  assert fresh.exists()
+  assert report.expired_removed == [expired.name]
+
+
+def test_run_janitor_archives_processed_files(upload_folder):
+  processed = upload_folder / "processed"
+  old_1 = _write(processed / "id_1_ts_20250101_120000.json", {"k": "v" * 500}, age_seconds=100 * DAY)
+  old_2 = _write(processed / "id_2_ts_20250101_120000.json", {"k": "w" * 500}, age_seconds=100 * DAY)
+  recent = _write(processed / "id_3_ts_20250101_120000.json", {"k": "r"}, age_seconds=1 * DAY)
+
+  report = run_janitor(upload_folder, JanitorConfig(processed_retention_days=90, min_age_seconds=0))
+
+  assert not old_1.exists() and not old_2.exists()
+  assert recent.exists()
+  assert sorted(report.archived) == sorted([old_1.name, old_2.name])
+  assert len(report.archives_written) == 1
+  archive = processed / "archive" / report.archives_written[0]
+  with zipfile.ZipFile(archive) as zf:
+    assert sorted(zf.namelist()) == sorted([old_1.name, old_2.name])
+    assert json.loads(zf.read(old_1.name)) == {"k": "v" * 500}
+  assert report.bytes_reclaimed > 0
+
+
+def test_run_janitor_extends_existing_archive(upload_folder):
+  processed = upload_folder / "processed"
+  first = _write(processed / "id_1_ts_20250101_120000.json", {"n": 1}, age_seconds=100 * DAY)
+  config = JanitorConfig(processed_retention_days=90, min_age_seconds=0)
+  report_1 = run_janitor(upload_folder, config)
+
+  second = _write(processed / "id_2_ts_20250101_120000.json", {"n": 2}, age_seconds=100 * DAY)
+  report_2 = run_janitor(upload_folder, config)
+
+  assert report_1.archives_written == report_2.archives_written
+  with zipfile.ZipFile(processed / "archive" / report_2.archives_written[0]) as zf:
+    assert sorted(zf.namelist()) == sorted([first.name, second.name])
+
+
+def test_run_janitor_dry_run_changes_nothing(upload_folder):
+  staging = upload_folder / "staging"
+  processed = upload_folder / "processed"
+  old = _write(staging / "id_10_ts_20250101_120000.json", {}, age_seconds=2 * DAY)
+  _write(staging / "id_10_ts_20250102_120000.json", {}, age_seconds=1 * DAY)
+  archived = _write(processed / "id_1_ts_20250101_120000.json", {}, age_seconds=100 * DAY)
+
+  report = run_janitor(upload_folder, JanitorConfig(dry_run=True))
+
+  assert old.exists() and archived.exists()
+  assert not (processed / "archive").exists()
+  assert report.superseded_removed == [old.name]
+  assert report.archived == [archived.name]
+  assert "dry run" in report.summary()
+
+
+def test_run_janitor_skips_when_lock_held(upload_folder):
+  (upload_folder / staging_janitor.LOCK_FILE_NAME).write_text("123")
+  report = run_janitor(upload_folder, JanitorConfig())
+  assert report.skipped is True
+  assert "skipped" in report.summary()
+
+
+def test_run_janitor_lock_is_per_upload_folder(upload_folder, tmp_path):
+  other = tmp_path / "other_uploads"
+  lock = staging_janitor._run_lock_for(upload_folder)
+  with lock:
+    assert run_janitor(upload_folder, JanitorConfig()).skipped is True
+    assert run_janitor(other, JanitorConfig()).skipped is False
+  assert staging_janitor._run_lock_for(upload_folder / ".." / upload_folder.name) is lock
+
+
+def test_run_janitor_clears_stale_lock(upload_folder):
+  lock = _write(upload_folder / staging_janitor.LOCK_FILE_NAME, {}, age_seconds=2 * DAY)
+  report = run_janitor(upload_folder, JanitorConfig(stale_lock_seconds=3600))
+  assert report.skipped is False
+  assert not lock.exists()
+
+
+def test_run_janitor_concurrent_with_writers(upload_folder):
+  """Janitor passes and staging writers running together never raise or remove fresh files."""
+  staging = upload_folder / "staging"
+  errors = []
+
+  def writer(id_: int) -> None:
+    try:
+      for i in range(20):
+        _write(staging / f"id_{id_}_ts_20250101_12{i:04d}.json", {"i": i})
+    except Exception as e:  # pragma: no cover - only hit on failure
+      errors.append(e)
+
+  threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+  for t in threads:
+    t.start()
+  for _ in range(5):
+    run_janitor(upload_folder, JanitorConfig(min_age_seconds=60))
+  for t in threads:
+    t.join()
+
+  assert errors == []
+  assert len(list(staging.glob("*.json"))) == 80
+
+
+def test_start_janitor_thread_disabled_by_default(upload_folder):
+  app = Flask(__name__)
+  app.config["UPLOAD_FOLDER"] = str(upload_folder)
+  assert start_janitor_thread(app) is None
+
+
+def test_start_janitor_thread_runs_pass(upload_folder):
+  staging = upload_folder / "staging"
+  old = _write(staging / "id_10_ts_20250101_120000.json", {}, age_seconds=2 * DAY)
+  _write(staging / "id_10_ts_20250102_120000.json", {}, age_seconds=1 * DAY)
+
+  app = Flask(__name__)
+  app.config["UPLOAD_FOLDER"] = str(upload_folder)
+  app.config["UPLOAD_JANITOR_MIN_AGE_SECONDS"] = 0
+  stop_event = start_janitor_thread(app, interval_seconds=0.05)
+  try:
+    deadline = time.time() + 5
+    while old.exists() and time.time() < deadline:
+      time.sleep(0.05)
+  finally:
+    stop_event.set()
+    # Let a pass still in progress finish so later tests can take the run lock
+    for thread in threading.enumerate():
+      if thread.name == "upload-janitor":
+        thread.join(timeout=5)
+
+  assert not old.exists()
+
+
+def test_main_cli(upload_folder, capsys):
+  staging = upload_folder / "staging"
+  old = _write(staging / "id_10_ts_20250101_120000.json", {}, age_seconds=2 * DAY)
+  _write(staging / "id_10_ts_20250102_120000.json", {}, age_seconds=1 * DAY)
+
+  exit_code = main(["--upload-folder", str(upload_folder), "--dry-run"])
+
+  assert exit_code == 0
+  assert old.exists()
+  assert "1 superseded" in capsys.readouterr().out
+
+
+def test_list_staged_skips_files_removed_by_the_janitor(upload_folder, monkeypatch):
+  """A file deleted between the listing's glob and its reads is left out instead of failing the page."""
+  from arb.portal import routes
+
+  kept = _write(upload_folder / "staging" / "id_1_ts_20250101_120000.json", {"id_incidence": 1})
+  removed = _write(upload_folder / "staging" / "id_2_ts_20250101_120000.json", {"id_incidence": 2})
+  original = routes.json_load_with_meta
+
+  def load_after_janitor(path):
+    if path == removed:
+      path.unlink()
+    return original(path)
+
+  rendered = {}
+  monkeypatch.setattr(routes, "json_load_with_meta", load_after_janitor)
+  monkeypatch.setattr(routes, "render_template", lambda name, **context: rendered.update(context) or "")
+  app = Flask(__name__)
+  app.config["UPLOAD_FOLDER"] = str(upload_folder)
+  app.register_blueprint(routes.main)
+
+  assert app.test_client().get("/list_staged").status_code == 200
+  assert [f["filename"] for f in rendered["staged_files"]] == [kept.name]
+  assert rendered["malformed_files"] == []
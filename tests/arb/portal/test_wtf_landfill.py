@@ -284,3 +284,16 @@ def test_cross_field_validation_no_emission_identified_flow(mock_globals, app_ct
 
   # Fields should be optional when no emission is identified
   # This tests the conditional validation logic
+
+
+def test_contingent_cause_choices_are_shared_per_location():
+  from arb.portal.wtf_landfill import contingent_cause_choices
+  causes = {"Cover": ["Crack", "Hole"]}
+  primary, secondary = contingent_cause_choices(causes, "Cover")
+  assert primary.valid_values >= {"Crack", "Hole", "Not applicable as no leak was detected"}
+  assert "Not applicable as no additional leak cause suspected" in secondary.valid_values
+  assert contingent_cause_choices(causes, "Cover")[0] is primary
+
+  reloaded = {"Cover": ["Crack"]}
+  primary_reloaded, _ = contingent_cause_choices(reloaded, "Cover")
+  assert primary_reloaded is not primary and "Hole" not in primary_reloaded.valid_values
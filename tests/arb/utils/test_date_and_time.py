@@ -5,14 +5,17 @@ Coverage philosophy:
 - All normal and common edge cases for datetime parsing, conversion, and validation are well covered.
 - Error handling for invalid, empty, and naive/aware datetime inputs is tested.
 - Bulk/recursive utilities are lightly tested, as they are not currently used in production workflows.
-- DST transitions, leap years, and other rare corner cases are not exhaustively tested, but can be added if these scenarios become relevant.
+- The fast ISO parsing path is checked for equivalence with dateutil, hour by hour across both 2025 DST
+  transitions.
+- Leap years and other rare corner cases are not exhaustively tested, but can be added if these scenarios become relevant.
 
 This suite provides strong confidence for current usage and can be expanded as new requirements or edge cases arise.
 """
-from datetime import datetime
+from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
 import pytest
+from dateutil import parser
 
 from arb.utils import date_and_time as dtmod
 
@@ -221,3 +224,69 @@ def test_bulk_ca_naive_datetime_to_utc_datetime_list():
 
 def test_bulk_ca_naive_datetime_to_utc_datetime_non_datetime():
   assert dtmod.bulk_ca_naive_datetime_to_utc_datetime(123) == 123
+
+
+# --- DST boundaries: fast ISO path ---
+SPRING_FORWARD = datetime(2025, 3, 9, 10, 0, tzinfo=UTC_TZ)  # 02:00 PST -> 03:00 PDT
+FALL_BACK = datetime(2025, 11, 2, 9, 0, tzinfo=UTC_TZ)  # 02:00 PDT -> 01:00 PST
+
+
+def _utc_hours_around(transition):
+  return [transition + timedelta(minutes=30 * step) for step in range(-8, 9)]
+
+
+def _iso_variants(utc_dt):
+  pacific = utc_dt.astimezone(PACIFIC_TZ)
+  return [
+    utc_dt.isoformat(),
+    utc_dt.isoformat().replace("+00:00", "Z"),
+    utc_dt.isoformat(sep=" ", timespec="minutes"),
+    (utc_dt + timedelta(microseconds=120)).isoformat(),
+    pacific.isoformat(),
+    pacific.replace(tzinfo=None).isoformat(),
+    pacific.strftime("%Y%m%dT%H%M%S%z"),  # basic format: dateutil only
+  ]
+
+
+@pytest.mark.parametrize("transition", [SPRING_FORWARD, FALL_BACK])
+def test_iso_fast_path_matches_dateutil_across_dst(transition):
+  for utc_dt in _utc_hours_around(transition):
+    for iso_str in _iso_variants(utc_dt):
+      expected = parser.isoparse(iso_str)
+      expected = (expected.replace(tzinfo=UTC_TZ) if expected.tzinfo is None else expected).astimezone(UTC_TZ)
+      result = dtmod.iso_str_to_utc_datetime(iso_str, error_on_missing_tz=False)
+      assert result == expected and result.tzinfo is UTC_TZ, iso_str
+
+
+@pytest.mark.parametrize("iso_str", ["2025-02-29T00:00:00Z", "2025-13-01", "2025-04-20T14:30:00+25:00", "", "x"])
+def test_iso_fast_path_rejects_what_dateutil_rejects(iso_str):
+  with pytest.raises(ValueError):
+    parser.isoparse(iso_str)
+  with pytest.raises(ValueError):
+    dtmod.iso_str_to_utc_datetime(iso_str)
+
+
+def test_dst_wall_clock_conversions():
+  # Fall back: 01:30 occurs twice; the naive result drops the fold
+  assert dtmod.utc_datetime_to_ca_naive_datetime(datetime(2025, 11, 2, 8, 30, tzinfo=UTC_TZ)) == datetime(2025, 11, 2, 1, 30)
+  assert dtmod.utc_datetime_to_ca_naive_datetime(datetime(2025, 11, 2, 9, 30, tzinfo=UTC_TZ)) == datetime(2025, 11, 2, 1, 30)
+  assert dtmod.ca_naive_datetime_to_utc_datetime(datetime(2025, 11, 2, 1, 30)) == datetime(2025, 11, 2, 8, 30, tzinfo=UTC_TZ)
+  # Spring forward: 02:30 does not exist and resolves with the pre-transition offset
+  assert dtmod.ca_naive_datetime_to_utc_datetime(datetime(2025, 3, 9, 2, 30)) == datetime(2025, 3, 9, 10, 30, tzinfo=UTC_TZ)
+  assert dtmod.utc_iso_str_to_ca_str("2025-03-09T10:30:00+00:00") == "2025-03-09T03:30"
+
+
+@pytest.mark.benchmark
+def test_benchmark_iso_parsing(best_of):
+  """Parse 2,000 stored ISO strings with dateutil and with the fast path."""
+  iso_strings = [(FALL_BACK + timedelta(minutes=7 * i)).isoformat() for i in range(2000)]
+
+  def dateutil_parse():
+    return [parser.isoparse(iso_str).astimezone(UTC_TZ) for iso_str in iso_strings]
+
+  def fast_parse():
+    return [dtmod.iso_str_to_utc_datetime(iso_str) for iso_str in iso_strings]
+
+  best_of("iso_parse_dateutil", dateutil_parse)
+  best_of("iso_parse_fast", fast_parse)
+  assert fast_parse() == dateutil_parse()
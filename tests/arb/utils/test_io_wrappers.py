@@ -10,13 +10,84 @@ This suite provides robust coverage for file I/O wrappers.
 """
 import json
 import sys
+import threading
 from pathlib import Path
 
 import pytest
 
 from arb.utils.path_utils import find_repo_root
 sys.path.insert(0, str(find_repo_root(Path(__file__)) / 'source' / 'production'))
-from arb.utils.io_wrappers import save_json_safely, read_json_file, write_text_file, copy_file_safe
+from arb.utils.io_wrappers import atomic_write, save_json_safely, read_json_file, write_text_file, copy_file_safe
+
+
+# --- atomic_write ---
+
+def test_atomic_write_text_and_bytes(tmp_path):
+  file = tmp_path / "a.txt"
+  atomic_write(file, "hello")
+  assert file.read_text() == "hello"
+  atomic_write(file, b"bytes")
+  assert file.read_bytes() == b"bytes"
+
+
+def test_atomic_write_leaves_no_temp_files(tmp_path):
+  file = tmp_path / "sub" / "a.json"
+  atomic_write(file, "{}", fsync_dir=True)
+  assert [p.name for p in file.parent.iterdir()] == ["a.json"]
+
+
+def test_atomic_write_none_path():
+  with pytest.raises(ValueError):
+    atomic_write(None, "x")
+
+
+def test_save_json_safely_failure_keeps_previous_file(tmp_path):
+  file = tmp_path / "keep.json"
+  save_json_safely({"v": 1}, file)
+  with pytest.raises(TypeError):
+    save_json_safely({"v": object()}, file)
+  assert json.loads(file.read_text()) == {"v": 1}
+  assert [p.name for p in tmp_path.iterdir()] == ["keep.json"]
+
+
+def test_save_json_safely_concurrent_writers_and_readers(tmp_path):
+  """Readers hammering a file while writers replace it must never see a truncated document."""
+  file = tmp_path / "staged.json"
+  save_json_safely({"writer": -1, "payload": []}, file)
+  stop = threading.Event()
+  errors = []
+  reads = [0]
+
+  def writer(n: int) -> None:
+    try:
+      for i in range(50):
+        save_json_safely({"writer": n, "i": i, "payload": list(range(2000))}, file)
+    except Exception as e:  # pragma: no cover - only hit on failure
+      errors.append(e)
+
+  def reader() -> None:
+    while not stop.is_set():
+      try:
+        data = read_json_file(file)
+        assert "writer" in data
+        reads[0] += 1
+      except Exception as e:  # pragma: no cover - only hit on failure
+        errors.append(e)
+        return
+
+  readers = [threading.Thread(target=reader) for _ in range(4)]
+  writers = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+  for t in readers + writers:
+    t.start()
+  for t in writers:
+    t.join()
+  stop.set()
+  for t in readers:
+    t.join()
+
+  assert errors == []
+  assert reads[0] > 0
+  assert [p.name for p in tmp_path.iterdir()] == ["staged.json"]
 
 
 # --- save_json_safely ---
@@ -213,6 +213,177 @@ def test_make_dict_serializeable_and_deserialize_dict():
   assert isinstance(deser["b"], datetime.datetime)
 
 
+def test_make_dict_serializeable_with_type_map():
+  d = {"id_incidence": "7", "flag": 0, "amount": "2.50", "when": datetime.datetime(2025, 1, 1, 8, 0), "other": None}
+  type_map = {"id_incidence": int, "flag": bool, "amount": decimal.Decimal}
+  assert arb_json.make_dict_serializeable(d, type_map) == {
+    "id_incidence": 7, "flag": False, "amount": 2.5, "when": "2025-01-01T08:00:00", "other": None}
+
+
+def test_make_dict_serializeable_errors():
+  with pytest.raises(TypeError):
+    arb_json.make_dict_serializeable({1: "a"})
+  for payload, type_map in [({"n": "abc"}, {"n": int}), ({"n": None}, {"n": float}), ({"n": "x"}, {"n": "bad"})]:
+    assert _outcome(arb_json.make_dict_serializeable, payload, type_map) == \
+           _outcome(_reference_make_dict_serializeable, payload, type_map)
+
+
+def test_deserialize_dict_errors():
+  with pytest.raises(TypeError):
+    arb_json.deserialize_dict({1: "a"}, {})
+  with pytest.raises(ValueError, match="Failed to cast 'abc'"):
+    arb_json.deserialize_dict({"n": "abc"}, {"n": int})
+  with pytest.raises(ValueError, match="Unsupported type"):
+    arb_json.deserialize_dict({"n": "abc"}, {"n": list})
+
+
+def test_serialize_memo_distinguishes_equal_datetimes():
+  """Equal instants in different zones, and DST-ambiguous naive times, must not share cached strings."""
+  from zoneinfo import ZoneInfo
+  utc = datetime.datetime(2025, 7, 4, 19, 0, tzinfo=datetime.timezone.utc)
+  pacific = utc.astimezone(ZoneInfo("America/Los_Angeles"))
+  assert utc == pacific
+  assert arb_json.make_dict_serializeable({"a": utc, "b": pacific}) == {
+    "a": "2025-07-04T19:00:00+00:00", "b": "2025-07-04T12:00:00-07:00"}
+
+  first = datetime.datetime(2025, 11, 2, 1, 30)
+  second = first.replace(fold=1)
+  assert first == second
+  result = arb_json.make_dict_serializeable({"first": first, "second": second}, convert_time_to_ca=True)
+  assert result == {"first": "2025-11-02T08:30:00+00:00", "second": "2025-11-02T09:30:00+00:00"}
+
+
+def test_compiled_converters_are_cached():
+  type_map = {"a": int, "b": datetime.datetime}
+  assert arb_json.compile_dict_serializer(type_map, True) is arb_json.compile_dict_serializer(dict(type_map), True)
+  assert arb_json.compile_dict_serializer(type_map, True) is not arb_json.compile_dict_serializer(type_map, False)
+  assert arb_json.compile_dict_deserializer(type_map) is arb_json.compile_dict_deserializer(dict(type_map))
+  assert arb_json.get_value_caster(int) is arb_json.get_value_caster(int)
+
+
+# --- Reference (pre-compilation) implementations, used to prove identical behavior ---
+def _reference_cast_model_value(value, value_type, convert_time_to_ca=False):
+  try:
+    if value_type == str:
+      return value
+    elif value_type in [bool, int, float]:
+      return value_type(value)
+    elif value_type == datetime.datetime:
+      dt = arb_json.iso_str_to_utc_datetime(value)
+      return arb_json.utc_datetime_to_ca_naive_datetime(dt) if convert_time_to_ca else dt
+    elif value_type == decimal.Decimal:
+      return decimal.Decimal(value)
+    else:
+      raise ValueError(f"Unsupported type for casting: {value_type}")
+  except Exception as e:
+    raise ValueError(f"Failed to cast {value!r} to {value_type}: {e}")
+
+
+def _reference_make_dict_serializeable(input_dict, type_map=None, convert_time_to_ca=False):
+  result = {}
+  for key, value in input_dict.items():
+    if not isinstance(key, str):
+      raise TypeError(f"All keys must be strings. Invalid key: {key} ({type(key)})")
+    if type_map and key in type_map:
+      try:
+        value = arb_json.safe_cast(value, type_map[key])
+      except Exception as e:
+        raise ValueError(f"Failed to cast key '{key}' to {type_map[key]}: {e}")
+    if isinstance(value, datetime.datetime):
+      if convert_time_to_ca:
+        value = arb_json.ca_naive_datetime_to_utc_datetime(value)
+      value = value.isoformat()
+    elif isinstance(value, decimal.Decimal):
+      value = float(value)
+    result[key] = value
+  return result
+
+
+def _reference_deserialize_dict(input_dict, type_map, convert_time_to_ca=False):
+  result = {}
+  for key, value in input_dict.items():
+    if not isinstance(key, str):
+      raise TypeError(f"All keys must be strings. Invalid key: {key} ({type(key)})")
+    if key in type_map and value is not None:
+      result[key] = _reference_cast_model_value(value, type_map[key], convert_time_to_ca)
+    else:
+      result[key] = value
+  return result
+
+
+def _misc_json_payload(n_keys: int = 200) -> tuple[dict, dict]:
+  """A realistic misc_json-like form payload (typed Python values) and its form type map."""
+  base = datetime.datetime(2025, 3, 9, 1, 30)
+  payload, type_map = {}, {}
+  for i in range(n_keys):
+    kind = i % 8
+    key = f"field_{i:03d}"
+    if kind == 0:
+      payload[key], type_map[key] = base + datetime.timedelta(hours=i), datetime.datetime
+    elif kind == 1:
+      payload[key], type_map[key] = decimal.Decimal(f"{i}.125"), decimal.Decimal
+    elif kind == 2:
+      payload[key], type_map[key] = i, int
+    elif kind == 3:
+      payload[key], type_map[key] = bool(i % 3), bool
+    elif kind == 4:
+      payload[key], type_map[key] = "Please Select", str
+    elif kind == 5:
+      payload[key] = None
+    else:
+      payload[key] = f"free text {i}"
+  payload["id_incidence"], type_map["id_incidence"] = "1234", int
+  return payload, type_map
+
+
+def _outcome(fn, *args):
+  try:
+    return "ok", fn(*args)
+  except Exception as e:
+    return type(e), str(e)
+
+
+@pytest.mark.parametrize("convert_time_to_ca", [False, True])
+@pytest.mark.parametrize("use_type_map", [False, True])
+def test_compiled_converters_match_reference(convert_time_to_ca, use_type_map):
+  payload, type_map = _misc_json_payload()
+  type_map = type_map if use_type_map else None
+
+  expected = _reference_make_dict_serializeable(payload, type_map, convert_time_to_ca)
+  serialized = arb_json.make_dict_serializeable(payload, type_map, convert_time_to_ca)
+  assert serialized == expected
+
+  _, form_types = _misc_json_payload()
+  assert _outcome(arb_json.deserialize_dict, serialized, form_types, convert_time_to_ca) == \
+         _outcome(_reference_deserialize_dict, serialized, form_types, convert_time_to_ca)
+
+
+@pytest.mark.parametrize("value, value_type", [
+  ("5", int), ("2.5", float), ("", bool), ("x", str), (5, str), ("1.10", decimal.Decimal),
+  ("2025-07-04T12:00:00+00:00", datetime.datetime), ("2025-07-04T12:00:00", datetime.datetime),
+  ("notanint", int), ("bad", decimal.Decimal), ("not a date", datetime.datetime), ("x", list), ("x", None),
+])
+@pytest.mark.parametrize("convert_time_to_ca", [False, True])
+def test_cast_model_value_matches_reference(value, value_type, convert_time_to_ca):
+  assert _outcome(arb_json.cast_model_value, value, value_type, convert_time_to_ca) == \
+         _outcome(_reference_cast_model_value, value, value_type, convert_time_to_ca)
+
+
+@pytest.mark.benchmark
+def test_benchmark_compiled_converters(best_of):
+  """Compare the compiled converters with the reference loop over a 200-key misc_json payload."""
+  payload, type_map = _misc_json_payload()
+  serialized = arb_json.make_dict_serializeable(payload, type_map, True)
+
+  best_of("serialize_reference", lambda: _reference_make_dict_serializeable(payload, type_map, True), 7, 200)
+  best_of("serialize_compiled", lambda: arb_json.make_dict_serializeable(payload, type_map, True), 7, 200)
+  best_of("deserialize_reference", lambda: _reference_deserialize_dict(serialized, type_map, True), 7, 200)
+  best_of("deserialize_compiled", lambda: arb_json.deserialize_dict(serialized, type_map, True), 7, 200)
+  assert serialized == _reference_make_dict_serializeable(payload, type_map, True)
+  assert arb_json.deserialize_dict(serialized, type_map, True) == \
+         _reference_deserialize_dict(serialized, type_map, True)
+
+
 # --- safe_json_loads ---
 def test_safe_json_loads_valid():
   d = {"a": 1}
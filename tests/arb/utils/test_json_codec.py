@@ -0,0 +1,250 @@
+"""
+Tests for arb.utils.json_codec
+
+Differential tests write documents with every available codec and read them back with every
+available codec, asserting the decoded objects are identical to the stdlib round trip. The
+benchmark tests (marked `benchmark`) time the staging write, `json_save_with_meta` and the
+staged-listing read paths with each codec and record the results; run them with `pytest -m benchmark`.
+"""
+import dataclasses
+import datetime
+import decimal
+import enum
+import json
+import math
+import uuid
+from pathlib import Path
+from unittest.mock import patch
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from arb.utils import json_codec
+from arb.utils.io_wrappers import save_json_safely
+from arb.utils.json import JSON_TYPE_TAGS, json_deserializer, json_load_with_meta, json_save_with_meta, \
+  json_serializer
+from arb.utils.json_codec import StdlibJsonCodec, get_json_codec, make_json_codec, set_json_codec
+from arb.utils.path_utils import find_repo_root
+
+AVAILABLE = sorted(json_codec._CODECS)
+requires_orjson = pytest.mark.skipif("orjson" not in AVAILABLE, reason="orjson is not installed")
+
+SAMPLES = [
+  {"a": 1, "b": [1, 2.5, None, True, False], "c": {"nested": {"deeper": "x"}}},
+  {"when": datetime.datetime(2025, 7, 4, 12, 34, 56, 789012),
+   "when_tz": datetime.datetime(2025, 3, 9, 2, 30, tzinfo=ZoneInfo("America/Los_Angeles")),
+   "amount": decimal.Decimal("1234.5600"),
+   "types": [int, str, float, bool]},
+  {"unicode": "Café – naïve ✓ 日本", "escapes": "quote\" backslash\\ newline\n tab\t"},
+  [{"id_incidence": i, "ts": datetime.datetime(2025, 1, 1) + datetime.timedelta(minutes=i)} for i in range(50)],
+  {"big": 2 ** 70, "neg": -2 ** 65, "float": 1e-7, "large_float": 1e16},
+  {"_metadata_": {"x": 1}, "_data_": {"list_of_lists": [[1, [2, [3, {"k": decimal.Decimal("0.1")}]]]]}},
+  None,
+  "just a string",
+  [],
+  {},
+]
+
+
+@pytest.fixture
+def restore_codec():
+  original = json_codec._active_codec
+  yield
+  json_codec._active_codec = original
+
+
+def _stdlib_round_trip(obj):
+  return json.loads(json.dumps(obj, default=json_serializer, indent=4), object_hook=json_deserializer)
+
+
+@pytest.mark.parametrize("writer", AVAILABLE)
+@pytest.mark.parametrize("reader", AVAILABLE)
+@pytest.mark.parametrize("sample", SAMPLES)
+def test_round_trip_matches_stdlib(writer, reader, sample):
+  raw = make_json_codec(writer).dumps(sample, default=json_serializer, indent=4)
+  decoded = make_json_codec(reader).loads(raw, object_hook=json_deserializer)
+  assert decoded == _stdlib_round_trip(sample)
+
+
+@pytest.mark.parametrize("reader", AVAILABLE)
+@pytest.mark.parametrize("sample", SAMPLES)
+def test_hook_keys_matches_full_hook(reader, sample):
+  raw = json.dumps(sample, default=json_serializer, indent=4).encode("utf-8")
+  decoded = make_json_codec(reader).loads(raw, object_hook=json_deserializer, hook_keys=JSON_TYPE_TAGS)
+  assert decoded == _stdlib_round_trip(sample)
+
+
+@pytest.mark.parametrize("sample", SAMPLES)
+def test_stdlib_codec_output_is_unchanged(sample):
+  raw = StdlibJsonCodec().dumps(sample, default=json_serializer, indent=4)
+  assert raw == json.dumps(sample, default=json_serializer, indent=4).encode("utf-8")
+
+
+@pytest.mark.parametrize("reader", AVAILABLE)
+def test_reads_same_bytes_identically(reader):
+  """Every codec decodes the same on-disk bytes (including stdlib-only literals) to the same objects."""
+  documents = [
+    json.dumps(sample, default=json_serializer, indent=4).encode("utf-8") for sample in SAMPLES
+  ] + [
+    b'{"nan": NaN, "inf": Infinity, "ninf": -Infinity}',
+    b'\xef\xbb\xbf{"bom": true}',
+    '{"text": "Café"}'.encode("utf-8"),
+    b'{"dup": 1, "dup": 2}',
+    b'{"__type__": "unknown.Type", "value": 1}',
+  ]
+  for raw in documents:
+    expected = json.loads(raw.decode("utf-8-sig"), object_hook=json_deserializer)
+    actual = make_json_codec(reader).loads(raw, object_hook=json_deserializer)
+    if isinstance(expected, dict) and "nan" in expected:
+      assert math.isnan(actual["nan"]) and actual["inf"] == math.inf and actual["ninf"] == -math.inf
+    else:
+      assert actual == expected
+
+
+@pytest.mark.parametrize("reader", AVAILABLE)
+def test_reads_repo_schema_files_identically(reader):
+  files = sorted((find_repo_root(Path(__file__)) / "feedback_forms" / "current_versions").glob("*.json"))
+  assert files
+  for path in files:
+    raw = path.read_bytes()
+    expected = json.loads(raw.decode("utf-8-sig"), object_hook=json_deserializer)
+    assert make_json_codec(reader).loads(raw, object_hook=json_deserializer) == expected
+
+
+@pytest.mark.parametrize("codec_name", AVAILABLE)
+def test_invalid_json_raises_json_decode_error(codec_name):
+  with pytest.raises(json.JSONDecodeError):
+    make_json_codec(codec_name).loads(b'{"a": ')
+
+
+@pytest.mark.parametrize("codec_name", AVAILABLE)
+def test_unsupported_type_raises_type_error(codec_name):
+  with pytest.raises(TypeError):
+    make_json_codec(codec_name).dumps({"x": object()}, default=json_serializer)
+
+
+class _Color(enum.Enum):
+  RED = "red"
+
+
+class _Level(enum.IntEnum):
+  HIGH = 3
+
+
+@dataclasses.dataclass
+class _Point:
+  x: int
+
+
+PARITY_SAMPLES = [
+  {"id": uuid.UUID("12345678-1234-5678-1234-567812345678"), "color": _Color.RED, "level": _Level.HIGH},
+  {"unicode": "Café ✓", "nested": [{"a": 1, "b": [None, True, 2.5]}, [], {}], "t": (1, 2)},
+  {1: "int key", "when": datetime.datetime(2025, 1, 2, 3, 4, 5), "day": datetime.date(2025, 1, 2)},
+  {"big": 2 ** 70, "amount": decimal.Decimal("1.25"), "point": _Point(1)},
+]
+
+
+@pytest.mark.parametrize("indent", [None, 2, 4])
+@pytest.mark.parametrize("ensure_ascii", [True, False])
+@pytest.mark.parametrize("default", [str, json_serializer, None])
+@pytest.mark.parametrize("sample", PARITY_SAMPLES)
+def test_codecs_write_identical_bytes(indent, ensure_ascii, default, sample):
+  """Every codec accepts the same types and writes the same bytes for the same options."""
+  outputs = []
+  for name in AVAILABLE:
+    try:
+      outputs.append(make_json_codec(name).dumps(sample, default=default, indent=indent, ensure_ascii=ensure_ascii))
+    except TypeError:
+      outputs.append(TypeError)
+  assert outputs.count(outputs[0]) == len(outputs)
+
+
+def test_stdlib_codec_encodes_uuid_and_enum_values():
+  raw = StdlibJsonCodec().dumps(PARITY_SAMPLES[0], default=json_serializer)
+  assert json.loads(raw) == {"id": "12345678-1234-5678-1234-567812345678", "color": "red", "level": 3}
+
+
+@requires_orjson
+def test_orjson_passes_datetimes_to_default():
+  """With default=str, datetimes must be rendered by str() exactly as stdlib would, not as RFC 3339."""
+  value = {"ts": datetime.datetime(2025, 1, 2, 3, 4, 5)}
+  raw = make_json_codec("orjson").dumps(value, default=str)
+  assert json.loads(raw) == json.loads(json.dumps(value, default=str))
+
+
+def test_make_json_codec_names():
+  assert make_json_codec("stdlib").name == "stdlib"
+  assert make_json_codec("auto").name == ("orjson" if "orjson" in AVAILABLE else "stdlib")
+  with pytest.raises(ValueError):
+    make_json_codec("simdjson")
+
+
+def test_get_json_codec_honors_env(monkeypatch, restore_codec):
+  json_codec._active_codec = None
+  monkeypatch.setenv(json_codec.JSON_CODEC_ENV_VAR, "stdlib")
+  assert get_json_codec().name == "stdlib"
+
+  json_codec._active_codec = None
+  monkeypatch.setenv(json_codec.JSON_CODEC_ENV_VAR, "bogus")
+  assert get_json_codec().name == "stdlib"
+
+
+@pytest.mark.parametrize("writer", AVAILABLE)
+@pytest.mark.parametrize("reader", AVAILABLE)
+def test_json_save_with_meta_cross_codec(tmp_path, writer, reader, restore_codec):
+  data = SAMPLES[1]
+  path = tmp_path / "meta.json"
+  set_json_codec(writer)
+  json_save_with_meta(path, data, metadata={"source": "test"})
+  set_json_codec(reader)
+  loaded, metadata = json_load_with_meta(path)
+  assert loaded == _stdlib_round_trip(data)
+  assert metadata["source"] == "test"
+
+
+@requires_orjson
+def test_json_save_defaults_use_orjson(tmp_path, restore_codec):
+  set_json_codec("orjson")
+  with patch.object(json_codec.orjson, "dumps", wraps=json_codec.orjson.dumps) as dumps:
+    json_save_with_meta(tmp_path / "meta.json", SAMPLES[1], metadata={"source": "test"})
+  assert dumps.call_count == 1
+  assert (tmp_path / "meta.json").read_text(encoding="utf-8").startswith('{\n  "_metadata_"')
+
+
+# --- Benchmarks -----------------------------------------------------------------------------------
+
+def _staged_payload(n_fields: int = 2000) -> dict:
+  ts = datetime.datetime(2025, 1, 1, 8, 0, 0)
+  tab = {f"field_{i:04d}": (f"value {i}" if i % 3 else ts + datetime.timedelta(hours=i)) for i in range(n_fields)}
+  tab.update({f"amount_{i:03d}": decimal.Decimal(f"{i}.25") for i in range(200)})
+  return {"tab_contents": {"Feedback Form": tab}, "metadata": {"sector": "Oil & Gas"}}
+
+
+@pytest.mark.benchmark
+def test_benchmark_staging_and_listing_paths(tmp_path, restore_codec, best_of):
+  """
+  Time the staging and listing paths per codec.
+
+  - staged write: `InMemoryStaging.to_staging_file` encoding (default=str, indent=2) plus atomic write
+  - save with meta: `json_save_with_meta` with its default options, as the upload paths call it
+  - list staged: `json_load_with_meta` over 20 staged files, as `list_staged` does
+  - list tagged: the same over files written by `json_save_with_meta` (datetime/Decimal tags to decode)
+  """
+  payload = _staged_payload()
+  staging_options = {"indent": 2, "ensure_ascii": False, "default": str}
+  loaded = {}
+  for name in AVAILABLE:
+    codec = set_json_codec(name)
+    staged = tmp_path / name / "staged"
+    tagged = tmp_path / name / "tagged"
+    best_of(f"{name}_staged_write", lambda: save_json_safely(payload, staged / "id_0_ts_20250101_000000.json",
+                                                             json_options=staging_options, codec=codec))
+    best_of(f"{name}_save_with_meta", lambda: json_save_with_meta(tmp_path / name / "meta.json", payload))
+    for i in range(20):
+      save_json_safely(payload, staged / f"id_{i}_ts_20250101_000000.json", json_options=staging_options, codec=codec)
+      json_save_with_meta(tagged / f"id_{i}_ts_20250101_000000.json", payload)
+    best_of(f"{name}_list_staged", lambda: [json_load_with_meta(p) for p in sorted(staged.glob("*.json"))])
+    best_of(f"{name}_list_tagged", lambda: [json_load_with_meta(p) for p in sorted(tagged.glob("*.json"))])
+    loaded[name] = json_load_with_meta(tagged / "id_0_ts_20250101_000000.json")[0]
+
+  assert all(result == loaded["stdlib"] for result in loaded.values())